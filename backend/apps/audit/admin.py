@@ -1,6 +1,18 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
-from .models import AuditLog
+from .models import AuditBatch, AuditLog
+
+
+class CappedCountPaginator(Paginator):
+    """Compte borné (COUNT sur une sous-requête LIMIT) : pas de parcours complet."""
+
+    cap = 10000
+
+    @cached_property
+    def count(self):
+        return self.object_list[: self.cap].count()
 
 
 @admin.register(AuditLog)
@@ -13,8 +25,14 @@ class AuditLogAdmin(admin.ModelAdmin):
         "entreprise",
         "created_at",
     )
-    list_filter = ("action", "entity_type", "entreprise")
-    search_fields = ("action", "entity_type", "entity_id")
+    # Filtres et recherche exacts : les listes de valeurs distinctes et les
+    # LIKE '%...%' parcourraient toute la table
+    list_filter = ("entreprise",)
+    search_fields = ("=action", "=entity_type", "=entity_id")
+    list_select_related = ("actor", "entreprise")
+    ordering = ("-created_at", "-id")
+    paginator = CappedCountPaginator
+    show_full_result_count = False
     readonly_fields = (
         "id",
         "entreprise",
@@ -24,6 +42,35 @@ class AuditLogAdmin(admin.ModelAdmin):
         "entity_id",
         "metadata",
         "created_at",
+        "batch",
+        "batch_index",
+        "entry_hash",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuditBatch)
+class AuditBatchAdmin(admin.ModelAdmin):
+    list_display = ("sequence", "size", "started_at", "ended_at", "sealed_at")
+    search_fields = ("merkle_root", "chain_hash")
+    readonly_fields = (
+        "id",
+        "sequence",
+        "started_at",
+        "ended_at",
+        "size",
+        "merkle_root",
+        "prev_hash",
+        "chain_hash",
+        "sealed_at",
     )
 
     def has_add_permission(self, request):
@@ -0,0 +1,250 @@
+"""
+Archives colonnaires compressées du journal d'audit (un fichier par
+entreprise et par mois).
+
+Format : `MAGIC`, longueur de l'en-tête (uint32), en-tête JSON, puis un bloc
+zlib par colonne. L'en-tête décrit le nombre de lignes, les bornes
+temporelles et, pour chaque colonne, son encodage et sa position :
+
+- `time` : horodatages en microsecondes UTC, triés et codés en deltas (int64) ;
+- `int` : entiers int64 ;
+- `dict` : dictionnaire de valeurs + codes uint32 (colonnes peu variées) ;
+- `lines` : chaînes séparées par des sauts de ligne (metadata en JSON).
+
+La lecture passe par `mmap` et ne décompresse que les colonnes utilisées :
+une recherche par action ne lit que `action` et `created_at` avant de
+reconstituer les lignes retenues.
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from datetime import UTC, datetime, timedelta
+from itertools import accumulate
+
+MAGIC = b"FMAUDIT1"
+SUFFIX = ".auditcol"
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# (nom, encodage) dans l'ordre des colonnes du fichier
+COLUMNS = (
+    ("id", "lines"),
+    ("created_at", "time"),
+    ("actor_id", "dict"),
+    ("action", "dict"),
+    ("entity_type", "dict"),
+    ("entity_id", "lines"),
+    ("metadata", "lines"),
+    ("batch_sequence", "int"),
+    ("batch_index", "int"),
+    ("entry_hash", "lines"),
+)
+ENCODINGS = dict(COLUMNS)
+# Colonnes dont la chaîne vide représente NULL
+NULLABLE = {"actor_id"}
+
+
+def to_micros(moment):
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def _encode(encoding, values):
+    if encoding == "time":
+        deltas = [b - a for a, b in zip([0, *values], values)]
+        return array("q", deltas).tobytes(), {}
+    if encoding == "int":
+        return array("q", [-1 if v is None else v for v in values]).tobytes(), {}
+    if encoding == "dict":
+        codes = {}
+        data = array("I", [codes.setdefault(v, len(codes)) for v in values])
+        return data.tobytes(), {"values": list(codes)}
+    return "\n".join(values).encode(), {}
+
+
+def _decode(encoding, raw, info, rows):
+    if encoding == "time":
+        return list(accumulate(array("q", raw)))
+    if encoding == "int":
+        return [None if v == -1 else v for v in array("q", raw)]
+    if encoding == "dict":
+        return array("I", raw)
+    return raw.decode().split("\n") if rows else []
+
+
+def _column_values(rows, name):
+    if name == "created_at":
+        return [to_micros(row["created_at"]) for row in rows]
+    if name == "metadata":
+        return [
+            json.dumps(row["metadata"], sort_keys=True, ensure_ascii=False)
+            for row in rows
+        ]
+    if ENCODINGS[name] == "int":
+        return [row[name] for row in rows]
+    return ["" if row[name] is None else str(row[name]) for row in rows]
+
+
+def write_archive(path, rows):
+    """
+    Écrit `rows` (dictionnaires des champs de `COLUMNS`, created_at avec
+    fuseau) triées par date, de façon atomique (fichier temporaire puis
+    renommage). Une archive existante est fusionnée (dédoublonnage par id).
+    """
+    rows = list(rows)
+    if os.path.exists(path):
+        known = {str(row["id"]) for row in rows}
+        with ArchiveReader(path) as existing:
+            rows += [row for row in existing.rows() if row["id"] not in known]
+    rows.sort(key=lambda row: (row["created_at"], str(row["id"])))
+
+    blocks, columns, offset = [], [], 0
+    for name, encoding in COLUMNS:
+        raw, info = _encode(encoding, _column_values(rows, name))
+        block = zlib.compress(raw, 6)
+        columns.append(
+            {"name": name, "offset": offset, "length": len(block), "raw": len(raw)}
+            | info
+        )
+        blocks.append(block)
+        offset += len(block)
+    header = json.dumps(
+        {
+            "rows": len(rows),
+            "min_created_at": rows[0]["created_at"].isoformat() if rows else None,
+            "max_created_at": rows[-1]["created_at"].isoformat() if rows else None,
+            "columns": columns,
+        }
+    ).encode()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as archive:
+        archive.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for block in blocks:
+            archive.write(block)
+        archive.flush()
+        os.fsync(archive.fileno())
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class ArchiveReader:
+    """Lecture d'une archive via mmap, colonne par colonne et à la demande."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as archive:
+            self._map = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} : archive d'audit invalide")
+        start = len(MAGIC) + 4
+        (header_length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        self.header = json.loads(self._map[start : start + header_length])
+        self._data_start = start + header_length
+        self._columns = {column["name"]: column for column in self.header["columns"]}
+        self._cache = {}
+
+    def __len__(self):
+        return self.header["rows"]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name):
+        """Valeurs brutes décodées d'une colonne (codes pour les colonnes `dict`)."""
+        if name not in self._cache:
+            column = self._columns[name]
+            start = self._data_start + column["offset"]
+            raw = zlib.decompress(self._map[start : start + column["length"]])
+            self._cache[name] = _decode(ENCODINGS[name], raw, column, len(self))
+        return self._cache[name]
+
+    def _value(self, name, i):
+        value = self.column(name)[i]
+        encoding = ENCODINGS[name]
+        if encoding == "dict":
+            value = self._columns[name]["values"][value]
+        if name == "created_at":
+            return from_micros(value)
+        if name == "metadata":
+            return json.loads(value)
+        if name in NULLABLE and not value:
+            return None
+        return value
+
+    def row(self, i):
+        return {name: self._value(name, i) for name, _ in COLUMNS}
+
+    def rows(self, indices=None):
+        indices = range(len(self)) if indices is None else indices
+        return [self.row(i) for i in indices]
+
+    def _equals(self, name, value, candidates):
+        column = self.column(name)
+        if ENCODINGS[name] == "dict":
+            values = self._columns[name]["values"]
+            if str(value) not in values:
+                return []
+            value = values.index(str(value))
+        elif ENCODINGS[name] == "int":
+            value = int(value)
+        else:
+            value = str(value)
+        return [i for i in candidates if column[i] == value]
+
+    def search(
+        self,
+        since=None,
+        until=None,
+        metadata_contains=None,
+        limit=None,
+        **equals,
+    ):
+        """
+        Lignes dont created_at est dans [since, until], dont chaque colonne de
+        `equals` (action=..., entity_id=...) vaut la valeur donnée et dont la
+        metadata contient `metadata_contains` (égalité des clés fournies).
+        """
+        candidates = range(len(self))
+        if since is not None or until is not None:
+            low = to_micros(since) if since is not None else None
+            high = to_micros(until) if until is not None else None
+            times = self.column("created_at")
+            candidates = [
+                i
+                for i in candidates
+                if (low is None or times[i] >= low)
+                and (high is None or times[i] <= high)
+            ]
+        for name, value in equals.items():
+            if name not in ENCODINGS:
+                raise ValueError(f"Colonne inconnue : {name}")
+            candidates = self._equals(name, value, candidates)
+        if metadata_contains:
+            metadata = self.column("metadata")
+            candidates = [
+                i
+                for i in candidates
+                if _contains(json.loads(metadata[i]), metadata_contains)
+            ]
+        if limit is not None:
+            candidates = list(candidates)[:limit]
+        return self.rows(candidates)
+
+
+def _contains(document, subset):
+    return all(document.get(key) == value for key, value in subset.items())
@@ -0,0 +1,25 @@
+"""
+Acteur et adresse IP d'une requête HTTP, pour attribuer les événements
+d'audit émis hors des vues (signaux, services). La requête en cours est
+celle qu'expose `apps.common.tenancy.current_request`.
+"""
+
+
+def request_actor(request):
+    """
+    Utilisateur authentifié de la requête, ou None.
+
+    DRF authentifie dans la vue et recopie l'utilisateur sur la requête
+    Django : il est donc lu au moment de l'événement, pas du middleware.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+def client_ip(request):
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
@@ -0,0 +1,121 @@
+"""
+API d'audit : `record()` enregistre un événement, écrit en base par lots
+via `AuditWriter` (voir `writer.py`) une fois la transaction courante validée.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from apps.common.sharding import shard_for
+from apps.common.tenancy import current_request
+
+from .context import client_ip, request_actor
+from .models import AuditLog
+from .writer import AuditWriter
+
+logger = logging.getLogger(__name__)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _insert(events):
+    """Écrit un lot d'événements, sur la base de chaque entreprise (shards)."""
+    close_old_connections()
+    by_database = {}
+    for event in events:
+        by_database.setdefault(shard_for(event["entreprise_id"]), []).append(event)
+    for using, group in by_database.items():
+        _insert_into(using, group)
+
+
+def _insert_into(using, events):
+    """Écrit un lot d'événements dans `using` ; en cas de conflit, ligne à ligne."""
+    try:
+        with transaction.atomic(using=using):
+            AuditLog.objects.using(using).bulk_create(
+                [AuditLog(**event) for event in events]
+            )
+        return
+    except IntegrityError:
+        pass
+    # Un événement invalide (acteur supprimé entre-temps...) ne doit pas
+    # bloquer le reste du lot indéfiniment
+    for event in events:
+        try:
+            with transaction.atomic(using=using):
+                AuditLog.objects.using(using).create(**event)
+        except IntegrityError:
+            logger.exception("Événement d'audit rejeté : %s", event)
+
+
+def get_writer():
+    """Writer du processus, créé au premier événement et vidé à l'arrêt."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    _insert,
+                    queue_size=settings.AUDIT_QUEUE_SIZE,
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+                    spill_dir=settings.AUDIT_SPILL_DIR,
+                )
+                atexit.register(_writer.close)
+    return _writer
+
+
+def record(
+    action,
+    instance=None,
+    *,
+    entity_type="",
+    entity_id="",
+    metadata=None,
+    actor=None,
+    entreprise_id=None,
+):
+    """
+    Enregistre un événement d'audit.
+
+    L'acteur et l'adresse IP sont déduits de la requête en cours s'ils ne
+    sont pas fournis ; l'entité et l'entreprise, de `instance`. L'événement
+    n'est transmis qu'après validation de la transaction en cours.
+    `metadata` doit être sérialisable en JSON.
+    """
+    request = current_request()
+    if actor is None and request is not None:
+        actor = request_actor(request)
+    if instance is not None:
+        entity_type = entity_type or instance._meta.model_name
+        entity_id = entity_id or str(instance.pk)
+        if entreprise_id is None:
+            entreprise_id = getattr(instance, "entreprise_id", None)
+    if entreprise_id is None and actor is not None:
+        entreprise_id = actor.entreprise_id
+
+    metadata = dict(metadata or {})
+    if request is not None:
+        metadata.setdefault("ip", client_ip(request))
+
+    event = {
+        "entreprise_id": str(entreprise_id) if entreprise_id else None,
+        "actor_id": str(actor.pk) if actor is not None else None,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "metadata": metadata,
+        "created_at": timezone.now(),
+    }
+    # Après validation de la transaction de l'entreprise, sur son shard
+    using = shard_for(entreprise_id)
+    if settings.AUDIT_ASYNC:
+        transaction.on_commit(lambda: get_writer().enqueue(event), using=using)
+    else:
+        transaction.on_commit(lambda: _insert([event]), using=using)
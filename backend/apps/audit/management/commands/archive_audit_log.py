@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.audit.retention import archive_audit_log
+from apps.common.sharding import tenant_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace les mois clos du journal d'audit vers des archives colonnaires "
+        "compressées (une par entreprise et par mois), puis les supprime de la base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.AUDIT_RETENTION_MONTHS,
+            help="Mois conservés en base, en plus du mois courant.",
+        )
+        parser.add_argument("--root", help="Répertoire des archives.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument(
+            "--database",
+            action="append",
+            default=[],
+            help="Alias de base (répétable). Par défaut : toutes les bases "
+            "d'entreprise (default et shards).",
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        for using in options["database"] or tenant_databases():
+            results += archive_audit_log(
+                options["retention_months"],
+                root=options["root"],
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+                using=using,
+            )
+        for result in results:
+            self.stdout.write(
+                f"{result.entreprise_id or '-'} {result.month:%Y-%m}: "
+                f"{result.archived} archivée(s), {result.deleted} supprimée(s) "
+                f"({result.elapsed * 1000:.0f} ms)"
+            )
+
+        archived = sum(result.archived for result in results)
+        action = "à archiver" if options["dry_run"] else "archivée(s)"
+        self.stdout.write(self.style.SUCCESS(f"{archived} entrée(s) {action}"))
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.audit import sealing
+from apps.common.sharding import tenant_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Scelle les entrées d'audit en attente en lots de Merkle chaînés "
+        "(à planifier toutes les quelques minutes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--max-size", type=int, default=sealing.SEAL_MAX_SIZE)
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=int(sealing.SEAL_WINDOW.total_seconds()),
+            help="Durée maximale couverte par un lot, en secondes.",
+        )
+        parser.add_argument(
+            "--delay",
+            type=int,
+            default=int(sealing.SEAL_DELAY.total_seconds()),
+            help="Âge minimal (secondes) d'une entrée avant scellement.",
+        )
+        parser.add_argument(
+            "--database",
+            action="append",
+            default=[],
+            help="Alias de base (répétable). Par défaut : toutes les bases "
+            "d'entreprise (default et shards).",
+        )
+
+    def handle(self, *args, **options):
+        for using in options["database"] or tenant_databases():
+            result = sealing.seal_audit_log(
+                max_size=options["max_size"],
+                window=timedelta(seconds=options["window"]),
+                delay=timedelta(seconds=options["delay"]),
+                using=using,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{using}: {result.entries} entrée(s) scellée(s) en "
+                    f"{result.batches} lot(s) ({result.elapsed * 1000:.0f} ms)"
+                )
+            )
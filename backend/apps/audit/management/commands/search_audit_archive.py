@@ -0,0 +1,66 @@
+import json
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.audit.retention import search_archives
+
+
+def _parse_bound(value, bound):
+    if value is None:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise CommandError(f"Date invalide (AAAA-MM-JJ) : {value}")
+    return timezone.make_aware(datetime.combine(day, bound))
+
+
+class Command(BaseCommand):
+    help = (
+        "Recherche dans les archives d'audit d'une entreprise sans les "
+        "restaurer en base (une ligne JSON par entrée)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("entreprise", help="UUID d'entreprise ('' : système).")
+        parser.add_argument("--since", help="Début de période (AAAA-MM-JJ).")
+        parser.add_argument("--until", help="Fin de période incluse (AAAA-MM-JJ).")
+        parser.add_argument("--action")
+        parser.add_argument("--entity-type")
+        parser.add_argument("--entity-id")
+        parser.add_argument("--actor", help="UUID de l'utilisateur.")
+        parser.add_argument(
+            "--metadata", help='Sous-ensemble JSON de metadata, ex. {"status": "PAID"}.'
+        )
+        parser.add_argument("--limit", type=int, default=1000)
+        parser.add_argument("--root", help="Répertoire des archives.")
+
+    def handle(self, *args, **options):
+        filters = {
+            column: options[option]
+            for column, option in (
+                ("action", "action"),
+                ("entity_type", "entity_type"),
+                ("entity_id", "entity_id"),
+                ("actor_id", "actor"),
+            )
+            if options[option]
+        }
+        if options["metadata"]:
+            try:
+                filters["metadata_contains"] = json.loads(options["metadata"])
+            except ValueError as err:
+                raise CommandError(f"--metadata : JSON invalide ({err})") from err
+
+        rows = search_archives(
+            options["entreprise"],
+            since=_parse_bound(options["since"], time.min),
+            until=_parse_bound(options["until"], time.max),
+            root=options["root"],
+            limit=options["limit"],
+            **filters,
+        )
+        for row in rows:
+            self.stdout.write(json.dumps(row, default=str, ensure_ascii=False))
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from datetime import time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.audit.sealing import batches_in_period, check_chain, verify_batch
+from apps.common.sharding import tenant_databases
+
+
+def _init_worker():
+    """Chaque processus ouvre ses propres connexions à la base."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def _parse_bound(value, bound):
+    if value is None:
+        return None
+    day = parse_date(value)
+    if day is None:
+        raise CommandError(f"Date invalide (AAAA-MM-JJ) : {value}")
+    return timezone.make_aware(datetime.combine(day, bound))
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie l'intégrité du journal d'audit : feuilles et racine de chaque "
+        "lot (en parallèle) et continuité de la chaîne des lots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Début de période (AAAA-MM-JJ).")
+        parser.add_argument("--until", help="Fin de période incluse (AAAA-MM-JJ).")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--database",
+            action="append",
+            default=[],
+            help="Alias de base (répétable). Par défaut : toutes les bases "
+            "d'entreprise (default et shards).",
+        )
+
+    def handle(self, *args, **options):
+        since = _parse_bound(options["since"], dt_time.min)
+        until = _parse_bound(options["until"], dt_time.max)
+
+        started = time.perf_counter()
+        batches, problems = [], []
+        for using in options["database"] or tenant_databases():
+            # Une chaîne de lots par base
+            chain = batches_in_period(since, until, using)
+            problems += [f"{using}: {problem}" for problem in check_chain(chain, using)]
+            batches += [(batch_id, using) for batch_id, *_ in chain]
+
+        if options["workers"] > 1:
+            # Les connexions ne doivent pas être partagées entre processus
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=_init_worker
+            ) as pool:
+                checks = list(
+                    pool.map(
+                        verify_batch,
+                        [batch_id for batch_id, _ in batches],
+                        [using for _, using in batches],
+                        chunksize=16,
+                    )
+                )
+        else:
+            checks = [verify_batch(batch_id, using) for batch_id, using in batches]
+
+        entries = 0
+        for (_, using), (_, batch_entries, batch_problems) in zip(batches, checks):
+            entries += batch_entries
+            problems += [f"{using}: {problem}" for problem in batch_problems]
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(problem))
+
+        elapsed = time.perf_counter() - started
+        summary = (
+            f"{len(batches)} lot(s), {entries} entrée(s) vérifiés en {elapsed:.2f} s"
+        )
+        if problems:
+            raise CommandError(f"{len(problems)} anomalie(s) : {summary}")
+        self.stdout.write(self.style.SUCCESS(f"Journal intègre : {summary}"))
@@ -0,0 +1,100 @@
+"""
+Arbres de Merkle (SHA-256) pour sceller le journal d'audit par lots.
+
+Les feuilles et les nœuds internes sont préfixés différemment (0x00 / 0x01,
+comme RFC 6962) pour qu'une feuille ne puisse pas se faire passer pour un
+nœud. Un nœud sans frère est remonté tel quel au niveau supérieur (pas de
+duplication, qui rendrait deux listes de feuilles différentes équivalentes).
+
+La preuve d'inclusion d'une feuille est la liste de ses frères de la
+feuille à la racine : O(log n) hachages pour la vérifier.
+"""
+
+import hashlib
+import json
+from datetime import UTC
+
+EMPTY_HASH = "0" * 64
+
+LEFT = "left"
+RIGHT = "right"
+
+
+def entry_bytes(entry):
+    """
+    Forme canonique d'une entrée d'audit : dictionnaire avec id,
+    entreprise_id, actor_id, action, entity_type, entity_id, metadata et
+    created_at (datetime avec fuseau).
+    """
+    created_at = entry["created_at"].astimezone(UTC)
+    return json.dumps(
+        [
+            str(entry["id"]),
+            str(entry["entreprise_id"] or ""),
+            str(entry["actor_id"] or ""),
+            entry["action"],
+            entry["entity_type"],
+            entry["entity_id"],
+            entry["metadata"],
+            created_at.isoformat(),
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode()
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _next_level(level):
+    parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaves) -> bytes:
+    """Racine d'une liste non vide de hachages de feuilles."""
+    level = list(leaves)
+    if not level:
+        raise ValueError("Aucune feuille")
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0]
+
+
+def inclusion_proof(leaves, index):
+    """Frères de la feuille `index`, de bas en haut : liste de (côté, hachage)."""
+    level = list(leaves)
+    if not 0 <= index < len(level):
+        raise IndexError(index)
+    proof = []
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append((LEFT if sibling < index else RIGHT, level[sibling]))
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def root_from_proof(leaf: bytes, proof) -> bytes:
+    node = leaf
+    for side, sibling in proof:
+        node = node_hash(sibling, node) if side == LEFT else node_hash(node, sibling)
+    return node
+
+
+def verify_proof(leaf: bytes, proof, root: bytes) -> bool:
+    return root_from_proof(leaf, proof) == root
+
+
+def chain_hash(prev_hash: str, root: str, sequence: int, size: int) -> str:
+    """Maillon de la chaîne des lots : lie la racine d'un lot au maillon précédent."""
+    return hashlib.sha256(f"{prev_hash}:{root}:{sequence}:{size}".encode()).hexdigest()
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:40
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_async_writer"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditBatch",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("sequence", models.PositiveBigIntegerField(unique=True)),
+                ("started_at", models.DateTimeField()),
+                ("ended_at", models.DateTimeField()),
+                ("size", models.PositiveIntegerField()),
+                ("merkle_root", models.CharField(max_length=64)),
+                ("prev_hash", models.CharField(max_length=64)),
+                ("chain_hash", models.CharField(max_length=64)),
+                ("sealed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Audit Batch",
+                "verbose_name_plural": "Audit Batches",
+                "db_table": "audit_auditbatch",
+                "ordering": ["sequence"],
+                "indexes": [
+                    models.Index(fields=["ended_at"], name="audit_batch_ended_idx")
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="entries",
+                to="audit.auditbatch",
+            ),
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="batch_index",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="entry_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["batch", "batch_index"], name="audit_batch_position_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                condition=models.Q(("batch__isnull", True)),
+                fields=["created_at"],
+                name="audit_unsealed_idx",
+            ),
+        ),
+    ]
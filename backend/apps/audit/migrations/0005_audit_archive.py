@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_audit_batches"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditbatch",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
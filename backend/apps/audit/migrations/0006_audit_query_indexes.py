@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:50
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0005_audit_archive"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="auditlog",
+            name="audit_audit_entrepr_1c359b_idx",
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["entreprise", "-created_at", "-id"],
+                name="audit_tenant_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["entreprise", "action", "-created_at"],
+                name="audit_tenant_action_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["entreprise", "entity_type", "entity_id", "-created_at"],
+                name="audit_tenant_entity_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["metadata"],
+                name="audit_metadata_gin_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
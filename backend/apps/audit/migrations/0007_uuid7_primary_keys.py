@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+import apps.common.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0006_audit_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="auditbatch",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="auditlog",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:30
+
+from django.db import migrations
+
+from apps.common.partitioning import partition_table, unpartition_table
+
+TABLE = "audit_auditlog"
+
+
+def partition(apps, schema_editor):
+    partition_table(schema_editor, TABLE)
+
+
+def unpartition(apps, schema_editor):
+    unpartition_table(schema_editor, TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0007_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0008_partition_auditlog"),
+        ("companies", "0003_entreprise_frozen_until"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="auditlog",
+            name="entreprise",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="audit_logs",
+                to="companies.entreprise",
+            ),
+        ),
+    ]
@@ -1,38 +1,122 @@
-import uuid
-
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.utils import timezone
+
+from apps.common.ids import uuid7
+from apps.common.managers import TenantManager
 
 
 class AuditLog(models.Model):
-    """Log d'audit pour tracer les actions critiques."""
+    """
+    Log d'audit pour tracer les actions critiques. Table partitionnée par
+    mois de `created_at` sous PostgreSQL (apps.common.partitioning).
+    """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
+    # Haché dans les entrées scellées (apps.audit.merkle) : une entreprise
+    # ayant un historique d'audit se désactive, elle ne se supprime pas
     entreprise = models.ForeignKey(
         "companies.Entreprise",
-        on_delete=models.SET_NULL,
+        on_delete=models.PROTECT,
         null=True,
         blank=True,
         related_name="audit_logs",
     )
+    # Vide pour les actions système (commandes, tâches planifiées)
     actor = models.ForeignKey(
-        "users.User", on_delete=models.PROTECT, related_name="audit_logs"
+        "users.User",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="audit_logs",
     )
 
     action = models.CharField(max_length=64)
     entity_type = models.CharField(max_length=64, blank=True, default="")
     entity_id = models.CharField(max_length=64, blank=True, default="")
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Horodatage de l'événement, pas de son écriture différée (apps.audit.writer)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    # Scellement (apps.audit.sealing) : lot, position et hachage de la feuille
+    batch = models.ForeignKey(
+        "audit.AuditBatch",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="entries",
+    )
+    batch_index = models.PositiveIntegerField(null=True, blank=True)
+    entry_hash = models.CharField(max_length=64, blank=True, default="")
+
+    objects = TenantManager()
 
     class Meta:
         db_table = "audit_auditlog"
         verbose_name = "Audit Log"
         verbose_name_plural = "Audit Logs"
         indexes = [
-            models.Index(fields=["entreprise", "created_at"]),
+            # Pagination par clé (created_at, id) décroissante, par entreprise
+            models.Index(
+                fields=["entreprise", "-created_at", "-id"],
+                name="audit_tenant_time_idx",
+            ),
+            models.Index(
+                fields=["entreprise", "action", "-created_at"],
+                name="audit_tenant_action_idx",
+            ),
+            models.Index(
+                fields=["entreprise", "entity_type", "entity_id", "-created_at"],
+                name="audit_tenant_entity_idx",
+            ),
             models.Index(fields=["actor", "created_at"]),
+            # Filtres de contenance sur metadata (@>)
+            GinIndex(
+                fields=["metadata"],
+                opclasses=["jsonb_path_ops"],
+                name="audit_metadata_gin_idx",
+            ),
+            models.Index(
+                fields=["batch", "batch_index"], name="audit_batch_position_idx"
+            ),
+            # Entrées en attente de scellement
+            models.Index(
+                fields=["created_at"],
+                name="audit_unsealed_idx",
+                condition=models.Q(batch__isnull=True),
+            ),
         ]
 
     def __str__(self):
         return f"{self.action} by {self.actor} at {self.created_at}"
+
+
+class AuditBatch(models.Model):
+    """
+    Lot scellé d'entrées d'audit : racine de Merkle des entrées, chaînée à
+    celle du lot précédent (`chain_hash`).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    sequence = models.PositiveBigIntegerField(unique=True)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    size = models.PositiveIntegerField()
+    merkle_root = models.CharField(max_length=64)
+    prev_hash = models.CharField(max_length=64)
+    chain_hash = models.CharField(max_length=64)
+    sealed_at = models.DateTimeField(auto_now_add=True)
+    # Entrées déplacées vers les archives colonnaires (apps.audit.retention)
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "audit_auditbatch"
+        verbose_name = "Audit Batch"
+        verbose_name_plural = "Audit Batches"
+        ordering = ["sequence"]
+        indexes = [models.Index(fields=["ended_at"], name="audit_batch_ended_idx")]
+
+    def __str__(self):
+        return f"Lot {self.sequence} ({self.size} entrées)"
@@ -0,0 +1,271 @@
+"""
+Rétention du journal d'audit : les mois clos sont déplacés de
+`audit_auditlog` vers des archives colonnaires (voir `archive.py`), un
+fichier par entreprise et par mois, puis supprimés de la base : partition
+du mois détachée et supprimée si la table est partitionnée
+(apps.common.partitioning), suppression par lots sinon.
+Les archives restent interrogeables sans restauration (`search_archives`).
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from apps.common import partitioning
+
+from .archive import SUFFIX, ArchiveReader, write_archive
+from .models import AuditBatch, AuditLog
+from .sealing import ENTRY_FIELDS, next_month
+
+# Entrées sans entreprise (actions système)
+GLOBAL_TENANT = "_global"
+
+
+@dataclass
+class ArchiveResult:
+    entreprise_id: object
+    month: datetime
+    archived: int = 0
+    deleted: int = 0
+    path: str = ""
+    elapsed: float = 0.0
+
+
+def archive_path(entreprise_id, month, root=None):
+    root = root or settings.AUDIT_ARCHIVE_DIR
+    tenant = str(entreprise_id) if entreprise_id else GLOBAL_TENANT
+    return os.path.join(root, tenant, f"{month:%Y-%m}{SUFFIX}")
+
+
+def retention_cutoff(retention_months, now=None):
+    """Début du plus ancien mois conservé en base (mois courant compris)."""
+    now = (now or timezone.now()).astimezone(UTC)
+    year, month = divmod(now.year * 12 + now.month - 1 - retention_months, 12)
+    return datetime(year, month + 1, 1, tzinfo=UTC)
+
+
+def months_to_archive(cutoff, using=DEFAULT_DB_ALIAS):
+    """Couples (entreprise_id, début de mois) ayant des entrées avant `cutoff`."""
+    return (
+        AuditLog.objects.using(using)
+        .filter(created_at__lt=cutoff, batch__isnull=False)
+        .annotate(month=TruncMonth("created_at", tzinfo=UTC))
+        .values_list("entreprise_id", "month")
+        .distinct()
+        .order_by("month", "entreprise_id")
+    )
+
+
+def archive_month(
+    entreprise_id,
+    month,
+    root=None,
+    batch_size=5000,
+    dry_run=False,
+    using=DEFAULT_DB_ALIAS,
+    delete=True,
+):
+    """
+    Archive puis supprime les entrées scellées d'une entreprise pour un mois.
+
+    Les entrées non encore scellées restent en base (elles le seront au
+    prochain passage). La suppression n'a lieu qu'après relecture de
+    l'archive écrite, lot scellé par lot scellé : `deleted` compte aussi les
+    entrées déjà archivées des autres entreprises de ces lots. Avec
+    `delete=False`, elle est laissée au détachement de la partition du mois
+    (`drop_archived_partitions`).
+    """
+    started = time.perf_counter()
+    result = ArchiveResult(entreprise_id=entreprise_id, month=month)
+    result.path = archive_path(entreprise_id, month, root)
+
+    tenant = (
+        Q(entreprise_id=entreprise_id) if entreprise_id else Q(entreprise__isnull=True)
+    )
+    entries = AuditLog.objects.using(using).filter(
+        tenant,
+        created_at__gte=month,
+        created_at__lt=next_month(month),
+        batch__isnull=False,
+    )
+    rows = list(
+        entries.order_by("created_at", "id").values(
+            *ENTRY_FIELDS, "batch_id", "batch__sequence", "batch_index", "entry_hash"
+        )
+    )
+    result.archived = len(rows)
+    if not rows or dry_run:
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    batch_ids = set()
+    for row in rows:
+        batch_ids.add(row.pop("batch_id"))
+        row["batch_sequence"] = row.pop("batch__sequence")
+    write_archive(result.path, rows)
+
+    with ArchiveReader(result.path) as archive:
+        archived_ids = set(archive.column("id"))
+    if not {str(row["id"]) for row in rows} <= archived_ids:
+        raise RuntimeError(f"{result.path} : archive incomplète, suppression annulée")
+    if not delete:
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    # Un lot mêle plusieurs entreprises : ses entrées ne sont supprimées qu'une
+    # fois celles de toutes les entreprises archivées, et d'un bloc, sinon le
+    # lot paraîtrait altéré (verify_batch, entry_proof). Les entrées laissées
+    # en base sont réarchivées (sans doublon) au prochain passage.
+    others = (
+        AuditLog.objects.using(using)
+        .filter(batch_id__in=batch_ids)
+        .exclude(tenant)
+        .values_list("batch_id", "entreprise_id", "id")
+    )
+    known = {}
+    for batch_id, other_id, entry_id in others.iterator():
+        if other_id not in known:
+            known[other_id] = _archived_ids(archive_path(other_id, month, root))
+        if str(entry_id) not in known[other_id]:
+            batch_ids.discard(batch_id)
+
+    # Lots supprimés par groupes d'environ `batch_size` entrées : transactions
+    # et verrous courts
+    batches = (
+        AuditBatch.objects.using(using)
+        .filter(id__in=batch_ids, archived_at__isnull=True)
+        .order_by("sequence")
+        .values_list("id", "size")
+    )
+    group, size = [], 0
+    for batch_id, batch_entries in batches:
+        if group and size + batch_entries > batch_size:
+            result.deleted += _delete_batches(group, using)
+            group, size = [], 0
+        group.append(batch_id)
+        size += batch_entries
+    if group:
+        result.deleted += _delete_batches(group, using)
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _archived_ids(path):
+    if not os.path.exists(path):
+        return set()
+    with ArchiveReader(path) as archive:
+        return set(archive.column("id"))
+
+
+def _delete_batches(batch_ids, using):
+    """Supprime toutes les entrées des lots `batch_ids` et les marque archivés."""
+    with transaction.atomic(using=using):
+        deleted = (
+            AuditLog.objects.using(using).filter(batch_id__in=batch_ids).delete()[0]
+        )
+        AuditBatch.objects.using(using).filter(id__in=batch_ids).update(
+            archived_at=timezone.now()
+        )
+    return deleted
+
+
+def _mark_archived_batches(batches, using):
+    """Lots dont plus aucune entrée n'est en base."""
+    batches.using(using).filter(archived_at__isnull=True).exclude(
+        Exists(AuditLog.objects.filter(batch_id=OuterRef("pk")))
+    ).update(archived_at=timezone.now())
+
+
+def drop_archived_partitions(archived, using=DEFAULT_DB_ALIAS):
+    """
+    Détache puis supprime les partitions des mois de `archived` (mois ->
+    nombre d'entrées archivées) qui ne contiennent que ces entrées. Les
+    écritures du journal sont bloquées le temps du comptage et du
+    détachement : une partition ayant reçu des entrées depuis l'archivage
+    (scellées ou non) est conservée jusqu'au prochain passage. Retourne les
+    mois supprimés.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    spec = partitioning.PARTITIONED_TABLES[AuditLog._meta.db_table]
+    dropped = []
+    for month in sorted(set(archived) & set(partitioning.partitions(connection, spec))):
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # Verrou sur la table mère (pas sur la partition) : le détachement
+            # l'exige ensuite, et une écriture en attente ne tient aucun verrou
+            cursor.execute(
+                f"LOCK TABLE {quote(spec.table)} IN SHARE ROW EXCLUSIVE MODE"
+            )
+            cursor.execute(f"SELECT count(*) FROM {quote(spec.partition(month))}")
+            (rows,) = cursor.fetchone()
+            if rows != archived[month]:
+                continue
+            partitioning.detach_partition(connection, spec, month, drop=True)
+        dropped.append(month)
+    if dropped:
+        _mark_archived_batches(AuditBatch.objects.all(), using)
+    return dropped
+
+
+def archive_audit_log(
+    retention_months, root=None, batch_size=5000, dry_run=False, using=DEFAULT_DB_ALIAS
+):
+    """Archive tous les mois de la base `using` antérieurs à la période de rétention."""
+    cutoff = retention_cutoff(retention_months)
+    connection = connections[using]
+    detached = set()
+    if partitioning.partition_key(AuditLog, connection):
+        spec = partitioning.PARTITIONED_TABLES[AuditLog._meta.db_table]
+        detached = set(partitioning.partitions(connection, spec))
+
+    results = []
+    for entreprise_id, month in months_to_archive(cutoff, using):
+        # Mois couvert par une partition : supprimé d'un bloc ensuite
+        delete = partitioning.month_start(month) not in detached
+        results.append(
+            archive_month(
+                entreprise_id, month, root, batch_size, dry_run, using, delete
+            )
+        )
+    if detached and not dry_run:
+        archived = {}
+        for result in results:
+            month = partitioning.month_start(result.month)
+            if month in detached:
+                archived[month] = archived.get(month, 0) + result.archived
+        dropped = set(drop_archived_partitions(archived, using))
+        for result in results:
+            if partitioning.month_start(result.month) in dropped:
+                result.deleted = result.archived
+    return results
+
+
+def search_archives(entreprise_id, since=None, until=None, root=None, **filters):
+    """
+    Recherche dans les archives mensuelles d'une entreprise recoupant
+    [since, until] ; `filters` est transmis à `ArchiveReader.search`.
+    """
+    directory = os.path.dirname(archive_path(entreprise_id, timezone.now(), root))
+    if not os.path.isdir(directory):
+        return []
+    low = f"{since:%Y-%m}" if since else ""
+    high = f"{until:%Y-%m}" if until else "9999-12"
+
+    results = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(SUFFIX) or not low <= name[: -len(SUFFIX)] <= high:
+            continue
+        with ArchiveReader(os.path.join(directory, name)) as archive:
+            results += archive.search(since=since, until=until, **filters)
+        limit = filters.get("limit")
+        if limit is not None and len(results) >= limit:
+            return results[:limit]
+    return results
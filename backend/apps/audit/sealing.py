@@ -0,0 +1,222 @@
+"""
+Scellement du journal d'audit par lots de Merkle chaînés.
+
+Les entrées non scellées sont regroupées par ordre chronologique en lots
+bornés en taille et en durée ; chaque lot stocke la racine de Merkle de
+ses entrées et un maillon `chain_hash` qui dépend du lot précédent. Une
+modification, suppression ou insertion a posteriori change la racine du
+lot concerné ou casse la chaîne.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from . import merkle
+from .models import AuditBatch, AuditLog
+
+# Taille et durée (heure des événements) maximales d'un lot
+SEAL_MAX_SIZE = 10000
+SEAL_WINDOW = timedelta(minutes=5)
+# Marge laissée à l'écriture différée (apps.audit.writer) avant de sceller
+SEAL_DELAY = timedelta(minutes=1)
+
+ENTRY_FIELDS = (
+    "id",
+    "entreprise_id",
+    "actor_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "metadata",
+    "created_at",
+)
+
+
+def next_month(moment):
+    """Début (UTC) du mois suivant celui de `moment`."""
+    moment = moment.astimezone(UTC)
+    year, month = divmod(moment.year * 12 + moment.month, 12)
+    return datetime(year, month + 1, 1, tzinfo=UTC)
+
+
+@dataclass
+class SealResult:
+    batches: int = 0
+    entries: int = 0
+    elapsed: float = 0.0
+
+
+def _seal_next(max_size, window, cutoff, using):
+    """Scelle le lot suivant ; retourne son nombre d'entrées (0 si rien à sceller)."""
+    with transaction.atomic(using=using):
+        # Le verrou sur la tête de chaîne sérialise les scellements concurrents
+        head = (
+            AuditBatch.objects.using(using)
+            .select_for_update()
+            .order_by("-sequence")
+            .first()
+        )
+        rows = list(
+            AuditLog.objects.using(using)
+            .filter(batch__isnull=True, created_at__lte=cutoff)
+            .order_by("created_at", "id")
+            .values(*ENTRY_FIELDS)[:max_size]
+        )
+        if not rows:
+            return 0
+        # Un lot ne chevauche jamais deux mois : l'archivage mensuel
+        # (apps.audit.retention) retire ainsi des lots entiers
+        limit = min(rows[0]["created_at"] + window, next_month(rows[0]["created_at"]))
+        rows = [row for row in rows if row["created_at"] < limit]
+
+        leaves = [merkle.leaf_hash(merkle.entry_bytes(row)) for row in rows]
+        root = merkle.merkle_root(leaves).hex()
+        sequence = head.sequence + 1 if head else 1
+        prev_hash = head.chain_hash if head else merkle.EMPTY_HASH
+        batch = AuditBatch.objects.using(using).create(
+            sequence=sequence,
+            started_at=rows[0]["created_at"],
+            ended_at=rows[-1]["created_at"],
+            size=len(rows),
+            merkle_root=root,
+            prev_hash=prev_hash,
+            chain_hash=merkle.chain_hash(prev_hash, root, sequence, len(rows)),
+        )
+        AuditLog.objects.using(using).bulk_update(
+            [
+                AuditLog(
+                    id=row["id"],
+                    batch_id=batch.pk,
+                    batch_index=i,
+                    entry_hash=leaf.hex(),
+                )
+                for i, (row, leaf) in enumerate(zip(rows, leaves))
+            ],
+            ["batch", "batch_index", "entry_hash"],
+            batch_size=1000,
+        )
+    return len(rows)
+
+
+def seal_audit_log(
+    max_size=SEAL_MAX_SIZE, window=SEAL_WINDOW, delay=SEAL_DELAY, using=DEFAULT_DB_ALIAS
+):
+    """
+    Scelle toutes les entrées de la base `using` antérieures à maintenant -
+    `delay`. Chaque base (shard) a sa propre chaîne de lots.
+    """
+    started = time.perf_counter()
+    result = SealResult()
+    cutoff = timezone.now() - delay
+    while sealed := _seal_next(max_size, window, cutoff, using):
+        result.batches += 1
+        result.entries += sealed
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+@dataclass
+class EntryProof:
+    """Preuve d'inclusion d'une entrée dans la racine de son lot."""
+
+    leaf: str
+    proof: list
+    batch: AuditBatch
+    valid: bool
+
+
+def entry_proof(entry):
+    """
+    Preuve d'inclusion d'une entrée scellée : la feuille est recalculée depuis
+    le contenu de l'entrée, les frères lus dans les hachages stockés du lot.
+    """
+    hashes = (
+        AuditLog.objects.using(entry._state.db)
+        .filter(batch_id=entry.batch_id)
+        .order_by("batch_index")
+        .values_list("entry_hash", flat=True)
+    )
+    proof = merkle.inclusion_proof(
+        [bytes.fromhex(h) for h in hashes], entry.batch_index
+    )
+    leaf = merkle.leaf_hash(
+        merkle.entry_bytes({name: getattr(entry, name) for name in ENTRY_FIELDS})
+    )
+    batch = entry.batch
+    return EntryProof(
+        leaf=leaf.hex(),
+        proof=[(side, sibling.hex()) for side, sibling in proof],
+        batch=batch,
+        valid=merkle.verify_proof(leaf, proof, bytes.fromhex(batch.merkle_root)),
+    )
+
+
+def verify_batch(batch_id, using=DEFAULT_DB_ALIAS):
+    """Recalcule feuilles, racine et maillon d'un lot ; retourne les anomalies."""
+    batch = AuditBatch.objects.using(using).get(pk=batch_id)
+    label = f"lot {batch.sequence}"
+    problems = []
+    expected = merkle.chain_hash(
+        batch.prev_hash, batch.merkle_root, batch.sequence, batch.size
+    )
+    if expected != batch.chain_hash:
+        problems.append(f"{label} : maillon de chaîne invalide")
+    if batch.archived_at is not None:
+        # Les entrées ne sont plus en base (voir apps.audit.retention)
+        return batch_id, 0, problems
+
+    rows = list(
+        AuditLog.objects.using(using)
+        .filter(batch_id=batch_id)
+        .order_by("batch_index")
+        .values(*ENTRY_FIELDS, "batch_index", "entry_hash")
+    )
+    if len(rows) != batch.size:
+        problems.append(f"{label} : {len(rows)} entrée(s) au lieu de {batch.size}")
+    if [row["batch_index"] for row in rows] != list(range(len(rows))):
+        problems.append(f"{label} : positions non contiguës")
+
+    leaves = []
+    for row in rows:
+        leaf = merkle.leaf_hash(merkle.entry_bytes(row))
+        if leaf.hex() != row["entry_hash"]:
+            problems.append(f"{label} : entrée {row['id']} modifiée")
+        leaves.append(leaf)
+    if not leaves or merkle.merkle_root(leaves).hex() != batch.merkle_root:
+        problems.append(f"{label} : racine de Merkle invalide")
+    return batch_id, len(rows), problems
+
+
+def batches_in_period(since=None, until=None, using=DEFAULT_DB_ALIAS):
+    """Lots recoupant [since, until] : (id, séquence, prev_hash, chain_hash)."""
+    batches = AuditBatch.objects.using(using).order_by("sequence")
+    if since is not None:
+        batches = batches.filter(ended_at__gte=since)
+    if until is not None:
+        batches = batches.filter(started_at__lte=until)
+    return list(batches.values_list("id", "sequence", "prev_hash", "chain_hash"))
+
+
+def check_chain(chain, using=DEFAULT_DB_ALIAS):
+    """Continuité de la chaîne, y compris avec le lot qui précède la période."""
+    if not chain:
+        return []
+    previous = (
+        AuditBatch.objects.using(using)
+        .filter(sequence=chain[0][1] - 1)
+        .values_list("sequence", "chain_hash")
+        .first()
+    )
+    expected_sequence, expected_prev = previous or (0, merkle.EMPTY_HASH)
+    problems = []
+    for _, sequence, prev_hash, current in chain:
+        if sequence != expected_sequence + 1:
+            problems.append(f"lot(s) manquant(s) avant le lot {sequence}")
+        elif prev_hash != expected_prev:
+            problems.append(f"lot {sequence} : chaîne rompue")
+        expected_sequence, expected_prev = sequence, current
+    return problems
@@ -0,0 +1,54 @@
+from rest_framework import serializers
+
+
+class AuditEntrySerializer(serializers.Serializer):
+    """Serializer pour une entrée du journal d'audit."""
+
+    id = serializers.UUIDField()
+    entreprise_id = serializers.UUIDField(allow_null=True)
+    actor_id = serializers.UUIDField(allow_null=True)
+    action = serializers.CharField()
+    entity_type = serializers.CharField()
+    entity_id = serializers.CharField()
+    metadata = serializers.DictField()
+    created_at = serializers.DateTimeField()
+
+
+class AuditLogPageSerializer(serializers.Serializer):
+    """Serializer pour une page du journal d'audit."""
+
+    results = AuditEntrySerializer(many=True)
+    next_cursor = serializers.CharField(
+        allow_null=True, help_text="À passer en `cursor` ; null en fin de liste"
+    )
+
+
+class AuditBatchSerializer(serializers.Serializer):
+    """Serializer pour un lot scellé."""
+
+    sequence = serializers.IntegerField()
+    started_at = serializers.DateTimeField()
+    ended_at = serializers.DateTimeField()
+    size = serializers.IntegerField()
+    merkle_root = serializers.CharField()
+    prev_hash = serializers.CharField()
+    chain_hash = serializers.CharField()
+
+
+class ProofStepSerializer(serializers.Serializer):
+    position = serializers.ChoiceField(
+        choices=["left", "right"], help_text="Côté du frère dans la concaténation"
+    )
+    hash = serializers.CharField()
+
+
+class AuditProofSerializer(serializers.Serializer):
+    """Serializer pour une preuve d'inclusion."""
+
+    entry = AuditEntrySerializer()
+    leaf_hash = serializers.CharField(
+        help_text="SHA-256(0x00 || forme canonique de l'entrée), en hexadécimal"
+    )
+    proof = ProofStepSerializer(many=True)
+    batch = AuditBatchSerializer()
+    valid = serializers.BooleanField(help_text="La preuve reconstruit la racine du lot")
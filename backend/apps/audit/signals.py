@@ -0,0 +1,94 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.invoices.models import Invoice
+
+from .events import record
+
+# Transitions de statut de facture tracées sous un nom d'action dédié
+INVOICE_STATUS_ACTIONS = {
+    Invoice.Status.ISSUED: "invoice.validated",
+    Invoice.Status.PAID: "invoice.paid",
+    Invoice.Status.CANCELED: "invoice.canceled",
+}
+# Paiement retiré (rapprochement supprimé) : la facture redevient due
+INVOICE_REOPENED = "invoice.reopened"
+
+
+def record_invoice_change(instance, created=False):
+    """
+    Trace la création ou la mise à jour de `instance`, sous le nom de sa
+    transition de statut le cas échéant. Appelé par `post_save` et, pour les
+    mises à jour groupées qui n'émettent pas de signaux, par l'appelant
+    (`apply_payments`).
+    """
+    previous = getattr(instance, "_loaded_status", None)
+    if created:
+        action = "invoice.created"
+    elif previous == Invoice.Status.PAID and instance.status == Invoice.Status.ISSUED:
+        action = INVOICE_REOPENED
+    elif previous is not None and previous != instance.status:
+        action = INVOICE_STATUS_ACTIONS.get(instance.status, "invoice.updated")
+    else:
+        action = "invoice.updated"
+    record(
+        action,
+        instance,
+        metadata={
+            "number": instance.number,
+            "status": instance.status,
+            "previous_status": previous,
+            "total_ttc": str(instance.total_ttc),
+        },
+    )
+    instance._loaded_status = instance.status
+
+
+@receiver(post_save, sender=Invoice)
+def audit_invoice_save(sender, instance, created, **kwargs):
+    record_invoice_change(instance, created)
+
+
+@receiver(post_delete, sender=Invoice)
+def audit_invoice_delete(sender, instance, **kwargs):
+    record(
+        "invoice.deleted",
+        instance,
+        metadata={"number": instance.number, "status": instance.status},
+    )
+
+
+@receiver(post_save, sender="treasury.BankTransaction")
+@receiver(post_delete, sender="treasury.BankTransaction")
+def audit_bank_transaction(sender, instance, created=False, **kwargs):
+    if kwargs.get("signal") is post_delete:
+        action = "bank_transaction.deleted"
+    else:
+        action = "bank_transaction.created" if created else "bank_transaction.updated"
+    record(
+        action,
+        instance,
+        metadata={
+            "date": str(instance.date),
+            "label": instance.label,
+            "amount": str(instance.amount),
+        },
+    )
+
+
+@receiver(post_save, sender="treasury.Reconciliation")
+@receiver(post_delete, sender="treasury.Reconciliation")
+def audit_reconciliation(sender, instance, created=False, **kwargs):
+    if kwargs.get("signal") is post_delete:
+        action = "reconciliation.deleted"
+    else:
+        action = "reconciliation.created" if created else "reconciliation.updated"
+    record(
+        action,
+        instance,
+        metadata={
+            "invoice_id": str(instance.invoice_id),
+            "bank_transaction_id": str(instance.bank_transaction_id),
+            "matched_amount": str(instance.matched_amount),
+        },
+    )
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name = "audit"
+
+urlpatterns = [
+    path("logs", views.audit_log_list, name="audit_log_list"),
+    path(
+        "logs/<uuid:entry_id>/proof", views.audit_entry_proof, name="audit_entry_proof"
+    ),
+]
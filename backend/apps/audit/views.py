@@ -0,0 +1,216 @@
+import json
+import uuid
+from datetime import datetime, time
+
+from django.db import NotSupportedError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.common.pagination import InvalidCursor, keyset_page
+from apps.common.serializers import ErrorSerializer
+from apps.common.tenancy import tenant_required
+
+from .models import AuditLog
+from .sealing import entry_proof
+from .serializers import AuditLogPageSerializer, AuditProofSerializer
+
+LOGS_DEFAULT_LIMIT = 50
+LOGS_MAX_LIMIT = 200
+
+
+def _entry_data(entry):
+    return {
+        "id": str(entry.id),
+        "entreprise_id": str(entry.entreprise_id) if entry.entreprise_id else None,
+        "actor_id": str(entry.actor_id) if entry.actor_id else None,
+        "action": entry.action,
+        "entity_type": entry.entity_type,
+        "entity_id": entry.entity_id,
+        "metadata": entry.metadata,
+        "created_at": entry.created_at.isoformat(),
+    }
+
+
+def _parse_moment(value, bound):
+    """Date-heure ISO, ou date seule (début / fin de journée selon `bound`)."""
+    try:
+        # Date seule testée d'abord : parse_datetime la lirait comme minuit
+        day = parse_date(value)
+        moment = datetime.combine(day, bound) if day else parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _batch_data(batch):
+    return {
+        "sequence": batch.sequence,
+        "started_at": batch.started_at.isoformat(),
+        "ended_at": batch.ended_at.isoformat(),
+        "size": batch.size,
+        "merkle_root": batch.merkle_root,
+        "prev_hash": batch.prev_hash,
+        "chain_hash": batch.chain_hash,
+    }
+
+
+@extend_schema(
+    tags=["Audit"],
+    summary="Consulter le journal d'audit",
+    description="Entrées d'audit de l'entreprise, des plus récentes aux plus "
+    "anciennes, paginées par curseur (`next_cursor`).",
+    parameters=[
+        OpenApiParameter(name="actor", type=OpenApiTypes.UUID, description="Auteur"),
+        OpenApiParameter(name="action", type=str, description="Action exacte"),
+        OpenApiParameter(name="entity_type", type=str, description="Type d'entité"),
+        OpenApiParameter(
+            name="entity_id",
+            type=str,
+            description="Identifiant d'entité (avec entity_type)",
+        ),
+        OpenApiParameter(
+            name="since",
+            type=OpenApiTypes.DATETIME,
+            description="Début (date ou date-heure ISO)",
+        ),
+        OpenApiParameter(
+            name="until",
+            type=OpenApiTypes.DATETIME,
+            description="Fin incluse (date ou date-heure ISO)",
+        ),
+        OpenApiParameter(
+            name="metadata",
+            type=str,
+            description='Objet JSON contenu dans metadata, ex. {"status": "PAID"}',
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            description=f"Taille de page (défaut {LOGS_DEFAULT_LIMIT}, "
+            f"max {LOGS_MAX_LIMIT})",
+        ),
+        OpenApiParameter(
+            name="cursor", type=str, description="Curseur de la page précédente"
+        ),
+    ],
+    responses={
+        200: AuditLogPageSerializer,
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def audit_log_list(request):
+    """
+    GET /api/v1/audit/logs
+    Journal d'audit de l'entreprise, paginé par clé (created_at, id).
+    """
+    params = request.query_params
+    entries = AuditLog.objects.all()
+
+    actor = params.get("actor")
+    if actor:
+        try:
+            entries = entries.filter(actor_id=uuid.UUID(actor))
+        except ValueError:
+            return Response({"error": "actor invalide"}, status=400)
+    if params.get("action"):
+        entries = entries.filter(action=params["action"])
+    if params.get("entity_id") and not params.get("entity_type"):
+        return Response({"error": "entity_type requis avec entity_id"}, status=400)
+    if params.get("entity_type"):
+        entries = entries.filter(entity_type=params["entity_type"])
+    if params.get("entity_id"):
+        entries = entries.filter(entity_id=params["entity_id"])
+
+    for name, lookup, bound in (
+        ("since", "created_at__gte", time.min),
+        ("until", "created_at__lte", time.max),
+    ):
+        if params.get(name):
+            moment = _parse_moment(params[name], bound)
+            if moment is None:
+                return Response({"error": f"{name} invalide"}, status=400)
+            entries = entries.filter(**{lookup: moment})
+
+    if params.get("metadata"):
+        try:
+            contained = json.loads(params["metadata"])
+        except ValueError:
+            contained = None
+        if not isinstance(contained, dict) or not contained:
+            return Response(
+                {"error": "metadata doit être un objet JSON non vide"}, status=400
+            )
+        entries = entries.filter(metadata__contains=contained)
+
+    try:
+        limit = int(params.get("limit", LOGS_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"error": "limit invalide"}, status=400)
+    limit = max(1, min(limit, LOGS_MAX_LIMIT))
+
+    try:
+        page, next_cursor = keyset_page(entries, params.get("cursor"), limit)
+    except InvalidCursor:
+        return Response({"error": "cursor invalide"}, status=400)
+    except NotSupportedError:
+        return Response(
+            {"error": "Filtre metadata non supporté par cette base"}, status=400
+        )
+
+    return Response(
+        {"results": [_entry_data(e) for e in page], "next_cursor": next_cursor}
+    )
+
+
+@extend_schema(
+    tags=["Audit"],
+    summary="Preuve d'inclusion d'une entrée d'audit",
+    description="Retourne l'entrée, son hachage et les O(log n) hachages "
+    "frères qui reconstruisent la racine de Merkle de son lot. L'entrée doit "
+    "être scellée (commande seal_audit_log).",
+    responses={
+        200: AuditProofSerializer,
+        401: ErrorSerializer,
+        404: ErrorSerializer,
+        409: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def audit_entry_proof(request, entry_id):
+    """
+    GET /api/v1/audit/logs/{id}/proof
+    Preuve d'inclusion d'une entrée dans son lot scellé.
+    """
+    try:
+        entry = AuditLog.objects.select_related("batch").get(id=entry_id)
+    except AuditLog.DoesNotExist:
+        return Response({"error": "Entrée d'audit non trouvée"}, status=404)
+
+    if entry.batch_id is None:
+        return Response({"error": "Entrée pas encore scellée"}, status=409)
+
+    proof = entry_proof(entry)
+    return Response(
+        {
+            "entry": _entry_data(entry),
+            "leaf_hash": proof.leaf,
+            "proof": [{"position": side, "hash": h} for side, h in proof.proof],
+            "batch": _batch_data(proof.batch),
+            "valid": proof.valid,
+        }
+    )
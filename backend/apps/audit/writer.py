@@ -0,0 +1,245 @@
+"""
+Écriture asynchrone et groupée des événements d'audit.
+
+Les événements (dictionnaires) sont déposés dans une file bornée, vidée
+par un thread d'arrière-plan qui les transmet par lots à `sink` dès que
+`batch_size` événements sont en attente ou que `flush_interval` secondes
+se sont écoulées.
+
+Contre-pression : si la file est pleine, l'appelant attend au plus
+`put_timeout` secondes, puis l'événement est déversé sur disque (JSON
+Lines dans `spill_dir`). Un lot refusé par `sink` (base lente ou
+indisponible) est déversé de la même façon ; les fichiers sont rejoués
+par le thread une fois `retry_interval` écoulé. Aucun événement n'est
+perdu tant que `spill_dir` est défini : un fichier en cours de rejeu lors
+d'un arrêt brutal est repris par le processus suivant (ses événements déjà
+écrits le sont alors une seconde fois).
+
+Ce module ne dépend pas de Django : voir `events.py` pour l'écriture en base.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class _Barrier:
+    """Marqueur déposé dans la file : signalé une fois les événements précédents écrits."""
+
+    def __init__(self, stop=False):
+        self.stop = stop
+        self.done = threading.Event()
+
+
+class AuditWriter:
+    """File bornée + thread d'écriture par lots vers `sink(events)`."""
+
+    def __init__(
+        self,
+        sink,
+        queue_size=10000,
+        batch_size=500,
+        flush_interval=1.0,
+        put_timeout=0.05,
+        spill_dir=None,
+        retry_interval=5.0,
+    ):
+        self.sink = sink
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.retry_interval = retry_interval
+
+        self.stats = {"enqueued": 0, "written": 0, "spilled": 0, "dropped": 0}
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._closed = False
+        self._retry_at = 0.0
+        self._replay_at = 0.0
+
+    def _ensure_started(self):
+        """Démarre le thread (à nouveau après un fork : file et thread ne survivent pas)."""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue(self.queue_size)
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def enqueue(self, event):
+        """Dépose un événement ; déversé sur disque si la file reste pleine."""
+        if self._closed:
+            self._spill([event])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put(event, timeout=self.put_timeout)
+        except queue.Full:
+            self._spill([event])
+        else:
+            self.stats["enqueued"] += 1
+
+    def flush(self, timeout=None):
+        """Attend l'écriture (ou le déversement) des événements déjà déposés."""
+        if self._pid != os.getpid() or self._thread is None:
+            return True
+        barrier = _Barrier()
+        self._queue.put(barrier)
+        return barrier.done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """
+        Vide la file puis arrête le thread ; ce qui n'a pu être écrit
+        dans le délai est déversé sur disque. Appelé à l'arrêt du worker.
+        """
+        self._closed = True
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        barrier = _Barrier(stop=True)
+        try:
+            self._queue.put(barrier, timeout=timeout)
+        except queue.Full:
+            pass
+        if not barrier.done.wait(timeout):
+            self._spill(self._drain())
+
+    def _drain(self):
+        events = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return events
+            if isinstance(item, _Barrier):
+                item.done.set()
+            else:
+                events.append(item)
+
+    def _run(self):
+        while True:
+            batch, barrier = self._take()
+            if batch:
+                self._write(batch)
+            if self.spill_dir and time.monotonic() >= self._replay_at:
+                self._replay_at = time.monotonic() + self.retry_interval
+                self._replay()
+            if barrier is not None:
+                barrier.done.set()
+                if barrier.stop:
+                    return
+
+    def _take(self):
+        """Lot suivant : jusqu'à `batch_size` événements ou `flush_interval` écoulé."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(item, _Barrier):
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def _write(self, events):
+        # Ne pas marteler une base en échec : déverser jusqu'au prochain essai
+        if time.monotonic() < self._retry_at:
+            self._spill(events)
+            return False
+        try:
+            self.sink(events)
+        except Exception:
+            logger.exception("Échec d'écriture de %d événement(s) d'audit", len(events))
+            self._retry_at = time.monotonic() + self.retry_interval
+            self._spill(events)
+            return False
+        self.stats["written"] += len(events)
+        return True
+
+    def _spill(self, events):
+        if not events:
+            return
+        if self.spill_dir is None:
+            self.stats["dropped"] += len(events)
+            logger.error(
+                "%d événement(s) d'audit perdu(s) (pas de spill_dir)", len(events)
+            )
+            return
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        with self._spill_lock:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_dir / f"audit-{os.getpid()}.jsonl", "a") as spill:
+                spill.write(lines)
+        self.stats["spilled"] += len(events)
+
+    def _replay(self):
+        """
+        Réinjecte les fichiers déversés, et ceux dont le rejeu a été
+        interrompu : ceux de ce processus et ceux des processus terminés (un
+        processus vivant peut encore écrire dans le sien, ou le rejouer).
+        """
+        paths = sorted(self.spill_dir.glob("audit-*.jsonl"))
+        paths += sorted(self.spill_dir.glob("audit-*.replay"))
+        for path in paths:
+            pid = _owner(path)
+            if pid != os.getpid() and _is_alive(pid):
+                continue
+            # Le renommage réserve le fichier à un seul processus, désigné
+            # comme propriétaire jusqu'à la fin du rejeu
+            spilled_by = path.name.split(".")[0]
+            claimed = path.with_name(
+                f"{spilled_by}.{os.getpid()}.{uuid.uuid4().hex}.replay"
+            )
+            try:
+                with self._spill_lock:
+                    os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            with open(claimed) as spill:
+                events = [json.loads(line) for line in spill if line.strip()]
+            for start in range(0, len(events), self.batch_size):
+                if not self._write(events[start : start + self.batch_size]):
+                    # Le lot en échec a été re-déversé par _write
+                    self._spill(events[start + self.batch_size :])
+                    break
+            claimed.unlink()
+            if time.monotonic() < self._retry_at:
+                return
+
+
+def _owner(path):
+    """Processus qui a déversé (`.jsonl`) ou qui rejoue (`.replay`) le fichier."""
+    parts = path.name.split(".")
+    return int(parts[1] if path.suffix == ".replay" else parts[0].split("-")[1])
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -60,7 +60,8 @@ class SupabaseJWTAuthentication(authentication.BaseAuthentication):
         email = payload.get("email", "")
 
         try:
-            user = User.objects.get(username=sub)
+            # Rôle et entreprise lus avec l'utilisateur (profil, tenant)
+            user = User.objects.select_related("role", "entreprise").get(username=sub)
             if email and user.email != email:
                 user.email = email
                 user.save(update_fields=["email"])
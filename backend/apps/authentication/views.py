@@ -1,3 +1,5 @@
+import time
+
 import requests
 from django.conf import settings
 from drf_spectacular.types import OpenApiTypes
@@ -8,7 +10,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from apps.audit.events import record
+from apps.common.metrics import observe_supabase
 from apps.common.serializers import ErrorSerializer
+from apps.users.models import User
 
 from .serializers import (AuthCredentialsSerializer,
                           AuthTokenResponseSerializer,
@@ -16,6 +21,18 @@ from .serializers import (AuthCredentialsSerializer,
                           LogoutResponseSerializer, RefreshTokenSerializer)
 
 
+def _supabase_post(operation, url, **kwargs):
+    """`requests.post` vers Supabase, latence relevée par opération."""
+    started = time.perf_counter()
+    status_code = "error"
+    try:
+        response = requests.post(url, **kwargs)
+        status_code = str(response.status_code)
+        return response
+    finally:
+        observe_supabase(operation, status_code, time.perf_counter() - started)
+
+
 @extend_schema(
     tags=["Auth"],
     summary="Inscription utilisateur",
@@ -58,7 +75,8 @@ def auth_register(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    response = requests.post(
+    response = _supabase_post(
+        "signup",
         f"{supabase_url}/auth/v1/signup",
         json={"email": email, "password": password},
         headers={
@@ -116,7 +134,8 @@ def auth_login(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    response = requests.post(
+    response = _supabase_post(
+        "login",
         f"{supabase_url}/auth/v1/token?grant_type=password",
         json={"email": email, "password": password},
         headers={
@@ -126,9 +145,23 @@ def auth_login(request):
     )
 
     if response.status_code >= 400:
+        record(
+            "auth.login_failed",
+            entity_type="user",
+            metadata={"email": email, "status": response.status_code},
+        )
         return Response(response.json(), status=response.status_code)
 
-    return Response(response.json(), status=status.HTTP_200_OK)
+    data = response.json()
+    sub = (data.get("user") or {}).get("id", "")
+    record(
+        "auth.login",
+        entity_type="user",
+        entity_id=sub,
+        actor=User.objects.filter(username=sub).first() if sub else None,
+        metadata={"email": email},
+    )
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @extend_schema(
@@ -217,7 +250,8 @@ def auth_refresh(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    response = requests.post(
+    response = _supabase_post(
+        "refresh",
         f"{supabase_url}/auth/v1/token?grant_type=refresh_token",
         json={"refresh_token": refresh_token},
         headers={
@@ -260,7 +294,8 @@ def auth_logout(request):
 
     auth_header = request.headers.get("Authorization", "")
 
-    requests.post(
+    _supabase_post(
+        "logout",
         f"{supabase_url}/auth/v1/logout",
         headers={
             "apikey": supabase_key,
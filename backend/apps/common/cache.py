@@ -0,0 +1,77 @@
+"""
+Cache chaud par entreprise, local au processus.
+
+Les valeurs (index, structures compilées...) restent en mémoire dans chaque
+worker ; seule une version par entreprise est stockée dans le cache Django.
+Avec un cache partagé (Redis, `REDIS_URL`), un simple incrément invalide
+tous les workers et toutes les instances. Avec le cache local par défaut,
+seul le processus qui invalide recharge aussitôt : les autres servent leur
+valeur jusqu'à l'expiration de `ttl`.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+
+from .metrics import cache_counters
+
+
+@dataclass
+class _Entry:
+    version: int
+    value: object
+    loaded_at: float
+
+
+class TenantCache:
+    """
+    Cache `entreprise_id -> valeur` rechargé via `loader(entreprise_id)`
+    lorsque la version partagée change ou que `ttl` (secondes) est dépassé.
+    """
+
+    def __init__(self, name, loader, ttl=300):
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self._entries = {}
+        self._locks = {}
+        self._hits, self._misses = cache_counters(name)
+
+    def _version_key(self, entreprise_id):
+        return f"{self.name}:version:{entreprise_id}"
+
+    def _is_fresh(self, entry, version):
+        return (
+            entry is not None
+            and entry.version == version
+            and time.monotonic() - entry.loaded_at < self.ttl
+        )
+
+    def get(self, entreprise_id):
+        entreprise_id = str(entreprise_id)
+        version = cache.get(self._version_key(entreprise_id), 0)
+        entry = self._entries.get(entreprise_id)
+        if self._is_fresh(entry, version):
+            self._hits.inc()
+            return entry.value
+
+        # Un seul chargement concurrent par entreprise
+        with self._locks.setdefault(entreprise_id, threading.Lock()):
+            entry = self._entries.get(entreprise_id)
+            if not self._is_fresh(entry, version):
+                self._misses.inc()
+                entry = _Entry(version, self.loader(entreprise_id), time.monotonic())
+                self._entries[entreprise_id] = entry
+        return entry.value
+
+    def invalidate(self, entreprise_id):
+        """Invalide l'entrée de l'entreprise (partout si le cache est partagé)."""
+        entreprise_id = str(entreprise_id)
+        key = self._version_key(entreprise_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+        self._entries.pop(entreprise_id, None)
@@ -0,0 +1,445 @@
+"""
+Jeu de données synthétique multi-entreprises (commande `generate_dataset`).
+
+Volumes par entreprise moyenne à l'échelle 1 (`VOLUMES`), répartis entre
+les entreprises selon une loi de Zipf (`skew`) : quelques grosses
+entreprises, une longue traîne de petites, comme en production. Dans une
+entreprise, les clients suivent aussi une loi de Zipf (peu de clients
+concentrent l'essentiel des factures).
+
+- Factures émises sur `months` mois, statut selon l'ancienneté (les
+  anciennes sont surtout payées), montants log-normaux, 1 à 8 lignes.
+- Transactions : un virement par facture payée, des prélèvements
+  mensuels fixes (loyer, salaires, abonnements) et des paiements par
+  carte jusqu'au volume visé.
+- Rapprochements : chaque facture payée avec son virement.
+
+Tout est dérivé de `seed` et du rang de l'entreprise (identifiants
+compris) : le résultat ne dépend pas du nombre de processus de chargement.
+Le chargement passe par COPY sur PostgreSQL, par `bulk_create` ailleurs.
+"""
+
+import math
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import connections, transaction
+
+from apps.treasury.categorization import label_key
+
+
+@dataclass(frozen=True)
+class Volumes:
+    users: int = 3
+    customers: int = 40
+    invoices: int = 800
+    transactions: int = 2_000
+
+
+VOLUMES = Volumes()
+# Exposant de Zipf de la taille des entreprises (0 : toutes égales)
+DEFAULT_SKEW = 1.0
+DEFAULT_MONTHS = 24
+# Ordre de chargement (dépendances)
+TENANT_TABLES = (
+    ("customers", "invoices.Customer"),
+    ("invoices", "invoices.Invoice"),
+    ("lines", "invoices.InvoiceLine"),
+    ("transactions", "treasury.BankTransaction"),
+    ("reconciliations", "treasury.Reconciliation"),
+)
+
+_COMPANY_WORDS = (
+    "Atelier",
+    "Boulangerie",
+    "Cabinet",
+    "Garage",
+    "Studio",
+    "Transports",
+    "Menuiserie",
+    "Pharmacie",
+    "Agence",
+    "Bistrot",
+    "Imprimerie",
+    "Conseil",
+)
+_CITIES = (
+    "Lyon",
+    "Nantes",
+    "Lille",
+    "Rennes",
+    "Bordeaux",
+    "Dijon",
+    "Tours",
+    "Annecy",
+    "Brest",
+    "Nancy",
+    "Metz",
+    "Pau",
+)
+_SERVICES = (
+    "Prestation de conseil",
+    "Maintenance mensuelle",
+    "Développement",
+    "Formation",
+    "Livraison",
+    "Installation",
+    "Licence logicielle",
+    "Audit",
+    "Fournitures",
+    "Déplacement",
+)
+# (libellé, montant mensuel moyen en euros)
+_RECURRING_DEBITS = (
+    ("PRLV SEPA LOYER SCI", 1800),
+    ("VIR SALAIRES", 9500),
+    ("PRLV SEPA URSSAF", 3200),
+    ("PRLV SEPA EDF", 240),
+    ("PRLV SEPA ORANGE PRO", 85),
+    ("PRLV SEPA AXA ASSURANCE", 160),
+    ("PRLV SEPA LEASING VEHICULE", 420),
+)
+_MERCHANTS = (
+    "CARREFOUR",
+    "TOTAL ENERGIES",
+    "AMAZON",
+    "SNCF",
+    "LEROY MERLIN",
+    "IKEA",
+    "METRO",
+    "BOULANGER",
+    "AIR FRANCE",
+    "LA POSTE",
+    "OVH",
+    "UBER",
+)
+_VAT_RATES = (Decimal("20.00"), Decimal("20.00"), Decimal("10.00"), Decimal("5.50"))
+
+
+def tenant_factors(tenants, skew=DEFAULT_SKEW):
+    """Taille relative de chaque entreprise (moyenne 1), décroissante."""
+    weights = [1 / (rank + 1) ** skew for rank in range(tenants)]
+    mean = sum(weights) / tenants
+    return [weight / mean for weight in weights]
+
+
+def _rng(seed, *key):
+    return random.Random(":".join(str(part) for part in (seed, *key)))
+
+
+def _uuid4(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _uuid7(moment, rng):
+    """UUID v7 (voir apps.common.ids) horodaté à `moment`."""
+    ms = int(moment.timestamp() * 1000)
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | rng.getrandbits(12) << 64
+        | 0b10 << 62
+        | rng.getrandbits(62)
+    )
+    return uuid.UUID(int=value)
+
+
+def _moment(day, rng):
+    """Instant aléatoire des heures ouvrées de `day`, en UTC."""
+    return datetime.combine(
+        day, time(8 + rng.randrange(10), rng.randrange(60)), tzinfo=UTC
+    )
+
+
+def _money(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+def _add_months(day, count):
+    year, index = divmod(day.year * 12 + day.month - 1 + count, 12)
+    return date(year, index + 1, min(day.day, 28))
+
+
+def reference_rows(
+    tenants, seed, role_id, shard="default", skew=DEFAULT_SKEW, today=None
+):
+    """Lignes `Entreprise` et `User` des `tenants` entreprises."""
+    today = today or date.today()
+    entreprises, users = [], []
+    for rank, factor in enumerate(tenant_factors(tenants, skew)):
+        rng = _rng(seed, "tenant", rank)
+        created = _moment(today - timedelta(days=rng.randrange(400, 2000)), rng)
+        entreprise_id = _uuid4(rng)
+        entreprises.append(
+            {
+                "id": entreprise_id,
+                "name": f"{rng.choice(_COMPANY_WORDS)} {rng.choice(_CITIES)} "
+                f"{rank:05d}",
+                "siret": f"{seed % 1000:03d}{rank:011d}",
+                "is_active": True,
+                "shard": shard,
+                "created_at": created,
+            }
+        )
+        for index in range(max(1, round(VOLUMES.users * math.sqrt(factor)))):
+            user_id = _uuid4(rng)
+            users.append(
+                {
+                    "id": user_id,
+                    "username": str(user_id),
+                    "email": f"user{index}.{rank}@example.com",
+                    "password": "!",
+                    "entreprise_id": entreprise_id,
+                    "role_id": role_id,
+                    "date_joined": created,
+                    "created_at": created,
+                }
+            )
+    return entreprises, users
+
+
+def tenant_rows(rank, entreprise_id, user_id, factor, seed, scale, months, today):
+    """Lignes de données de l'entreprise de rang `rank`, par table."""
+    rng = _rng(seed, "data", rank)
+    start = _add_months(today, -months)
+    span = (today - start).days
+
+    customers = []
+    for index in range(max(2, round(VOLUMES.customers * factor * scale))):
+        created = _moment(start + timedelta(days=rng.randrange(span)), rng)
+        customers.append(
+            {
+                "id": _uuid7(created, rng),
+                "entreprise_id": entreprise_id,
+                "name": f"{rng.choice(_COMPANY_WORDS)} {rng.choice(_CITIES)} {index}",
+                "email": f"compta{index}@client.example.com",
+                "vat_number": f"FR{rng.randrange(10**11):011d}",
+                "created_at": created,
+            }
+        )
+    # Zipf : les premiers clients concentrent les factures
+    cum_weights = list(_accumulate(1 / (index + 1) for index in range(len(customers))))
+
+    invoice_count = max(1, round(VOLUMES.invoices * factor * scale))
+    days = sorted(rng.randrange(span) for _ in range(invoice_count))
+    chosen = rng.choices(customers, cum_weights=cum_weights, k=invoice_count)
+    invoices, lines, credits, reconciliations = [], [], [], []
+    # label_key ignore les chiffres : une clé par client, marchand ou
+    # prélèvement, calculée sur le premier libellé
+    keys = {}
+    for number, (offset, customer) in enumerate(zip(days, chosen, strict=True)):
+        issue_date = start + timedelta(days=offset)
+        created = _moment(issue_date, rng)
+        invoice_id = _uuid7(created, rng)
+        total_ht = total_tva = 0
+        for _ in range(min(1 + int(rng.expovariate(0.6)), 8)):
+            qty = rng.choice((1, 1, 1, 2, 3, 5, 10))
+            unit_cents = round(rng.lognormvariate(10.5, 1.0) / qty)
+            vat_rate = rng.choice(_VAT_RATES)
+            line_ht = qty * unit_cents
+            line_tva = round(line_ht * vat_rate / 100)
+            total_ht += line_ht
+            total_tva += line_tva
+            lines.append(
+                {
+                    "id": _uuid7(created, rng),
+                    "entreprise_id": entreprise_id,
+                    "invoice_id": invoice_id,
+                    "label": rng.choice(_SERVICES),
+                    "qty": Decimal(qty),
+                    "unit_price": _money(unit_cents),
+                    "vat_rate": vat_rate,
+                    "total_ht": _money(line_ht),
+                    "total_tva": _money(line_tva),
+                    "total_ttc": _money(line_ht + line_tva),
+                }
+            )
+        total_ttc = total_ht + total_tva
+
+        age = (today - issue_date).days
+        roll = rng.random()
+        if age > 60:
+            status = "PAID" if roll < 0.8 else "ISSUED" if roll < 0.92 else "CANCELED"
+        else:
+            status = "DRAFT" if roll < 0.2 else "ISSUED" if roll < 0.8 else "PAID"
+        paid = total_ttc if status == "PAID" else 0
+        invoices.append(
+            {
+                "id": invoice_id,
+                "entreprise_id": entreprise_id,
+                "customer_id": customer["id"],
+                "number": f"FAC-{issue_date.year}-{number + 1:06d}",
+                "status": status,
+                "issue_date": issue_date,
+                "due_date": issue_date + timedelta(days=30),
+                "total_ht": _money(total_ht),
+                "total_tva": _money(total_tva),
+                "total_ttc": _money(total_ttc),
+                "amount_paid": _money(paid),
+                "amount_due": _money(
+                    total_ttc - paid if status in ("ISSUED", "PAID") else 0
+                ),
+                "created_at": created,
+                "updated_at": created,
+            }
+        )
+        if status == "PAID":
+            paid_on = min(
+                issue_date + timedelta(days=round(rng.lognormvariate(3.2, 0.5))), today
+            )
+            label = f"VIR SEPA {customer['name'].upper()} {invoices[-1]['number']}"
+            moment = _moment(paid_on, rng)
+            transaction_id = _uuid7(moment, rng)
+            key = keys.get(customer["id"]) or keys.setdefault(
+                customer["id"], label_key(label)
+            )
+            credits.append(
+                _transaction(
+                    transaction_id, entreprise_id, paid_on, label, key, paid, moment
+                )
+            )
+            reconciliations.append(
+                {
+                    "id": _uuid7(moment, rng),
+                    "entreprise_id": entreprise_id,
+                    "invoice_id": invoice_id,
+                    "bank_transaction_id": transaction_id,
+                    "matched_amount": _money(paid),
+                    "matched_at": moment,
+                    "matched_by_id": user_id,
+                }
+            )
+
+    debits = []
+    target = max(round(VOLUMES.transactions * factor * scale) - len(credits), 0)
+    recurring = rng.sample(_RECURRING_DEBITS, k=min(2 + round(factor), 7))
+    for label, monthly in recurring:
+        amount = -round(monthly * 100 * rng.uniform(0.3, 1.5) * math.sqrt(factor))
+        day = rng.randrange(1, 28)
+        key = label_key(label)
+        for month in range(months):
+            if len(debits) >= target:
+                break
+            paid_on = _add_months(start.replace(day=day), month)
+            if paid_on > today:
+                break
+            moment = _moment(paid_on, rng)
+            debits.append(
+                _transaction(
+                    _uuid7(moment, rng),
+                    entreprise_id,
+                    paid_on,
+                    label,
+                    key,
+                    amount,
+                    moment,
+                )
+            )
+    while len(debits) < target:
+        paid_on = start + timedelta(days=rng.randrange(span))
+        merchant = rng.choice(_MERCHANTS)
+        label = f"CB {merchant} {paid_on:%d/%m}"
+        key = keys.get(merchant) or keys.setdefault(merchant, label_key(label))
+        moment = _moment(paid_on, rng)
+        amount = -max(round(rng.lognormvariate(8.5, 1.1)), 100)
+        debits.append(
+            _transaction(
+                _uuid7(moment, rng), entreprise_id, paid_on, label, key, amount, moment
+            )
+        )
+
+    return {
+        "customers": customers,
+        "invoices": invoices,
+        "lines": lines,
+        "transactions": credits + debits,
+        "reconciliations": reconciliations,
+    }
+
+
+def _accumulate(values):
+    total = 0
+    for value in values:
+        total += value
+        yield total
+
+
+def _transaction(transaction_id, entreprise_id, day, label, key, cents, moment):
+    return {
+        "id": transaction_id,
+        "entreprise_id": entreprise_id,
+        "date": day,
+        "label": label,
+        "amount": _money(cents),
+        "label_key": key,
+        "created_at": moment,
+    }
+
+
+# --- Chargement ------------------------------------------------------------
+
+
+def load_rows(model, rows, using="default", batch_size=5_000):
+    """
+    Insère `rows` (dictionnaires par attname ; champs absents : valeur par
+    défaut) dans la table de `model`. COPY sur PostgreSQL (psycopg 3).
+    """
+    if not rows:
+        return 0
+    fields = model._meta.concrete_fields
+    defaults = {
+        field.attname: field.get_default()
+        for field in fields
+        if field.attname not in rows[0]
+    }
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql" and hasattr(cursor.cursor, "copy"):
+            columns = ", ".join(quote(field.column) for field in fields)
+            with cursor.cursor.copy(
+                f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(
+                        tuple(
+                            row.get(field.attname, defaults.get(field.attname))
+                            for field in fields
+                        )
+                    )
+            return len(rows)
+    model._base_manager.using(using).bulk_create(
+        (model(**defaults, **row) for row in rows), batch_size=batch_size
+    )
+    return len(rows)
+
+
+def load_tenants(job):
+    """
+    Génère et charge les données d'un lot d'entreprises, une transaction
+    par entreprise. `job` : (alias, seed, scale, months, today, entreprises)
+    avec entreprises = [(rang, entreprise_id, user_id, facteur)]. Retourne
+    le nombre de lignes par table.
+    """
+    using, seed, scale, months, today, entreprises = job
+    counts = dict.fromkeys((name for name, _ in TENANT_TABLES), 0)
+    for rank, entreprise_id, user_id, factor in entreprises:
+        rows = tenant_rows(
+            rank, entreprise_id, user_id, factor, seed, scale, months, today
+        )
+        with transaction.atomic(using=using):
+            for name, label in TENANT_TABLES:
+                counts[name] += load_rows(apps.get_model(label), rows[name], using)
+    connections[using].close()
+    return counts
+
+
+def worker_setup():
+    """Initialisation d'un processus de chargement (démarré par spawn)."""
+    import django
+
+    django.setup()
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.common import partitioning
+from apps.common.sharding import tenant_databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée les partitions mensuelles à venir des tables partitionnées et "
+        "reclasse les lignes tombées dans leur partition par défaut "
+        "(à planifier chaque jour)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=partitioning.AHEAD_MONTHS,
+            help="Mois créés d'avance après le mois courant.",
+        )
+        parser.add_argument(
+            "--database",
+            action="append",
+            default=[],
+            help="Alias de base (répétable). Par défaut : toutes les bases "
+            "d'entreprise (default et shards).",
+        )
+
+    def handle(self, *args, **options):
+        for using in options["database"] or tenant_databases():
+            connection = connections[using]
+            for spec in partitioning.PARTITIONED_TABLES.values():
+                if not partitioning.is_partitioned(connection, spec.table):
+                    self.stdout.write(f"{using}: {spec.table} non partitionnée")
+                    continue
+                created = partitioning.ensure_partitions(
+                    connection, spec, ahead=options["months_ahead"]
+                )
+                for name in created:
+                    self.stdout.write(f"{using}: {name} créée")
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{using}: {spec.table} à jour "
+                        f"({len(created)} partition(s) créée(s))"
+                    )
+                )
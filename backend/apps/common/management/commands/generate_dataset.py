@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from apps.common import dataset, sharding
+from apps.common.partitioning import PARTITIONED_TABLES, ensure_partitions
+from apps.common.tenancy import ALL, active_entreprises
+from apps.companies.models import Entreprise
+from apps.users.models import Role, User
+
+# Lots par processus : répartit les grosses entreprises et rythme l'affichage
+JOBS_PER_WORKER = 4
+
+
+class Command(BaseCommand):
+    help = (
+        "Génère un jeu de données synthétique multi-entreprises (entreprises, "
+        "utilisateurs, clients, factures, transactions, rapprochements), "
+        "déterministe pour une graine donnée. À réserver aux bases de "
+        "développement et de test."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenants", type=int, default=100)
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplie les volumes par entreprise (échelle 1 : environ "
+            "5 000 lignes par entreprise en moyenne).",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=dataset.DEFAULT_SKEW,
+            help="Exposant de Zipf de la taille des entreprises (0 : égales).",
+        )
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=dataset.DEFAULT_MONTHS,
+            help="Historique généré, en mois jusqu'à aujourd'hui.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processus de chargement (PostgreSQL uniquement).",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Base qui reçoit les données des entreprises (default ou shard).",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        databases = sharding.tenant_databases()
+        if using not in databases:
+            raise CommandError(
+                f"Base inconnue : {using} (bases : {', '.join(databases)})"
+            )
+        tenants, seed = options["tenants"], options["seed"]
+        started = time.monotonic()
+        today = date.today()
+
+        role, _ = Role.objects.get_or_create(
+            code=Role.GERANT_PME, defaults={"label": "Gérant PME"}
+        )
+        entreprises, users = dataset.reference_rows(
+            tenants, seed, role.pk, shard=using, skew=options["skew"], today=today
+        )
+        if Entreprise.objects.filter(siret=entreprises[0]["siret"]).exists():
+            raise CommandError(f"Jeu de données déjà généré pour la graine {seed}")
+        with transaction.atomic():
+            dataset.load_rows(Entreprise, entreprises)
+            dataset.load_rows(User, users)
+        if using != DEFAULT_DB_ALIAS:
+            sharding.sync_reference_rows(using)
+        # Chargées sans signaux : caches des entreprises à invalider
+        active_entreprises.invalidate(ALL)
+        sharding.shard_map.invalidate(sharding.SHARD_MAP_KEY)
+
+        first_user = {}
+        for user in users:
+            first_user.setdefault(user["entreprise_id"], user["id"])
+        factors = dataset.tenant_factors(tenants, options["skew"])
+        plan = [
+            (rank, row["id"], first_user[row["id"]], factors[rank])
+            for rank, row in enumerate(entreprises)
+        ]
+        workers = options["workers"]
+        if connections[using].vendor != "postgresql":
+            workers = 1
+        chunks = max(1, min(tenants, workers * JOBS_PER_WORKER))
+        jobs = [
+            (
+                using,
+                seed,
+                options["scale"],
+                options["months"],
+                today,
+                plan[index::chunks],
+            )
+            for index in range(chunks)
+        ]
+
+        totals = {"entreprises": len(entreprises), "users": len(users)}
+        for done, counts in enumerate(self._run(jobs, workers), start=1):
+            for name, count in counts.items():
+                totals[name] = totals.get(name, 0) + count
+            self.stdout.write(
+                f"lot {done}/{len(jobs)} : {sum(counts.values())} ligne(s)"
+            )
+
+        connection = connections[using]
+        for spec in PARTITIONED_TABLES.values():
+            ensure_partitions(connection, spec)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        elapsed = time.monotonic() - started
+        rows = sum(totals.values())
+        for name, count in totals.items():
+            self.stdout.write(f"{name:>16} {count:>12}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{rows} ligne(s) en {elapsed:.1f} s ({rows / elapsed:.0f} lignes/s)"
+            )
+        )
+
+    def _run(self, jobs, workers):
+        if workers <= 1:
+            for job in jobs:
+                yield dataset.load_tenants(job)
+            return
+        # Processus neufs (spawn) : ni connexions ni pools hérités
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=dataset.worker_setup,
+        ) as executor:
+            futures = [executor.submit(dataset.load_tenants, job) for job in jobs]
+            for future in as_completed(futures):
+                yield future.result()
@@ -0,0 +1,62 @@
+"""
+Managers restreints à l'entreprise courante.
+
+Dans un bloc `tenant_scope(entreprise_id)` (ouvert par `tenant_required`
+pour les vues), toute requête passant par un `TenantManager` est filtrée
+sur l'entreprise et porte le hint `tenant`, transmis aux routeurs de base
+de données (`db_for_read` / `db_for_write`). Hors de ce bloc (admin,
+commandes, tâches de fond), le manager se comporte comme un manager
+standard.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+
+_scope = ContextVar("tenant_scope", default=None)
+
+
+@contextmanager
+def tenant_scope(entreprise_id):
+    """Restreint les `TenantManager` à `entreprise_id` le temps du bloc."""
+    token = _scope.set(entreprise_id)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def scoped_tenant():
+    """Entreprise du bloc `tenant_scope` en cours, ou None."""
+    return _scope.get()
+
+
+def tenant_from_hints(hints):
+    """Entreprise désignée par les hints d'un routeur (queryset ou instance)."""
+    if hints.get("tenant") is not None:
+        return hints["tenant"]
+    return getattr(hints.get("instance"), "entreprise_id", None)
+
+
+class TenantQuerySet(models.QuerySet):
+    def for_tenant(self, entreprise_id):
+        """Lignes de `entreprise_id`, avec le hint de routage correspondant."""
+        queryset = self.filter(entreprise_id=entreprise_id)
+        queryset._hints = {**queryset._hints, "tenant": entreprise_id}
+        return queryset
+
+
+class TenantManager(models.Manager.from_queryset(TenantQuerySet)):
+    """Manager filtré sur l'entreprise du `tenant_scope` en cours."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        entreprise_id = _scope.get()
+        if entreprise_id is None:
+            return queryset
+        return queryset.for_tenant(entreprise_id)
+
+    def unscoped(self):
+        """Toutes les entreprises, même dans un `tenant_scope` (à justifier)."""
+        return super().get_queryset()
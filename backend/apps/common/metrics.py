@@ -0,0 +1,150 @@
+"""
+Métriques Prometheus de l'API, exposées sur `/metrics`.
+
+- `http_requests_total` et `http_request_duration_seconds` par route
+  (nom d'URL, `invoices:list`), méthode et statut : jamais le chemin,
+  dont les identifiants feraient exploser le nombre de séries ;
+- temps et nombre de requêtes SQL par requête HTTP (relevés par
+  `QueryCountMiddleware`, placé après `MetricsMiddleware`) ;
+- accès aux caches de tenancy (`TenantCache`, rôles) : succès ou
+  chargement ;
+- latence des appels à Supabase par opération ;
+- état des pools de connexions (`pool_stats`), relevé au plus toutes les
+  `POOL_STATS_INTERVAL` secondes par worker.
+
+Sous gunicorn (gunicorn.conf.py), chaque worker écrit ses valeurs dans des
+fichiers mappés en mémoire sous `PROMETHEUS_MULTIPROC_DIR`, agrégés par
+celui qui répond à `/metrics`. Sans cette variable (runserver, tests), les
+métriques restent dans le processus. Une mesure coûte quelques
+microsecondes : pas de verrou global ni d'entrée/sortie.
+"""
+
+import hmac
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import multiprocess
+from prometheus_client.exposition import CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.metrics import Counter, Gauge, Histogram
+from prometheus_client.registry import REGISTRY, CollectorRegistry
+
+from .pooling import pool_stats
+
+POOL_STATS_INTERVAL = 10.0
+# Route des requêtes qui ne correspondent à aucune URL
+UNMATCHED = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requêtes HTTP traitées.",
+    ["route", "method", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Temps passé en base par requête HTTP.",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+DB_QUERIES = Counter(
+    "http_request_db_queries_total",
+    "Requêtes SQL émises pendant les requêtes HTTP.",
+    ["route"],
+)
+CACHE_REQUESTS = Counter(
+    "tenant_cache_requests_total",
+    "Lectures des caches par entreprise (hit : valeur en mémoire, miss : "
+    "chargement).",
+    ["cache", "result"],
+)
+SUPABASE_LATENCY = Histogram(
+    "supabase_request_duration_seconds",
+    "Durée des appels à l'API Supabase.",
+    ["operation", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL = Gauge(
+    "db_pool",
+    "Statistiques des pools de connexions (psycopg_pool), sommées sur les "
+    "workers vivants.",
+    ["alias", "stat"],
+    multiprocess_mode="livesum",
+)
+
+
+def cache_counters(name):
+    """Compteurs `(hit, miss)` du cache `name`, résolus une fois."""
+    return CACHE_REQUESTS.labels(name, "hit"), CACHE_REQUESTS.labels(name, "miss")
+
+
+def observe_supabase(operation, status, duration):
+    SUPABASE_LATENCY.labels(operation, status).observe(duration)
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else UNMATCHED
+
+
+class MetricsMiddleware:
+    """Latence, statut et temps SQL de chaque requête, par route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._pool_checked = 0.0
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        route = route_name(request)
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        LATENCY.labels(route, request.method).observe(duration)
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            DB_TIME.labels(route).observe(stats.duration)
+            DB_QUERIES.labels(route).inc(stats.count)
+
+        now = time.monotonic()
+        if now - self._pool_checked >= POOL_STATS_INTERVAL:
+            self._pool_checked = now
+            for alias, values in pool_stats().items():
+                for stat, value in values.items():
+                    DB_POOL.labels(alias, stat).set(value)
+        return response
+
+
+def registry():
+    """Registre à exposer : agrégat des workers en mode multiprocessus."""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def metrics_view(request):
+    """
+    GET /metrics
+    Métriques au format texte Prometheus, sur présentation du jeton Bearer
+    `METRICS_TOKEN`. Sans jeton configuré, ouvert seulement en DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = hmac.compare_digest(
+            request.headers.get("Authorization", "").encode(),
+            f"Bearer {token}".encode(),
+        )
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,693 @@
+"""
+Migrations de schéma sans interruption des écritures (PostgreSQL).
+
+Sur les grosses tables (factures, lignes, transactions, journal d'audit),
+`CREATE INDEX`, l'ajout d'une contrainte validée ou un `UPDATE` global
+bloquent les écritures pendant toute leur durée. Les opérations de ce
+module les remplacent dans les migrations :
+
+- `AddIndexOnline` / `RemoveIndexOnline` : `CREATE/DROP INDEX CONCURRENTLY`,
+  partition par partition sur les tables partitionnées, en reconstruisant
+  l'index INVALID laissé par une tentative interrompue ;
+- `AddConstraintOnline` puis `ValidateConstraintOnline` (dans une migration
+  suivante) : contrainte CHECK ajoutée `NOT VALID` (verrou bref), puis
+  validée sans bloquer les écritures ;
+- `SetNotNullOnline` : `NOT NULL` posé grâce à une contrainte CHECK validée
+  au préalable, sans balayage de la table sous verrou exclusif ;
+- `Backfill` : remplissage d'une colonne par lots de clés primaires, une
+  transaction par lot, avec une pause entre les lots.
+
+Les migrations qui les utilisent déclarent `atomic = False`. Les verrous
+sont demandés avec `lock_timeout` (`LOCK_TIMEOUT`) et la commande est
+retentée à l'expiration, plutôt que de laisser les écritures s'accumuler
+derrière elle. L'avancement est affiché pendant les opérations longues.
+
+Hors PostgreSQL (SQLite en développement), les opérations se comportent
+comme leurs équivalents Django ordinaires.
+
+Exemple, nouvel index sur `Invoice` :
+
+    class Migration(migrations.Migration):
+        atomic = False
+        operations = [
+            AddIndexOnline(
+                model_name="invoice",
+                index=models.Index(fields=["entreprise", "due_date"], name="..."),
+            ),
+        ]
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.migrations import operations
+from django.db.migrations.operations.base import Operation
+from django.db.utils import NotSupportedError, OperationalError
+
+from apps.common.partitioning import is_partitioned
+
+# Attente maximale d'un verrou par une commande DDL, puis nouvel essai
+LOCK_TIMEOUT = "5s"
+LOCK_RETRIES = 5
+# Délai avant le premier nouvel essai (doublé à chaque échec)
+RETRY_DELAY = 2.0
+# Intervalle minimal entre deux lignes d'avancement (secondes)
+PROGRESS_INTERVAL = 10.0
+BACKFILL_BATCH_SIZE = 5000
+BACKFILL_PAUSE = 0.1
+
+# Attente de verrou expirée (lock_timeout)
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _write(text):
+    # Sans retour à la ligne final : `migrate` termine la ligne par « OK »
+    sys.stdout.write(f"\n    {text}")
+    sys.stdout.flush()
+
+
+def _duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """
+    Avancement d'une opération longue, affiché au plus une fois toutes les
+    `interval` secondes. Avec `unit`, affiche aussi le débit et une
+    estimation du temps restant.
+    """
+
+    def __init__(
+        self,
+        label,
+        total=None,
+        unit=None,
+        interval=None,
+        write=_write,
+        clock=time.monotonic,
+    ):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.interval = PROGRESS_INTERVAL if interval is None else interval
+        self.write = write
+        self.clock = clock
+        self.started = clock()
+        self.done = 0
+        self.phase = None
+        self._shown = None
+
+    def update(self, done, total=None, phase=None, force=False):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if phase is not None:
+            self.phase = phase
+        now = self.clock()
+        if force or self._shown is None or now - self._shown >= self.interval:
+            self._shown = now
+            self.write(self.format(now))
+
+    def finish(self):
+        # Opération assez courte pour n'avoir rien affiché : rien à conclure
+        if self._shown is not None:
+            self.write(self.format(self.clock(), finished=True))
+
+    def format(self, now, finished=False):
+        elapsed = now - self.started
+        text = self.label
+        if self.phase:
+            text += f" [{self.phase}]"
+        if self.done or self.total:
+            text += f" : {self.done}"
+        if self.total:
+            text += f"/{self.total} ({min(100 * self.done / self.total, 100):.0f} %)"
+        if self.unit and elapsed > 0:
+            rate = self.done / elapsed
+            text += f", {rate:.0f} {self.unit}/s"
+            if not finished and self.total and rate > 0 and self.done < self.total:
+                text += f", reste ~{_duration((self.total - self.done) / rate)}"
+        text += f", {_duration(elapsed)}"
+        return text + (" - terminé" if finished else "")
+
+
+# --- Verrous -------------------------------------------------------------
+
+
+def _lock_timed_out(error):
+    cause = error.__cause__
+    return _LOCK_NOT_AVAILABLE in (
+        getattr(cause, "sqlstate", None),
+        getattr(cause, "pgcode", None),
+    )
+
+
+@contextmanager
+def lock_timeout(connection, value=LOCK_TIMEOUT):
+    """Limite l'attente des verrous sur `connection` (niveau session)."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('lock_timeout', %s, false)", [value])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("RESET lock_timeout")
+
+
+def _with_retries(run, retries=LOCK_RETRIES, delay=RETRY_DELAY, sleep=time.sleep):
+    """Exécute `run()`, retenté avec un délai croissant si un verrou expire."""
+    for attempt in range(retries + 1):
+        try:
+            return run()
+        except OperationalError as error:
+            if not _lock_timed_out(error) or attempt == retries:
+                raise
+            sleep(delay * 2**attempt)
+
+
+def _ensure_not_in_transaction(operation, schema_editor):
+    if schema_editor.connection.in_atomic_block:
+        raise NotSupportedError(
+            f"{operation.__class__.__name__} doit s'exécuter hors transaction "
+            "(atomic = False sur la migration)."
+        )
+
+
+# --- Index ---------------------------------------------------------------
+
+
+def _index_state(connection, name):
+    """None si l'index `name` n'existe pas, sinon sa validité."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT x.indisvalid FROM pg_index x "
+            "JOIN pg_class c ON c.oid = x.indexrelid "
+            "WHERE c.oid = to_regclass(%s)",
+            [connection.ops.quote_name(name)],
+        )
+        row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def _table_partitions(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [connection.ops.quote_name(table)],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def partition_index_name(index_name, table, partition):
+    """Nom de l'index de `partition` rattaché à l'index `index_name`."""
+    suffix = partition.removeprefix(f"{table}_")
+    return f"{index_name[: 62 - len(suffix)]}_{suffix}"
+
+
+@contextmanager
+def _index_build_progress(connection, label):
+    """
+    Suit la construction d'index en cours sur `connection` depuis une autre
+    connexion (`pg_stat_progress_create_index`).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        pid = cursor.fetchone()[0]
+    progress = Progress(label)
+    stop = threading.Event()
+
+    def poll():
+        observer = connections.create_connection(connection.alias)
+        try:
+            while not stop.wait(progress.interval):
+                with observer.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT phase, "
+                        "CASE WHEN blocks_total > 0 THEN blocks_done "
+                        "ELSE tuples_done END, "
+                        "CASE WHEN blocks_total > 0 THEN blocks_total "
+                        "ELSE tuples_total END "
+                        "FROM pg_stat_progress_create_index WHERE pid = %s",
+                        [pid],
+                    )
+                    row = cursor.fetchone()
+                if row:
+                    progress.update(row[1], row[2], phase=row[0], force=True)
+        finally:
+            observer.close()
+
+    thread = threading.Thread(target=poll, name=f"progress-{label}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+    progress.finish()
+
+
+def _build_index(schema_editor, statement, name):
+    connection = schema_editor.connection
+
+    def build():
+        state = _index_state(connection, name)
+        if state:
+            return
+        if state is False:
+            # Reste INVALID d'une construction concurrente interrompue
+            schema_editor.execute(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {connection.ops.quote_name(name)}"
+            )
+        with _index_build_progress(connection, f"index {name}"):
+            schema_editor.execute(statement, params=None)
+
+    _with_retries(build)
+
+
+def _attach_index(schema_editor, parent, child):
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_inherits "
+            "WHERE inhrelid = to_regclass(%s) AND inhparent = to_regclass(%s)",
+            [quote(child), quote(parent)],
+        )
+        if cursor.fetchone():
+            return
+    _with_retries(
+        lambda: schema_editor.execute(
+            f"ALTER INDEX {quote(parent)} ATTACH PARTITION {quote(child)}"
+        )
+    )
+
+
+def create_index(schema_editor, model, index):
+    """
+    Crée `index` sans bloquer les écritures (PostgreSQL, hors transaction).
+    Sur une table partitionnée, l'index de la table mère est créé vide
+    (`ON ONLY`), puis construit concurremment sur chaque partition et
+    rattaché : il devient valide une fois toutes les partitions rattachées.
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    with lock_timeout(connection):
+        if not is_partitioned(connection, table):
+            _build_index(
+                schema_editor,
+                index.create_sql(model, schema_editor, concurrently=True),
+                index.name,
+            )
+            return
+        if _index_state(connection, index.name) is None:
+            parent = index.create_sql(model, schema_editor)
+            parent.parts["table"] = f"ONLY {quote(table)}"
+            _with_retries(lambda: schema_editor.execute(parent, params=None))
+        for partition in _table_partitions(connection, table):
+            name = partition_index_name(index.name, table, partition)
+            statement = index.create_sql(model, schema_editor, concurrently=True)
+            statement.parts["table"] = quote(partition)
+            statement.parts["name"] = quote(name)
+            _build_index(schema_editor, statement, name)
+            _attach_index(schema_editor, index.name, name)
+
+
+def drop_index(schema_editor, model, index):
+    """
+    Supprime `index` sans bloquer les écritures. L'index d'une table
+    partitionnée ne peut pas être supprimé concurremment : la suppression,
+    brève, est faite sous `lock_timeout`.
+    """
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    concurrently = not is_partitioned(connection, model._meta.db_table)
+    with lock_timeout(connection):
+        _with_retries(
+            lambda: schema_editor.execute(
+                f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}"
+                f"IF EXISTS {quote(index.name)}"
+            )
+        )
+
+
+class AddIndexOnline(operations.AddIndex):
+    """`AddIndex` construit avec `CREATE INDEX CONCURRENTLY`."""
+
+    atomic = False
+
+    def describe(self):
+        return f"Create index {self.index.name} online on model {self.model_name}"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        _ensure_not_in_transaction(self, schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            create_index(schema_editor, model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        _ensure_not_in_transaction(self, schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            drop_index(schema_editor, model, self.index)
+
+
+class RemoveIndexOnline(operations.RemoveIndex):
+    """`RemoveIndex` avec `DROP INDEX CONCURRENTLY`."""
+
+    atomic = False
+
+    def describe(self):
+        return f"Remove index {self.name} online from model {self.model_name}"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        _ensure_not_in_transaction(self, schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            model_state = from_state.models[app_label, self.model_name_lower]
+            drop_index(schema_editor, model, model_state.get_index_by_name(self.name))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        _ensure_not_in_transaction(self, schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            model_state = to_state.models[app_label, self.model_name_lower]
+            create_index(schema_editor, model, model_state.get_index_by_name(self.name))
+
+
+# --- Contraintes -----------------------------------------------------------
+
+
+def _validate_constraint(schema_editor, table, name):
+    # SHARE UPDATE EXCLUSIVE : lectures et écritures continuent
+    quote = schema_editor.connection.ops.quote_name
+    progress = Progress(f"validation {name}")
+    progress.update(0)
+    _with_retries(
+        lambda: schema_editor.execute(
+            f"ALTER TABLE {quote(table)} VALIDATE CONSTRAINT {quote(name)}"
+        )
+    )
+    progress.finish()
+
+
+class AddConstraintOnline(operations.AddConstraint):
+    """
+    `AddConstraint` d'une contrainte CHECK ajoutée `NOT VALID` : seules les
+    nouvelles lignes sont contrôlées. Les lignes existantes sont vérifiées
+    par `ValidateConstraintOnline`, dans une migration ultérieure.
+    """
+
+    def __init__(self, model_name, constraint):
+        if not isinstance(constraint, models.CheckConstraint):
+            raise TypeError(
+                "AddConstraintOnline ne gère que les contraintes CHECK ; pour "
+                "une unicité, construire d'abord l'index avec AddIndexOnline."
+            )
+        super().__init__(model_name, constraint)
+
+    def describe(self):
+        return (
+            f"Create constraint {self.constraint.name} not valid "
+            f"on model {self.model_name}"
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            statement = self.constraint.create_sql(model, schema_editor)
+            with lock_timeout(schema_editor.connection):
+                _with_retries(
+                    lambda: schema_editor.execute(f"{statement} NOT VALID", params=None)
+                )
+
+
+class ValidateConstraintOnline(Operation):
+    """Valide une contrainte ajoutée `NOT VALID` sans bloquer les écritures."""
+
+    atomic = False
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def describe(self):
+        return f"Validate constraint {self.name} on model {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"{self.model_name.lower()}_validate_{self.name.lower()}"
+
+    def deconstruct(self):
+        return (
+            self.__class__.__name__,
+            [],
+            {"model_name": self.model_name, "name": self.name},
+        )
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        _ensure_not_in_transaction(self, schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            with lock_timeout(schema_editor.connection):
+                _validate_constraint(schema_editor, model._meta.db_table, self.name)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+
+class SetNotNullOnline(operations.AlterField):
+    """
+    `AlterField` qui rend une colonne obligatoire (`null=True` vers
+    `null=False`, rien d'autre ne change). Sur PostgreSQL : contrainte
+    `CHECK (colonne IS NOT NULL) NOT VALID`, validée sans bloquer les
+    écritures, puis `SET NOT NULL` qui s'appuie sur elle au lieu de
+    parcourir la table, et suppression de la contrainte. La colonne doit
+    avoir été remplie au préalable (`Backfill`).
+    """
+
+    atomic = False
+
+    def describe(self):
+        return f"Set {self.model_name}.{self.name} not null online"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        _ensure_not_in_transaction(self, schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        old_field = from_state.apps.get_model(
+            app_label, self.model_name
+        )._meta.get_field(self.name)
+        new_field = model._meta.get_field(self.name)
+        _, _, _, old_kwargs = old_field.deconstruct()
+        _, _, _, new_kwargs = new_field.deconstruct()
+        if not old_kwargs.pop("null", False) or new_kwargs.pop("null", False):
+            raise ValueError(f"{self.name} : null=True vers null=False attendu")
+        if old_kwargs != new_kwargs:
+            raise ValueError(f"{self.name} : seul l'attribut null doit changer")
+
+        quote = schema_editor.connection.ops.quote_name
+        table, column = model._meta.db_table, new_field.column
+        check = f"{table}_{column}_not_null"[:63]
+        with lock_timeout(schema_editor.connection):
+            for sql in (
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT IF EXISTS {quote(check)}",
+                (
+                    f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(check)} "
+                    f"CHECK ({quote(column)} IS NOT NULL) NOT VALID"
+                ),
+            ):
+                _with_retries(lambda sql=sql: schema_editor.execute(sql))
+            _validate_constraint(schema_editor, table, check)
+            for sql in (
+                f"ALTER TABLE {quote(table)} ALTER COLUMN {quote(column)} SET NOT NULL",
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(check)}",
+            ):
+                _with_retries(lambda sql=sql: schema_editor.execute(sql))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        from_model = from_state.apps.get_model(app_label, self.model_name)
+        # DROP NOT NULL : modification du catalogue seulement
+        with lock_timeout(schema_editor.connection):
+            _with_retries(
+                lambda: schema_editor.alter_field(
+                    from_model,
+                    from_model._meta.get_field(self.name),
+                    model._meta.get_field(self.name),
+                )
+            )
+
+
+# --- Remplissage -----------------------------------------------------------
+
+
+def estimated_rows(connection, model):
+    """Nombre de lignes de `model` : estimation des statistiques sur PostgreSQL."""
+    if connection.vendor != "postgresql":
+        return model._base_manager.using(connection.alias).count()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint "
+            "FROM pg_class c WHERE c.relkind = 'r' AND (c.oid = to_regclass(%s) "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits "
+            "WHERE inhparent = to_regclass(%s)))",
+            [connection.ops.quote_name(model._meta.db_table)] * 2,
+        )
+        return cursor.fetchone()[0]
+
+
+def backfill(
+    model,
+    values,
+    where=None,
+    using=DEFAULT_DB_ALIAS,
+    batch_size=BACKFILL_BATCH_SIZE,
+    pause=BACKFILL_PAUSE,
+    progress=None,
+    sleep=time.sleep,
+):
+    """
+    `UPDATE` de `values` (champ -> valeur ou expression) sur les lignes de
+    `model` filtrées par `where` (Q), par lots de `batch_size` clés
+    primaires parcourues dans l'ordre, une transaction par lot, avec
+    `pause` secondes entre deux lots pour laisser passer le trafic et la
+    réplication. Pour pouvoir reprendre après une interruption, `where`
+    doit exclure les lignes déjà traitées (ex. `Q(colonne__isnull=True)`).
+    Retourne le nombre de lignes mises à jour.
+    """
+    connection = connections[using]
+    rows = model._base_manager.using(using).order_by("pk")
+    if where is not None:
+        rows = rows.filter(where)
+    if progress is None:
+        progress = Progress(
+            f"{model._meta.db_table} ({', '.join(values)})",
+            total=estimated_rows(connection, model),
+            unit="lignes",
+        )
+    last, updated = None, 0
+    while True:
+        batch = rows if last is None else rows.filter(pk__gt=last)
+        keys = list(batch.values_list("pk", flat=True)[:batch_size])
+        if not keys:
+            break
+        with transaction.atomic(using=using):
+            updated += (
+                model._base_manager.using(using).filter(pk__in=keys).update(**values)
+            )
+        last = keys[-1]
+        progress.update(updated)
+        if len(keys) < batch_size:
+            break
+        sleep(pause)
+    progress.finish()
+    return updated
+
+
+class Backfill(Operation):
+    """
+    Remplit des colonnes existantes par lots (`backfill`). Sans effet sur
+    l'état des modèles ; le retour arrière ne fait rien.
+    """
+
+    atomic = False
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(
+        self,
+        model_name,
+        values,
+        where=None,
+        batch_size=BACKFILL_BATCH_SIZE,
+        pause=BACKFILL_PAUSE,
+    ):
+        self.model_name = model_name
+        self.values = values
+        self.where = where
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def describe(self):
+        return f"Backfill {', '.join(self.values)} on model {self.model_name}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"backfill_{self.model_name.lower()}"
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "values": self.values}
+        if self.where is not None:
+            kwargs["where"] = self.where
+        if self.batch_size != BACKFILL_BATCH_SIZE:
+            kwargs["batch_size"] = self.batch_size
+        if self.pause != BACKFILL_PAUSE:
+            kwargs["pause"] = self.pause
+        return (self.__class__.__name__, [], kwargs)
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        _ensure_not_in_transaction(self, schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        alias = schema_editor.connection.alias
+        if self.allow_migrate_model(alias, model):
+            backfill(
+                model,
+                self.values,
+                where=self.where,
+                using=alias,
+                batch_size=self.batch_size,
+                pause=self.pause,
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
@@ -0,0 +1,56 @@
+"""
+Pagination par clé (keyset) : le curseur encode la clé de tri de la
+dernière ligne servie, et la page suivante reprend strictement après elle.
+Contrairement à OFFSET, le coût d'une page ne dépend pas de sa position.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, pk) -> str:
+    raw = json.dumps([created_at.isoformat(), str(pk)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """`(created_at, pk UUID)` d'un curseur ; lève InvalidCursor s'il est malformé."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        moment = parse_datetime(created_at)
+        pk = uuid.UUID(pk)
+    except (ValueError, TypeError, AttributeError) as err:
+        raise InvalidCursor(cursor) from err
+    if moment is None:
+        raise InvalidCursor(cursor)
+    return moment, pk
+
+
+def keyset_page(queryset, cursor=None, limit=50, field="created_at"):
+    """
+    Page de `queryset` triée par (`field`, pk) décroissants, après `cursor`.
+    Retourne `(lignes, curseur suivant ou None)`.
+    """
+    queryset = queryset.order_by(f"-{field}", "-pk")
+    if cursor:
+        moment, pk = decode_cursor(cursor)
+        # Borne d'intervalle exploitable par l'index, puis exclusion des ex aequo
+        queryset = queryset.filter(**{f"{field}__lte": moment}).exclude(
+            Q(**{field: moment}) & Q(pk__gte=pk)
+        )
+    rows = list(queryset[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, field), last.pk)
@@ -0,0 +1,300 @@
+"""
+Partitionnement natif PostgreSQL par mois (RANGE) des tables en ajout seul.
+
+- Chaque table de `PARTITIONED_TABLES` a une partition par mois
+  (`<table>_pAAAAMM`) et une partition par défaut (`<table>_default`) qui
+  recueille les lignes hors des mois créés ; `ensure_partitions` crée les
+  mois à venir et y déplace les lignes tombées dans la partition par défaut.
+- La clé primaire devient (id, colonne de partition) : PostgreSQL exige que
+  toute contrainte d'unicité contienne la clé de partition. Aucune clé
+  étrangère ne peut donc viser ces tables (`db_constraint=False`).
+- La rétention détache puis supprime des partitions entières au lieu de
+  supprimer des lignes (ni balayage, ni WAL, ni VACUUM).
+- Les requêtes filtrées sur la colonne de partition ne lisent que les
+  partitions concernées (`latest_rows` pour les « plus récents d'abord »).
+
+Hors PostgreSQL (SQLite en développement), les tables restent simples et
+les fonctions de ce module sont sans effet.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    table: str
+    column: str
+    # Colonne timestamptz (bornes en UTC) plutôt que date
+    timestamp: bool = False
+
+    @property
+    def default_partition(self):
+        return f"{self.table}_default"
+
+    def partition(self, month):
+        return f"{self.table}_p{month:%Y%m}"
+
+    def bound(self, month):
+        return (
+            f"{month:%Y-%m-%d} 00:00:00+00" if self.timestamp else f"{month:%Y-%m-%d}"
+        )
+
+
+PARTITIONED_TABLES = {
+    spec.table: spec
+    for spec in (
+        PartitionSpec("treasury_banktransaction", "date"),
+        PartitionSpec("audit_auditlog", "created_at", timestamp=True),
+    )
+}
+# Mois créés d'avance (à entretenir par `ensure_partitions`, planifiée)
+AHEAD_MONTHS = 3
+# Fenêtres successives (en mois) de `latest_rows`
+RECENT_WINDOWS = (3, 12)
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value):
+    """Premier jour du mois de `value` (date ; datetime ramenée en UTC)."""
+    if isinstance(value, datetime):
+        value = value.astimezone(UTC).date() if value.tzinfo else value.date()
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    year, index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return date(year, index + 1, 1)
+
+
+def is_partitioned(connection, table):
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partition_key(model, connection):
+    """Colonne de partition de `model` sur `connection`, ou None."""
+    spec = PARTITIONED_TABLES.get(model._meta.db_table)
+    if spec is None or not is_partitioned(connection, spec.table):
+        return None
+    return spec.column
+
+
+def partitions(connection, spec):
+    """Mois des partitions mensuelles attachées, triés."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [spec.table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition(connection, spec, month):
+    """
+    Crée la partition de `month`, en y déplaçant les lignes du mois déjà
+    présentes dans la partition par défaut.
+    """
+    quote = connection.ops.quote_name
+    name = spec.partition(month)
+    low, high = spec.bound(month), spec.bound(add_months(month, 1))
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} (LIKE {quote(spec.table)} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(spec.default_partition)} "
+            f"WHERE {quote(spec.column)} >= %s AND {quote(spec.column)} < %s "
+            f"RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved",
+            [low, high],
+        )
+        # Index et clés étrangères de la table mère créés à l'attachement
+        cursor.execute(
+            f"ALTER TABLE {quote(spec.table)} ATTACH PARTITION {quote(name)} "
+            f"FOR VALUES FROM ('{low}') TO ('{high}')"
+        )
+    return name
+
+
+def ensure_partitions(connection, spec, ahead=AHEAD_MONTHS, now=None):
+    """
+    Crée les partitions manquantes jusqu'à `ahead` mois après le mois courant,
+    ainsi que celles des mois présents dans la partition par défaut.
+    Retourne les noms créés.
+    """
+    if not is_partitioned(connection, spec.table):
+        return []
+    current = month_start(now or timezone.now())
+    wanted = {add_months(current, offset) for offset in range(ahead + 1)}
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', {quote(spec.column)} "
+            f"{'AT TIME ZONE %s' if spec.timestamp else ''})::date "
+            f"FROM {quote(spec.default_partition)}",
+            ["UTC"] if spec.timestamp else [],
+        )
+        wanted.update(row[0] for row in cursor.fetchall())
+    existing = set(partitions(connection, spec))
+    return [
+        create_partition(connection, spec, month) for month in sorted(wanted - existing)
+    ]
+
+
+def detach_partition(connection, spec, month, drop=False):
+    """Détache la partition de `month` (puis la supprime si `drop`)."""
+    quote = connection.ops.quote_name
+    name = spec.partition(month)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE {quote(spec.table)} DETACH PARTITION {quote(name)}"
+        )
+        if drop:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+    return name
+
+
+def latest_rows(queryset, field, limit, windows=RECENT_WINDOWS, today=None):
+    """
+    Les `limit` premières lignes de `queryset`, trié d'abord par `field`
+    décroissant, cherchées sur les `windows` derniers mois avant la table
+    entière : sur une table partitionnée, seules les partitions récentes
+    sont lues tant qu'elles suffisent.
+    """
+    today = today or timezone.now()
+    for months in windows:
+        since = add_months(month_start(today), -months)
+        if isinstance(queryset.model._meta.get_field(field), models.DateTimeField):
+            since = datetime(since.year, since.month, 1, tzinfo=UTC)
+        rows = list(queryset.filter(**{f"{field}__gte": since})[:limit])
+        if len(rows) == limit:
+            return rows
+    return list(queryset[:limit])
+
+
+# --- Conversion (migrations) ---------------------------------------------
+
+
+def _table_layout(cursor, table):
+    """Index (hors contraintes) et contraintes p/u/f de `table`."""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f')",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass(%s) "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.oid)",
+        [table],
+    )
+    return constraints, cursor.fetchall()
+
+
+def _rebuild(connection, spec, partitioned, ahead):
+    quote = connection.ops.quote_name
+    table, column = spec.table, spec.column
+    old = f"{table}_old"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE confrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        referencing = [row[0] for row in cursor.fetchall()]
+        if referencing:
+            raise RuntimeError(
+                f"{table} est visée par des clés étrangères ({', '.join(referencing)})"
+            )
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        constraints, indexes = _table_layout(cursor, old)
+        for name, _, _ in constraints:
+            cursor.execute(f"ALTER TABLE {quote(old)} DROP CONSTRAINT {quote(name)}")
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {quote(name)}")
+
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            + (f" PARTITION BY RANGE ({quote(column)})" if partitioned else "")
+        )
+        if any(kind == "u" for _, kind, _ in constraints):
+            raise RuntimeError(f"{table} : contrainte d'unicité non gérée")
+        primary_key = f"id, {quote(column)}" if partitioned else "id"
+        for name, kind, _ in constraints:
+            if kind == "p":
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} "
+                    f"PRIMARY KEY ({primary_key})"
+                )
+
+        if partitioned:
+            cursor.execute(
+                f"CREATE TABLE {quote(spec.default_partition)} "
+                f"PARTITION OF {quote(table)} DEFAULT"
+            )
+            cursor.execute(f"SELECT min({quote(column)}) FROM {quote(old)}")
+            oldest = cursor.fetchone()[0]
+            first = month_start(oldest) if oldest else month_start(timezone.now())
+            last = add_months(month_start(timezone.now()), ahead)
+            month = first
+            while month <= last:
+                create_partition(connection, spec, month)
+                month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        pattern = re.compile(rf" ON (ONLY )?(\S+\.)?{re.escape(old)} USING ")
+        for _, definition in indexes:
+            cursor.execute(pattern.sub(f" ON {quote(table)} USING ", definition))
+        # Clés étrangères en dernier : validées en une passe, sans événements
+        # de contrôle différés en attente pendant la création des index
+        for name, kind, definition in constraints:
+            if kind == "f":
+                cursor.execute(
+                    f"ALTER TABLE {quote(table)} "
+                    f"ADD CONSTRAINT {quote(name)} {definition}"
+                )
+        cursor.execute(f"DROP TABLE {quote(old)}")
+
+
+def partition_table(schema_editor, table, ahead=AHEAD_MONTHS):
+    """
+    Convertit `table` en table partitionnée par mois (opération de
+    migration, PostgreSQL uniquement). Les lignes sont recopiées : sur une
+    grosse table, prévoir une fenêtre de maintenance.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or is_partitioned(connection, table):
+        return
+    _rebuild(connection, PARTITIONED_TABLES[table], True, ahead)
+
+
+def unpartition_table(schema_editor, table):
+    """Inverse de `partition_table`."""
+    connection = schema_editor.connection
+    if not is_partitioned(connection, table):
+        return
+    _rebuild(connection, PARTITIONED_TABLES[table], False, 0)
@@ -0,0 +1,101 @@
+"""
+Pools de connexions PostgreSQL (psycopg 3), configurables par alias.
+
+Chaque processus gunicorn tient un pool par base au lieu d'une connexion
+persistante par thread : les connexions sont vérifiées avant d'être prêtées,
+recyclées après `MAX_LIFETIME` secondes et fermées après `MAX_IDLE` secondes
+d'inactivité au-delà de `MIN_SIZE`.
+
+Réglages lus dans l'environnement, `DB_POOL_<ALIAS>_<CLÉ>` prioritaire sur
+`DB_POOL_<CLÉ>` (p. ex. `DB_POOL_REPLICA_1_MAX_SIZE=8`). `DB_POOL=0` revient
+aux connexions persistantes. Ce module est importé par les settings : il ne
+dépend pas des modèles.
+"""
+
+import importlib.util
+import os
+
+import dj_database_url
+
+POOL_DEFAULTS = {
+    "MIN_SIZE": 1,
+    # Un thread gunicorn tient au plus une connexion par base
+    "MAX_SIZE": 4,
+    # Attente maximale d'une connexion libre avant erreur (secondes)
+    "TIMEOUT": 10.0,
+    "MAX_LIFETIME": 1800.0,
+    "MAX_IDLE": 300.0,
+}
+POSTGRES_ENGINES = ("django.db.backends.postgresql",)
+# Connexions persistantes, hors pool (SQLite, psycopg_pool absent, DB_POOL=0)
+PERSISTENT_MAX_AGE = 600
+
+
+def pooling_available():
+    return importlib.util.find_spec("psycopg_pool") is not None
+
+
+def pool_setting(alias, key, environ=None):
+    """Réglage `key` du pool de `alias` (environnement, puis défaut)."""
+    environ = os.environ if environ is None else environ
+    default = POOL_DEFAULTS[key]
+    value = environ.get(f"DB_POOL_{alias.upper()}_{key}", environ.get(f"DB_POOL_{key}"))
+    return default if value in (None, "") else type(default)(value)
+
+
+def pool_options(alias, environ=None):
+    """Arguments de `psycopg_pool.ConnectionPool` pour `alias`."""
+    options = {key.lower(): pool_setting(alias, key, environ) for key in POOL_DEFAULTS}
+    if options["min_size"] > options["max_size"]:
+        raise ValueError(
+            f"DB_POOL {alias} : MIN_SIZE ({options['min_size']}) > "
+            f"MAX_SIZE ({options['max_size']})"
+        )
+    return {**options, "name": alias}
+
+
+def database(url, alias, environ=None):
+    """Entrée de `DATABASES` pour `url`, avec pool si possible."""
+    environ = os.environ if environ is None else environ
+    if not url:
+        # Comme `dj_database_url.config` sans DATABASE_URL
+        return {}
+    config = dj_database_url.parse(
+        url, conn_max_age=PERSISTENT_MAX_AGE, ssl_require=True
+    )
+    pooled = (
+        config["ENGINE"] in POSTGRES_ENGINES
+        and environ.get("DB_POOL", "1") != "0"
+        and pooling_available()
+    )
+    # Connexion vérifiée avant chaque emprunt (pool) ou réutilisation : une
+    # connexion coupée (inactivité, bascule) est remplacée au lieu d'échouer
+    config["CONN_HEALTH_CHECKS"] = True
+    if pooled:
+        config["CONN_MAX_AGE"] = 0  # le pool garde les connexions
+        config["OPTIONS"] = {
+            **config.get("OPTIONS", {}),
+            "pool": pool_options(alias, environ),
+        }
+    return config
+
+
+def pool_stats():
+    """
+    Statistiques des pools ouverts dans ce processus, par alias : taille,
+    connexions libres, attentes (`requests_waiting`, `requests_wait_ms`,
+    `requests_errors` pour les délais dépassés), connexions perdues...
+    """
+    from django.db import connections
+
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor != "postgresql" or not connection.settings_dict[
+            "OPTIONS"
+        ].get("pool"):
+            continue
+        pool = connection.pool
+        if pool is not None and not pool.closed:
+            stats[alias] = pool.get_stats()
+    return stats
@@ -0,0 +1,190 @@
+"""
+Instrumentation SQL par requête HTTP.
+
+`QueryCountMiddleware` compte les requêtes et le temps passé en base
+pendant le traitement de chaque requête (toutes les bases), les regroupe
+par empreinte (SQL aux littéraux et listes IN près) et signale les N+1 :
+une même SELECT répétée au moins `QUERY_COUNT_N_PLUS_ONE` fois, avec le
+cadre du code du projet qui l'a émise. Selon les réglages :
+
+- `QUERY_COUNT_HEADERS` : en-têtes `X-DB-Queries`, `X-DB-Time-Ms` et
+  `X-DB-N-Plus-One` sur la réponse ;
+- `QUERY_COUNT_LOG` : une ligne de log par requête (DEBUG, WARNING en cas
+  de N+1), statistiques dans `extra["query_count"]` ;
+- `QUERY_COUNT_RAISE` : lève `NPlusOneError` (tests).
+
+Les statistiques restent disponibles sur `request.query_stats`.
+"""
+
+import functools
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+from .query_plans import is_counted
+
+logger = logging.getLogger(__name__)
+
+# Racine du backend : les cadres hors de ce dossier (Django, DRF) sont sautés
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__))) + os.sep
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+
+
+class NPlusOneError(Exception):
+    """Requête répétée détectée pendant une requête HTTP (`QUERY_COUNT_RAISE`)."""
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """SQL normalisé : littéraux et paramètres remplacés, listes IN réduites."""
+    sql = _STRING_RE.sub("?", sql).replace("%s", "?")
+    sql = " ".join(_NUMBER_RE.sub("?", sql).split())
+    return _IN_LIST_RE.sub("IN (...)", sql)
+
+
+def _origin():
+    """Premier cadre du code du projet (hors de ce module) dans la pile."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_DIR)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            path = os.path.relpath(filename, _PROJECT_DIR)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+@dataclass
+class QueryGroup:
+    sql: str
+    count: int = 0
+    duration: float = 0.0
+    # Cadre d'origine, relevé quand la répétition atteint le seuil de N+1
+    origin: str | None = None
+
+
+class QueryStats:
+    """Requêtes d'une requête HTTP, par empreinte."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.count = 0
+        self.duration = 0.0
+        self.groups = {}
+
+    def record(self, sql, duration):
+        if not is_counted(sql):
+            return
+        self.count += 1
+        self.duration += duration
+        key = fingerprint(sql)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = QueryGroup(key)
+        group.count += 1
+        group.duration += duration
+        # Pile relevée une seule fois par empreinte répétée
+        if group.count == self.threshold and key[:6].upper() == "SELECT":
+            group.origin = _origin()
+
+    @property
+    def n_plus_one(self):
+        return [group for group in self.groups.values() if group.origin is not None]
+
+    def as_dict(self):
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 2),
+            "duplicates": self.count - len(self.groups),
+            "n_plus_one": [
+                {"sql": group.sql, "count": group.count, "origin": group.origin}
+                for group in self.n_plus_one
+            ],
+        }
+
+
+def _recorder(stats):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.record(sql, time.perf_counter() - started)
+
+    return wrapper
+
+
+class QueryCountMiddleware:
+    """Compte les requêtes SQL de chaque requête HTTP et signale les N+1."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats(settings.QUERY_COUNT_N_PLUS_ONE)
+        request.query_stats = stats
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(_recorder(stats))
+                )
+            response = self.get_response(request)
+
+        flagged = stats.n_plus_one
+        if settings.QUERY_COUNT_HEADERS:
+            response["X-DB-Queries"] = str(stats.count)
+            response["X-DB-Time-Ms"] = f"{stats.duration * 1000:.1f}"
+            response["X-DB-N-Plus-One"] = str(len(flagged))
+        if settings.QUERY_COUNT_LOG:
+            self._log(request, response, stats, flagged)
+        if flagged and settings.QUERY_COUNT_RAISE:
+            raise NPlusOneError(
+                f"{request.method} {request.path} : "
+                + " ; ".join(
+                    f"{group.count} x {group.sql} ({group.origin})" for group in flagged
+                )
+            )
+        return response
+
+    def _log(self, request, response, stats, flagged):
+        if not flagged and not logger.isEnabledFor(logging.DEBUG):
+            return
+        extra = {
+            "query_count": {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                **stats.as_dict(),
+            }
+        }
+        if flagged:
+            logger.warning(
+                "N+1 sur %s %s : %s",
+                request.method,
+                request.path,
+                " ; ".join(f"{group.count} x {group.origin}" for group in flagged),
+                extra=extra,
+            )
+        else:
+            logger.debug(
+                "%s %s : %d requête(s) SQL, %.1f ms",
+                request.method,
+                request.path,
+                stats.count,
+                stats.duration * 1000,
+                extra=extra,
+            )
@@ -0,0 +1,161 @@
+"""
+Plans d'exécution des requêtes SQL émises par un appel d'API.
+
+`capture_queries` enregistre les requêtes émises pendant un bloc,
+`explain` obtient le plan réel d'une requête (EXPLAIN ANALYZE, BUFFERS)
+et `check_queries` confronte l'ensemble au `QueryBudget` de l'endpoint :
+
+- nombre de requêtes au-delà de `queries` (requête ajoutée, N+1) ;
+- parcours séquentiel (Seq Scan) de plus de `seq_scan_rows` lignes d'une
+  table hors de `seq_scans` : index perdu ;
+- estimation de lignes d'un nœud au-delà de `rows`.
+
+PostgreSQL uniquement (voir tests/test_query_plans.py).
+"""
+
+import json
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.db import connections, transaction
+
+from apps.common.partitioning import PARTITIONED_TABLES
+
+# Instructions de contrôle de transaction, hors budget de requêtes
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT", "SET")
+# Nœuds qui consomment toute leur entrée avant de produire une ligne : la
+# limite (LIMIT) au-dessus d'eux ne réduit pas ce qu'ils lisent
+_BLOCKING_NODES = {"Sort", "Aggregate", "Hash", "Materialize", "SetOp", "WindowAgg"}
+
+
+def is_counted(sql):
+    """Requête comptée dans un budget (hors contrôle de transaction)."""
+    return not sql.lstrip().upper().startswith(_TRANSACTION_CONTROL)
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    # Requêtes par appel
+    queries: int
+    # Lignes estimées par nœud du plan
+    rows: int = 5_000
+    # Tables dont le parcours séquentiel est accepté (tables de référence)
+    seq_scans: frozenset = field(default_factory=frozenset)
+    # En deçà, un parcours séquentiel est normal (petite table ou partition)
+    seq_scan_rows: int = 1_000
+
+
+@dataclass
+class CapturedQuery:
+    alias: str
+    sql: str
+    params: object
+    duration: float
+
+    @property
+    def counted(self):
+        return is_counted(self.sql)
+
+    @property
+    def explainable(self):
+        return self.sql.lstrip().upper().startswith("SELECT")
+
+
+@contextmanager
+def capture_queries(aliases=None):
+    """Liste des `CapturedQuery` exécutées pendant le bloc."""
+    captured = []
+
+    def recorder(alias):
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                captured.append(
+                    CapturedQuery(alias, sql, params, time.perf_counter() - started)
+                )
+
+        return wrapper
+
+    with ExitStack() as stack:
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder(alias)))
+        yield captured
+
+
+def explain(connection, sql, params):
+    """
+    Plan exécuté de `sql` (racine du JSON d'EXPLAIN ANALYZE), dans une
+    transaction annulée ensuite.
+    """
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        result = cursor.fetchone()[0]
+        transaction.set_rollback(True, using=connection.alias)
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def _table(relation):
+    """Table d'une relation du plan (la table mère pour une partition)."""
+    for table in PARTITIONED_TABLES:
+        if relation.startswith(f"{table}_"):
+            return table
+    return relation
+
+
+def _scanned_rows(node):
+    return (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * max(
+        node.get("Actual Loops", 1), 1
+    )
+
+
+def plan_problems(plan, budget):
+    """Écarts du plan `plan` (JSON d'EXPLAIN ANALYZE) au `budget`."""
+    problems = []
+    stack = [(plan, False)]
+    while stack:
+        node, limited = stack.pop()
+        kind = node["Node Type"]
+        relation = node.get("Relation Name")
+        table = _table(relation) if relation else None
+        if (
+            kind == "Seq Scan"
+            and table not in budget.seq_scans
+            and _scanned_rows(node) > budget.seq_scan_rows
+        ):
+            problems.append(f"Seq Scan sur {table} ({_scanned_rows(node)} lignes lues)")
+        # Sous un LIMIT, l'estimation d'un nœud non bloquant porte sur toutes
+        # les lignes qu'il pourrait produire, pas sur celles lues
+        blocking = kind in _BLOCKING_NODES
+        if (not limited or blocking) and node.get("Plan Rows", 0) > budget.rows:
+            target = f" sur {table}" if table else ""
+            problems.append(
+                f"{kind}{target} : {node['Plan Rows']} lignes estimées "
+                f"(budget {budget.rows})"
+            )
+        limited = (limited or kind == "Limit") and not blocking
+        stack.extend((child, limited) for child in node.get("Plans", []))
+    return list(dict.fromkeys(problems))
+
+
+def check_queries(captured, budget):
+    """Écarts au `budget` des requêtes `captured`, avec leur SQL."""
+    statements = [query for query in captured if query.counted]
+    problems = []
+    if len(statements) > budget.queries:
+        problems.append(
+            f"{len(statements)} requêtes (budget {budget.queries}) :\n"
+            + "\n".join(f"      {query.sql}" for query in statements)
+        )
+    for query in statements:
+        if not query.explainable:
+            continue
+        plan = explain(connections[query.alias], query.sql, query.params)
+        problems.extend(
+            f"{problem}\n      {query.sql}" for problem in plan_problems(plan, budget)
+        )
+    return problems
@@ -0,0 +1,280 @@
+"""
+Lectures sur réplicas, avec lecture de ses propres écritures.
+
+- Les requêtes HTTP sûres (GET, HEAD, OPTIONS) lisent sur une réplica
+  saine ; tout le reste (écritures, commandes, tâches de fond) reste sur le
+  primaire.
+- Après une requête ayant écrit, la position WAL du primaire (LSN) est
+  renvoyée au client dans un cookie signé (`PIN_COOKIE`), lu quel que soit
+  le worker qui sert la requête suivante : les lectures de l'utilisateur
+  restent sur le primaire tant qu'aucune réplica n'a rejoué cette position,
+  et au plus `REPLICA_PIN_SECONDS`.
+- L'état de chaque réplica (joignable, LSN rejoué, retard) est sondé au plus
+  toutes les `REPLICA_CHECK_INTERVAL` secondes par processus.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import LazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Position inconnue (base autre que PostgreSQL) : lectures sur le primaire
+UNKNOWN_POSITION = 0
+# Cookie signé "<utilisateur>:<LSN>" de la dernière écriture
+PIN_COOKIE = "replica_pin"
+
+REPLICA_STATUS_SQL = """
+    SELECT pg_is_in_recovery(),
+           pg_last_wal_replay_lsn(),
+           CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+           END
+"""
+
+_state = ContextVar("replica_state", default=None)
+_round_robin = itertools.count()
+
+
+def parse_lsn(value):
+    """LSN PostgreSQL ('16/B374D848') en entier comparable ; None si absent."""
+    if not value:
+        return None
+    high, low = str(value).split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def primary_position(cursor):
+    """Position WAL courante du primaire (PostgreSQL)."""
+    cursor.execute("SELECT pg_current_wal_lsn()")
+    return parse_lsn(cursor.fetchone()[0])
+
+
+@dataclass
+class ReplicaStatus:
+    alias: str
+    healthy: bool
+    # Dernière position rejouée (None hors PostgreSQL)
+    lsn: int | None = None
+    # Retard de rejeu, en secondes (0 si tout le WAL reçu est rejoué)
+    lag: float = 0.0
+    error: str = ""
+    checked_at: float = 0.0
+
+    def has_replayed(self, position):
+        if position is None:
+            return True
+        return self.lsn is not None and self.lsn >= position
+
+
+def read_status(alias, cursor, vendor="postgresql"):
+    """État d'une réplica lu via `cursor`."""
+    now = time.monotonic()
+    if vendor != "postgresql":
+        cursor.execute("SELECT 1")
+        return ReplicaStatus(alias, True, checked_at=now)
+    cursor.execute(REPLICA_STATUS_SQL)
+    in_recovery, lsn, lag = cursor.fetchone()
+    if not in_recovery:
+        # Promue (bascule) : elle n'est plus alimentée par le primaire
+        return ReplicaStatus(alias, False, error="hors réplication", checked_at=now)
+    return ReplicaStatus(alias, True, parse_lsn(lsn), float(lag or 0), checked_at=now)
+
+
+def choose_replica(statuses, last_write, max_lag):
+    """
+    Alias d'une réplica saine, assez à jour et ayant rejoué `last_write`
+    (tour de rôle entre les candidates), ou None.
+    """
+    candidates = [
+        status.alias
+        for status in statuses
+        if status.healthy and status.lag <= max_lag and status.has_replayed(last_write)
+    ]
+    if not candidates:
+        return None
+    return candidates[next(_round_robin) % len(candidates)]
+
+
+class ReplicaHealth:
+    """
+    Sondes par alias, mises en cache `interval` secondes dans le processus
+    (par défaut `REPLICA_CHECK_INTERVAL`).
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def status(self, alias):
+        interval = self.interval or settings.REPLICA_CHECK_INTERVAL
+        status = self._statuses.get(alias)
+        if status is not None and time.monotonic() - status.checked_at < interval:
+            return status
+        # Une seule sonde à la fois ; les autres threads lisent l'état courant
+        if self._lock.acquire(blocking=status is None):
+            try:
+                status = self.check(alias)
+            finally:
+                self._lock.release()
+        return status
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                status = read_status(alias, cursor, connection.vendor)
+        except DatabaseError as err:
+            connection.close()
+            status = ReplicaStatus(
+                alias, False, error=str(err), checked_at=time.monotonic()
+            )
+        if not status.healthy:
+            logger.warning("Réplica %s écartée : %s", alias, status.error)
+        self._statuses[alias] = status
+        return status
+
+
+health = ReplicaHealth()
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", ())
+
+
+def _user_id(request):
+    """Utilisateur déjà identifié, sans déclencher de chargement (et donc de lecture)."""
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def remember_write(request, response):
+    """
+    Renvoie au client, dans `PIN_COOKIE`, la position du primaire après une
+    écriture de l'utilisateur.
+    """
+    user_id = _user_id(request)
+    if user_id is None:
+        return
+    position = UNKNOWN_POSITION
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor == "postgresql":
+        try:
+            with connection.cursor() as cursor:
+                position = primary_position(cursor)
+        except DatabaseError:
+            logger.exception("Position WAL du primaire illisible")
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        f"{user_id}:{position}",
+        salt=PIN_COOKIE,
+        max_age=settings.REPLICA_PIN_SECONDS,
+        secure=request.is_secure(),
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def last_write(request, user_id):
+    """
+    Position de la dernière écriture de `user_id` (`PIN_COOKIE`), ou None si
+    le cookie est absent, expiré, altéré ou émis pour un autre utilisateur.
+    """
+    value = request.get_signed_cookie(
+        PIN_COOKIE,
+        default=None,
+        salt=PIN_COOKIE,
+        max_age=settings.REPLICA_PIN_SECONDS,
+    )
+    owner, _, position = (value or "").partition(":")
+    if owner != str(user_id) or not position.isdigit():
+        return None
+    return int(position)
+
+
+@dataclass
+class _RequestState:
+    request: object
+    read_only: bool
+    wrote: bool = False
+    alias: str | None = None
+
+
+class ReplicaMiddleware:
+    """Ouvre l'état de routage de la requête et mémorise ses écritures."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState(request, read_only=request.method in SAFE_METHODS)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and replica_aliases():
+            remember_write(request, response)
+        return response
+
+
+class ReplicaRouter:
+    """Lectures des requêtes sûres sur réplica, tout le reste sur le primaire."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.read_only or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            alias = self._pick(state.request)
+            if alias is None:
+                return DEFAULT_DB_ALIAS
+            state.alias = alias
+        return state.alias
+
+    def _pick(self, request):
+        """
+        Réplica de la requête ; None tant que l'utilisateur n'est pas
+        identifié (sa dernière écriture est inconnue) ou en transaction.
+        """
+        aliases = replica_aliases()
+        if not aliases or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        user_id = _user_id(request)
+        if user_id is None:
+            return None
+        position = last_write(request, user_id)
+        statuses = [health.status(alias) for alias in aliases]
+        return choose_replica(statuses, position, settings.REPLICA_MAX_LAG) or (
+            DEFAULT_DB_ALIAS
+        )
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,424 @@
+"""
+Répartition des entreprises sur plusieurs bases (shards).
+
+`Entreprise.shard` désigne l'alias de la base qui porte les données de
+l'entreprise (`TENANT_MODELS`). Les tables de référence (`REFERENCE_MODELS`)
+restent écrites sur `default` et sont recopiées sur chaque shard, pour que
+les clés étrangères des données d'entreprise y restent valides.
+
+Le routage s'appuie sur le hint `tenant` des `TenantManager`, sur l'instance
+écrite ou, à défaut, sur le `tenant_scope` en cours : hors de ces cas, une
+requête part sur `default`. Le code exécuté hors des vues (commandes, tâches)
+qui touche aux données d'une entreprise s'exécute donc dans
+`tenant_scope(entreprise_id)`, et ses transactions via `tenant_atomic()`.
+
+Chaque worker garde la carte des entreprises déplacées (`shard_map`) au
+plus `SHARD_MAP_TTL` secondes. Un déplacement (`move_tenant`) gèle donc les
+écritures de l'entreprise (`Entreprise.frozen_until`, lu en base par tous
+les workers) jusqu'à ce que chacun ait rechargé la carte après la bascule.
+
+Sans `DATABASE_SHARDS`, tout reste sur `default` sans surcoût.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .cache import TenantCache
+from .managers import scoped_tenant, tenant_from_hints
+from .partitioning import partition_key
+
+logger = logging.getLogger(__name__)
+
+# Écrites sur `default`, recopiées sur chaque shard (ordre des dépendances)
+REFERENCE_MODELS = ("users.Role", "companies.Entreprise", "users.User")
+# Données d'entreprise, dans l'ordre des dépendances (copie) ; ordre inverse
+# pour les suppressions
+TENANT_MODELS = (
+    "invoices.Customer",
+    "invoices.Invoice",
+    "invoices.InvoiceLine",
+    "invoices.InvoiceDocument",
+    "treasury.BankTransaction",
+    "treasury.Reconciliation",
+    "treasury.CategoryRule",
+    "treasury.RecurringSeries",
+    "treasury.RecurringScanState",
+    "treasury.LabelStats",
+    "audit.AuditLog",
+)
+# Le scellement est propre à chaque base : une entrée copiée est rescellée
+# dans la chaîne de la base cible, et n'est jamais réécrite ensuite
+RESEALED_FIELDS = {
+    "audit.AuditLog": {"batch_id": None, "batch_index": None, "entry_hash": ""}
+}
+
+
+def shard_aliases():
+    return getattr(settings, "DATABASE_SHARDS", ())
+
+
+def tenant_databases():
+    """Toutes les bases pouvant porter des données d'entreprise."""
+    return [DEFAULT_DB_ALIAS, *shard_aliases()]
+
+
+def _load_shard_map(_):
+    from apps.companies.models import Entreprise
+
+    return {
+        str(entreprise_id): alias
+        for entreprise_id, alias in Entreprise.objects.exclude(
+            shard=DEFAULT_DB_ALIAS
+        ).values_list("id", "shard")
+    }
+
+
+# Entreprises hors de `default` uniquement (invalidé par apps.companies.signals,
+# immédiatement partout avec un cache partagé, sinon après `SHARD_MAP_TTL`)
+SHARD_MAP_KEY = "*"
+SHARD_MAP_TTL = 30
+shard_map = TenantCache("sharding:map", _load_shard_map, ttl=SHARD_MAP_TTL)
+
+
+def shard_for(entreprise_id):
+    """Alias de la base portant les données de `entreprise_id`."""
+    if entreprise_id is None or not shard_aliases():
+        return DEFAULT_DB_ALIAS
+    return shard_map.get(SHARD_MAP_KEY).get(str(entreprise_id), DEFAULT_DB_ALIAS)
+
+
+def tenant_db(entreprise_id=None):
+    """Base de `entreprise_id`, par défaut de l'entreprise du `tenant_scope`."""
+    if entreprise_id is None:
+        entreprise_id = scoped_tenant()
+    return shard_for(entreprise_id)
+
+
+def tenant_atomic(entreprise_id=None):
+    """`transaction.atomic` sur la base de l'entreprise (voir `tenant_db`)."""
+    return transaction.atomic(using=tenant_db(entreprise_id))
+
+
+class ShardRouter:
+    """
+    Données d'entreprise vers leur shard ; le reste (et les entreprises
+    restées sur `default`) est laissé aux routeurs suivants.
+    """
+
+    def _shard(self, model, hints):
+        if not shard_aliases() or model._meta.label not in TENANT_MODELS:
+            return None
+        entreprise_id = tenant_from_hints(hints)
+        if entreprise_id is None:
+            entreprise_id = scoped_tenant()
+        alias = shard_for(entreprise_id)
+        return None if alias == DEFAULT_DB_ALIAS else alias
+
+    def db_for_read(self, model, **hints):
+        if shard_aliases() and model._meta.label not in TENANT_MODELS:
+            # Relation suivie depuis une ligne de shard (lot d'audit...) : les
+            # écritures de ces modèles restent, elles, sur `default`
+            instance = hints.get("instance")
+            if instance is not None and instance._state.db in shard_aliases():
+                return instance._state.db
+        return self._shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not shard_aliases():
+            return None
+        # Les lignes de référence existent sur toutes les bases
+        if {obj1._meta.label, obj2._meta.label} & set(REFERENCE_MODELS):
+            return True
+        return None
+
+
+def copy_rows(model, rows, alias, batch_size=500):
+    """
+    Insère ou remplace `rows` (dictionnaires attname -> valeur) dans la base
+    `alias`, valeurs conservées à l'identique (ni auto_now, ni signaux).
+    """
+    if not rows:
+        return 0
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+    table, pk = quote(model._meta.db_table), model._meta.pk
+    fields = model._meta.concrete_fields
+    columns = ", ".join(quote(f.column) for f in fields)
+    updates = ", ".join(
+        f"{quote(f.column)} = EXCLUDED.{quote(f.column)}"
+        for f in fields
+        if not f.primary_key
+    )
+    # Table partitionnée : la clé primaire inclut la colonne de partition, une
+    # ligne dont la date a changé est donc supprimée puis réinsérée
+    partitioned = partition_key(model, connection) is not None
+    placeholder = f"({', '.join(['%s'] * len(fields))})"
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start : start + batch_size]
+        params = [
+            f.get_db_prep_save(row[f.attname], connection)
+            for row in chunk
+            for f in fields
+        ]
+        with connection.cursor() as cursor:
+            if partitioned:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {quote(pk.column)} IN "
+                    f"({', '.join(['%s'] * len(chunk))})",
+                    [pk.get_db_prep_save(row[pk.attname], connection) for row in chunk],
+                )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"VALUES {', '.join([placeholder] * len(chunk))}"
+                + (
+                    ""
+                    if partitioned
+                    else f" ON CONFLICT ({quote(pk.column)}) DO UPDATE SET {updates}"
+                ),
+                params,
+            )
+    return len(rows)
+
+
+def _row(instance):
+    return {
+        f.attname: getattr(instance, f.attname) for f in instance._meta.concrete_fields
+    }
+
+
+def mirror_reference(instance):
+    """Recopie une ligne de référence enregistrée sur `default` vers chaque shard."""
+    for alias in shard_aliases():
+        try:
+            copy_rows(type(instance), [_row(instance)], alias)
+        except DatabaseError:
+            # Rattrapé par `sync_reference_rows` (move_tenant)
+            logger.exception("%s non recopié sur %s", instance._meta.label, alias)
+
+
+def unmirror_reference(instance):
+    """Supprime une ligne de référence des shards (cascade sur le shard)."""
+    for alias in shard_aliases():
+        type(instance)._base_manager.using(alias).filter(pk=instance.pk).delete()
+
+
+def sync_reference_rows(alias, batch_size=1000):
+    """Recopie toutes les lignes de référence de `default` vers `alias`."""
+    copied = {}
+    for label in REFERENCE_MODELS:
+        model = apps.get_model(label)
+        attnames = [f.attname for f in model._meta.concrete_fields]
+        rows = list(model._base_manager.using(DEFAULT_DB_ALIAS).values(*attnames))
+        copied[label] = copy_rows(model, rows, alias, batch_size)
+    return copied
+
+
+# --- Déplacement d'une entreprise ---------------------------------------
+
+
+def _entreprises():
+    from apps.companies.models import Entreprise
+
+    return Entreprise.objects.using(DEFAULT_DB_ALIAS)
+
+
+def freeze_tenant(entreprise_id, timeout):
+    """
+    Refuse les écritures HTTP de l'entreprise pendant `timeout` secondes
+    (voir `tenant_required`).
+    """
+    _entreprises().filter(pk=entreprise_id).update(
+        frozen_until=timezone.now() + timedelta(seconds=timeout)
+    )
+
+
+def unfreeze_tenant(entreprise_id):
+    _entreprises().filter(pk=entreprise_id).update(frozen_until=None)
+
+
+def is_frozen(entreprise_id):
+    """Gel en cours ; une requête sur `default`, seulement si des shards existent."""
+    return (
+        bool(shard_aliases())
+        and _entreprises()
+        .filter(pk=entreprise_id, frozen_until__gt=timezone.now())
+        .exists()
+    )
+
+
+def cutover_tenant(entreprise_id, target, hold):
+    """
+    Bascule l'entreprise, toujours gelée, vers `target` et prolonge le gel de
+    `hold` secondes : le temps que chaque worker recharge `shard_map` (au plus
+    `SHARD_MAP_TTL`). Retourne False, sans bascule, si le gel a expiré : des
+    écritures ont pu atteindre la base source depuis la vérification.
+    """
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        entreprise = _entreprises().select_for_update().get(pk=entreprise_id)
+        now = timezone.now()
+        if entreprise.frozen_until is None or entreprise.frozen_until <= now:
+            return False
+        entreprise.shard = target
+        entreprise.frozen_until = now + timedelta(seconds=hold)
+        entreprise.save(update_fields=["shard", "frozen_until"])
+    return True
+
+
+def _tenant_rows(model, alias, entreprise_id):
+    return model._base_manager.using(alias).filter(entreprise_id=entreprise_id)
+
+
+def _compared(model, row):
+    """Valeurs comparées entre bases (hors scellement propre à chaque base)."""
+    resealed = RESEALED_FIELDS.get(model._meta.label, {})
+    return tuple(
+        value
+        for name, value in row.items()
+        if name not in resealed and name != "entreprise_id"
+    )
+
+
+@dataclass
+class SyncResult:
+    label: str
+    written: int = 0
+    deleted: int = 0
+
+
+def sync_model(model, entreprise_id, source, target, batch_size=1000):
+    """
+    Aligne les lignes de l'entreprise de `target` sur `source` : insère les
+    absentes, remplace les différentes, supprime celles en trop.
+    """
+    label = model._meta.label
+    result = SyncResult(label)
+    resealed = RESEALED_FIELDS.get(label)
+    attnames = [f.attname for f in model._meta.concrete_fields]
+    pk_name = model._meta.pk.attname
+    source_rows = _tenant_rows(model, source, entreprise_id).order_by("pk")
+    seen = set()
+    last_pk = None
+    while True:
+        batch = source_rows if last_pk is None else source_rows.filter(pk__gt=last_pk)
+        rows = list(batch.values(*attnames)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][pk_name]
+        pks = [row[pk_name] for row in rows]
+        seen.update(pks)
+        existing = {
+            row[pk_name]: _compared(model, row)
+            for row in _tenant_rows(model, target, entreprise_id)
+            .filter(pk__in=pks)
+            .values(*attnames)
+        }
+        changed = []
+        for row in rows:
+            pk = row[pk_name]
+            if resealed is not None:
+                # Entrées immuables : insérées une fois, jamais réécrites
+                if pk not in existing:
+                    changed.append({**row, **resealed})
+            elif existing.get(pk) != _compared(model, row):
+                changed.append(row)
+        result.written += copy_rows(model, changed, target)
+
+    if resealed is None:
+        extra = [
+            pk
+            for pk in _tenant_rows(model, target, entreprise_id).values_list(
+                "pk", flat=True
+            )
+            if pk not in seen
+        ]
+        for start in range(0, len(extra), batch_size):
+            # Suppression brute : ni cascade ni signaux (pas d'audit du déplacement)
+            result.deleted += (
+                model._base_manager.using(target)
+                .filter(pk__in=extra[start : start + batch_size])
+                ._raw_delete(target)
+            )
+    return result
+
+
+def sync_tenant(entreprise_id, source, target, batch_size=1000):
+    """Aligne toutes les données de l'entreprise de `target` sur `source`."""
+    results = []
+    with transaction.atomic(using=target):
+        for label in TENANT_MODELS:
+            model = apps.get_model(label)
+            results.append(sync_model(model, entreprise_id, source, target, batch_size))
+    return results
+
+
+def tenant_digest(model, alias, entreprise_id):
+    """(nombre de lignes, empreinte) des données de l'entreprise dans `alias`."""
+    attnames = [f.attname for f in model._meta.concrete_fields]
+    digest = hashlib.sha256()
+    count = 0
+    for row in (
+        _tenant_rows(model, alias, entreprise_id)
+        .order_by("pk")
+        .values(*attnames)
+        .iterator(chunk_size=2000)
+    ):
+        digest.update(json.dumps(_compared(model, row), default=str).encode())
+        count += 1
+    return count, digest.hexdigest()
+
+
+@dataclass
+class VerifyResult:
+    problems: list = field(default_factory=list)
+    rows: int = 0
+
+
+def verify_tenant(entreprise_id, source, target):
+    """Compare nombre de lignes et empreinte de chaque modèle entre les deux bases."""
+    result = VerifyResult()
+    for label in TENANT_MODELS:
+        model = apps.get_model(label)
+        expected = tenant_digest(model, source, entreprise_id)
+        actual = tenant_digest(model, target, entreprise_id)
+        result.rows += expected[0]
+        if expected != actual:
+            result.problems.append(
+                f"{label} : {expected[0]} ligne(s) sur {source}, {actual[0]} sur {target}"
+                + (" (contenu différent)" if expected[0] == actual[0] else "")
+            )
+    return result
+
+
+def purge_tenant(entreprise_id, alias, batch_size=1000):
+    """
+    Supprime les données de l'entreprise de `alias` après bascule. Les
+    entrées d'audit scellées restent : les lots de cette base doivent rester
+    vérifiables (elles partent avec l'archivage mensuel).
+    """
+    deleted = {}
+    with transaction.atomic(using=alias):
+        for label in reversed(TENANT_MODELS):
+            model = apps.get_model(label)
+            rows = _tenant_rows(model, alias, entreprise_id)
+            if label in RESEALED_FIELDS:
+                rows = rows.filter(batch__isnull=True)
+            pks = list(rows.values_list("pk", flat=True))
+            deleted[label] = 0
+            for start in range(0, len(pks), batch_size):
+                deleted[label] += (
+                    model._base_manager.using(alias)
+                    .filter(pk__in=pks[start : start + batch_size])
+                    ._raw_delete(alias)
+                )
+    return deleted
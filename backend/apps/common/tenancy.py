@@ -0,0 +1,180 @@
+"""
+Résolution de l'entreprise courante (tenant), une fois par requête.
+
+`TenantMiddleware` attache `request.tenant`, résolu à la première lecture
+(DRF n'authentifie l'utilisateur qu'à l'entrée de la vue) :
+
+- en-tête `X-Company-Id` s'il est présent, sinon l'entreprise de
+  l'utilisateur ;
+- un utilisateur n'accède qu'à sa propre entreprise, un ADMIN_CABINET à
+  toute entreprise active.
+
+Les codes de rôle (immuables) et l'ensemble des entreprises actives sont
+gardés en mémoire : la résolution ne coûte aucune requête, y compris pour
+un changement d'entreprise par un ADMIN_CABINET.
+
+Le tenant de la requête en cours est aussi exposé via `current_tenant()`
+(contextvar) pour le code appelé hors des vues (managers, services).
+"""
+
+import functools
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.utils.functional import SimpleLazyObject, cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .cache import TenantCache
+from .managers import tenant_scope
+from .metrics import cache_counters
+from .sharding import is_frozen
+
+TENANT_HEADER = "X-Company-Id"
+
+_current_request = ContextVar("tenant_request", default=None)
+_role_codes = {}
+_role_hits, _role_misses = cache_counters("tenancy:roles")
+
+
+@dataclass(frozen=True)
+class TenantContext:
+    """Entreprise résolue pour la requête, ou erreur à renvoyer (`error`, `status`)."""
+
+    entreprise_id: uuid.UUID | None = None
+    user_id: uuid.UUID | None = None
+    role: str | None = None
+    # Entreprise choisie via X-Company-Id plutôt que celle de l'utilisateur
+    switched: bool = False
+    error: str = ""
+    status: int = 200
+
+    def __bool__(self):
+        return self.entreprise_id is not None
+
+    @cached_property
+    def entreprise(self):
+        from apps.companies.models import Entreprise
+
+        return Entreprise.objects.get(pk=self.entreprise_id)
+
+
+def _load_active_entreprises(_):
+    from apps.companies.models import Entreprise
+
+    return frozenset(
+        Entreprise.objects.filter(is_active=True).values_list("id", flat=True)
+    )
+
+
+# Clé unique : l'ensemble est partagé par tous les tenants
+# (invalidé par apps.companies.signals)
+ALL = "*"
+active_entreprises = TenantCache("tenancy:active-entreprises", _load_active_entreprises)
+
+
+def role_code(user):
+    """Code du rôle de l'utilisateur ; les rôles sont immuables, donc mis en cache."""
+    if user.role_id is None:
+        return None
+    if user.role_id in _role_codes:
+        _role_hits.inc()
+    else:
+        from apps.users.models import Role
+
+        _role_misses.inc()
+        _role_codes.update(Role.objects.values_list("id", "code"))
+    return _role_codes.get(user.role_id)
+
+
+def resolve_tenant(request):
+    from apps.users.models import Role
+
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return TenantContext(error="Authentification requise", status=401)
+
+    role = role_code(user)
+    header = request.headers.get(TENANT_HEADER)
+    if not header:
+        if user.entreprise_id is None:
+            return TenantContext(
+                user_id=user.pk, role=role, error="Entreprise non définie", status=400
+            )
+        return TenantContext(user.entreprise_id, user.pk, role)
+
+    try:
+        entreprise_id = uuid.UUID(header)
+    except ValueError:
+        return TenantContext(
+            user_id=user.pk, role=role, error=f"{TENANT_HEADER} invalide", status=400
+        )
+    if entreprise_id == user.entreprise_id:
+        return TenantContext(entreprise_id, user.pk, role)
+    if role == Role.ADMIN_CABINET and entreprise_id in active_entreprises.get(ALL):
+        return TenantContext(entreprise_id, user.pk, role, switched=True)
+    return TenantContext(
+        user_id=user.pk, role=role, error="Accès refusé à cette entreprise", status=403
+    )
+
+
+class TenantMiddleware:
+    """
+    Attache `request.tenant`, résolu à la première lecture puis mémorisé, et
+    expose la requête via `current_request()` le temps de son traitement.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = SimpleLazyObject(lambda: resolve_tenant(request))
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+def current_request():
+    """Requête HTTP en cours, ou None hors requête."""
+    return _current_request.get()
+
+
+def current_tenant():
+    """
+    Tenant de la requête en cours, ou None hors requête ou tant que
+    l'utilisateur n'est pas authentifié (un tenant résolu trop tôt serait
+    mémorisé en erreur pour toute la requête).
+    """
+    request = current_request()
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return None
+    return request.tenant
+
+
+def tenant_required(view):
+    """
+    Décorateur de vue (sous `@permission_classes`) : renvoie l'erreur de
+    résolution du tenant, le cas échéant, sinon exécute la vue dans le
+    `tenant_scope` de l'entreprise résolue (voir apps.common.managers).
+    Les écritures d'une entreprise en cours de déplacement entre shards
+    sont refusées (503).
+    """
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        tenant = request.tenant
+        if tenant.error:
+            return Response({"error": tenant.error}, status=tenant.status)
+        if request.method not in SAFE_METHODS and is_frozen(tenant.entreprise_id):
+            return Response(
+                {"error": "Entreprise en cours de déplacement, réessayez plus tard"},
+                status=503,
+            )
+        with tenant_scope(tenant.entreprise_id):
+            return view(request, *args, **kwargs)
+
+    return wrapper
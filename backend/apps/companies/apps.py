@@ -5,3 +5,6 @@ class CompaniesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.companies"
     verbose_name = "Companies"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,111 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common import sharding
+from apps.companies.models import Entreprise
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace les données d'une entreprise vers une autre base : copie en "
+        "ligne, gel des écritures, rattrapage, vérification, bascule, puis "
+        "attente du rechargement de la carte des shards par tous les workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("entreprise", help="UUID de l'entreprise.")
+        parser.add_argument("target", help="Alias de la base cible.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--freeze-timeout",
+            type=int,
+            default=600,
+            help="Durée maximale du gel des écritures, en secondes.",
+        )
+        parser.add_argument(
+            "--grace",
+            type=float,
+            default=5,
+            help="Attente (secondes) des écritures en cours après le gel.",
+        )
+        parser.add_argument(
+            "--purge-source",
+            action="store_true",
+            help="Supprime les données de la base source après bascule.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            entreprise = Entreprise.objects.get(pk=options["entreprise"])
+        except (Entreprise.DoesNotExist, ValidationError) as err:
+            raise CommandError(
+                f"Entreprise introuvable : {options['entreprise']}"
+            ) from err
+        source, target = entreprise.shard, options["target"]
+        databases = sharding.tenant_databases()
+        if target not in databases:
+            raise CommandError(
+                f"Base inconnue : {target} (bases : {', '.join(databases)})"
+            )
+        if target == source:
+            raise CommandError(f"L'entreprise est déjà sur {target}")
+
+        batch_size, grace = options["batch_size"], options["grace"]
+        sharding.sync_reference_rows(target, batch_size)
+        # Première passe en ligne : l'essentiel des lignes, sans gêner l'entreprise
+        self._report(
+            "copie", sharding.sync_tenant(entreprise.pk, source, target, batch_size)
+        )
+
+        # Gel lu en base par chaque worker : plus aucune écriture HTTP
+        # n'atteint la source, une fois terminées celles en cours (`grace`)
+        sharding.freeze_tenant(entreprise.pk, options["freeze_timeout"])
+        hold = sharding.SHARD_MAP_TTL + grace
+        try:
+            time.sleep(grace)
+            self._report(
+                "rattrapage",
+                sharding.sync_tenant(entreprise.pk, source, target, batch_size),
+            )
+            verified = sharding.verify_tenant(entreprise.pk, source, target)
+            if verified.problems:
+                raise CommandError(
+                    "Vérification en échec, bascule annulée :\n"
+                    + "\n".join(verified.problems)
+                )
+            if not sharding.cutover_tenant(entreprise.pk, target, hold):
+                raise CommandError(
+                    "Gel expiré avant la bascule (--freeze-timeout), bascule annulée"
+                )
+        except BaseException:
+            sharding.unfreeze_tenant(entreprise.pk)
+            raise
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{entreprise.pk} : {source} -> {target} "
+                f"({verified.rows} ligne(s) vérifiée(s))"
+            )
+        )
+
+        # Un worker peut encore router l'entreprise vers la source jusqu'au
+        # rechargement de sa carte : le gel est maintenu jusque-là, et la
+        # source n'est purgée qu'ensuite
+        self.stdout.write(f"Rechargement de la carte des shards ({hold:.0f} s)...")
+        time.sleep(hold)
+        sharding.unfreeze_tenant(entreprise.pk)
+
+        if options["purge_source"]:
+            deleted = sharding.purge_tenant(entreprise.pk, source, batch_size)
+            self.stdout.write(
+                f"Purge de {source} : {sum(deleted.values())} ligne(s) supprimée(s)"
+            )
+
+    def _report(self, step, results):
+        for result in results:
+            if result.written or result.deleted:
+                self.stdout.write(
+                    f"{step} {result.label} : {result.written} écrite(s), "
+                    f"{result.deleted} supprimée(s)"
+                )
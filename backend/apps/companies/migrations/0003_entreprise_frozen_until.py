@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0002_entreprise_shard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entreprise",
+            name="frozen_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -13,6 +13,11 @@ class Entreprise(models.Model):
     name = models.CharField(max_length=255)
     siret = models.CharField(max_length=14, unique=True)
     is_active = models.BooleanField(default=True)
+    # Alias de la base portant les données de l'entreprise (apps.common.sharding)
+    shard = models.CharField(max_length=63, default="default")
+    # Écritures HTTP refusées jusqu'à cette date : déplacement entre shards en
+    # cours (lu en base par chaque worker, voir apps.common.sharding)
+    frozen_until = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
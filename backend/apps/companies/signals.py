@@ -0,0 +1,29 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common import sharding
+from apps.common.tenancy import ALL, active_entreprises
+
+from .models import Entreprise
+
+
+@receiver(post_save, sender=Entreprise)
+@receiver(post_delete, sender=Entreprise)
+def invalidate_tenant_maps(sender, instance, **kwargs):
+    """Création, (dés)activation, déplacement ou suppression d'une entreprise."""
+    active_entreprises.invalidate(ALL)
+    sharding.shard_map.invalidate(sharding.SHARD_MAP_KEY)
+
+
+@receiver(post_save, sender=Entreprise)
+def mirror_entreprise(sender, instance, using, **kwargs):
+    """Les données d'entreprise d'un shard référencent l'entreprise localement."""
+    if using == DEFAULT_DB_ALIAS:
+        sharding.mirror_reference(instance)
+
+
+@receiver(post_delete, sender=Entreprise)
+def unmirror_entreprise(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        sharding.unmirror_reference(instance)
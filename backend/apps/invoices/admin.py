@@ -6,6 +6,7 @@ from .models import Customer, Invoice, InvoiceDocument, InvoiceLine
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ("name", "email", "entreprise", "created_at")
+    list_select_related = ("entreprise",)
     list_filter = ("entreprise",)
     search_fields = ("name", "email")
     readonly_fields = ("id", "created_at")
@@ -27,6 +28,7 @@ class InvoiceAdmin(admin.ModelAdmin):
         "issue_date",
         "entreprise",
     )
+    list_select_related = ("customer", "entreprise")
     list_filter = ("status", "entreprise")
     search_fields = ("number", "customer__name")
     readonly_fields = (
@@ -43,4 +45,5 @@ class InvoiceAdmin(admin.ModelAdmin):
 @admin.register(InvoiceDocument)
 class InvoiceDocumentAdmin(admin.ModelAdmin):
     list_display = ("invoice", "pdf_path", "generated_at")
+    list_select_related = ("invoice",)
     readonly_fields = ("id", "generated_at")
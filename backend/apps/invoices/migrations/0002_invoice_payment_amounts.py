@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_payment_amounts(apps, schema_editor):
+    Invoice = apps.get_model("invoices", "Invoice")
+    Reconciliation = apps.get_model("treasury", "Reconciliation")
+
+    paid = (
+        Reconciliation.objects.filter(invoice=OuterRef("pk"))
+        .values("invoice")
+        .annotate(total=Sum("matched_amount"))
+        .values("total")
+    )
+    Invoice.objects.update(
+        amount_paid=Coalesce(
+            Subquery(paid),
+            Value(0),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+    )
+    # Brouillons et factures annulées : rien d'exigible, hors de l'index partiel
+    Invoice.objects.filter(status__in=["ISSUED", "PAID"]).update(
+        amount_due=F("total_ttc") - F("amount_paid")
+    )
+    Invoice.objects.filter(
+        status="ISSUED", amount_paid__gt=0, amount_due__lte=0
+    ).update(status="PAID")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoices", "0001_initial"),
+        ("treasury", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="amount_paid",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="amount_due",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_payment_amounts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("amount_due__gt", 0)),
+                fields=["entreprise", "due_date"],
+                name="invoice_open_items_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+import apps.common.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invoices", "0002_invoice_payment_amounts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customer",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="invoice",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="invoicedocument",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="invoiceline",
+            name="id",
+            field=models.UUIDField(
+                default=apps.common.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+from apps.common.online_schema import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY : hors transaction
+    atomic = False
+
+    dependencies = [
+        ("companies", "0002_entreprise_shard"),
+        ("invoices", "0003_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="invoice",
+            index=models.Index(
+                fields=["entreprise", "created_at"],
+                name="invoices_in_entrepr_7c9796_idx",
+            ),
+        ),
+    ]
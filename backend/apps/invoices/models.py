@@ -1,13 +1,16 @@
-import uuid
+from decimal import Decimal
 
 from django.db import models
 from django.utils import timezone
 
+from apps.common.ids import uuid7
+from apps.common.managers import TenantManager
+
 
 class Customer(models.Model):
     """Client d'une entreprise."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     entreprise = models.ForeignKey(
         "companies.Entreprise", on_delete=models.CASCADE, related_name="customers"
@@ -19,6 +22,8 @@ class Customer(models.Model):
     vat_number = models.CharField(max_length=32, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "invoices_customer"
         verbose_name = "Customer"
@@ -32,7 +37,7 @@ class Customer(models.Model):
 class Invoice(models.Model):
     """Facture."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     class Status(models.TextChoices):
         DRAFT = "DRAFT", "Brouillon"
@@ -59,6 +64,10 @@ class Invoice(models.Model):
     total_tva = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_ttc = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    # Dénormalisé : maintenu par les rapprochements (apps.treasury.reconciliation)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    amount_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     # Anti-fraude MVP (chaînage + verrouillage)
     hash_prev = models.CharField(max_length=64, null=True, blank=True)
     hash_curr = models.CharField(max_length=64, null=True, blank=True)
@@ -67,6 +76,8 @@ class Invoice(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "invoices_invoice"
         verbose_name = "Invoice"
@@ -79,16 +90,59 @@ class Invoice(models.Model):
         indexes = [
             models.Index(fields=["entreprise", "issue_date"]),
             models.Index(fields=["entreprise", "status"]),
+            # Liste des factures, plus récentes d'abord
+            models.Index(fields=["entreprise", "created_at"]),
+            # Factures ouvertes (reste à payer), par échéance
+            models.Index(
+                fields=["entreprise", "due_date"],
+                name="invoice_open_items_idx",
+                condition=models.Q(amount_due__gt=0),
+            ),
         ]
 
     def __str__(self):
         return f"Facture {self.number}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Statut lu en base, pour tracer les transitions (apps.audit.signals)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.refresh_payment_state()
+        update_fields = kwargs.get("update_fields")
+        # Reste à payer et statut dépendent du total, du payé et du statut
+        payment_fields = {"total_ttc", "amount_paid", "status"}
+        if update_fields is not None and payment_fields & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "amount_due", "status"}
+        return super().save(*args, **kwargs)
+
+    def refresh_payment_state(self):
+        """
+        Recalcule le reste à payer (nul pour un brouillon ou une facture
+        annulée : rien n'est exigible) et bascule le statut PAID <-> ISSUED
+        selon que la facture est soldée ou non.
+        """
+        if self.status in (self.Status.ISSUED, self.Status.PAID):
+            self.amount_due = self.total_ttc - self.amount_paid
+        else:
+            self.amount_due = Decimal("0.00")
+        if (
+            self.status == self.Status.ISSUED
+            and self.amount_paid
+            and self.amount_due <= 0
+        ):
+            self.status = self.Status.PAID
+        elif self.status == self.Status.PAID and self.amount_due > 0:
+            self.status = self.Status.ISSUED
+
 
 class InvoiceLine(models.Model):
     """Ligne de facture."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     entreprise = models.ForeignKey(
         "companies.Entreprise", on_delete=models.CASCADE, related_name="invoice_lines"
@@ -104,6 +158,8 @@ class InvoiceLine(models.Model):
     total_tva = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_ttc = models.DecimalField(max_digits=12, decimal_places=2, default=0)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "invoices_invoiceline"
         verbose_name = "Invoice Line"
@@ -117,7 +173,7 @@ class InvoiceLine(models.Model):
 class InvoiceDocument(models.Model):
     """Document PDF généré pour une facture."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     entreprise = models.ForeignKey(
         "companies.Entreprise",
@@ -130,6 +186,8 @@ class InvoiceDocument(models.Model):
     pdf_path = models.CharField(max_length=500)
     generated_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "invoices_invoicedocument"
         verbose_name = "Invoice Document"
@@ -46,6 +46,12 @@ class InvoiceSerializer(serializers.Serializer):
     total_ttc = serializers.DecimalField(
         max_digits=12, decimal_places=2, read_only=True
     )
+    amount_paid = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+    amount_due = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
     lines = InvoiceLineSerializer(many=True, read_only=True)
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
@@ -70,4 +76,5 @@ class InvoiceListSerializer(serializers.Serializer):
     issue_date = serializers.DateField()
     due_date = serializers.DateField(allow_null=True)
     total_ttc = serializers.DecimalField(max_digits=12, decimal_places=2)
+    amount_due = serializers.DecimalField(max_digits=12, decimal_places=2)
     created_at = serializers.DateTimeField()
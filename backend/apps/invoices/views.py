@@ -1,3 +1,5 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.decorators import api_view, permission_classes
@@ -5,6 +7,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.common.serializers import ErrorSerializer, MessageSerializer
+from apps.common.sharding import tenant_atomic
+from apps.common.tenancy import tenant_required
 
 from .models import Customer, Invoice
 from .serializers import (CustomerSerializer, InvoiceCreateSerializer,
@@ -31,17 +35,13 @@ from .serializers import (CustomerSerializer, InvoiceCreateSerializer,
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def invoice_list(request):
     """
     GET /api/v1/invoices
     Liste des factures (scopé entreprise).
     """
-    # TODO: Filtrer par entreprise via X-Company-Id
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    invoices = Invoice.objects.filter(entreprise=entreprise).select_related("customer")
+    invoices = Invoice.objects.select_related("customer")
 
     # Filtres optionnels
     status_filter = request.query_params.get("status")
@@ -57,6 +57,7 @@ def invoice_list(request):
             "issue_date": inv.issue_date.isoformat(),
             "due_date": inv.due_date.isoformat() if inv.due_date else None,
             "total_ttc": str(inv.total_ttc),
+            "amount_due": str(inv.amount_due),
             "created_at": inv.created_at.isoformat(),
         }
         for inv in invoices.order_by("-created_at")[:25]
@@ -77,28 +78,37 @@ def invoice_list(request):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def invoice_create(request):
     """
     POST /api/v1/invoices
     Création d'une facture.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
+    entreprise_id = request.tenant.entreprise_id
 
     customer_id = request.data.get("customer_id")
     if not customer_id:
         return Response({"error": "customer_id requis"}, status=400)
 
     try:
-        customer = Customer.objects.get(id=customer_id, entreprise=entreprise)
+        customer = Customer.objects.get(id=customer_id)
     except Customer.DoesNotExist:
         return Response({"error": "Client non trouvé"}, status=404)
 
+    dates = {}
+    for name in ("issue_date", "due_date"):
+        value = request.data.get(name)
+        if not value:
+            continue
+        try:
+            dates[name] = parse_date(str(value))
+        except ValueError:
+            dates[name] = None
+        if dates[name] is None:
+            return Response({"error": f"{name} invalide (AAAA-MM-JJ)"}, status=400)
+
     # Générer numéro séquentiel
-    last_invoice = (
-        Invoice.objects.filter(entreprise=entreprise).order_by("-created_at").first()
-    )
+    last_invoice = Invoice.objects.order_by("-created_at").first()
     if last_invoice and last_invoice.number:
         try:
             last_num = int(last_invoice.number.split("-")[-1])
@@ -109,11 +119,11 @@ def invoice_create(request):
         new_number = "FAC-00001"
 
     invoice = Invoice.objects.create(
-        entreprise=entreprise,
+        entreprise_id=entreprise_id,
         customer=customer,
         number=new_number,
-        issue_date=request.data.get("issue_date"),
-        due_date=request.data.get("due_date"),
+        issue_date=dates.get("issue_date", timezone.localdate()),
+        due_date=dates.get("due_date"),
     )
 
     return Response(
@@ -127,6 +137,8 @@ def invoice_create(request):
             "total_ht": str(invoice.total_ht),
             "total_tva": str(invoice.total_tva),
             "total_ttc": str(invoice.total_ttc),
+            "amount_paid": str(invoice.amount_paid),
+            "amount_due": str(invoice.amount_due),
             "created_at": invoice.created_at.isoformat(),
         },
         status=201,
@@ -145,20 +157,17 @@ def invoice_create(request):
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def invoice_detail(request, invoice_id):
     """
     GET /api/v1/invoices/{id}
     Détail d'une facture.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
     try:
         invoice = (
             Invoice.objects.select_related("customer")
             .prefetch_related("lines")
-            .get(id=invoice_id, entreprise=entreprise)
+            .get(id=invoice_id)
         )
     except Invoice.DoesNotExist:
         return Response({"error": "Facture non trouvée"}, status=404)
@@ -192,6 +201,8 @@ def invoice_detail(request, invoice_id):
             "total_ht": str(invoice.total_ht),
             "total_tva": str(invoice.total_tva),
             "total_ttc": str(invoice.total_ttc),
+            "amount_paid": str(invoice.amount_paid),
+            "amount_due": str(invoice.amount_due),
             "lines": lines,
             "created_at": invoice.created_at.isoformat(),
             "updated_at": invoice.updated_at.isoformat(),
@@ -212,28 +223,27 @@ def invoice_detail(request, invoice_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def invoice_validate(request, invoice_id):
     """
     POST /api/v1/invoices/{id}/validate
     Valide une facture.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    try:
-        invoice = Invoice.objects.get(id=invoice_id, entreprise=entreprise)
-    except Invoice.DoesNotExist:
-        return Response({"error": "Facture non trouvée"}, status=404)
+    # Verrou : `apply_payments` peut imputer un paiement au même moment
+    with tenant_atomic():
+        try:
+            invoice = Invoice.objects.select_for_update().get(id=invoice_id)
+        except Invoice.DoesNotExist:
+            return Response({"error": "Facture non trouvée"}, status=404)
 
-    if invoice.status != Invoice.Status.DRAFT:
-        return Response(
-            {"error": "Seules les factures en brouillon peuvent être validées"},
-            status=400,
-        )
+        if invoice.status != Invoice.Status.DRAFT:
+            return Response(
+                {"error": "Seules les factures en brouillon peuvent être validées"},
+                status=400,
+            )
 
-    invoice.status = Invoice.Status.ISSUED
-    invoice.save()
+        invoice.status = Invoice.Status.ISSUED
+        invoice.save(update_fields=["status", "updated_at"])
 
     return Response({"message": "Facture validée"})
 
@@ -251,25 +261,23 @@ def invoice_validate(request, invoice_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def invoice_cancel(request, invoice_id):
     """
     POST /api/v1/invoices/{id}/cancel
     Annule une facture.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    try:
-        invoice = Invoice.objects.get(id=invoice_id, entreprise=entreprise)
-    except Invoice.DoesNotExist:
-        return Response({"error": "Facture non trouvée"}, status=404)
+    with tenant_atomic():
+        try:
+            invoice = Invoice.objects.select_for_update().get(id=invoice_id)
+        except Invoice.DoesNotExist:
+            return Response({"error": "Facture non trouvée"}, status=404)
 
-    if invoice.status == Invoice.Status.CANCELED:
-        return Response({"error": "Facture déjà annulée"}, status=400)
+        if invoice.status == Invoice.Status.CANCELED:
+            return Response({"error": "Facture déjà annulée"}, status=400)
 
-    invoice.status = Invoice.Status.CANCELED
-    invoice.save()
+        invoice.status = Invoice.Status.CANCELED
+        invoice.save(update_fields=["status", "updated_at"])
 
     return Response({"message": "Facture annulée"})
 
@@ -288,16 +296,13 @@ def invoice_cancel(request, invoice_id):
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def customer_list(request):
     """
     GET /api/v1/customers
     Liste des clients.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    customers = Customer.objects.filter(entreprise=entreprise).order_by("name")
+    customers = Customer.objects.order_by("name")
     data = [
         {
             "id": str(c.id),
@@ -326,21 +331,20 @@ def customer_list(request):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def customer_create(request):
     """
     POST /api/v1/customers
     Création d'un client.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
+    entreprise_id = request.tenant.entreprise_id
 
     name = request.data.get("name")
     if not name:
         return Response({"error": "name requis"}, status=400)
 
     customer = Customer.objects.create(
-        entreprise=entreprise,
+        entreprise_id=entreprise_id,
         name=name,
         email=request.data.get("email", ""),
         phone=request.data.get("phone", ""),
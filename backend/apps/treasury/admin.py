@@ -1,17 +1,42 @@
 from django.contrib import admin
 
-from .models import BankTransaction, Reconciliation
+from . import models
 
 
-@admin.register(BankTransaction)
+@admin.register(models.BankTransaction)
 class BankTransactionAdmin(admin.ModelAdmin):
-    list_display = ("date", "label", "amount", "entreprise", "created_at")
-    list_filter = ("entreprise", "date")
+    list_display = (
+        "date",
+        "label",
+        "amount",
+        "category",
+        "anomaly_flags",
+        "entreprise",
+        "created_at",
+    )
+    list_select_related = ("entreprise",)
+    list_filter = ("entreprise", "date", "category", "anomaly_flags")
     search_fields = ("label",)
     readonly_fields = ("id", "created_at")
 
 
-@admin.register(Reconciliation)
+@admin.register(models.CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = (
+        "pattern",
+        "kind",
+        "category",
+        "priority",
+        "is_active",
+        "entreprise",
+    )
+    list_select_related = ("entreprise",)
+    list_filter = ("entreprise", "kind", "is_active")
+    search_fields = ("pattern", "category")
+    readonly_fields = ("id", "created_at", "updated_at")
+
+
+@admin.register(models.Reconciliation)
 class ReconciliationAdmin(admin.ModelAdmin):
     list_display = (
         "invoice",
@@ -20,5 +45,22 @@ class ReconciliationAdmin(admin.ModelAdmin):
         "matched_by",
         "matched_at",
     )
+    list_select_related = ("invoice", "bank_transaction", "matched_by")
     list_filter = ("entreprise",)
     readonly_fields = ("id", "matched_at")
+
+
+@admin.register(models.RecurringSeries)
+class RecurringSeriesAdmin(admin.ModelAdmin):
+    list_display = (
+        "label_key",
+        "kind",
+        "expected_amount",
+        "next_expected_date",
+        "occurrences",
+        "entreprise",
+    )
+    list_select_related = ("entreprise",)
+    list_filter = ("entreprise", "kind")
+    search_fields = ("label_key",)
+    readonly_fields = ("id", "updated_at")
@@ -0,0 +1,105 @@
+"""
+Détection vectorisée des transactions inhabituelles à l'import.
+
+Pour chaque clé de libellé, l'entreprise conserve nombre, moyenne et somme
+des carrés des écarts (M2) des montants. Chaque lot importé est scoré
+contre ces statistiques en une passe NumPy, puis ses propres moments sont
+fusionnés aux statistiques existantes (formule de Chan et al.), sans
+relire l'historique.
+"""
+
+import numpy as np
+
+# Drapeaux (masque de bits de BankTransaction.anomaly_flags)
+AMOUNT_OUTLIER = 1
+DUPLICATE = 2
+FLAG_NAMES = {AMOUNT_OUTLIER: "amount_outlier", DUPLICATE: "duplicate"}
+
+# Historique minimal d'un libellé avant de juger ses montants
+MIN_HISTORY = 5
+# Écart (en écarts-types) au-delà duquel un montant est inhabituel
+Z_THRESHOLD = 4.0
+# Écart-type plancher : 5 % de la moyenne, au moins 1 € (montants en centimes)
+MIN_STD_RATIO = 0.05
+MIN_STD_CENTS = 100.0
+
+
+def flag_names(flags: int) -> list[str]:
+    """Noms des drapeaux présents dans le masque `flags`."""
+    return [name for bit, name in FLAG_NAMES.items() if flags & bit]
+
+
+def batch_moments(codes, values, size):
+    """Nombre, moyenne et M2 de `values` par code (0 <= code < size)."""
+    codes = np.asarray(codes, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.bincount(codes, minlength=size)
+    means = np.zeros(size)
+    np.divide(
+        np.bincount(codes, weights=values, minlength=size),
+        counts,
+        out=means,
+        where=counts > 0,
+    )
+    m2 = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=size)
+    return counts, means, m2
+
+
+def merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Fusionne deux jeux de moments (Chan, Golub & LeVeque), élément par élément."""
+    count_a = np.asarray(count_a, dtype=np.float64)
+    count_b = np.asarray(count_b, dtype=np.float64)
+    count = count_a + count_b
+    delta = np.asarray(mean_b, dtype=np.float64) - mean_a
+    weight = np.zeros_like(count)
+    np.divide(count_b, count, out=weight, where=count > 0)
+    mean = mean_a + delta * weight
+    m2 = m2_a + m2_b + delta**2 * count_a * weight
+    return count.astype(np.int64), mean, m2
+
+
+def amount_scores(codes, amounts, prior_count, prior_mean, prior_m2):
+    """
+    Écart de chaque montant à la moyenne de son libellé, en écarts-types
+    (planchers compris) ; 0 pour les libellés sans historique suffisant.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    count = np.asarray(prior_count, dtype=np.float64)[codes]
+    mean = np.asarray(prior_mean, dtype=np.float64)[codes]
+
+    variance = np.zeros_like(count)
+    np.divide(np.asarray(prior_m2)[codes], count - 1, out=variance, where=count > 1)
+    std = np.maximum.reduce(
+        [
+            np.sqrt(variance),
+            MIN_STD_RATIO * np.abs(mean),
+            np.full_like(mean, MIN_STD_CENTS),
+        ]
+    )
+    return np.where(count >= MIN_HISTORY, np.abs(amounts - mean) / std, 0.0)
+
+
+def duplicate_mask(codes, preexisting):
+    """
+    Transactions dont le code (libellé, montant, date) apparaît déjà : plus
+    tôt dans le lot, ou en base (`preexisting[code]` vrai).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    repeated = np.ones(len(codes), dtype=bool)
+    _, first = np.unique(codes, return_index=True)
+    repeated[first] = False
+    return repeated | np.asarray(preexisting, dtype=bool)[codes]
+
+
+def score_batch(codes, amounts, prior, duplicate_codes, preexisting):
+    """
+    `(flags, scores)` pour un lot : `prior` = (nombre, moyenne, M2) par code
+    de libellé, `duplicate_codes` / `preexisting` pour les doublons (débits).
+    """
+    scores = amount_scores(codes, amounts, *prior)
+    flags = np.where(scores > Z_THRESHOLD, AMOUNT_OUTLIER, 0)
+    debit = np.asarray(amounts) < 0
+    duplicates = duplicate_mask(duplicate_codes, preexisting) & debit
+    flags = flags | np.where(duplicates, DUPLICATE, 0)
+    return flags.astype(np.int64), scores
@@ -5,3 +5,6 @@ class TreasuryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.treasury"
     verbose_name = "Treasury"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,86 @@
+"""
+Application des règles de catégorisation aux transactions bancaires.
+
+Les règles actives d'une entreprise sont compilées (voir `categorization.py`)
+et gardées en mémoire via `TenantCache`, invalidé par `signals.py` à chaque
+modification de règle.
+"""
+
+import time
+from dataclasses import dataclass
+
+from apps.common.cache import TenantCache
+from apps.common.sharding import tenant_atomic
+
+from .categorization import CompiledRules, Rule
+from .models import BankTransaction, CategoryRule
+
+
+@dataclass
+class RecategorizeResult:
+    """Bilan d'un passage de re-catégorisation pour une entreprise."""
+
+    entreprise_id: object
+    rules: int = 0
+    scanned: int = 0
+    updated: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def labels_per_minute(self) -> float:
+        return self.scanned * 60 / self.elapsed if self.elapsed else 0.0
+
+
+def compile_category_rules(entreprise_id):
+    """Compile les règles actives de l'entreprise, par priorité puis ancienneté."""
+    rows = CategoryRule.objects.filter(
+        entreprise_id=entreprise_id, is_active=True
+    ).values_list("category", "kind", "pattern")
+    return CompiledRules([Rule(*row) for row in rows])
+
+
+# Règles compilées par entreprise, invalidées par `signals.py`
+category_rules = TenantCache("treasury:category-rules", compile_category_rules)
+
+
+def recategorize_transactions(
+    entreprise_id, batch_size=5000, only_uncategorized=False, dry_run=False
+):
+    """
+    Ré-applique les règles à toutes les transactions de l'entreprise.
+
+    Parcours par pagination sur la clé primaire ; seules les transactions
+    dont la catégorie change sont réécrites (bulk_update par lot).
+    """
+    started = time.perf_counter()
+    rules = category_rules.get(entreprise_id)
+    result = RecategorizeResult(entreprise_id=entreprise_id, rules=len(rules))
+
+    transactions = BankTransaction.objects.filter(entreprise_id=entreprise_id)
+    if only_uncategorized:
+        transactions = transactions.filter(category="")
+
+    last_pk = None
+    while True:
+        batch = transactions.order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch.values_list("pk", "label", "category")[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        changed = []
+        for pk, label, category in rows:
+            new_category = rules.categorize(label)
+            if new_category != category:
+                changed.append(BankTransaction(pk=pk, category=new_category))
+        result.scanned += len(rows)
+        result.updated += len(changed)
+
+        if changed and not dry_run:
+            with tenant_atomic(entreprise_id):
+                BankTransaction.objects.bulk_update(changed, ["category"])
+
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,240 @@
+"""
+Catégorisation des transactions bancaires par règles.
+
+Les règles d'une entreprise sont compilées une fois en :
+- un automate Aho-Corasick unique, portant les mots-clés et, pour chaque
+  règle « regex » qui en possède un, un littéral obligatoire servant de
+  déclencheur ;
+- la liste, par rang, des seules regex sans littéral exploitable.
+Chaque libellé est ainsi parcouru une fois par l'automate ; seules les regex
+déclenchées sont évaluées, puis les regex sans déclencheur de rang inférieur
+à la meilleure règle trouvée. La règle gagnante est celle de rang le plus
+faible (priorité, puis ancienneté).
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+
+_SEPARATORS_RE = re.compile(r"[^A-Z0-9]+")
+_NAMED_GROUP_RE = re.compile(r"\(\?P[<=]")
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_DIGITS_RE = re.compile(r"\d+")
+# Échappements ne correspondant à aucun caractère littéral et sans suite
+# (`\x41`, `\u00e9`, `\N{...}`, octal et références arrière en ont une)
+_CLASS_ESCAPES = frozenset("dDsSwWbBAZ")
+
+# Longueur minimale d'un littéral déclencheur (en deçà, trop de faux positifs)
+MIN_TRIGGER_LENGTH = 3
+
+
+def normalize_label(text: str) -> str:
+    """
+    Majuscules sans accents, séparateurs réduits à une espace, encadré
+    d'espaces : " PRLV SEPA EDF " (les mots-clés ne matchent que des mots
+    entiers).
+    """
+    text = unicodedata.normalize("NFKD", text.upper())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return f" {_SEPARATORS_RE.sub(' ', text).strip()} "
+
+
+def label_key(label: str) -> str:
+    """
+    Clé de regroupement d'un libellé : normalisé, sans chiffres (dates,
+    numéros de mandat ou d'échéance), espaces réduites.
+    """
+    return " ".join(_DIGITS_RE.sub(" ", normalize_label(label)).split())
+
+
+class AhoCorasick:
+    """
+    Automate multi-motifs. Les sorties de chaque nœud sont fusionnées le
+    long des liens d'échec à la construction, le parcours n'a donc qu'à
+    lire celles du nœud courant.
+    """
+
+    def __init__(self, patterns):
+        """`patterns` : itérable de `(motif, valeur)`."""
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [()]
+
+        for pattern, value in patterns:
+            node = 0
+            for char in pattern:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                node = next_node
+            self.outputs[node] += (value,)
+
+        # Liens d'échec en largeur, sorties fusionnées au passage
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.outputs[child] += self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def __len__(self):
+        return len(self.goto)
+
+    def matches(self, text: str) -> set:
+        """Valeurs de tous les motifs présents dans `text`."""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+
+def validate_regex(pattern: str) -> str | None:
+    """Message d'erreur si `pattern` ne peut pas être combiné, sinon None."""
+    if _NAMED_GROUP_RE.search(pattern):
+        return "Les groupes nommés ne sont pas autorisés"
+    try:
+        re.compile(f"(?:{pattern})", re.IGNORECASE)
+    except re.error as e:
+        return f"Expression régulière invalide: {e}"
+    return None
+
+
+def required_literal(pattern: str) -> str | None:
+    """
+    Plus long mot ASCII que toute correspondance de `pattern` contient
+    nécessairement, en majuscules ; None si aucun n'est garanti.
+
+    Analyse volontairement conservatrice : seuls les caractères littéraux
+    hors groupe et hors classe sont retenus, et toute alternation de
+    premier niveau ou tout échappement autre qu'un métacaractère ou une
+    classe (`\\d`, `\\s`...) annule l'extraction.
+    """
+    if re.compile(pattern).flags & re.VERBOSE:
+        return None
+
+    runs, current = [], []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        literal = None
+        if char == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if escaped and not escaped.isalnum():
+                literal = escaped
+            elif escaped not in _CLASS_ESCAPES:
+                return None
+            i += 2
+        elif char == "[":
+            # Classe de caractères : sautée jusqu'au « ] » fermant
+            i += 1
+            if pattern[i : i + 1] == "^":
+                i += 1
+            if pattern[i : i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+        elif char in "?*{":
+            # Le caractère précédent devient facultatif
+            if current:
+                current.pop()
+            if char == "{":
+                i = pattern.find("}", i)
+                if i == -1:
+                    break
+            i += 1
+        elif char == "|" and depth == 0:
+            return None
+        else:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char not in ".^$+|":
+                literal = char
+            i += 1
+
+        if literal is not None and depth == 0:
+            current.append(literal)
+        else:
+            runs.append("".join(current))
+            current = []
+    runs.append("".join(current))
+
+    words = [
+        word
+        for run in runs
+        for word in _WORD_RE.findall(run)
+        if len(word) >= MIN_TRIGGER_LENGTH
+    ]
+    return max(words, key=len).upper() if words else None
+
+
+@dataclass(frozen=True)
+class Rule:
+    category: str
+    kind: str  # "KEYWORD" | "REGEX"
+    pattern: str
+
+
+class CompiledRules:
+    """Ensemble de règles compilé ; les règles sont fournies par rang croissant."""
+
+    def __init__(self, rules):
+        self.categories = [rule.category for rule in rules]
+        self.regexes = {}  # rang -> regex déclenchée par l'automate
+        self.untriggered = []  # (rang, regex) évaluées sans déclencheur
+
+        patterns = []
+        for rank, rule in enumerate(rules):
+            if rule.kind == "KEYWORD":
+                keyword = normalize_label(rule.pattern)
+                if keyword.strip():
+                    patterns.append((keyword, rank))
+                continue
+            regex = re.compile(rule.pattern, re.IGNORECASE)
+            trigger = required_literal(rule.pattern)
+            if trigger is None:
+                self.untriggered.append((rank, regex))
+            else:
+                patterns.append((trigger, rank))
+                self.regexes[rank] = regex
+
+        self.automaton = AhoCorasick(patterns) if patterns else None
+
+    def __len__(self):
+        return len(self.categories)
+
+    def categorize(self, label: str) -> str:
+        """Catégorie de la règle de plus petit rang qui reconnaît `label`."""
+        found = None
+        if self.automaton is not None:
+            for rank in sorted(self.automaton.matches(normalize_label(label))):
+                regex = self.regexes.get(rank)
+                if regex is None or regex.search(label):
+                    found = rank
+                    break
+        # Une alternation combinée ne rendrait pas les correspondances qui se
+        # chevauchent : chaque regex est essayée, par rang croissant
+        for rank, regex in self.untriggered:
+            if found is not None and rank >= found:
+                break
+            if regex.search(label):
+                found = rank
+                break
+        return "" if found is None else self.categories[found]
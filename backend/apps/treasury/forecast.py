@@ -0,0 +1,139 @@
+"""
+Prévision de trésorerie par entreprise.
+
+Les entrées (solde, encaissements attendus des factures ouvertes décalés du
+délai de paiement moyen de chaque client, décaissements récurrents détectés
+par `detect_recurring`) sont chargées une fois et gardées en cache ; seule
+la projection sur l'horizon demandé est recalculée à chaque appel (voir
+`cashflow.py`).
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.common.cache import TenantCache
+from apps.invoices.models import Invoice
+
+from .cashflow import RecurringFlows, group_codes, mean_delays, project
+from .matching import to_cents
+from .models import BankTransaction, Reconciliation, RecurringSeries
+
+# Une série sans occurrence depuis 1,5 période est considérée comme arrêtée
+STALE_PERIODS = 1.5
+
+
+@dataclass
+class ForecastInputs:
+    """Entrées de la prévision d'une entreprise, en centimes et ordinaux."""
+
+    balance_cents: int
+    expected_ordinals: np.ndarray
+    expected_amounts: np.ndarray
+    recurring: RecurringFlows
+    recurring_series: list  # RecurringSeries, alignées sur `recurring`
+
+
+def load_forecast_inputs(entreprise_id):
+    today = timezone.localdate()
+
+    balance = (
+        BankTransaction.objects.filter(entreprise_id=entreprise_id).aggregate(
+            total=Sum("amount")
+        )["total"]
+        or 0
+    )
+
+    # Délai de paiement historique par client
+    history = list(
+        Reconciliation.objects.filter(
+            entreprise_id=entreprise_id, invoice__due_date__isnull=False
+        ).values_list(
+            "invoice__customer_id", "invoice__due_date", "bank_transaction__date"
+        )
+    )
+    open_rows = list(
+        Invoice.objects.filter(
+            entreprise_id=entreprise_id,
+            status=Invoice.Status.ISSUED,
+            amount_due__gt=0,
+        ).values_list("customer_id", "due_date", "issue_date", "amount_due")
+    )
+    customer_codes, customers = group_codes(
+        [row[0] for row in history] + [row[0] for row in open_rows]
+    )
+    delays = np.fromiter(
+        ((paid - due).days for _, due, paid in history), dtype=np.float64
+    )
+    customer_delays = mean_delays(
+        customer_codes[: len(history)], delays, max(len(customers), 1)
+    )
+
+    # Encaissement attendu = échéance (ou émission) + délai moyen du client
+    due = np.fromiter(
+        (
+            (due_date or issue_date).toordinal()
+            for _, due_date, issue_date, _ in open_rows
+        ),
+        dtype=np.int64,
+    )
+    expected_ordinals = due + np.rint(
+        customer_delays[customer_codes[len(history) :]]
+    ).astype(np.int64)
+    expected_amounts = np.fromiter(
+        (to_cents(row[3]) for row in open_rows), dtype=np.float64
+    )
+
+    # Décaissements récurrents encore actifs ; les encaissements récurrents
+    # (clients réguliers) sont déjà projetés depuis les factures ouvertes
+    series = [
+        item
+        for item in RecurringSeries.objects.filter(
+            entreprise_id=entreprise_id, expected_amount__lt=0
+        )
+        if (today - item.last_date).days <= STALE_PERIODS * item.period_days
+    ]
+    recurring = RecurringFlows(
+        periods=np.array([item.period_days for item in series], dtype=np.float64),
+        amounts=np.array(
+            [to_cents(item.expected_amount) for item in series], dtype=np.float64
+        ),
+        last=np.array([item.last_date.toordinal() for item in series], dtype=np.int64),
+    )
+
+    return ForecastInputs(
+        balance_cents=to_cents(balance),
+        expected_ordinals=expected_ordinals,
+        expected_amounts=expected_amounts,
+        recurring=recurring,
+        recurring_series=series,
+    )
+
+
+# Entrées de prévision par entreprise, invalidées par `signals.py`
+forecast_inputs = TenantCache("treasury:forecast", load_forecast_inputs)
+
+
+def cash_forecast(entreprise_id, days=90, start=None):
+    """Prévision `(entrées, Projection)` sur `days` jours à partir de `start`."""
+    start = start or timezone.localdate()
+    inputs = forecast_inputs.get(entreprise_id)
+    projection = project(
+        inputs.balance_cents,
+        inputs.expected_ordinals,
+        inputs.expected_amounts,
+        inputs.recurring,
+        start.toordinal(),
+        days + 1,
+    )
+    return inputs, projection
+
+
+def next_occurrence(flows, index, start):
+    """Prochaine date de la série `index` à partir de `start`."""
+    last, period = int(flows.last[index]), float(flows.periods[index])
+    steps = max(1, int(np.ceil((start.toordinal() - last) / period)))
+    return date.fromordinal(round(last + steps * period))
@@ -0,0 +1,131 @@
+"""
+Recherche des combinaisons de factures réglées par un même virement.
+
+Sous-ensemble borné (meet-in-the-middle) sur des montants entiers en
+centimes : les candidates sont coupées en deux moitiés, les sommes de
+chaque moitié sont énumérées avec élagage (tri croissant, plafond), puis
+les sommes complémentaires sont recherchées par dichotomie. Le nombre de
+candidates, la taille des groupes et le temps de calcul sont plafonnés.
+"""
+
+import bisect
+import time
+from dataclasses import dataclass, field
+
+from .matching import InvoiceCandidate
+
+
+class _Timeout(Exception):
+    pass
+
+
+@dataclass
+class InvoiceGroup:
+    """Ensemble de factures dont la somme correspond au virement."""
+
+    invoices: tuple[InvoiceCandidate, ...]
+    total_cents: int
+    difference_cents: int  # total - montant du virement
+
+
+@dataclass
+class GroupingResult:
+    groups: list[InvoiceGroup] = field(default_factory=list)
+    candidates: int = 0
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+
+def _enumerate_sums(items, max_size, ceiling, deadline, max_subsets):
+    """
+    Sommes des sous-ensembles de `items` (triés par montant croissant) de
+    taille <= `max_size` ne dépassant pas `ceiling`, sous-ensemble vide inclus.
+    """
+    sums = [(0, ())]
+    stack = [(0, 0, ())]
+    while stack:
+        start, total, chosen = stack.pop()
+        if len(chosen) == max_size:
+            continue
+        for i in range(start, len(items)):
+            subtotal = total + items[i].amount_cents
+            if subtotal > ceiling:
+                break  # Montants triés : les suivants dépassent aussi
+            subset = chosen + (i,)
+            sums.append((subtotal, subset))
+            stack.append((i + 1, subtotal, subset))
+        if len(sums) > max_subsets or time.perf_counter() > deadline:
+            raise _Timeout
+    return sums
+
+
+def find_invoice_groups(
+    target_cents: int,
+    candidates,
+    tolerance_cents: int = 0,
+    max_size: int = 5,
+    max_candidates: int = 30,
+    time_budget: float = 0.05,
+    max_subsets: int = 200_000,
+    limit: int = 5,
+) -> GroupingResult:
+    """
+    Jusqu'à `limit` groupes d'au plus `max_size` factures dont la somme des
+    restes à payer vaut `target_cents` à `tolerance_cents` près.
+
+    Les `max_candidates` premières candidates sont retenues : à l'appelant
+    de les fournir déjà filtrées (client, dates) et triées par pertinence.
+    Au-delà de `time_budget` secondes, les groupes déjà trouvés sont
+    retournés avec `timed_out=True`.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    ceiling = target_cents + tolerance_cents
+
+    items = [c for c in candidates if 0 < c.amount_cents <= ceiling]
+    items = sorted(items[:max_candidates], key=lambda c: c.amount_cents)
+    result = GroupingResult(candidates=len(items))
+
+    left, right = items[::2], items[1::2]
+    found = {}
+    try:
+        left_sums = _enumerate_sums(left, max_size, ceiling, deadline, max_subsets)
+        right_sums = _enumerate_sums(right, max_size, ceiling, deadline, max_subsets)
+        right_sums.sort(key=lambda entry: entry[0])
+        right_totals = [total for total, _ in right_sums]
+
+        for count, (left_total, left_subset) in enumerate(left_sums):
+            low = target_cents - tolerance_cents - left_total
+            high = ceiling - left_total
+            start = bisect.bisect_left(right_totals, low)
+            stop = bisect.bisect_right(right_totals, high)
+            for right_total, right_subset in right_sums[start:stop]:
+                size = len(left_subset) + len(right_subset)
+                if not 0 < size <= max_size:
+                    continue
+                key = (left_subset, right_subset)
+                found[key] = left_total + right_total
+            if len(found) >= limit * 20:
+                break
+            if count % 256 == 0 and time.perf_counter() > deadline:
+                raise _Timeout
+    except _Timeout:
+        result.timed_out = True
+
+    groups = []
+    for (left_subset, right_subset), total in found.items():
+        invoices = tuple(left[i] for i in left_subset) + tuple(
+            right[i] for i in right_subset
+        )
+        groups.append(
+            InvoiceGroup(
+                invoices=invoices,
+                total_cents=total,
+                difference_cents=total - target_cents,
+            )
+        )
+    # Les plus exacts d'abord, puis les plus petits groupes
+    groups.sort(key=lambda g: (abs(g.difference_cents), len(g.invoices)))
+    result.groups = groups[:limit]
+    result.elapsed = time.perf_counter() - started
+    return result
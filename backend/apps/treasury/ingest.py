@@ -0,0 +1,153 @@
+"""
+Insertion des transactions bancaires : catégorisation, détection
+d'anomalies et mise à jour des statistiques par libellé, par lot.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from apps.audit.events import record
+from apps.common.sharding import tenant_atomic
+
+from .anomalies import batch_moments, merge_moments, score_batch
+from .cashflow import group_codes
+from .categories import category_rules
+from .categorization import label_key
+from .forecast import forecast_inputs
+from .matching import to_cents
+from .models import BankTransaction, LabelStats
+
+
+@dataclass
+class IngestResult:
+    """Bilan d'un import de transactions."""
+
+    transactions: list = field(default_factory=list)
+    flagged: int = 0
+    elapsed: float = 0.0
+    scoring_elapsed: float = 0.0
+
+
+def _existing_debits(entreprise_id, transactions):
+    """Triplets (clé, centimes, date) des débits du lot déjà en base."""
+    debits = [tx for tx in transactions if tx.amount < 0]
+    if not debits:
+        return set()
+    rows = BankTransaction.objects.filter(
+        entreprise_id=entreprise_id,
+        amount__lt=0,
+        date__range=(min(tx.date for tx in debits), max(tx.date for tx in debits)),
+        label_key__in={tx.label_key for tx in debits},
+    ).values_list("label_key", "amount", "date")
+    return {(key, to_cents(amount), tx_date) for key, amount, tx_date in rows}
+
+
+def _save_stats(entreprise_id, keys, counts, means, m2):
+    LabelStats.objects.bulk_create(
+        [
+            LabelStats(
+                entreprise_id=entreprise_id,
+                label_key=key,
+                count=int(counts[code]),
+                mean=float(means[code]),
+                m2=float(m2[code]),
+            )
+            for code, key in enumerate(keys)
+        ],
+        update_conflicts=True,
+        unique_fields=["entreprise", "label_key"],
+        update_fields=["count", "mean", "m2", "updated_at"],
+    )
+
+
+def ingest_transactions(entreprise_id, transactions, batch_size=1000):
+    """
+    Insère un lot de `BankTransaction` non sauvegardées (date, libellé,
+    montant ; catégorie facultative) après catégorisation et scoring.
+    """
+    started = time.perf_counter()
+    result = IngestResult(transactions=transactions)
+    if not transactions:
+        return result
+
+    rules = category_rules.get(entreprise_id)
+    for tx in transactions:
+        tx.entreprise_id = entreprise_id
+        tx.label_key = label_key(tx.label)
+        if not tx.category:
+            tx.category = rules.categorize(tx.label)
+
+    # Tout ce qui relève du scoring (lectures comprises) est chronométré
+    scoring_started = time.perf_counter()
+    amounts = np.fromiter(
+        (to_cents(tx.amount) for tx in transactions),
+        dtype=np.float64,
+        count=len(transactions),
+    )
+    codes, keys = group_codes([tx.label_key for tx in transactions])
+    triples = [
+        (tx.label_key, int(cents), tx.date) for tx, cents in zip(transactions, amounts)
+    ]
+    existing = _existing_debits(entreprise_id, transactions)
+
+    with tenant_atomic(entreprise_id):
+        # Verrou sur les statistiques des libellés du lot le temps de la fusion
+        stored = {
+            stats.label_key: stats
+            for stats in LabelStats.objects.select_for_update().filter(
+                entreprise_id=entreprise_id, label_key__in=keys
+            )
+        }
+        prior = (
+            np.array([getattr(stored.get(key), "count", 0) for key in keys]),
+            np.array([getattr(stored.get(key), "mean", 0.0) for key in keys]),
+            np.array([getattr(stored.get(key), "m2", 0.0) for key in keys]),
+        )
+        duplicate_codes, distinct = group_codes(triples)
+        preexisting = np.fromiter(
+            (triple in existing for triple in distinct), dtype=bool, count=len(distinct)
+        )
+        flags, scores = score_batch(codes, amounts, prior, duplicate_codes, preexisting)
+        merged = merge_moments(*prior, *batch_moments(codes, amounts, len(keys)))
+        for tx, tx_flags, score in zip(transactions, flags.tolist(), scores.tolist()):
+            tx.anomaly_flags = tx_flags
+            tx.anomaly_score = round(score, 2)
+        result.flagged = int(np.count_nonzero(flags))
+        result.scoring_elapsed = time.perf_counter() - scoring_started
+
+        BankTransaction.objects.bulk_create(transactions, batch_size=batch_size)
+
+        stats_started = time.perf_counter()
+        _save_stats(entreprise_id, keys, *merged)
+        result.scoring_elapsed += time.perf_counter() - stats_started
+
+    # bulk_create n'émet pas de signaux
+    forecast_inputs.invalidate(entreprise_id)
+    record(
+        "bank_transaction.imported",
+        entity_type="banktransaction",
+        entreprise_id=entreprise_id,
+        metadata={"count": len(transactions), "flagged": result.flagged},
+    )
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def rebuild_label_stats(entreprise_id, batch_size=5000):
+    """Recalcule les statistiques par libellé depuis tout l'historique."""
+    rows = BankTransaction.objects.filter(entreprise_id=entreprise_id).values_list(
+        "label_key", "amount"
+    )
+    keys = {}
+    codes, amounts = [], []
+    for key, amount in rows.iterator(chunk_size=batch_size):
+        codes.append(keys.setdefault(key, len(keys)))
+        amounts.append(to_cents(amount))
+    moments = batch_moments(codes, amounts, len(keys))
+
+    with tenant_atomic(entreprise_id):
+        LabelStats.objects.filter(entreprise_id=entreprise_id).delete()
+        _save_stats(entreprise_id, list(keys), *moments)
+    return len(keys)
@@ -0,0 +1,108 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.common.managers import tenant_scope
+from apps.companies.models import Entreprise
+from apps.treasury.reconciliation import auto_reconcile, default_actor
+
+
+def _init_worker():
+    """Chaque processus ouvre ses propres connexions à la base."""
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def _reconcile_tenant(entreprise_id, options):
+    actor = default_actor(entreprise_id, options["actor"])
+    if actor is None:
+        return None
+    with tenant_scope(entreprise_id):
+        return auto_reconcile(
+            entreprise_id,
+            actor,
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+            early_days=options["early_days"],
+            late_days=options["late_days"],
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Rapproche automatiquement les transactions bancaires avec les factures "
+        "ouvertes (une entreprise par processus)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entreprise",
+            action="append",
+            default=[],
+            help="UUID d'entreprise (répétable). Par défaut : toutes les actives.",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--actor",
+            help="username de l'utilisateur auteur des rapprochements "
+            "(par défaut : le plus ancien utilisateur de l'entreprise).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--early-days", type=int, default=30)
+        parser.add_argument("--late-days", type=int, default=90)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        entreprises = Entreprise.objects.filter(is_active=True)
+        if options["entreprise"]:
+            entreprises = entreprises.filter(id__in=options["entreprise"])
+        entreprise_ids = list(entreprises.values_list("id", flat=True))
+
+        # Seules des options sérialisables sont transmises aux processus
+        tenant_options = {
+            key: options[key]
+            for key in ("actor", "dry_run", "batch_size", "early_days", "late_days")
+        }
+
+        started = time.perf_counter()
+        results = []
+        if options["workers"] > 1:
+            # Les connexions ne doivent pas être partagées entre processus
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=_init_worker
+            ) as pool:
+                futures = [
+                    pool.submit(_reconcile_tenant, eid, tenant_options)
+                    for eid in entreprise_ids
+                ]
+                for future in as_completed(futures):
+                    results.append(future.result())
+        else:
+            results = [_reconcile_tenant(eid, tenant_options) for eid in entreprise_ids]
+
+        elapsed = time.perf_counter() - started
+        total_matches = 0
+        total_scanned = 0
+        for result in filter(None, results):
+            total_matches += result.matches
+            total_scanned += result.transactions_scanned
+            self.stdout.write(
+                f"{result.entreprise_id}: {result.matches} rapprochement(s) / "
+                f"{result.transactions_scanned} transaction(s), "
+                f"{result.open_invoices} facture(s) ouverte(s), "
+                f"{result.matches_per_second:.0f} rapprochements/s"
+            )
+
+        rate = total_matches / elapsed if elapsed else 0.0
+        suffix = " (dry-run)" if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_matches} rapprochement(s) sur {total_scanned} transaction(s) "
+                f"en {elapsed:.2f}s ({rate:.0f} rapprochements/s){suffix}"
+            )
+        )
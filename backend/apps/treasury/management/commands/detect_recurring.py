@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.managers import tenant_scope
+from apps.companies.models import Entreprise
+from apps.treasury.recurring import LOOKBACK_DAYS, detect_recurring_series
+
+
+class Command(BaseCommand):
+    help = (
+        "Détecte les flux récurrents (hebdomadaires, mensuels, trimestriels) "
+        "dans l'historique bancaire. Incrémental après le premier passage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entreprise",
+            action="append",
+            default=[],
+            help="UUID d'entreprise (répétable). Par défaut : toutes les actives.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ré-analyse tout l'historique au lieu des seules nouvelles transactions.",
+        )
+        parser.add_argument("--lookback-days", type=int, default=LOOKBACK_DAYS)
+
+    def handle(self, *args, **options):
+        entreprises = Entreprise.objects.filter(is_active=True)
+        if options["entreprise"]:
+            entreprises = entreprises.filter(id__in=options["entreprise"])
+
+        total_series = 0
+        for entreprise_id in entreprises.values_list("id", flat=True):
+            with tenant_scope(entreprise_id):
+                result = detect_recurring_series(
+                    entreprise_id,
+                    full=options["full"],
+                    lookback_days=options["lookback_days"],
+                )
+            total_series += result.series
+            mode = (
+                f"incrémental, {result.new_transactions} nouvelle(s) transaction(s)"
+                if result.incremental
+                else "complet"
+            )
+            self.stdout.write(
+                f"{entreprise_id}: {result.series} série(s) sur {result.groups} "
+                f"groupe(s), {result.removed} retirée(s) ({mode}, "
+                f"{result.elapsed * 1000:.0f} ms)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{total_series} série(s) récurrente(s) mise(s) à jour")
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.common.managers import tenant_scope
+from apps.companies.models import Entreprise
+from apps.treasury.ingest import rebuild_label_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les statistiques de montant par libellé (détection "
+        "d'anomalies) depuis tout l'historique bancaire."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entreprise",
+            action="append",
+            default=[],
+            help="UUID d'entreprise (répétable). Par défaut : toutes les actives.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        entreprises = Entreprise.objects.filter(is_active=True)
+        if options["entreprise"]:
+            entreprises = entreprises.filter(id__in=options["entreprise"])
+
+        total = 0
+        for entreprise_id in entreprises.values_list("id", flat=True):
+            with tenant_scope(entreprise_id):
+                labels = rebuild_label_stats(entreprise_id, options["batch_size"])
+            total += labels
+            self.stdout.write(f"{entreprise_id}: {labels} libellé(s)")
+        self.stdout.write(self.style.SUCCESS(f"{total} libellé(s) recalculé(s)"))
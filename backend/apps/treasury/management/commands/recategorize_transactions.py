@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.managers import tenant_scope
+from apps.companies.models import Entreprise
+from apps.treasury.categories import recategorize_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Ré-applique les règles de catégorisation aux transactions bancaires "
+        "existantes (après ajout ou modification de règles)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entreprise",
+            action="append",
+            default=[],
+            help="UUID d'entreprise (répétable). Par défaut : toutes les actives.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--only-uncategorized",
+            action="store_true",
+            help="Ne traite que les transactions sans catégorie.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        entreprises = Entreprise.objects.filter(is_active=True)
+        if options["entreprise"]:
+            entreprises = entreprises.filter(id__in=options["entreprise"])
+
+        started = time.perf_counter()
+        total_scanned = 0
+        total_updated = 0
+        for entreprise_id in entreprises.values_list("id", flat=True):
+            with tenant_scope(entreprise_id):
+                result = recategorize_transactions(
+                    entreprise_id,
+                    batch_size=options["batch_size"],
+                    only_uncategorized=options["only_uncategorized"],
+                    dry_run=options["dry_run"],
+                )
+            total_scanned += result.scanned
+            total_updated += result.updated
+            self.stdout.write(
+                f"{entreprise_id}: {result.updated} modifiée(s) / "
+                f"{result.scanned} transaction(s), {result.rules} règle(s), "
+                f"{result.labels_per_minute:.0f} libellés/min"
+            )
+
+        elapsed = time.perf_counter() - started
+        rate = total_scanned * 60 / elapsed if elapsed else 0.0
+        suffix = " (dry-run)" if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_updated} transaction(s) re-catégorisée(s) sur "
+                f"{total_scanned} en {elapsed:.2f}s ({rate:.0f} libellés/min){suffix}"
+            )
+        )
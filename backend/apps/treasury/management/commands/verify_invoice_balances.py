@@ -0,0 +1,135 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.common.sharding import tenant_databases
+from apps.invoices.models import Invoice
+from apps.treasury.forecast import forecast_inputs
+from apps.treasury.models import Reconciliation
+from apps.treasury.reconciliation import open_invoice_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie que amount_paid / amount_due / statut des factures "
+        "correspondent à la somme de leurs rapprochements (--fix pour corriger)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--entreprise",
+            action="append",
+            default=[],
+            help="UUID d'entreprise (répétable). Par défaut : toutes.",
+        )
+        parser.add_argument("--fix", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        paid = (
+            Reconciliation.objects.filter(invoice=OuterRef("pk"))
+            .values("invoice")
+            .annotate(total=Sum("matched_amount"))
+            .values("total")
+        )
+        drifted = []
+        checked = 0
+        # Chaque shard porte les factures et rapprochements de ses entreprises
+        for using in tenant_databases():
+            invoices = Invoice.objects.using(using).annotate(
+                expected_paid=Coalesce(
+                    Subquery(paid),
+                    Value(0),
+                    output_field=DecimalField(max_digits=12, decimal_places=2),
+                )
+            )
+            if options["entreprise"]:
+                invoices = invoices.filter(entreprise_id__in=options["entreprise"])
+
+            found = []
+            for invoice in invoices.order_by("id").iterator(
+                chunk_size=options["batch_size"]
+            ):
+                checked += 1
+                stored = self._recompute(invoice, invoice.expected_paid)
+                if stored:
+                    found.append(invoice)
+                    if not options["fix"]:
+                        self._report(invoice, stored)
+
+            if found and options["fix"]:
+                found = self._fix(
+                    using, [invoice.pk for invoice in found], options["batch_size"]
+                )
+            drifted += found
+
+        if options["fix"]:
+            for entreprise_id in {invoice.entreprise_id for invoice in drifted}:
+                open_invoice_index.invalidate(entreprise_id)
+                forecast_inputs.invalidate(entreprise_id)
+
+        style = self.style.WARNING if drifted else self.style.SUCCESS
+        action = "corrigée(s)" if options["fix"] else "en écart"
+        self.stdout.write(
+            style(f"{len(drifted)} facture(s) {action} sur {checked} vérifiée(s)")
+        )
+
+    def _recompute(self, invoice, expected_paid):
+        """Impute `expected_paid` ; renvoie l'état précédent s'il diffère."""
+        stored = (invoice.amount_paid, invoice.amount_due, invoice.status)
+        invoice.amount_paid = expected_paid
+        invoice.refresh_payment_state()
+        if stored == (invoice.amount_paid, invoice.amount_due, invoice.status):
+            return None
+        return stored
+
+    def _report(self, invoice, stored):
+        self.stdout.write(
+            f"{invoice.entreprise_id} {invoice.number}: "
+            f"payé {stored[0]} -> {invoice.amount_paid}, "
+            f"reste {stored[1]} -> {invoice.amount_due}, "
+            f"statut {stored[2]} -> {invoice.status}"
+        )
+
+    def _fix(self, using, invoice_ids, batch_size):
+        """
+        Recalcule et corrige les factures `invoice_ids` par lots, sous le
+        verrou que prend `apply_payments` : un paiement imputé depuis la
+        lecture n'est pas écrasé par un total périmé.
+        """
+        fixed = []
+        for start in range(0, len(invoice_ids), batch_size):
+            chunk = invoice_ids[start : start + batch_size]
+            with transaction.atomic(using=using):
+                locked = list(
+                    Invoice.objects.using(using)
+                    .select_for_update()
+                    .filter(id__in=chunk)
+                    .order_by("id")
+                )
+                # Relus après le verrou : une nouvelle requête voit les
+                # rapprochements validés pendant l'attente
+                totals = dict(
+                    Reconciliation.objects.using(using)
+                    .filter(invoice_id__in=chunk)
+                    .values("invoice")
+                    .annotate(total=Sum("matched_amount"))
+                    .values_list("invoice", "total")
+                )
+                changed = []
+                for invoice in locked:
+                    paid = totals.get(invoice.pk, Decimal(0))
+                    stored = self._recompute(invoice, paid)
+                    if stored:
+                        changed.append(invoice)
+                        self._report(invoice, stored)
+                Invoice.objects.using(using).bulk_update(
+                    changed,
+                    ["amount_paid", "amount_due", "status"],
+                    batch_size=batch_size,
+                )
+            fixed += changed
+        return fixed
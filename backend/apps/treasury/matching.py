@@ -0,0 +1,338 @@
+"""
+Index des factures ouvertes pour le rapprochement bancaire.
+
+Module sans dépendance à l'ORM : les factures sont chargées une seule fois
+sous forme de `InvoiceCandidate`, indexées par montant en centimes et par
+référence de facture, puis chaque transaction est confrontée à l'index en
+temps quasi constant au lieu d'un parcours factures x transactions.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+# Références de facture citées dans un libellé ("FAC-00012", "FAC 12", "00012")
+_REFERENCE_RE = re.compile(r"[A-Z]{2,}[\s\-_/.]*\d+|\d{4,}")
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+_WORD_RE = re.compile(r"[A-Z0-9]{3,}")
+
+# Mots sans valeur discriminante dans un nom de client ou un libellé bancaire
+_NAME_STOPWORDS = frozenset(
+    {"SAS", "SARL", "EURL", "SASU", "SNC", "SCI", "LES", "DES", "VIR", "SEPA", "PRLV"}
+)
+
+# Pondération du score de suggestion (somme = 1)
+SCORE_WEIGHTS = {"amount": 0.45, "reference": 0.25, "name": 0.2, "date": 0.1}
+
+
+def to_cents(amount) -> int:
+    """Convertit un montant décimal en centimes entiers."""
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convertit des centimes entiers en montant décimal à 2 décimales."""
+    return Decimal(cents).scaleb(-2)
+
+
+def reference_keys(text: str) -> set[str]:
+    """
+    Clés de référence normalisées présentes dans un texte.
+    "VIR FAC-00012 ACME" -> {"FAC00012", "12"}
+    """
+    keys = set()
+    for token in _REFERENCE_RE.findall(text.upper()):
+        normalized = _NON_ALNUM_RE.sub("", token)
+        keys.add(normalized)
+        digits = normalized.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ").lstrip("0")
+        if digits:
+            keys.add(digits)
+    return keys
+
+
+def name_tokens(text: str) -> set[str]:
+    """Mots significatifs d'un nom de client ou d'un libellé."""
+    return {
+        word
+        for word in _WORD_RE.findall(text.upper())
+        if word not in _NAME_STOPWORDS and not word.isdigit()
+    }
+
+
+@dataclass(slots=True)
+class InvoiceCandidate:
+    """Facture ouverte telle que vue par le moteur de rapprochement."""
+
+    id: object
+    number: str
+    amount_cents: int  # Reste à payer
+    issue_date: date
+    due_date: date | None = None
+    customer_id: object = None
+    customer_name: str = ""
+
+    @property
+    def reference_date(self) -> date:
+        return self.due_date or self.issue_date
+
+
+@dataclass
+class InvoiceIndex:
+    """
+    Index en mémoire des factures ouvertes d'une entreprise.
+
+    - `by_amount` : montant restant en centimes -> factures
+    - `by_reference` : clé de référence (numéro normalisé) -> factures
+    - `by_name` : mot du nom client -> factures
+    - `by_customer` : client -> factures (et mots de son nom)
+    - `amounts` : montants distincts triés, pour les recherches par intervalle
+    Les factures rapprochées sont retirées via `consume()`.
+    """
+
+    early_days: int = 30  # Paiement accepté jusqu'à N jours avant l'échéance
+    late_days: int = 90  # ... et jusqu'à N jours après
+    by_amount: dict[int, list[InvoiceCandidate]] = field(default_factory=dict)
+    by_reference: dict[str, list[InvoiceCandidate]] = field(default_factory=dict)
+    by_name: dict[str, list[InvoiceCandidate]] = field(default_factory=dict)
+    by_customer: dict[object, list[InvoiceCandidate]] = field(default_factory=dict)
+    customer_words: dict[object, set[str]] = field(default_factory=dict)
+    customers_by_word: dict[str, set] = field(default_factory=dict)
+    amounts: list[int] = field(default_factory=list)
+    consumed: set = field(default_factory=set)
+
+    @classmethod
+    def build(cls, candidates, **options) -> "InvoiceIndex":
+        index = cls(**options)
+        for candidate in candidates:
+            index.add(candidate, keep_sorted=False)
+        index.amounts = sorted(index.by_amount)
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.by_amount.values()) - len(self.consumed)
+
+    def add(self, candidate: InvoiceCandidate, keep_sorted: bool = True) -> None:
+        if keep_sorted and candidate.amount_cents not in self.by_amount:
+            bisect.insort(self.amounts, candidate.amount_cents)
+        self.by_amount.setdefault(candidate.amount_cents, []).append(candidate)
+        for key in reference_keys(candidate.number):
+            self.by_reference.setdefault(key, []).append(candidate)
+        words = name_tokens(candidate.customer_name)
+        for word in words:
+            self.by_name.setdefault(word, []).append(candidate)
+            self.customers_by_word.setdefault(word, set()).add(candidate.customer_id)
+        self.by_customer.setdefault(candidate.customer_id, []).append(candidate)
+        self.customer_words[candidate.customer_id] = words
+
+    def consume(self, candidate: InvoiceCandidate) -> None:
+        self.consumed.add(candidate.id)
+
+    def in_window(self, candidate: InvoiceCandidate, tx_date: date) -> bool:
+        """La date de la transaction est-elle plausible pour cette facture ?"""
+        if candidate.issue_date > tx_date:
+            return False
+        reference = candidate.reference_date
+        return (
+            reference - timedelta(days=self.early_days)
+            <= tx_date
+            <= reference + timedelta(days=self.late_days)
+        )
+
+    def referenced(self, label: str) -> list[InvoiceCandidate]:
+        """Factures ouvertes dont la référence est citée dans le libellé."""
+        seen = {}
+        for key in reference_keys(label):
+            for candidate in self.by_reference.get(key, ()):
+                if candidate.id not in self.consumed:
+                    seen[candidate.id] = candidate
+        return list(seen.values())
+
+    def with_amount(self, amount_cents: int) -> list[InvoiceCandidate]:
+        return [
+            c for c in self.by_amount.get(amount_cents, ()) if c.id not in self.consumed
+        ]
+
+    def nearest_amounts(self, amount_cents: int, margin: int, limit: int):
+        """
+        Au plus `limit` factures ouvertes dont le reste à payer est le plus
+        proche de `amount_cents`, sans s'en écarter de plus de `margin`.
+        """
+        amounts = self.amounts
+        right = bisect.bisect_left(amounts, amount_cents)
+        left = right - 1
+        found = 0
+        while found < limit:
+            left_gap = amount_cents - amounts[left] if left >= 0 else None
+            right_gap = amounts[right] - amount_cents if right < len(amounts) else None
+            if right_gap is not None and (left_gap is None or right_gap <= left_gap):
+                gap, amount = right_gap, amounts[right]
+                right += 1
+            elif left_gap is not None:
+                gap, amount = left_gap, amounts[left]
+                left -= 1
+            else:
+                return
+            if gap > margin:
+                return
+            for candidate in self.by_amount[amount]:
+                if candidate.id not in self.consumed:
+                    found += 1
+                    yield candidate
+
+    def named(self, words: set[str], limit: int):
+        """Factures ouvertes dont le nom client partage un mot avec `words`."""
+        found = 0
+        for word in words:
+            for candidate in self.by_name.get(word, ()):
+                if found >= limit:
+                    return
+                if candidate.id not in self.consumed:
+                    found += 1
+                    yield candidate
+
+    def for_customer(self, customer_id, tx_date: date) -> list[InvoiceCandidate]:
+        """
+        Factures ouvertes d'un client plausibles à la date de la transaction,
+        de la plus proche à la plus éloignée de leur échéance.
+        """
+        candidates = [
+            c
+            for c in self.by_customer.get(customer_id, ())
+            if c.id not in self.consumed and self.in_window(c, tx_date)
+        ]
+        candidates.sort(key=lambda c: abs((tx_date - c.reference_date).days))
+        return candidates
+
+    def customer_in_label(self, label: str):
+        """Client désigné sans ambiguïté par le libellé, sinon None."""
+        customers = {c.customer_id for c in self.referenced(label)}
+        if not customers:
+            words = name_tokens(label)
+            scores = {}
+            for word in words:
+                for customer_id in self.customers_by_word.get(word, ()):
+                    customer_words = self.customer_words[customer_id]
+                    scores[customer_id] = len(customer_words & words) / len(
+                        customer_words
+                    )
+            if scores:
+                best = max(scores.values())
+                customers = {cid for cid, score in scores.items() if score == best}
+        return customers.pop() if len(customers) == 1 else None
+
+    def suggest(
+        self,
+        amount_cents: int,
+        tx_date: date,
+        label: str,
+        k: int = 5,
+        amount_tolerance: float = 0.2,
+        max_candidates: int = 200,
+    ) -> list["Suggestion"]:
+        """
+        Les `k` factures les plus probables pour une transaction.
+
+        Les candidates sont restreintes par l'index (montants les plus
+        proches à ±`amount_tolerance`, référence citée, nom client présent
+        dans le libellé, chacun borné à `max_candidates`) puis notées ;
+        seul un tas de taille `k` est conservé.
+        """
+        amount_cents = abs(amount_cents)
+        words = name_tokens(label)
+        referenced = self.referenced(label)
+        referenced_ids = {c.id for c in referenced}
+        margin = int(amount_cents * amount_tolerance)
+
+        candidates = {}
+        for source in (
+            self.nearest_amounts(amount_cents, margin, max_candidates),
+            self.named(words, max_candidates),
+            referenced,
+        ):
+            for candidate in source:
+                candidates[candidate.id] = candidate
+
+        scored = (
+            score_candidate(c, amount_cents, tx_date, words, c.id in referenced_ids)
+            for c in candidates.values()
+        )
+        return heapq.nlargest(k, scored, key=lambda s: s.score)
+
+    def match(
+        self, amount_cents: int, tx_date: date, label: str
+    ) -> InvoiceCandidate | None:
+        """
+        Retourne la facture correspondant sans ambiguïté à la transaction.
+
+        1. Une facture citée dans le libellé et de même montant.
+        2. Sinon, l'unique facture de même montant dans la fenêtre d'échéance.
+        Toute ambiguïté (plusieurs candidates) laisse la transaction au
+        rapprochement manuel.
+        """
+        if amount_cents <= 0:
+            return None
+
+        referenced = [
+            c for c in self.referenced(label) if c.amount_cents == amount_cents
+        ]
+        if len(referenced) == 1:
+            return referenced[0]
+        if referenced:
+            return None
+
+        in_window = [
+            c for c in self.with_amount(amount_cents) if self.in_window(c, tx_date)
+        ]
+        if len(in_window) == 1:
+            return in_window[0]
+        return None
+
+
+@dataclass(slots=True)
+class Suggestion:
+    """Facture proposée pour une transaction, avec le détail du score."""
+
+    candidate: InvoiceCandidate
+    score: float
+    details: dict
+
+
+def score_candidate(
+    candidate: InvoiceCandidate,
+    amount_cents: int,
+    tx_date: date,
+    label_words: set[str],
+    is_referenced: bool,
+) -> Suggestion:
+    """
+    Note une facture entre 0 et 1 selon :
+    - la proximité du montant,
+    - la citation de son numéro dans le libellé,
+    - la présence du nom client dans le libellé,
+    - l'écart entre la date de transaction et l'échéance.
+    """
+    gap = abs(candidate.amount_cents - amount_cents)
+    amount = max(0.0, 1.0 - gap / max(amount_cents, candidate.amount_cents, 1))
+
+    customer_words = name_tokens(candidate.customer_name)
+    name = (
+        len(customer_words & label_words) / len(customer_words)
+        if customer_words
+        else 0.0
+    )
+
+    days = abs((tx_date - candidate.reference_date).days)
+    recency = math.exp(-days / 30)
+
+    details = {
+        "amount": round(amount, 3),
+        "reference": 1.0 if is_referenced else 0.0,
+        "name": round(name, 3),
+        "date": round(recency, 3),
+    }
+    score = sum(SCORE_WEIGHTS[key] * value for key, value in details.items())
+    return Suggestion(candidate=candidate, score=round(score, 4), details=details)
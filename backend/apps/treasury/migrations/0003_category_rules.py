@@ -0,0 +1,80 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:05
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0001_initial"),
+        ("treasury", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryRule",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("category", models.CharField(max_length=64)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("KEYWORD", "Mot-clé"),
+                            ("REGEX", "Expression régulière"),
+                        ],
+                        default="KEYWORD",
+                        max_length=10,
+                    ),
+                ),
+                ("pattern", models.CharField(max_length=255)),
+                ("priority", models.PositiveIntegerField(default=100)),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "entreprise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="category_rules",
+                        to="companies.entreprise",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Category Rule",
+                "verbose_name_plural": "Category Rules",
+                "db_table": "treasury_categoryrule",
+                "ordering": ["priority", "created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["entreprise", "is_active"],
+                        name="treasury_ca_entrepr_b7aedd_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="banktransaction",
+            name="category",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="banktransaction",
+            index=models.Index(
+                fields=["entreprise", "category"],
+                name="banktx_entreprise_category_idx",
+            ),
+        ),
+    ]
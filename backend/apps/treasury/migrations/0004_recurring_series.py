@@ -0,0 +1,129 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:20
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.treasury.categorization import label_key
+
+
+def backfill_label_keys(apps, schema_editor):
+    BankTransaction = apps.get_model("treasury", "BankTransaction")
+
+    batch = []
+    for tx in BankTransaction.objects.only("id", "label").iterator(chunk_size=5000):
+        tx.label_key = label_key(tx.label)
+        batch.append(tx)
+        if len(batch) >= 5000:
+            BankTransaction.objects.bulk_update(batch, ["label_key"])
+            batch = []
+    BankTransaction.objects.bulk_update(batch, ["label_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0001_initial"),
+        ("treasury", "0003_category_rules"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="banktransaction",
+            name="label_key",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.RunPython(backfill_label_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="banktransaction",
+            index=models.Index(
+                fields=["entreprise", "label_key"],
+                name="banktx_entreprise_labelkey_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="banktransaction",
+            index=models.Index(
+                fields=["entreprise", "created_at"],
+                name="banktx_entreprise_created_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="RecurringSeries",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("label_key", models.CharField(max_length=255)),
+                ("amount_band", models.IntegerField()),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("WEEKLY", "Hebdomadaire"),
+                            ("MONTHLY", "Mensuel"),
+                            ("QUARTERLY", "Trimestriel"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("period_days", models.FloatField()),
+                ("occurrences", models.PositiveIntegerField()),
+                ("first_date", models.DateField()),
+                ("last_date", models.DateField()),
+                ("next_expected_date", models.DateField()),
+                (
+                    "expected_amount",
+                    models.DecimalField(decimal_places=2, max_digits=12),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "entreprise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_series",
+                        to="companies.entreprise",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Recurring Series",
+                "verbose_name_plural": "Recurring Series",
+                "db_table": "treasury_recurringseries",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entreprise", "label_key", "amount_band"),
+                        name="uniq_recurring_series_per_tenant",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="RecurringScanState",
+            fields=[
+                (
+                    "entreprise",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recurring_scan_state",
+                        serialize=False,
+                        to="companies.entreprise",
+                    ),
+                ),
+                ("scanned_until", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Recurring Scan State",
+                "verbose_name_plural": "Recurring Scan States",
+                "db_table": "treasury_recurringscanstate",
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0001_initial"),
+        ("treasury", "0004_recurring_series"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="banktransaction",
+            name="anomaly_flags",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="banktransaction",
+            name="anomaly_score",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="banktransaction",
+            index=models.Index(
+                condition=models.Q(("anomaly_flags__gt", 0)),
+                fields=["entreprise", "date"],
+                name="banktx_flagged_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="LabelStats",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("label_key", models.CharField(max_length=255)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("mean", models.FloatField(default=0)),
+                ("m2", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "entreprise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="label_stats",
+                        to="companies.entreprise",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Label Stats",
+                "verbose_name_plural": "Label Stats",
+                "db_table": "treasury_labelstats",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("entreprise", "label_key"),
+                        name="uniq_label_stats_per_tenant",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.common.partitioning import partition_table, unpartition_table
+
+TABLE = "treasury_banktransaction"
+
+
+def partition(apps, schema_editor):
+    partition_table(schema_editor, TABLE)
+
+
+def unpartition(apps, schema_editor):
+    unpartition_table(schema_editor, TABLE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("treasury", "0006_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        # Une clé étrangère ne peut viser une table partitionnée que via une
+        # contrainte d'unicité incluant la clé de partition
+        migrations.AlterField(
+            model_name="reconciliation",
+            name="bank_transaction",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="reconciliations",
+                to="treasury.banktransaction",
+            ),
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
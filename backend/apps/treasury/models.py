@@ -1,13 +1,19 @@
-import uuid
-
 from django.db import models
 from django.utils import timezone
 
+from apps.common.ids import uuid7
+from apps.common.managers import TenantManager
+
+from .categorization import label_key
+
 
 class BankTransaction(models.Model):
-    """Transaction bancaire."""
+    """
+    Transaction bancaire. Table partitionnée par mois de `date` sous
+    PostgreSQL (apps.common.partitioning).
+    """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     entreprise = models.ForeignKey(
         "companies.Entreprise",
@@ -17,22 +23,187 @@ class BankTransaction(models.Model):
     date = models.DateField(default=timezone.now)
     label = models.CharField(max_length=255)
     amount = models.DecimalField(max_digits=12, decimal_places=2)  # + crédit / - débit
+    category = models.CharField(max_length=64, blank=True, default="")
+    # Libellé normalisé sans chiffres, clé de regroupement des flux récurrents
+    label_key = models.CharField(max_length=255, blank=True, default="")
+    # Masque de bits, voir anomalies.FLAG_NAMES
+    anomaly_flags = models.PositiveSmallIntegerField(default=0)
+    anomaly_score = models.FloatField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "treasury_banktransaction"
         verbose_name = "Bank Transaction"
         verbose_name_plural = "Bank Transactions"
-        indexes = [models.Index(fields=["entreprise", "date"])]
+        indexes = [
+            models.Index(fields=["entreprise", "date"]),
+            models.Index(
+                fields=["entreprise", "category"], name="banktx_entreprise_category_idx"
+            ),
+            models.Index(
+                fields=["entreprise", "label_key"],
+                name="banktx_entreprise_labelkey_idx",
+            ),
+            models.Index(
+                fields=["entreprise", "created_at"],
+                name="banktx_entreprise_created_idx",
+            ),
+            models.Index(
+                fields=["entreprise", "date"],
+                condition=models.Q(anomaly_flags__gt=0),
+                name="banktx_flagged_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.label} ({self.amount})"
 
+    def save(self, *args, **kwargs):
+        self.label_key = label_key(self.label)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "label" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "label_key"}
+        super().save(*args, **kwargs)
+
+
+class LabelStats(models.Model):
+    """
+    Statistiques glissantes des montants d'une clé de libellé (nombre,
+    moyenne, M2 de Welford), en centimes.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    entreprise = models.ForeignKey(
+        "companies.Entreprise", on_delete=models.CASCADE, related_name="label_stats"
+    )
+    label_key = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = "treasury_labelstats"
+        verbose_name = "Label Stats"
+        verbose_name_plural = "Label Stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entreprise", "label_key"], name="uniq_label_stats_per_tenant"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.label_key} (n={self.count})"
+
+
+class RecurringSeries(models.Model):
+    """Flux récurrent détecté (même clé de libellé, même tranche de montant)."""
+
+    class Kind(models.TextChoices):
+        WEEKLY = "WEEKLY", "Hebdomadaire"
+        MONTHLY = "MONTHLY", "Mensuel"
+        QUARTERLY = "QUARTERLY", "Trimestriel"
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    entreprise = models.ForeignKey(
+        "companies.Entreprise",
+        on_delete=models.CASCADE,
+        related_name="recurring_series",
+    )
+    label_key = models.CharField(max_length=255)
+    amount_band = models.IntegerField()  # Voir recurrence.amount_bands
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    period_days = models.FloatField()
+    occurrences = models.PositiveIntegerField()
+    first_date = models.DateField()
+    last_date = models.DateField()
+    next_expected_date = models.DateField()
+    expected_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = "treasury_recurringseries"
+        verbose_name = "Recurring Series"
+        verbose_name_plural = "Recurring Series"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entreprise", "label_key", "amount_band"],
+                name="uniq_recurring_series_per_tenant",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.label_key} ({self.kind}, {self.expected_amount})"
+
+
+class RecurringScanState(models.Model):
+    """Point de reprise de la détection incrémentale des flux récurrents."""
+
+    entreprise = models.OneToOneField(
+        "companies.Entreprise",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="recurring_scan_state",
+    )
+    # Transactions créées depuis cette date non encore examinées
+    scanned_until = models.DateTimeField(null=True, blank=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = "treasury_recurringscanstate"
+        verbose_name = "Recurring Scan State"
+        verbose_name_plural = "Recurring Scan States"
+
+    def __str__(self):
+        return f"{self.entreprise_id} @ {self.scanned_until}"
+
+
+class CategoryRule(models.Model):
+    """Règle de catégorisation automatique des transactions bancaires."""
+
+    class Kind(models.TextChoices):
+        KEYWORD = "KEYWORD", "Mot-clé"
+        REGEX = "REGEX", "Expression régulière"
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+
+    entreprise = models.ForeignKey(
+        "companies.Entreprise", on_delete=models.CASCADE, related_name="category_rules"
+    )
+    category = models.CharField(max_length=64)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.KEYWORD)
+    pattern = models.CharField(max_length=255)
+    priority = models.PositiveIntegerField(default=100)  # Plus petit = prioritaire
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = "treasury_categoryrule"
+        verbose_name = "Category Rule"
+        verbose_name_plural = "Category Rules"
+        ordering = ["priority", "created_at"]
+        indexes = [models.Index(fields=["entreprise", "is_active"])]
+
+    def __str__(self):
+        return f"{self.pattern} -> {self.category}"
+
 
 class Reconciliation(models.Model):
     """Rapprochement entre facture et transaction bancaire."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     entreprise = models.ForeignKey(
         "companies.Entreprise", on_delete=models.CASCADE, related_name="reconciliations"
@@ -41,8 +212,13 @@ class Reconciliation(models.Model):
     invoice = models.ForeignKey(
         "invoices.Invoice", on_delete=models.PROTECT, related_name="reconciliations"
     )
+    # Sans contrainte en base : la table des transactions est partitionnée
+    # (apps.common.partitioning), PROTECT reste appliqué par Django
     bank_transaction = models.ForeignKey(
-        BankTransaction, on_delete=models.PROTECT, related_name="reconciliations"
+        BankTransaction,
+        on_delete=models.PROTECT,
+        related_name="reconciliations",
+        db_constraint=False,
     )
 
     matched_amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -52,6 +228,8 @@ class Reconciliation(models.Model):
         "users.User", on_delete=models.PROTECT, related_name="reconciliations"
     )
 
+    objects = TenantManager()
+
     class Meta:
         db_table = "treasury_reconciliation"
         verbose_name = "Reconciliation"
@@ -0,0 +1,296 @@
+"""
+Rapprochement automatique factures <-> transactions bancaires.
+
+Les factures ouvertes d'une entreprise sont chargées une fois dans un
+`InvoiceIndex`, puis les transactions non rapprochées sont parcourues une
+seule fois. Seules les correspondances sans ambiguïté sont enregistrées,
+après une nouvelle vérification sous verrou (`discard_stale_matches`).
+"""
+
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.utils import timezone
+
+from apps.audit.events import record
+from apps.audit.signals import record_invoice_change
+from apps.common.cache import TenantCache
+from apps.common.sharding import tenant_atomic
+from apps.invoices.models import Invoice
+from apps.users.models import User
+
+from .forecast import forecast_inputs
+from .grouping import find_invoice_groups
+from .matching import InvoiceCandidate, InvoiceIndex, to_cents
+from .models import BankTransaction, Reconciliation
+
+
+@dataclass
+class AutoReconcileResult:
+    """Bilan d'un passage de rapprochement automatique pour une entreprise."""
+
+    entreprise_id: object
+    open_invoices: int = 0
+    transactions_scanned: int = 0
+    matches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def matches_per_second(self) -> float:
+        return self.matches / self.elapsed if self.elapsed else 0.0
+
+
+def open_invoices(entreprise_id):
+    """Factures émises ayant encore un reste à payer (index partiel)."""
+    return Invoice.objects.filter(
+        entreprise_id=entreprise_id, status=Invoice.Status.ISSUED, amount_due__gt=0
+    )
+
+
+def load_invoice_candidates(entreprise_id):
+    """Charge les factures ouvertes sous forme de `InvoiceCandidate`."""
+    rows = open_invoices(entreprise_id).values_list(
+        "id",
+        "number",
+        "amount_due",
+        "issue_date",
+        "due_date",
+        "customer_id",
+        "customer__name",
+    )
+    for pk, number, amount_due, issue_date, due_date, customer_id, name in rows:
+        yield InvoiceCandidate(
+            id=pk,
+            number=number,
+            amount_cents=to_cents(amount_due),
+            issue_date=issue_date,
+            due_date=due_date,
+            customer_id=customer_id,
+            customer_name=name,
+        )
+
+
+def build_invoice_index(entreprise_id):
+    return InvoiceIndex.build(load_invoice_candidates(entreprise_id))
+
+
+# Index chaud des factures ouvertes, invalidé par `signals.py`
+open_invoice_index = TenantCache("treasury:open-invoices", build_invoice_index)
+
+
+def apply_payments(payments, batch_size=1000):
+    """
+    Ajoute `{invoice_id: montant}` au payé des factures et recalcule reste à
+    payer et statut. Doit être appelé dans la transaction qui écrit les
+    rapprochements : les factures sont verrouillées jusqu'au commit.
+    """
+    now = timezone.now()
+    invoice_ids = sorted(payments)
+    updated = []
+    for start in range(0, len(invoice_ids), batch_size):
+        chunk = invoice_ids[start : start + batch_size]
+        # Verrouillage dans un ordre stable pour éviter les interblocages
+        for invoice in (
+            Invoice.objects.select_for_update().filter(id__in=chunk).order_by("id")
+        ):
+            invoice.amount_paid += Decimal(str(payments[invoice.id]))
+            invoice.refresh_payment_state()
+            invoice.updated_at = now
+            updated.append(invoice)
+    Invoice.objects.bulk_update(
+        updated,
+        ["amount_paid", "amount_due", "status", "updated_at"],
+        batch_size=batch_size,
+    )
+    # `bulk_update` n'émet pas `post_save` : transitions (PAID...) tracées ici
+    for invoice in updated:
+        if invoice.status != invoice._loaded_status:
+            record_invoice_change(invoice)
+    return updated
+
+
+def lock_transactions(tx_ids, batch_size=1000):
+    """
+    Verrouille les transactions `tx_ids` jusqu'au commit. Tout rapprochement
+    les prend avant les factures : le lien n'ayant pas de contrainte en base
+    (table partitionnée), l'insertion seule ne verrouille pas la transaction.
+    """
+    tx_ids = sorted(tx_ids)
+    for start in range(0, len(tx_ids), batch_size):
+        list(
+            BankTransaction.objects.select_for_update()
+            .filter(id__in=tx_ids[start : start + batch_size])
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+
+def create_reconciliation(**fields):
+    """
+    Crée un rapprochement et impute le montant sur la facture. Lève
+    `ValueError` si la facture, relue sous verrou, n'est pas émise ou si le
+    montant dépasse son reste à payer.
+    """
+    reco = Reconciliation(**fields)
+    with tenant_atomic(fields.get("entreprise_id")):
+        lock_transactions([reco.bank_transaction_id])
+        invoice = Invoice.objects.select_for_update().get(pk=reco.invoice_id)
+        if invoice.status != Invoice.Status.ISSUED:
+            raise ValueError("Facture non émise ou déjà soldée")
+        if reco.matched_amount > invoice.amount_due:
+            raise ValueError(
+                f"matched_amount supérieur au reste à payer ({invoice.amount_due})"
+            )
+        reco.save(force_insert=True)
+        apply_payments({reco.invoice_id: reco.matched_amount})
+    return reco
+
+
+def delete_reconciliation(reco):
+    """Supprime un rapprochement et annule son imputation sur la facture."""
+    with tenant_atomic(reco.entreprise_id):
+        apply_payments({reco.invoice_id: -reco.matched_amount})
+        reco.delete()
+
+
+def unreconciled_transactions(entreprise_id):
+    """Crédits bancaires sans aucun rapprochement."""
+    return BankTransaction.objects.filter(
+        entreprise_id=entreprise_id, amount__gt=0, reconciliations__isnull=True
+    )
+
+
+def default_actor(entreprise_id, username=None):
+    """
+    Utilisateur auquel sont attribués les rapprochements automatiques :
+    `username` s'il est fourni, sinon le plus ancien utilisateur actif.
+    """
+    users = User.objects.filter(entreprise_id=entreprise_id, is_active=True)
+    if username:
+        users = users.filter(username=username)
+    return users.order_by("created_at").first()
+
+
+def discard_stale_matches(reconciliations, batch_size=1000):
+    """
+    Écarte les rapprochements devenus caducs depuis leur calcul hors
+    transaction : transaction rapprochée entre-temps, facture plus émise ou
+    reste à payer insuffisant. À appeler dans la transaction qui les écrit.
+
+    Transactions puis factures sont verrouillées, dans l'ordre de
+    `create_reconciliation`.
+    """
+    tx_ids = sorted({reco.bank_transaction_id for reco in reconciliations})
+    invoice_ids = sorted({reco.invoice_id for reco in reconciliations})
+    lock_transactions(tx_ids, batch_size=batch_size)
+    taken, due = set(), {}
+    for start in range(0, len(tx_ids), batch_size):
+        chunk = tx_ids[start : start + batch_size]
+        taken.update(
+            Reconciliation.objects.filter(bank_transaction_id__in=chunk).values_list(
+                "bank_transaction_id", flat=True
+            )
+        )
+    for start in range(0, len(invoice_ids), batch_size):
+        chunk = invoice_ids[start : start + batch_size]
+        due.update(
+            Invoice.objects.select_for_update()
+            .filter(id__in=chunk, status=Invoice.Status.ISSUED)
+            .order_by("id")
+            .values_list("id", "amount_due")
+        )
+    kept = []
+    for reco in reconciliations:
+        remaining = due.get(reco.invoice_id)
+        if reco.bank_transaction_id in taken or remaining is None:
+            continue
+        if reco.matched_amount > remaining:
+            continue
+        due[reco.invoice_id] = remaining - reco.matched_amount
+        kept.append(reco)
+    return kept
+
+
+def auto_reconcile(entreprise_id, actor, dry_run=False, batch_size=1000, **options):
+    """
+    Rapproche automatiquement les transactions d'une entreprise.
+    `options` est transmis à `InvoiceIndex` (early_days, late_days).
+    """
+    started = time.perf_counter()
+    result = AutoReconcileResult(entreprise_id=entreprise_id)
+
+    index = InvoiceIndex.build(load_invoice_candidates(entreprise_id), **options)
+    result.open_invoices = len(index)
+
+    to_create = []
+    if len(index):
+        rows = (
+            unreconciled_transactions(entreprise_id)
+            .order_by("date")
+            .values_list("id", "date", "label", "amount")
+        )
+        for tx_id, tx_date, label, amount in rows.iterator(chunk_size=batch_size):
+            result.transactions_scanned += 1
+            candidate = index.match(to_cents(amount), tx_date, label)
+            if candidate is None:
+                continue
+            index.consume(candidate)
+            to_create.append(
+                Reconciliation(
+                    entreprise_id=entreprise_id,
+                    invoice_id=candidate.id,
+                    bank_transaction_id=tx_id,
+                    matched_amount=amount,
+                    matched_by=actor,
+                )
+            )
+
+    result.matches = len(to_create)
+    if to_create and not dry_run:
+        with tenant_atomic(entreprise_id):
+            to_create = discard_stale_matches(to_create, batch_size=batch_size)
+            Reconciliation.objects.bulk_create(to_create, batch_size=batch_size)
+            apply_payments({r.invoice_id: r.matched_amount for r in to_create})
+        result.matches = len(to_create)
+        # bulk_create n'émet pas de signaux
+        open_invoice_index.invalidate(entreprise_id)
+        forecast_inputs.invalidate(entreprise_id)
+        record(
+            "reconciliation.auto",
+            entity_type="reconciliation",
+            actor=actor,
+            entreprise_id=entreprise_id,
+            metadata={
+                "matches": result.matches,
+                "transactions_scanned": result.transactions_scanned,
+            },
+        )
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def suggest_invoice_groups(
+    entreprise_id, transaction, customer_id=None, tolerance_cents=0, **options
+):
+    """
+    Groupes de factures ouvertes d'un même client soldés par `transaction`.
+    Le client est déduit du libellé s'il n'est pas fourni ; retourne
+    `(customer_id, GroupingResult)` ou `(None, None)` si aucun client.
+    `options` est transmis à `find_invoice_groups`.
+    """
+    index = open_invoice_index.get(entreprise_id)
+    if customer_id is None:
+        customer_id = index.customer_in_label(transaction.label)
+    if customer_id is None:
+        return None, None
+
+    candidates = index.for_customer(customer_id, transaction.date)
+    result = find_invoice_groups(
+        to_cents(transaction.amount),
+        candidates,
+        tolerance_cents=tolerance_cents,
+        **options,
+    )
+    return customer_id, result
@@ -0,0 +1,121 @@
+"""
+Détection vectorisée des flux récurrents (loyers, abonnements, salaires).
+
+Les transactions sont groupées par clé de libellé et tranche de montant,
+puis les statistiques d'inter-arrivée de chaque groupe (nombre, moyenne et
+écart-type des écarts entre dates) sont calculées en une passe de
+`bincount` sur des tableaux triés. Un groupe est une série si l'écart moyen
+correspond à une périodicité connue avec une dispersion limitée.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# (périodicité, écart nominal en jours, tolérance sur la moyenne et l'écart-type)
+PERIODICITIES = (
+    ("WEEKLY", 7.0, 1.5),
+    ("MONTHLY", 30.44, 3.5),
+    ("QUARTERLY", 91.31, 7.0),
+)
+
+# Tranches de montant géométriques : chaque tranche couvre +25 %
+BAND_RATIO = 1.25
+
+
+def amount_bands(amounts):
+    """Tranche signée de chaque montant (centimes) ; 0 pour un montant nul."""
+    amounts = np.asarray(amounts, dtype=np.float64)
+    magnitudes = np.abs(amounts)
+    bands = np.zeros(len(amounts), dtype=np.int64)
+    nonzero = magnitudes >= 1
+    bands[nonzero] = (
+        np.floor(np.log(magnitudes[nonzero]) / np.log(BAND_RATIO)).astype(np.int64) + 1
+    )
+    return np.sign(amounts).astype(np.int64) * bands
+
+
+@dataclass
+class SeriesStats:
+    """Statistiques par code de groupe (indice = code)."""
+
+    counts: np.ndarray
+    periods: np.ndarray  # écart moyen en jours
+    jitter: np.ndarray  # écart-type des écarts
+    amounts: np.ndarray  # montant moyen, centimes
+    first: np.ndarray  # ordinaux
+    last: np.ndarray
+
+
+def inter_arrival_stats(codes, ordinals, amounts):
+    """Statistiques d'inter-arrivée de chaque groupe `codes` (entiers >= 0)."""
+    codes = np.asarray(codes, dtype=np.int64)
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    size = int(codes.max()) + 1 if len(codes) else 0
+
+    order = np.lexsort((ordinals, codes))
+    codes, ordinals, amounts = codes[order], ordinals[order], amounts[order]
+
+    counts = np.bincount(codes, minlength=size)
+    amount_means = np.zeros(size)
+    np.divide(
+        np.bincount(codes, weights=amounts, minlength=size),
+        counts,
+        out=amount_means,
+        where=counts > 0,
+    )
+
+    same = codes[1:] == codes[:-1]
+    gap_codes = codes[1:][same]
+    gaps = np.diff(ordinals)[same].astype(np.float64)
+    gap_counts = np.bincount(gap_codes, minlength=size)
+    periods = np.zeros(size)
+    np.divide(
+        np.bincount(gap_codes, weights=gaps, minlength=size),
+        gap_counts,
+        out=periods,
+        where=gap_counts > 0,
+    )
+    squares = np.zeros(size)
+    np.divide(
+        np.bincount(gap_codes, weights=gaps**2, minlength=size),
+        gap_counts,
+        out=squares,
+        where=gap_counts > 0,
+    )
+
+    # Première et dernière occurrence (tri par code puis par date)
+    first = np.zeros(size, dtype=np.int64)
+    last = np.zeros(size, dtype=np.int64)
+    if len(codes):
+        ends = np.flatnonzero(np.append(codes[1:] != codes[:-1], True))
+        starts = np.append(0, ends[:-1] + 1)
+        first[codes[starts]] = ordinals[starts]
+        last[codes[ends]] = ordinals[ends]
+
+    return SeriesStats(
+        counts=counts,
+        periods=periods,
+        jitter=np.sqrt(np.maximum(squares - periods**2, 0)),
+        amounts=amount_means,
+        first=first,
+        last=last,
+    )
+
+
+def classify(stats, min_occurrences=3):
+    """
+    Indice dans `PERIODICITIES` de la périodicité de chaque groupe, -1 si le
+    groupe n'est pas une série.
+    """
+    kinds = np.full(len(stats.counts), -1, dtype=np.int64)
+    enough = stats.counts >= min_occurrences
+    for index, (_, nominal, tolerance) in enumerate(PERIODICITIES):
+        matches = (
+            enough
+            & (np.abs(stats.periods - nominal) <= tolerance)
+            & (stats.jitter <= tolerance)
+        )
+        kinds[matches] = index
+    return kinds
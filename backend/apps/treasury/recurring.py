@@ -0,0 +1,150 @@
+"""
+Détection et persistance des flux récurrents d'une entreprise.
+
+Premier passage : tout l'historique récent est analysé. Passages suivants :
+seules les transactions créées depuis le point de reprise sont examinées,
+et seuls les groupes (clé de libellé, tranche de montant) qu'elles touchent
+sont recalculés.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from apps.common.sharding import tenant_atomic
+
+from . import recurrence
+from .forecast import forecast_inputs
+from .matching import from_cents, to_cents
+from .models import BankTransaction, RecurringScanState, RecurringSeries
+
+# Historique pris en compte pour évaluer une série
+LOOKBACK_DAYS = 400
+
+
+@dataclass
+class RecurringScanResult:
+    """Bilan d'un passage de détection pour une entreprise."""
+
+    entreprise_id: object
+    incremental: bool = False
+    new_transactions: int = 0
+    groups: int = 0
+    series: int = 0
+    removed: int = 0
+    elapsed: float = 0.0
+
+
+def detect_recurring_series(entreprise_id, full=False, lookback_days=LOOKBACK_DAYS):
+    """Met à jour les `RecurringSeries` de l'entreprise."""
+    started = time.perf_counter()
+    scan_started_at = timezone.now()
+    today = timezone.localdate()
+    state, _ = RecurringScanState.objects.get_or_create(entreprise_id=entreprise_id)
+    incremental = not full and state.scanned_until is not None
+    result = RecurringScanResult(entreprise_id=entreprise_id, incremental=incremental)
+
+    since = today - timedelta(days=lookback_days)
+    history = BankTransaction.objects.filter(
+        entreprise_id=entreprise_id, date__gte=since
+    )
+    touched = None
+    if incremental:
+        # Borne sur la date : seules les partitions de la fenêtre sont lues
+        new_rows = list(
+            BankTransaction.objects.filter(
+                entreprise_id=entreprise_id,
+                created_at__gte=state.scanned_until,
+                date__gte=since,
+            ).values_list("label_key", "amount")
+        )
+        result.new_transactions = len(new_rows)
+        bands = recurrence.amount_bands([to_cents(amount) for _, amount in new_rows])
+        touched = {(key, int(band)) for (key, _), band in zip(new_rows, bands)}
+        history = history.filter(label_key__in={key for key, _ in touched})
+
+    rows = list(history.values_list("label_key", "amount", "date"))
+    groups = {}
+    codes = np.fromiter(
+        (
+            groups.setdefault((key, int(band)), len(groups))
+            for (key, _, _), band in zip(
+                rows,
+                recurrence.amount_bands([to_cents(amount) for _, amount, _ in rows]),
+            )
+        ),
+        dtype=np.int64,
+        count=len(rows),
+    )
+    ordinals = np.fromiter(
+        (tx_date.toordinal() for _, _, tx_date in rows), dtype=np.int64, count=len(rows)
+    )
+    amounts = np.fromiter(
+        (to_cents(amount) for _, amount, _ in rows), dtype=np.float64, count=len(rows)
+    )
+    stats = recurrence.inter_arrival_stats(codes, ordinals, amounts)
+    kinds = recurrence.classify(stats)
+
+    detected = []
+    for (key, band), code in groups.items():
+        if kinds[code] < 0 or (touched is not None and (key, band) not in touched):
+            continue
+        last = date.fromordinal(int(stats.last[code]))
+        period = float(stats.periods[code])
+        detected.append(
+            RecurringSeries(
+                entreprise_id=entreprise_id,
+                label_key=key,
+                amount_band=band,
+                kind=recurrence.PERIODICITIES[kinds[code]][0],
+                period_days=period,
+                occurrences=int(stats.counts[code]),
+                first_date=date.fromordinal(int(stats.first[code])),
+                last_date=last,
+                next_expected_date=last + timedelta(days=round(period)),
+                expected_amount=from_cents(round(float(stats.amounts[code]))),
+            )
+        )
+    result.groups = len(groups) if touched is None else len(touched)
+    result.series = len(detected)
+
+    # Groupes examinés qui ne forment plus une série
+    examined = RecurringSeries.objects.filter(entreprise_id=entreprise_id)
+    if touched is not None:
+        examined = examined.filter(label_key__in={key for key, _ in touched})
+    kept = {(series.label_key, series.amount_band) for series in detected}
+    stale = [
+        pk
+        for pk, key, band in examined.values_list("pk", "label_key", "amount_band")
+        if (key, band) not in kept and (touched is None or (key, band) in touched)
+    ]
+    result.removed = len(stale)
+
+    with tenant_atomic(entreprise_id):
+        RecurringSeries.objects.filter(pk__in=stale).delete()
+        RecurringSeries.objects.bulk_create(
+            detected,
+            update_conflicts=True,
+            unique_fields=["entreprise", "label_key", "amount_band"],
+            update_fields=[
+                "kind",
+                "period_days",
+                "occurrences",
+                "first_date",
+                "last_date",
+                "next_expected_date",
+                "expected_amount",
+                "updated_at",
+            ],
+        )
+        # Les transactions créées pendant le passage seront revues au suivant
+        state.scanned_until = scan_started_at
+        state.save(update_fields=["scanned_until"])
+
+    if detected or stale:
+        forecast_inputs.invalidate(entreprise_id)
+    result.elapsed = time.perf_counter() - started
+    return result
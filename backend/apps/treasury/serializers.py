@@ -8,6 +8,14 @@ class BankTransactionSerializer(serializers.Serializer):
     date = serializers.DateField()
     label = serializers.CharField(max_length=255)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    category = serializers.CharField(read_only=True)
+    anomaly_flags = serializers.ListField(
+        child=serializers.ChoiceField(choices=["amount_outlier", "duplicate"]),
+        read_only=True,
+    )
+    anomaly_score = serializers.FloatField(
+        read_only=True, help_text="Écart du montant à l'habitude, en écarts-types"
+    )
     created_at = serializers.DateTimeField(read_only=True)
 
 
@@ -17,6 +25,39 @@ class BankTransactionCreateSerializer(serializers.Serializer):
     date = serializers.DateField(required=False)
     label = serializers.CharField(max_length=255)
     amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    category = serializers.CharField(
+        max_length=64,
+        required=False,
+        help_text="Par défaut : catégorie déduite des règles",
+    )
+
+
+class BankTransactionImportSerializer(serializers.Serializer):
+    """Serializer pour l'import d'un lot de transactions."""
+
+    transactions = BankTransactionCreateSerializer(many=True)
+
+
+class BankTransactionImportResultSerializer(serializers.Serializer):
+    """Serializer pour le résultat d'un import de transactions."""
+
+    created = serializers.IntegerField()
+    flagged = serializers.IntegerField()
+    flagged_transactions = BankTransactionSerializer(many=True)
+
+
+class CategoryRuleSerializer(serializers.Serializer):
+    """Serializer pour une règle de catégorisation."""
+
+    id = serializers.UUIDField(read_only=True)
+    category = serializers.CharField(max_length=64)
+    kind = serializers.ChoiceField(choices=["KEYWORD", "REGEX"], default="KEYWORD")
+    pattern = serializers.CharField(max_length=255)
+    priority = serializers.IntegerField(
+        min_value=0, default=100, help_text="Plus petit = prioritaire"
+    )
+    is_active = serializers.BooleanField(default=True)
+    created_at = serializers.DateTimeField(read_only=True)
 
 
 class ReconciliationSerializer(serializers.Serializer):
@@ -38,6 +79,86 @@ class ReconciliationCreateSerializer(serializers.Serializer):
     matched_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
+class ReconciliationSuggestionSerializer(serializers.Serializer):
+    """Serializer pour une suggestion de rapprochement."""
+
+    invoice_id = serializers.UUIDField()
+    invoice_number = serializers.CharField()
+    customer_name = serializers.CharField()
+    remaining_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    due_date = serializers.DateField(allow_null=True)
+    score = serializers.FloatField(help_text="Score entre 0 et 1")
+    details = serializers.DictField(
+        child=serializers.FloatField(), help_text="Détail du score par critère"
+    )
+
+
+class GroupedInvoiceSerializer(serializers.Serializer):
+    """Serializer pour une facture d'un groupe de rapprochement."""
+
+    invoice_id = serializers.UUIDField()
+    invoice_number = serializers.CharField()
+    remaining_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    due_date = serializers.DateField(allow_null=True)
+
+
+class InvoiceGroupSerializer(serializers.Serializer):
+    """Serializer pour un groupe de factures réglées par un virement."""
+
+    invoices = GroupedInvoiceSerializer(many=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    difference = serializers.DecimalField(
+        max_digits=12, decimal_places=2, help_text="Total - montant du virement"
+    )
+
+
+class ReconciliationGroupsSerializer(serializers.Serializer):
+    """Serializer pour les groupes de factures candidats d'une transaction."""
+
+    customer_id = serializers.UUIDField()
+    timed_out = serializers.BooleanField(
+        help_text="Recherche interrompue par la limite de temps"
+    )
+    groups = InvoiceGroupSerializer(many=True)
+
+
+class ForecastDaySerializer(serializers.Serializer):
+    """Serializer pour un jour de prévision de trésorerie."""
+
+    date = serializers.DateField()
+    inflow = serializers.DecimalField(max_digits=12, decimal_places=2)
+    outflow = serializers.DecimalField(max_digits=12, decimal_places=2)
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class RecurringSeriesSerializer(serializers.Serializer):
+    """Serializer pour un flux récurrent détecté."""
+
+    id = serializers.UUIDField()
+    label = serializers.CharField(help_text="Libellé normalisé")
+    kind = serializers.ChoiceField(choices=["WEEKLY", "MONTHLY", "QUARTERLY"])
+    period_days = serializers.FloatField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    occurrences = serializers.IntegerField()
+    last_date = serializers.DateField()
+    next_date = serializers.DateField()
+
+
+class CashForecastSerializer(serializers.Serializer):
+    """Serializer pour la prévision de trésorerie."""
+
+    start_date = serializers.DateField()
+    days = serializers.IntegerField()
+    current_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    expected_inflows = serializers.DecimalField(max_digits=12, decimal_places=2)
+    expected_outflows = serializers.DecimalField(max_digits=12, decimal_places=2)
+    end_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    min_balance = serializers.DecimalField(max_digits=12, decimal_places=2)
+    min_balance_date = serializers.DateField()
+    daily = ForecastDaySerializer(many=True)
+    recurring = RecurringSeriesSerializer(many=True)
+
+
 class TreasuryDashboardSerializer(serializers.Serializer):
     """Serializer pour le dashboard trésorerie."""
 
@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .categories import category_rules
+from .forecast import forecast_inputs
+from .models import BankTransaction, CategoryRule, Reconciliation
+from .reconciliation import open_invoice_index
+
+
+def invalidate_on_commit(tenant_cache, instance, using):
+    """
+    Invalide après le commit : invalidé plus tôt, un autre worker pourrait
+    recharger l'état encore en base et le garder sous la nouvelle version.
+    """
+    entreprise_id = instance.entreprise_id
+    transaction.on_commit(lambda: tenant_cache.invalidate(entreprise_id), using=using)
+
+
+@receiver(post_save, sender="invoices.Customer")
+@receiver(post_save, sender="invoices.Invoice")
+@receiver(post_delete, sender="invoices.Invoice")
+@receiver(post_save, sender=Reconciliation)
+@receiver(post_delete, sender=Reconciliation)
+def invalidate_open_invoices(sender, instance, using, **kwargs):
+    """Toute écriture sur un client, une facture ou un rapprochement périme l'index."""
+    invalidate_on_commit(open_invoice_index, instance, using)
+
+
+@receiver(post_save, sender=CategoryRule)
+@receiver(post_delete, sender=CategoryRule)
+def invalidate_category_rules(sender, instance, using, **kwargs):
+    """Toute modification de règle impose de recompiler les règles de l'entreprise."""
+    invalidate_on_commit(category_rules, instance, using)
+
+
+@receiver(post_save, sender=BankTransaction)
+@receiver(post_delete, sender=BankTransaction)
+@receiver(post_save, sender="invoices.Invoice")
+@receiver(post_delete, sender="invoices.Invoice")
+@receiver(post_save, sender=Reconciliation)
+@receiver(post_delete, sender=Reconciliation)
+def invalidate_forecast(sender, instance, using, **kwargs):
+    """Solde, factures ouvertes et délais de paiement alimentent la prévision."""
+    invalidate_on_commit(forecast_inputs, instance, using)
@@ -7,11 +7,28 @@ app_name = "treasury"
 urlpatterns = [
     # Dashboard
     path("dashboard", views.treasury_dashboard, name="dashboard"),
+    path("forecast", views.treasury_forecast, name="forecast"),
+    path("recurring-series", views.recurring_series_list, name="recurring_series_list"),
     # Bank Transactions
     path("bank-transactions", views.transaction_list, name="transaction_list"),
     path(
         "bank-transactions/create", views.transaction_create, name="transaction_create"
     ),
+    path(
+        "bank-transactions/import", views.transaction_import, name="transaction_import"
+    ),
+    # Category rules
+    path("category-rules", views.category_rule_list, name="category_rule_list"),
+    path(
+        "category-rules/create",
+        views.category_rule_create,
+        name="category_rule_create",
+    ),
+    path(
+        "category-rules/<uuid:rule_id>",
+        views.category_rule_delete,
+        name="category_rule_delete",
+    ),
     # Reconciliations
     path("reconciliations", views.reconciliation_list, name="reconciliation_list"),
     path(
@@ -19,6 +36,16 @@ urlpatterns = [
         views.reconciliation_create,
         name="reconciliation_create",
     ),
+    path(
+        "reconciliations/suggestions",
+        views.reconciliation_suggestions,
+        name="reconciliation_suggestions",
+    ),
+    path(
+        "reconciliations/groups",
+        views.reconciliation_groups,
+        name="reconciliation_groups",
+    ),
     path(
         "reconciliations/<uuid:reconciliation_id>",
         views.reconciliation_delete,
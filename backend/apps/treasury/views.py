@@ -1,20 +1,109 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.exceptions import ValidationError
 from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.partitioning import latest_rows
 from apps.common.serializers import ErrorSerializer, MessageSerializer
+from apps.common.tenancy import tenant_required
 from apps.invoices.models import Invoice
 
-from .models import BankTransaction, Reconciliation
+from .anomalies import flag_names
+from .categorization import validate_regex
+from .forecast import cash_forecast, next_occurrence
+from .ingest import ingest_transactions
+from .matching import from_cents, to_cents
+from .models import (BankTransaction, CategoryRule, Reconciliation,
+                     RecurringSeries)
+from .reconciliation import (create_reconciliation, delete_reconciliation,
+                             open_invoice_index, suggest_invoice_groups)
 from .serializers import (BankTransactionCreateSerializer,
-                          BankTransactionSerializer,
+                          BankTransactionImportResultSerializer,
+                          BankTransactionImportSerializer,
+                          BankTransactionSerializer, CashForecastSerializer,
+                          CategoryRuleSerializer,
                           ReconciliationCreateSerializer,
+                          ReconciliationGroupsSerializer,
                           ReconciliationSerializer,
+                          ReconciliationSuggestionSerializer,
+                          RecurringSeriesSerializer,
                           TreasuryDashboardSerializer)
 
+SUGGESTIONS_DEFAULT_LIMIT = 5
+SUGGESTIONS_MAX_LIMIT = 20
+FORECAST_DEFAULT_DAYS = 90
+IMPORT_MAX_TRANSACTIONS = 5000
+FORECAST_MAX_DAYS = 365
+# Borne exclue des montants (BankTransaction.amount : 12 chiffres dont 2 décimales)
+AMOUNT_LIMIT = Decimal(10) ** 10
+# Plus grande valeur de CategoryRule.priority (integer PostgreSQL)
+PRIORITY_MAX = 2**31 - 1
+
+
+def _transaction_data(t):
+    return {
+        "id": str(t.id),
+        "date": t.date.isoformat(),
+        "label": t.label,
+        "amount": str(t.amount),
+        "category": t.category,
+        "anomaly_flags": flag_names(t.anomaly_flags),
+        "anomaly_score": t.anomaly_score,
+        "created_at": t.created_at.isoformat(),
+    }
+
+
+def _parse_amount(value):
+    """Montant arrondi au centime, ou None s'il n'est pas un nombre fini."""
+    try:
+        # NaN, infinis et exposants démesurés : ValueError, OverflowError,
+        # InvalidOperation ou decimal.Overflow (tous ArithmeticError sauf NaN)
+        return from_cents(to_cents(value))
+    except (ArithmeticError, ValueError):
+        return None
+
+
+def _build_transaction(data):
+    """`(BankTransaction non sauvegardée, erreur)` à partir d'un dict reçu."""
+    label = data.get("label")
+    amount = data.get("amount")
+    category = data.get("category") or ""
+    if not label or amount is None:
+        return None, "label et amount requis"
+    for name, value in (("label", label), ("category", category)):
+        max_length = BankTransaction._meta.get_field(name).max_length
+        if not isinstance(value, str) or len(value) > max_length:
+            return None, f"{name} invalide ({max_length} caractères maximum)"
+    amount = _parse_amount(amount)
+    if amount is None:
+        return None, "amount invalide"
+    if abs(amount) >= AMOUNT_LIMIT:
+        return None, f"amount invalide (inférieur à {AMOUNT_LIMIT} en valeur absolue)"
+
+    tx_date = timezone.localdate()
+    if data.get("date"):
+        try:
+            tx_date = parse_date(str(data["date"]))
+        except ValueError:
+            tx_date = None
+        if tx_date is None:
+            return None, "date invalide (AAAA-MM-JJ)"
+
+    transaction = BankTransaction(
+        date=tx_date, label=label, amount=amount, category=category
+    )
+    return transaction, None
+
 
 @extend_schema(
     tags=["Treasury"],
@@ -27,16 +116,13 @@ from .serializers import (BankTransactionCreateSerializer,
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def treasury_dashboard(request):
     """
     GET /api/v1/treasury/dashboard
     Dashboard trésorerie.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    transactions = BankTransaction.objects.filter(entreprise=entreprise)
+    transactions = BankTransaction.objects.all()
 
     total_in = (
         transactions.filter(amount__gt=0).aggregate(total=Sum("amount"))["total"] or 0
@@ -46,17 +132,9 @@ def treasury_dashboard(request):
     )
     balance = total_in + total_out
 
-    recent = transactions.order_by("-date", "-created_at")[:20]
-    recent_data = [
-        {
-            "id": str(t.id),
-            "date": t.date.isoformat(),
-            "label": t.label,
-            "amount": str(t.amount),
-            "created_at": t.created_at.isoformat(),
-        }
-        for t in recent
-    ]
+    # Derniers mois d'abord : seules les partitions récentes sont lues
+    recent = latest_rows(transactions.order_by("-date", "-created_at"), "date", 20)
+    recent_data = [_transaction_data(t) for t in recent]
 
     return Response(
         {
@@ -68,6 +146,124 @@ def treasury_dashboard(request):
     )
 
 
+def _recurring_series_data(series, next_date):
+    return {
+        "id": str(series.id),
+        "label": series.label_key,
+        "kind": series.kind,
+        "period_days": round(series.period_days, 1),
+        "amount": str(series.expected_amount),
+        "occurrences": series.occurrences,
+        "last_date": series.last_date.isoformat(),
+        "next_date": next_date.isoformat(),
+    }
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Prévision de trésorerie",
+    description="Projette le solde bancaire jour par jour à partir des "
+    "échéances des factures ouvertes (décalées du délai de paiement moyen de "
+    "chaque client) et des flux récurrents détectés.",
+    parameters=[
+        OpenApiParameter(
+            name="days",
+            type=OpenApiTypes.INT,
+            description=f"Horizon en jours (défaut {FORECAST_DEFAULT_DAYS}, "
+            f"max {FORECAST_MAX_DAYS})",
+        ),
+    ],
+    responses={
+        200: CashForecastSerializer,
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def treasury_forecast(request):
+    """
+    GET /api/v1/treasury/forecast?days=90
+    Prévision de trésorerie.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    try:
+        days = int(request.query_params.get("days", FORECAST_DEFAULT_DAYS))
+    except ValueError:
+        return Response({"error": "days invalide"}, status=400)
+    if not 1 <= days <= FORECAST_MAX_DAYS:
+        return Response(
+            {"error": f"days doit être compris entre 1 et {FORECAST_MAX_DAYS}"},
+            status=400,
+        )
+
+    start = timezone.localdate()
+    inputs, projection = cash_forecast(entreprise_id, days=days, start=start)
+
+    inflows = np.rint(projection.inflows).astype(np.int64).tolist()
+    outflows = np.rint(projection.outflows).astype(np.int64).tolist()
+    balances = np.rint(projection.balance).astype(np.int64).tolist()
+    lowest = int(np.argmin(projection.balance))
+
+    recurring = [
+        _recurring_series_data(series, next_occurrence(inputs.recurring, i, start))
+        for i, series in enumerate(inputs.recurring_series)
+    ]
+
+    return Response(
+        {
+            "start_date": start.isoformat(),
+            "days": days,
+            "current_balance": str(from_cents(inputs.balance_cents)),
+            "expected_inflows": str(from_cents(sum(inflows))),
+            "expected_outflows": str(from_cents(sum(outflows))),
+            "end_balance": str(from_cents(balances[-1])),
+            "min_balance": str(from_cents(balances[lowest])),
+            "min_balance_date": (start + timedelta(days=lowest)).isoformat(),
+            "daily": [
+                {
+                    "date": (start + timedelta(days=offset)).isoformat(),
+                    "inflow": str(from_cents(inflows[offset])),
+                    "outflow": str(from_cents(outflows[offset])),
+                    "balance": str(from_cents(balances[offset])),
+                }
+                for offset in range(days + 1)
+            ],
+            "recurring": recurring,
+        }
+    )
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Lister les flux récurrents",
+    description="Retourne les séries récurrentes détectées (loyers, "
+    "abonnements, salaires...) avec leur prochaine échéance attendue.",
+    responses={
+        200: RecurringSeriesSerializer(many=True),
+        401: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def recurring_series_list(request):
+    """
+    GET /api/v1/treasury/recurring-series
+    Liste des flux récurrents.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    series = RecurringSeries.objects.filter(entreprise_id=entreprise_id).order_by(
+        "next_expected_date"
+    )
+    return Response(
+        [_recurring_series_data(item, item.next_expected_date) for item in series]
+    )
+
+
 @extend_schema(
     tags=["Treasury"],
     summary="Lister les transactions",
@@ -79,6 +275,11 @@ def treasury_dashboard(request):
         OpenApiParameter(
             name="to_date", type=OpenApiTypes.DATE, description="Date fin"
         ),
+        OpenApiParameter(
+            name="flagged",
+            type=OpenApiTypes.BOOL,
+            description="Uniquement les transactions signalées comme inhabituelles",
+        ),
     ],
     responses={
         200: BankTransactionSerializer(many=True),
@@ -87,16 +288,13 @@ def treasury_dashboard(request):
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def transaction_list(request):
     """
     GET /api/v1/bank-transactions
     Liste des transactions.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    transactions = BankTransaction.objects.filter(entreprise=entreprise)
+    transactions = BankTransaction.objects.all()
 
     from_date = request.query_params.get("from_date")
     to_date = request.query_params.get("to_date")
@@ -105,15 +303,12 @@ def transaction_list(request):
     if to_date:
         transactions = transactions.filter(date__lte=to_date)
 
+    if request.query_params.get("flagged") in ("1", "true"):
+        transactions = transactions.filter(anomaly_flags__gt=0)
+
     data = [
-        {
-            "id": str(t.id),
-            "date": t.date.isoformat(),
-            "label": t.label,
-            "amount": str(t.amount),
-            "created_at": t.created_at.isoformat(),
-        }
-        for t in transactions.order_by("-date")[:25]
+        _transaction_data(t)
+        for t in latest_rows(transactions.order_by("-date"), "date", 25)
     ]
     return Response(data)
 
@@ -131,40 +326,209 @@ def transaction_list(request):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def transaction_create(request):
     """
     POST /api/v1/bank-transactions
     Création d'une transaction.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
+    entreprise_id = request.tenant.entreprise_id
 
-    label = request.data.get("label")
-    amount = request.data.get("amount")
+    transaction, error = _build_transaction(request.data)
+    if error:
+        return Response({"error": error}, status=400)
 
-    if not label or amount is None:
-        return Response({"error": "label et amount requis"}, status=400)
+    ingest_transactions(entreprise_id, [transaction])
+    return Response(_transaction_data(transaction), status=201)
 
-    transaction = BankTransaction.objects.create(
-        entreprise=entreprise,
-        date=request.data.get("date"),
-        label=label,
-        amount=amount,
-    )
 
+@extend_schema(
+    tags=["Treasury"],
+    summary="Importer des transactions",
+    description="Crée un lot de transactions bancaires (relevé). Chaque "
+    "transaction est catégorisée et signalée si son montant est inhabituel "
+    "pour son libellé ou si elle ressemble à un débit en double.",
+    request=BankTransactionImportSerializer,
+    responses={
+        201: BankTransactionImportResultSerializer,
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def transaction_import(request):
+    """
+    POST /api/v1/treasury/bank-transactions/import
+    Import d'un lot de transactions.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    rows = request.data.get("transactions")
+    if not isinstance(rows, list) or not rows:
+        return Response({"error": "transactions requis (liste)"}, status=400)
+    if len(rows) > IMPORT_MAX_TRANSACTIONS:
+        return Response(
+            {"error": f"{IMPORT_MAX_TRANSACTIONS} transactions maximum par import"},
+            status=400,
+        )
+
+    transactions = []
+    for line, row in enumerate(rows, start=1):
+        transaction, error = _build_transaction(row if isinstance(row, dict) else {})
+        if error:
+            return Response({"error": f"Ligne {line}: {error}"}, status=400)
+        transactions.append(transaction)
+
+    result = ingest_transactions(entreprise_id, transactions)
     return Response(
         {
-            "id": str(transaction.id),
-            "date": transaction.date.isoformat(),
-            "label": transaction.label,
-            "amount": str(transaction.amount),
-            "created_at": transaction.created_at.isoformat(),
+            "created": len(result.transactions),
+            "flagged": result.flagged,
+            "flagged_transactions": [
+                _transaction_data(t) for t in result.transactions if t.anomaly_flags
+            ],
         },
         status=201,
     )
 
 
+# ========== Category Rules ==========
+
+
+def _category_rule_data(rule):
+    return {
+        "id": str(rule.id),
+        "category": rule.category,
+        "kind": rule.kind,
+        "pattern": rule.pattern,
+        "priority": rule.priority,
+        "is_active": rule.is_active,
+        "created_at": rule.created_at.isoformat(),
+    }
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Lister les règles de catégorisation",
+    description="Retourne les règles de catégorisation, par priorité.",
+    responses={
+        200: CategoryRuleSerializer(many=True),
+        401: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def category_rule_list(request):
+    """
+    GET /api/v1/treasury/category-rules
+    Liste des règles de catégorisation.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    rules = CategoryRule.objects.filter(entreprise_id=entreprise_id)
+    return Response([_category_rule_data(rule) for rule in rules])
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Créer une règle de catégorisation",
+    description="Crée une règle (mot-clé ou expression régulière). Elle "
+    "s'applique aux nouvelles transactions ; la commande "
+    "`recategorize_transactions` l'applique à l'historique.",
+    request=CategoryRuleSerializer,
+    responses={
+        201: CategoryRuleSerializer,
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def category_rule_create(request):
+    """
+    POST /api/v1/treasury/category-rules/create
+    Création d'une règle de catégorisation.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    category = request.data.get("category")
+    pattern = request.data.get("pattern")
+    kind = request.data.get("kind", CategoryRule.Kind.KEYWORD)
+
+    if not category or not pattern:
+        return Response({"error": "category et pattern requis"}, status=400)
+    for name, value in (("category", category), ("pattern", pattern)):
+        max_length = CategoryRule._meta.get_field(name).max_length
+        if not isinstance(value, str) or len(value) > max_length:
+            return Response(
+                {"error": f"{name} invalide ({max_length} caractères maximum)"},
+                status=400,
+            )
+    if kind not in CategoryRule.Kind.values:
+        return Response({"error": "kind invalide (KEYWORD ou REGEX)"}, status=400)
+    if kind == CategoryRule.Kind.REGEX:
+        error = validate_regex(pattern)
+        if error:
+            return Response({"error": error}, status=400)
+
+    try:
+        priority = int(request.data.get("priority", 100))
+    except (TypeError, ValueError):
+        return Response({"error": "priority doit être un entier"}, status=400)
+    if priority < 0:
+        return Response({"error": "priority doit être positif"}, status=400)
+    if priority > PRIORITY_MAX:
+        return Response(
+            {"error": f"priority doit être au plus {PRIORITY_MAX}"}, status=400
+        )
+    is_active = request.data.get("is_active", True)
+    if not isinstance(is_active, bool):
+        return Response({"error": "is_active doit être un booléen"}, status=400)
+
+    rule = CategoryRule.objects.create(
+        entreprise_id=entreprise_id,
+        category=category,
+        kind=kind,
+        pattern=pattern,
+        priority=priority,
+        is_active=is_active,
+    )
+    return Response(_category_rule_data(rule), status=201)
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Supprimer une règle de catégorisation",
+    description="Supprime une règle. Les catégories déjà attribuées sont "
+    "conservées jusqu'à la prochaine re-catégorisation.",
+    responses={
+        200: MessageSerializer,
+        401: ErrorSerializer,
+        404: ErrorSerializer,
+    },
+)
+@api_view(["DELETE"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def category_rule_delete(request, rule_id):
+    """
+    DELETE /api/v1/treasury/category-rules/{id}
+    Suppression d'une règle de catégorisation.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    deleted, _ = CategoryRule.objects.filter(
+        id=rule_id, entreprise_id=entreprise_id
+    ).delete()
+    if not deleted:
+        return Response({"error": "Règle non trouvée"}, status=404)
+    return Response({"message": "Règle supprimée"})
+
+
 # ========== Reconciliations ==========
 
 
@@ -179,16 +543,13 @@ def transaction_create(request):
 )
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def reconciliation_list(request):
     """
     GET /api/v1/reconciliations
     Liste des rapprochements.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
-    recos = Reconciliation.objects.filter(entreprise=entreprise).select_related(
+    recos = Reconciliation.objects.select_related(
         "invoice", "bank_transaction", "matched_by"
     )
 
@@ -211,7 +572,8 @@ def reconciliation_list(request):
 @extend_schema(
     tags=["Treasury"],
     summary="Créer un rapprochement",
-    description="Lie une transaction bancaire à une facture.",
+    description="Lie une transaction bancaire à une facture et met à jour "
+    "son reste à payer.",
     request=ReconciliationCreateSerializer,
     responses={
         201: ReconciliationSerializer,
@@ -222,14 +584,13 @@ def reconciliation_list(request):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def reconciliation_create(request):
     """
     POST /api/v1/reconciliations
     Création d'un rapprochement.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
+    entreprise_id = request.tenant.entreprise_id
 
     invoice_id = request.data.get("invoice_id")
     transaction_id = request.data.get("bank_transaction_id")
@@ -241,25 +602,33 @@ def reconciliation_create(request):
             status=400,
         )
 
+    matched_amount = _parse_amount(matched_amount)
+    if matched_amount is None or not 0 < matched_amount < AMOUNT_LIMIT:
+        return Response(
+            {"error": f"matched_amount invalide (positif, inférieur à {AMOUNT_LIMIT})"},
+            status=400,
+        )
+
     try:
-        invoice = Invoice.objects.get(id=invoice_id, entreprise=entreprise)
-    except Invoice.DoesNotExist:
+        invoice = Invoice.objects.get(id=invoice_id)
+    except (Invoice.DoesNotExist, ValueError, ValidationError):
         return Response({"error": "Facture non trouvée"}, status=404)
 
     try:
-        transaction = BankTransaction.objects.get(
-            id=transaction_id, entreprise=entreprise
-        )
-    except BankTransaction.DoesNotExist:
+        transaction = BankTransaction.objects.get(id=transaction_id)
+    except (BankTransaction.DoesNotExist, ValueError, ValidationError):
         return Response({"error": "Transaction non trouvée"}, status=404)
 
-    reco = Reconciliation.objects.create(
-        entreprise=entreprise,
-        invoice=invoice,
-        bank_transaction=transaction,
-        matched_amount=matched_amount,
-        matched_by=request.user,
-    )
+    try:
+        reco = create_reconciliation(
+            entreprise_id=entreprise_id,
+            invoice=invoice,
+            bank_transaction=transaction,
+            matched_amount=matched_amount,
+            matched_by=request.user,
+        )
+    except ValueError as err:
+        return Response({"error": str(err)}, status=400)
 
     return Response(
         {
@@ -274,10 +643,184 @@ def reconciliation_create(request):
     )
 
 
+@extend_schema(
+    tags=["Treasury"],
+    summary="Suggestions de rapprochement",
+    description="Retourne les factures ouvertes les plus probables pour une "
+    "transaction bancaire, triées par score décroissant.",
+    parameters=[
+        OpenApiParameter(
+            name="bank_transaction_id",
+            type=OpenApiTypes.UUID,
+            required=True,
+            description="Transaction à rapprocher",
+        ),
+        OpenApiParameter(
+            name="limit",
+            type=int,
+            description=f"Nombre de suggestions (max {SUGGESTIONS_MAX_LIMIT})",
+        ),
+    ],
+    responses={
+        200: ReconciliationSuggestionSerializer(many=True),
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+        404: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def reconciliation_suggestions(request):
+    """
+    GET /api/v1/reconciliations/suggestions?bank_transaction_id=
+    Top-k des factures candidates pour une transaction.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    transaction_id = request.query_params.get("bank_transaction_id")
+    if not transaction_id:
+        return Response({"error": "bank_transaction_id requis"}, status=400)
+
+    try:
+        limit = int(request.query_params.get("limit", SUGGESTIONS_DEFAULT_LIMIT))
+    except ValueError:
+        return Response({"error": "limit invalide"}, status=400)
+    limit = max(1, min(limit, SUGGESTIONS_MAX_LIMIT))
+
+    try:
+        transaction = BankTransaction.objects.only("date", "label", "amount").get(
+            id=transaction_id
+        )
+    except (BankTransaction.DoesNotExist, ValueError, ValidationError):
+        return Response({"error": "Transaction non trouvée"}, status=404)
+
+    index = open_invoice_index.get(entreprise_id)
+    suggestions = index.suggest(
+        to_cents(transaction.amount), transaction.date, transaction.label, k=limit
+    )
+
+    data = [
+        {
+            "invoice_id": str(s.candidate.id),
+            "invoice_number": s.candidate.number,
+            "customer_name": s.candidate.customer_name,
+            "remaining_amount": str(from_cents(s.candidate.amount_cents)),
+            "due_date": (
+                s.candidate.due_date.isoformat() if s.candidate.due_date else None
+            ),
+            "score": s.score,
+            "details": s.details,
+        }
+        for s in suggestions
+    ]
+    return Response(data)
+
+
+@extend_schema(
+    tags=["Treasury"],
+    summary="Paiements groupés",
+    description="Recherche les combinaisons de factures ouvertes d'un même client "
+    "dont la somme correspond au montant de la transaction.",
+    parameters=[
+        OpenApiParameter(
+            name="bank_transaction_id",
+            type=OpenApiTypes.UUID,
+            required=True,
+            description="Transaction à rapprocher",
+        ),
+        OpenApiParameter(
+            name="customer_id",
+            type=OpenApiTypes.UUID,
+            description="Client (déduit du libellé par défaut)",
+        ),
+        OpenApiParameter(
+            name="tolerance",
+            type=OpenApiTypes.DECIMAL,
+            description="Écart toléré sur le total (0 par défaut)",
+        ),
+    ],
+    responses={
+        200: ReconciliationGroupsSerializer,
+        400: ErrorSerializer,
+        401: ErrorSerializer,
+        404: ErrorSerializer,
+    },
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@tenant_required
+def reconciliation_groups(request):
+    """
+    GET /api/v1/reconciliations/groups?bank_transaction_id=
+    Combinaisons de factures réglées par un même virement.
+    """
+    entreprise_id = request.tenant.entreprise_id
+
+    transaction_id = request.query_params.get("bank_transaction_id")
+    if not transaction_id:
+        return Response({"error": "bank_transaction_id requis"}, status=400)
+
+    customer_id = request.query_params.get("customer_id")
+    try:
+        customer_id = uuid.UUID(customer_id) if customer_id else None
+    except ValueError:
+        return Response({"error": "customer_id invalide"}, status=400)
+    tolerance = _parse_amount(request.query_params.get("tolerance", "0"))
+    if tolerance is None or abs(tolerance) >= AMOUNT_LIMIT:
+        return Response(
+            {"error": f"tolerance invalide (inférieure à {AMOUNT_LIMIT})"}, status=400
+        )
+
+    try:
+        transaction = BankTransaction.objects.only("date", "label", "amount").get(
+            id=transaction_id
+        )
+    except (BankTransaction.DoesNotExist, ValueError, ValidationError):
+        return Response({"error": "Transaction non trouvée"}, status=404)
+
+    customer_id, result = suggest_invoice_groups(
+        entreprise_id,
+        transaction,
+        customer_id=customer_id,
+        tolerance_cents=abs(to_cents(tolerance)),
+    )
+    if result is None:
+        return Response(
+            {"error": "Client non identifié dans le libellé, customer_id requis"},
+            status=400,
+        )
+
+    groups = [
+        {
+            "invoices": [
+                {
+                    "invoice_id": str(c.id),
+                    "invoice_number": c.number,
+                    "remaining_amount": str(from_cents(c.amount_cents)),
+                    "due_date": c.due_date.isoformat() if c.due_date else None,
+                }
+                for c in group.invoices
+            ],
+            "total": str(from_cents(group.total_cents)),
+            "difference": str(from_cents(group.difference_cents)),
+        }
+        for group in result.groups
+    ]
+    return Response(
+        {
+            "customer_id": str(customer_id),
+            "timed_out": result.timed_out,
+            "groups": groups,
+        }
+    )
+
+
 @extend_schema(
     tags=["Treasury"],
     summary="Supprimer un rapprochement",
-    description="Supprime un rapprochement existant.",
+    description="Supprime un rapprochement existant et rétablit le reste à "
+    "payer de la facture.",
     responses={
         200: MessageSerializer,
         401: ErrorSerializer,
@@ -286,19 +829,16 @@ def reconciliation_create(request):
 )
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
+@tenant_required
 def reconciliation_delete(request, reconciliation_id):
     """
     DELETE /api/v1/reconciliations/{id}
     Suppression d'un rapprochement.
     """
-    entreprise = request.user.entreprise
-    if not entreprise:
-        return Response({"error": "Entreprise non définie"}, status=400)
-
     try:
-        reco = Reconciliation.objects.get(id=reconciliation_id, entreprise=entreprise)
+        reco = Reconciliation.objects.get(id=reconciliation_id)
     except Reconciliation.DoesNotExist:
         return Response({"error": "Rapprochement non trouvé"}, status=404)
 
-    reco.delete()
+    delete_reconciliation(reco)
     return Response({"message": "Rapprochement supprimé"})
@@ -26,6 +26,7 @@ class UserAdmin(admin.ModelAdmin):
         "is_active",
         "created_at",
     )
+    list_select_related = ("role", "entreprise")
     list_filter = ("is_active", "role", "entreprise")
     search_fields = ("email", "username")
     readonly_fields = ("id", "username", "created_at")
@@ -0,0 +1,21 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.sharding import mirror_reference, unmirror_reference
+
+from .models import Role, User
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_save, sender=User)
+def mirror_reference_row(sender, instance, using, **kwargs):
+    """Acteurs et rôles sont référencés par les données d'entreprise des shards."""
+    if using == DEFAULT_DB_ALIAS:
+        mirror_reference(instance)
+
+
+@receiver(post_delete, sender=User)
+def unmirror_user(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        unmirror_reference(instance)
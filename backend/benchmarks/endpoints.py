@@ -0,0 +1,778 @@
+"""
+Benchmark des endpoints de l'API sous charge concurrente.
+
+    BENCH_DATABASE_URL=postgres://... python -m benchmarks.endpoints \
+        --concurrency 1 8 32 --requests 200 --output bench.json \
+        --baseline baseline.json --threshold p95_ms=20%
+
+La base doit contenir un jeu de données (`manage.py generate_dataset`).
+L'API est démarrée sous gunicorn (`--workers`, `--threads`) sur cette base,
+avec un secret JWT propre au benchmark : les jetons des utilisateurs de
+`--tenants` entreprises, des plus grosses aux plus petites, sont signés
+ici. Chaque route de config/urls.py figure dans `SCENARIOS` ou dans
+`SKIPPED` (avec la raison) : une route nouvelle fait échouer le benchmark.
+
+Par route et par niveau de concurrence : latences p50/p95/p99, débit et
+réponses en erreur ; par route, requêtes SQL par appel (mesurées une fois,
+dans ce processus) et RSS du plus gros worker après la charge. Les
+écritures (création, validation, suppression) portent sur des lignes
+créées pour l'occasion, hors mesure. Les résultats sont écrits en JSON
+(`--output`) et comparés à `--baseline` : une dégradation au-delà des
+seuils fait échouer la commande. Client et serveur partagent la machine :
+comparer des résultats obtenus sur la même.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+import jwt
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+JWT_SECRET = "endpoint-benchmark-local-signing-secret"
+METRICS_TOKEN = "endpoint-benchmark-metrics-token"
+REQUEST_TIMEOUT = 60
+SERVER_START_TIMEOUT = 60
+IMPORT_ROWS = 50
+
+# Métrique -> sens de la dégradation (1 : hausse, -1 : baisse)
+METRICS = {
+    "p50_ms": 1,
+    "p95_ms": 1,
+    "p99_ms": 1,
+    "rps": -1,
+    "errors": 1,
+    "queries": 1,
+    "rss_mb": 1,
+}
+# Dégradation relative tolérée par métrique
+DEFAULT_THRESHOLDS = {
+    "p50_ms": 0.25,
+    "p95_ms": 0.25,
+    "p99_ms": 0.5,
+    "rps": 0.2,
+    "errors": 0.0,
+    "queries": 0.0,
+    "rss_mb": 0.2,
+}
+# En deçà, un écart de latence est du bruit de mesure
+DEFAULT_NOISE_MS = 2.0
+
+# Routes non mesurées : nom d'URL ou namespace -> raison
+SKIPPED = {
+    "admin": "interface d'administration (session Django, hors API)",
+    "authentication": "relais vers Supabase : latence d'un service externe",
+}
+
+
+class PrepareError(Exception):
+    """Échec d'une préparation (création de la ligne visée)."""
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    Appel mesuré de la route `route` (`namespace:nom`). `path` est formaté
+    avec le contexte de l'entreprise et ce que renvoie `prepare`.
+    """
+
+    route: str
+    path: str
+    method: str = "GET"
+    # (contexte, n) -> corps JSON
+    body: object = None
+    # (appel, contexte, n) -> valeurs du chemin, exécuté hors mesure
+    prepare: object = None
+    status: int = 200
+    # Jeton Bearer propre à la route (au lieu du JWT de l'entreprise)
+    token: str = ""
+
+
+def _json(response, status):
+    if response.status_code != status:
+        raise PrepareError(f"HTTP {response.status_code}")
+    return response.json()
+
+
+def _invoice_body(ctx, n):
+    today = date.today()
+    return {
+        "customer_id": ctx["customer"],
+        "issue_date": today.isoformat(),
+        "due_date": (today + timedelta(days=30)).isoformat(),
+    }
+
+
+def _rule_body(ctx, n):
+    return {"category": "Benchmark", "pattern": f"BENCH {ctx['nonce']} {n}"}
+
+
+def _import_body(ctx, n):
+    return {
+        "transactions": [
+            {"label": f"CB BENCH {ctx['nonce']} {n} {index}", "amount": "-9.99"}
+            for index in range(IMPORT_ROWS)
+        ]
+    }
+
+
+def _draft_invoice(call, ctx, n):
+    created = call("POST", "/api/v1/invoices/create", _invoice_body(ctx, n))
+    return {"draft": _json(created, 201)["id"]}
+
+
+def _credit(call, ctx, n):
+    created = call(
+        "POST",
+        "/api/v1/treasury/bank-transactions/create",
+        {"label": f"VIR BENCH {ctx['nonce']} {n}", "amount": "0.01"},
+    )
+    return {"credit": _json(created, 201)["id"]}
+
+
+def _rule(call, ctx, n):
+    created = call("POST", "/api/v1/treasury/category-rules/create", _rule_body(ctx, n))
+    return {"rule": _json(created, 201)["id"]}
+
+
+def _reconciliation(call, ctx, n):
+    created = call(
+        "POST",
+        "/api/v1/treasury/reconciliations/create",
+        {
+            "invoice_id": ctx["invoice"],
+            "bank_transaction_id": _credit(call, ctx, n)["credit"],
+            "matched_amount": "0.01",
+        },
+    )
+    return {"reconciliation": _json(created, 201)["id"]}
+
+
+SCENARIOS = {
+    "me": Scenario("users:me", "/api/v1/me"),
+    "companies": Scenario("companies:list", "/api/v1/companies/"),
+    "company create": Scenario(
+        "companies:create",
+        "/api/v1/companies/create",
+        "POST",
+        body=lambda ctx, n: {
+            "name": f"Benchmark {ctx['nonce']} {n}",
+            "siret": f"9{ctx['nonce']:05d}{n:08d}",
+        },
+        status=201,
+    ),
+    "company detail": Scenario("companies:detail", "/api/v1/companies/{company}"),
+    "invoices": Scenario("invoices:list", "/api/v1/invoices/"),
+    "invoices issued": Scenario("invoices:list", "/api/v1/invoices/?status=ISSUED"),
+    "invoice create": Scenario(
+        "invoices:create",
+        "/api/v1/invoices/create",
+        "POST",
+        body=_invoice_body,
+        status=201,
+    ),
+    "invoice detail": Scenario("invoices:detail", "/api/v1/invoices/{invoice}"),
+    "invoice validate": Scenario(
+        "invoices:validate",
+        "/api/v1/invoices/{draft}/validate",
+        "POST",
+        prepare=_draft_invoice,
+    ),
+    "invoice cancel": Scenario(
+        "invoices:cancel",
+        "/api/v1/invoices/{draft}/cancel",
+        "POST",
+        prepare=_draft_invoice,
+    ),
+    "customers": Scenario("invoices:customer_list", "/api/v1/invoices/customers"),
+    "customer create": Scenario(
+        "invoices:customer_create",
+        "/api/v1/invoices/customers/create",
+        "POST",
+        body=lambda ctx, n: {"name": f"Client benchmark {ctx['nonce']} {n}"},
+        status=201,
+    ),
+    "dashboard": Scenario("treasury:dashboard", "/api/v1/treasury/dashboard"),
+    "forecast": Scenario("treasury:forecast", "/api/v1/treasury/forecast"),
+    "recurring series": Scenario(
+        "treasury:recurring_series_list", "/api/v1/treasury/recurring-series"
+    ),
+    "transactions": Scenario(
+        "treasury:transaction_list", "/api/v1/treasury/bank-transactions"
+    ),
+    "transactions flagged": Scenario(
+        "treasury:transaction_list", "/api/v1/treasury/bank-transactions?flagged=1"
+    ),
+    "transaction create": Scenario(
+        "treasury:transaction_create",
+        "/api/v1/treasury/bank-transactions/create",
+        "POST",
+        body=lambda ctx, n: {
+            "label": f"CB BENCH {ctx['nonce']} {n}",
+            "amount": "-12.5",
+        },
+        status=201,
+    ),
+    "transaction import": Scenario(
+        "treasury:transaction_import",
+        "/api/v1/treasury/bank-transactions/import",
+        "POST",
+        body=_import_body,
+        status=201,
+    ),
+    "category rules": Scenario(
+        "treasury:category_rule_list", "/api/v1/treasury/category-rules"
+    ),
+    "category rule create": Scenario(
+        "treasury:category_rule_create",
+        "/api/v1/treasury/category-rules/create",
+        "POST",
+        body=_rule_body,
+        status=201,
+    ),
+    "category rule delete": Scenario(
+        "treasury:category_rule_delete",
+        "/api/v1/treasury/category-rules/{rule}",
+        "DELETE",
+        prepare=_rule,
+    ),
+    "reconciliations": Scenario(
+        "treasury:reconciliation_list", "/api/v1/treasury/reconciliations"
+    ),
+    "reconciliation create": Scenario(
+        "treasury:reconciliation_create",
+        "/api/v1/treasury/reconciliations/create",
+        "POST",
+        body=lambda ctx, n: {
+            "invoice_id": ctx["invoice"],
+            "bank_transaction_id": ctx["credit"],
+            "matched_amount": "0.01",
+        },
+        prepare=_credit,
+        status=201,
+    ),
+    "reconciliation suggestions": Scenario(
+        "treasury:reconciliation_suggestions",
+        "/api/v1/treasury/reconciliations/suggestions"
+        "?bank_transaction_id={transaction}",
+    ),
+    "reconciliation groups": Scenario(
+        "treasury:reconciliation_groups",
+        "/api/v1/treasury/reconciliations/groups"
+        "?bank_transaction_id={transaction}&customer_id={customer}",
+    ),
+    "reconciliation delete": Scenario(
+        "treasury:reconciliation_delete",
+        "/api/v1/treasury/reconciliations/{reconciliation}",
+        "DELETE",
+        prepare=_reconciliation,
+    ),
+    "audit logs": Scenario("audit:audit_log_list", "/api/v1/audit/logs"),
+    "audit proof": Scenario(
+        "audit:audit_entry_proof", "/api/v1/audit/logs/{audit_entry}/proof"
+    ),
+    "schema": Scenario("schema", "/api/schema/"),
+    "swagger": Scenario("swagger-ui", "/api/docs/"),
+    "redoc": Scenario("redoc", "/api/redoc/"),
+    "metrics": Scenario("metrics", "/metrics", token=METRICS_TOKEN),
+}
+
+
+def discover_routes():
+    """Routes de config/urls.py : nom (`namespace:nom`) -> motif."""
+    from django.urls import URLResolver, get_resolver
+
+    def walk(patterns, prefix, namespace):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                yield from walk(
+                    pattern.url_patterns, route, pattern.namespace or namespace
+                )
+                continue
+            name = pattern.name or route
+            yield (f"{namespace}:{name}" if namespace else name), route
+
+    return dict(walk(get_resolver().url_patterns, "", None))
+
+
+def uncovered_routes(routes, scenarios=SCENARIOS, skipped=SKIPPED):
+    """Routes ni mesurées ni écartées explicitement."""
+    covered = {scenario.route for scenario in scenarios.values()}
+    return sorted(
+        name
+        for name in routes
+        if name not in covered
+        and name not in skipped
+        and name.partition(":")[0] not in skipped
+    )
+
+
+def tenant_contexts(count):
+    """
+    Contexte de `count` entreprises réparties des plus grosses aux plus
+    petites (en factures) : jeton de leur premier utilisateur et lignes
+    existantes visées par les routes de détail.
+    """
+    from django.db.models import Count
+
+    from apps.audit.models import AuditLog
+    from apps.invoices.models import Customer, Invoice
+    from apps.treasury.models import BankTransaction
+    from apps.users.models import User
+
+    ranked = [
+        row["entreprise_id"]
+        for row in Invoice.objects.values("entreprise_id")
+        .annotate(size=Count("id"))
+        .order_by("-size", "entreprise_id")
+    ]
+    chosen = [ranked[index * len(ranked) // count] for index in range(count)]
+    expires = datetime.now(UTC) + timedelta(days=1)
+    nonce = random.randrange(100_000)
+    contexts = []
+    for entreprise_id in dict.fromkeys(chosen):
+        user = (
+            User.objects.filter(entreprise_id=entreprise_id, is_active=True)
+            .order_by("created_at")
+            .first()
+        )
+        if user is None:
+            continue
+        rows = {
+            "invoice": Invoice.objects.for_tenant(entreprise_id),
+            "customer": Customer.objects.for_tenant(entreprise_id),
+            "transaction": BankTransaction.objects.for_tenant(entreprise_id)
+            .filter(amount__gt=0)
+            .order_by("-date"),
+            "audit_entry": AuditLog.objects.for_tenant(entreprise_id).filter(
+                batch__isnull=False
+            ),
+        }
+        context = {
+            "company": str(entreprise_id),
+            "nonce": nonce,
+            "token": jwt.encode(
+                {"sub": user.username, "aud": "authenticated", "exp": expires},
+                JWT_SECRET,
+                "HS256",
+            ),
+        }
+        for key, queryset in rows.items():
+            row_id = queryset.values_list("id", flat=True).first()
+            if row_id is not None:
+                context[key] = str(row_id)
+        contexts.append(context)
+    return contexts
+
+
+def http_caller(base_url, token):
+    """`call(method, path, body)` via HTTP, authentifié par `token`."""
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+
+    def call(method, path, body=None):
+        return session.request(
+            method, base_url + path, json=body, timeout=REQUEST_TIMEOUT
+        )
+
+    return call
+
+
+def local_caller(token):
+    """`call(method, path, body)` dans ce processus (client de test Django)."""
+    from django.test import Client
+
+    client = Client(HTTP_HOST="127.0.0.1", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def call(method, path, body=None):
+        return client.generic(
+            method,
+            path,
+            json.dumps(body) if body is not None else "",
+            content_type="application/json",
+        )
+
+    return call
+
+
+def _request(scenario, call, ctx, n):
+    """`(méthode, chemin, corps)` de l'appel `n`, préparation comprise."""
+    values = dict(ctx)
+    if scenario.prepare:
+        values.update(scenario.prepare(call, ctx, n))
+    body = scenario.body(values, n) if scenario.body else None
+    return scenario.method, scenario.path.format(**values), body
+
+
+def count_queries(scenario, ctx):
+    """Requêtes SQL d'un appel, caches chauds (second appel)."""
+    from apps.common.query_plans import capture_queries
+
+    call = local_caller(scenario.token or ctx["token"])
+    for n in range(2):
+        request = _request(scenario, call, ctx, n)
+        with capture_queries() as captured:
+            response = call(*request)
+    if response.status_code != scenario.status:
+        raise PrepareError(f"HTTP {response.status_code}")
+    return sum(1 for query in captured if query.counted)
+
+
+def percentile(values, fraction):
+    """Percentile `fraction` (0-1) de `values`, par interpolation linéaire."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(latencies, errors, elapsed):
+    """Métriques d'un niveau de charge (latences en secondes)."""
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(milliseconds, 0.5), 2),
+        "p95_ms": round(percentile(milliseconds, 0.95), 2),
+        "p99_ms": round(percentile(milliseconds, 0.99), 2),
+        "mean_ms": round(statistics.fmean(milliseconds), 2),
+        "rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+def run_load(base_url, scenario, contexts, concurrency, total, warmup, offset):
+    """
+    `warmup` puis `total` appels de `scenario`, répartis entre les
+    entreprises, par `concurrency` clients simultanés.
+    """
+    tokens = {ctx["token"]: scenario.token or ctx["token"] for ctx in contexts}
+    callers = {token: http_caller(base_url, token) for token in tokens.values()}
+    # Préparations hors mesure, séquentielles
+    calls = []
+    for n in range(offset, offset + warmup + total):
+        ctx = contexts[n % len(contexts)]
+        token = tokens[ctx["token"]]
+        calls.append((token, *_request(scenario, callers[token], ctx, n)))
+
+    local = threading.local()
+
+    def send(call):
+        token, method, path, body = call
+        sessions = local.__dict__.setdefault("callers", {})
+        if token not in sessions:
+            sessions[token] = http_caller(base_url, token)
+        started = time.perf_counter()
+        try:
+            failed = sessions[token](method, path, body).status_code != scenario.status
+        except requests.RequestException:
+            failed = True
+        return time.perf_counter() - started, failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, calls[:warmup]))
+        started = time.perf_counter()
+        outcomes = list(pool.map(send, calls[warmup:]))
+        elapsed = time.perf_counter() - started
+    return summarize(
+        [latency for latency, _ in outcomes],
+        sum(failed for _, failed in outcomes),
+        elapsed,
+    )
+
+
+def worker_rss(master_pid):
+    """RSS (Mo) des workers gunicorn de `master_pid`, via /proc (Linux)."""
+    rss = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # pid (comm) state ppid ... : comm peut contenir des espaces
+            parent = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+            if parent != master_pid:
+                continue
+            status = (stat.parent / "status").read_text()
+        except (OSError, IndexError, ValueError):
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                rss.append(round(int(line.split()[1]) / 1024, 1))
+    return sorted(rss)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(env, workers, threads):
+    """API sous gunicorn sur un port libre : `(url, pid du maître)`."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--log-level",
+            "warning",
+            "config.wsgi:application",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"gunicorn arrêté (code {process.returncode})")
+            try:
+                requests.get(f"{base_url}/api/v1/me", timeout=REQUEST_TIMEOUT)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+        yield base_url, process.pid
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def parse_threshold(value):
+    """`p95_ms=20%` ou `p95_ms=0.2` -> `("p95_ms", 0.2)`."""
+    metric, _, raw = value.partition("=")
+    if metric not in METRICS or not raw:
+        raise argparse.ArgumentTypeError(
+            f"seuil invalide : {value} (métriques : {', '.join(METRICS)})"
+        )
+    try:
+        if raw.endswith("%"):
+            return metric, float(raw[:-1]) / 100
+        return metric, float(raw)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"seuil invalide : {value}") from err
+
+
+def _degraded(metric, value, reference, threshold, noise_ms):
+    if value is None or reference is None:
+        return False
+    delta = (value - reference) * METRICS[metric]
+    if metric.endswith("_ms") and delta <= noise_ms:
+        return False
+    return delta > abs(reference) * threshold
+
+
+def compare(results, baseline, thresholds=None, noise_ms=DEFAULT_NOISE_MS):
+    """
+    Dégradations de `results` par rapport à `baseline` (même format),
+    sur les endpoints et niveaux de concurrence communs.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    regressions = []
+    for label, entry in results["endpoints"].items():
+        reference = baseline["endpoints"].get(label)
+        if reference is None:
+            continue
+        pairs = [("", entry, reference)]
+        pairs += [
+            (f" c={level}", metrics, reference["levels"][level])
+            for level, metrics in entry["levels"].items()
+            if level in reference["levels"]
+        ]
+        for where, current, previous in pairs:
+            for metric, threshold in thresholds.items():
+                if metric not in current or metric not in previous:
+                    continue
+                value, old = current[metric], previous[metric]
+                if _degraded(metric, value, old, threshold, noise_ms):
+                    change = f" ({(value - old) / old:+.0%})" if old else ""
+                    regressions.append(
+                        f"{label}{where} {metric} : {old} -> {value}{change}, "
+                        f"seuil {threshold:.0%}"
+                    )
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    routes = discover_routes()
+    missing = uncovered_routes(routes)
+    if missing:
+        sys.exit(f"Routes sans scénario ni exclusion : {', '.join(missing)}")
+    scenarios = {
+        label: scenario
+        for label, scenario in SCENARIOS.items()
+        if not args.only or any(part in label for part in args.only)
+    }
+    contexts = tenant_contexts(args.tenants)
+    if not contexts:
+        sys.exit("Aucune entreprise avec factures : lancer generate_dataset")
+
+    results = {
+        "meta": {
+            "started_at": datetime.now(UTC).isoformat(),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "threads": args.threads,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "tenants": len(contexts),
+        },
+        "endpoints": {},
+        "skipped": {},
+    }
+    print(
+        f"{'endpoint':<28} {'c':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'req/s':>8} {'err':>5} {'queries':>8} {'rss MB':>7}"
+    )
+    env = {
+        **os.environ,
+        "DEBUG": "False",
+        "ALLOWED_HOSTS": "127.0.0.1,localhost",
+    }
+    with server(env, args.workers, args.threads) as (base_url, master_pid):
+        offset = 0
+        for label, scenario in scenarios.items():
+            try:
+                entry = {
+                    "route": scenario.route,
+                    "method": scenario.method,
+                    "queries": count_queries(scenario, contexts[0]),
+                    "levels": {},
+                }
+                for concurrency in args.concurrency:
+                    entry["levels"][str(concurrency)] = run_load(
+                        base_url,
+                        scenario,
+                        contexts,
+                        concurrency,
+                        args.requests,
+                        args.warmup,
+                        offset,
+                    )
+                    offset += args.requests + args.warmup
+            except (KeyError, PrepareError) as err:
+                reason = (
+                    f"données absentes : {err}"
+                    if isinstance(err, KeyError)
+                    else f"préparation : {err}"
+                )
+                results["skipped"][label] = reason
+                print(f"{label:<28} ignoré ({reason})")
+                continue
+            entry["rss_mb"] = max(worker_rss(master_pid), default=None)
+            results["endpoints"][label] = entry
+            for level, metrics in entry["levels"].items():
+                print(
+                    f"{label:<28} {level:>4} {metrics['p50_ms']:>8.1f} "
+                    f"{metrics['p95_ms']:>8.1f} {metrics['p99_ms']:>8.1f} "
+                    f"{metrics['rps']:>8.1f} {metrics['errors']:>5} "
+                    f"{entry['queries']:>8} {entry['rss_mb'] or 0:>7.0f}"
+                )
+        results["meta"]["worker_rss_mb"] = worker_rss(master_pid)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help="Base de test avec jeu de données (défaut : $BENCH_DATABASE_URL).",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Appels mesurés par niveau."
+    )
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument(
+        "--only", nargs="+", help="Endpoints dont le nom contient l'un des motifs."
+    )
+    parser.add_argument("--output", type=Path, help="Résultats JSON.")
+    parser.add_argument("--baseline", type=Path, help="Résultats de référence.")
+    parser.add_argument(
+        "--threshold",
+        type=parse_threshold,
+        action="append",
+        default=[],
+        help="Dégradation tolérée, ex. p95_ms=20%% (répétable).",
+    )
+    parser.add_argument("--noise-ms", type=float, default=DEFAULT_NOISE_MS)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url ou BENCH_DATABASE_URL requis")
+
+    # Serveur et mesures en processus sur la même base et le même secret
+    os.environ.update(
+        DATABASE_URL=args.database_url,
+        SUPABASE_JWT_SECRET=JWT_SECRET,
+        METRICS_TOKEN=METRICS_TOKEN,
+        DEBUG="False",
+    )
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+    results = run(args)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(
+            results,
+            json.loads(args.baseline.read_text()),
+            dict(args.threshold),
+            args.noise_ms,
+        )
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Aucune régression par rapport à {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark du solveur de paiements groupés.
+
+    python -m benchmarks.grouping --open-items 10 50 200 1000 --runs 200
+
+Pour chaque volume de factures ouvertes d'un client, des virements sont
+construits à partir de 1 à `--group-size` factures tirées au hasard, puis
+résolus avec les bornes par défaut de `find_invoice_groups`.
+"""
+
+import argparse
+import random
+import statistics
+from datetime import date, timedelta
+
+from apps.treasury.grouping import find_invoice_groups
+from apps.treasury.matching import InvoiceCandidate
+
+
+def _open_items(rng, count, today):
+    # Montants log-normaux (médiane ~ 800 €), échéances étalées sur 6 mois
+    return [
+        InvoiceCandidate(
+            id=i,
+            number=f"FAC-{i:05d}",
+            amount_cents=max(100, int(rng.lognormvariate(11.3, 0.9))),
+            issue_date=today - timedelta(days=rng.randint(30, 210)),
+            due_date=today - timedelta(days=rng.randint(-30, 180)),
+        )
+        for i in range(count)
+    ]
+
+
+def run(open_items, runs, group_size, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    print(
+        f"{'open items':>10} {'p50 ms':>8} {'p99 ms':>8} {'found':>7} {'timeouts':>9}"
+    )
+    for count in open_items:
+        timings, found, timeouts = [], 0, 0
+        for _ in range(runs):
+            invoices = _open_items(rng, count, today)
+            # Comme en production : les échéances les plus proches d'abord
+            invoices.sort(key=lambda c: abs((today - c.due_date).days))
+            paid = rng.sample(
+                invoices[:20], min(len(invoices), rng.randint(1, group_size))
+            )
+            target = sum(c.amount_cents for c in paid)
+
+            result = find_invoice_groups(target, invoices)
+            timings.append(result.elapsed * 1000)
+            found += bool(result.groups)
+            timeouts += result.timed_out
+
+        timings.sort()
+        print(
+            f"{count:>10} {statistics.median(timings):>8.2f} "
+            f"{timings[int(len(timings) * 0.99) - 1]:>8.2f} "
+            f"{found / runs:>7.0%} {timeouts:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--open-items", type=int, nargs="+", default=[10, 50, 200, 1000]
+    )
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.open_items, args.runs, args.group_size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark de l'élagage de partitions sur les requêtes de trésorerie.
+
+    BENCH_DATABASE_URL=postgres://... python -m benchmarks.partitioning \
+        --rows 5000000 --tenants 500 --months 36
+
+Charge deux tables de même forme que `treasury_banktransaction`, l'une
+simple, l'autre partitionnée par mois de `date`, puis compare (EXPLAIN
+ANALYZE) les requêtes du dashboard et de la liste des transactions : durée
+médiane, partitions effectivement lues et pages touchées. À lancer sur une
+base de test : les tables sont créées puis supprimées.
+"""
+
+import argparse
+import os
+import random
+import statistics
+from datetime import date
+
+import psycopg
+
+from apps.common.partitioning import add_months
+
+PLAIN, PARTITIONED = "bench_tx_plain", "bench_tx_part"
+START = date(2024, 1, 1)
+
+COLUMNS = """
+    id uuid NOT NULL,
+    entreprise_id integer NOT NULL,
+    date date NOT NULL,
+    label varchar(255) NOT NULL,
+    amount numeric(12, 2) NOT NULL,
+    created_at timestamptz NOT NULL
+"""
+
+# Requêtes des vues (apps.treasury.views), paramètres : entreprise, aujourd'hui
+QUERIES = {
+    # Dashboard, dernières transactions sur la première fenêtre de latest_rows
+    "dashboard recent": (
+        "SELECT * FROM {table} WHERE entreprise_id = %(tenant)s "
+        "AND date >= %(window)s ORDER BY date DESC, created_at DESC LIMIT 20"
+    ),
+    # Liste filtrée sur un mois (from_date / to_date)
+    "list month": (
+        "SELECT * FROM {table} WHERE entreprise_id = %(tenant)s "
+        "AND date >= %(month)s AND date < %(month_end)s ORDER BY date DESC LIMIT 25"
+    ),
+    # Total d'un trimestre (solde, flux)
+    "quarter total": (
+        "SELECT sum(amount) FROM {table} WHERE entreprise_id = %(tenant)s "
+        "AND date >= %(quarter)s AND date < %(month_end)s"
+    ),
+}
+
+
+def _create(cursor, rows, tenants, months):
+    days = (add_months(START, months) - START).days
+    for table in (PLAIN, PARTITIONED):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"CREATE TABLE {PLAIN} ({COLUMNS}, PRIMARY KEY (id))")
+    cursor.execute(
+        f"CREATE TABLE {PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, date)) "
+        "PARTITION BY RANGE (date)"
+    )
+    for index in range(months):
+        month = add_months(START, index)
+        cursor.execute(
+            f"CREATE TABLE {PARTITIONED}_p{month:%Y%m} PARTITION OF {PARTITIONED} "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        )
+    cursor.execute(
+        f"INSERT INTO {PLAIN} SELECT gen_random_uuid(), "
+        f"(random() * {tenants - 1})::int, "
+        f"%s::date + (random() * {days - 1})::int, 'VIR SEPA', "
+        "round((random() * 2000 - 1000)::numeric, 2), now() "
+        "FROM generate_series(1, %s)",
+        [START, rows],
+    )
+    cursor.execute(f"INSERT INTO {PARTITIONED} SELECT * FROM {PLAIN}")
+    for table in (PLAIN, PARTITIONED):
+        cursor.execute(f"CREATE INDEX ON {table} (entreprise_id, date)")
+        cursor.execute(f"VACUUM ANALYZE {table}")
+
+
+def _scans(plan):
+    """(partitions lues, pages touchées) d'un plan EXPLAIN ANALYZE JSON."""
+    relations = set()
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if "Relation Name" in node and node.get("Actual Loops", 0) > 0:
+            relations.add(node["Relation Name"])
+        stack.extend(node.get("Plans", []))
+    return len(relations), plan["Shared Hit Blocks"] + plan["Shared Read Blocks"]
+
+
+def run(database_url, rows, tenants, months, runs, seed):
+    rng = random.Random(seed)
+    today = add_months(START, months - 1).replace(day=15)
+    month = add_months(START, months // 2)
+    params = {
+        "window": add_months(today.replace(day=1), -3),
+        "month": month,
+        "month_end": add_months(month, 1),
+        "quarter": add_months(month, -2),
+    }
+    with (
+        psycopg.connect(database_url, autocommit=True) as connection,
+        connection.cursor() as cursor,
+    ):
+        _create(cursor, rows, tenants, months)
+        print(
+            f"{'query':>16} {'table':>12} {'p50 ms':>8} {'partitions':>11} "
+            f"{'pages':>7}"
+        )
+        for name, sql in QUERIES.items():
+            for table in (PLAIN, PARTITIONED):
+                timings, scanned, pages = [], [], []
+                for _ in range(runs):
+                    cursor.execute(
+                        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+                        + sql.format(table=table),
+                        {**params, "tenant": rng.randrange(tenants)},
+                    )
+                    explained = cursor.fetchone()[0][0]
+                    timings.append(explained["Execution Time"])
+                    partitions, touched = _scans(explained["Plan"])
+                    scanned.append(partitions)
+                    pages.append(touched)
+                print(
+                    f"{name:>16} {table:>12} {statistics.median(timings):>8.2f} "
+                    f"{max(scanned):>11} {statistics.median(pages):>7.0f}"
+                )
+        for table in (PLAIN, PARTITIONED):
+            cursor.execute(f"DROP TABLE {table}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help="Base PostgreSQL de test (défaut : $BENCH_DATABASE_URL).",
+    )
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url ou BENCH_DATABASE_URL requis")
+    run(args.database_url, args.rows, args.tenants, args.months, args.runs, args.seed)
+
+
+if __name__ == "__main__":
+    main()
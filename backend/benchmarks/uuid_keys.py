@@ -0,0 +1,113 @@
+"""
+Benchmark des clés primaires UUID v4 (aléatoires) et v7 (ordonnées).
+
+    BENCH_DATABASE_URL=postgres://... python -m benchmarks.uuid_keys \
+        --rows 1000000 5000000 --batch 10000
+
+Pour chaque volume, charge une table jetable (forme de `BankTransaction`)
+par lots de `--batch` lignes via COPY, avec des clés `uuid4` puis `uuid7`,
+et mesure le débit d'insertion, la taille de l'index de clé primaire et le
+volume de WAL généré. À lancer sur une base de test : les tables sont
+créées puis supprimées.
+"""
+
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+import psycopg
+
+from apps.common.ids import uuid7
+
+TABLE = "bench_uuid_keys"
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def _rows(rng, count, new_id):
+    start = date(2024, 1, 1)
+    for i in range(count):
+        yield (
+            new_id(),
+            start + timedelta(days=i % 730),
+            f"VIR SEPA {rng.randrange(100_000):05d}",
+            rng.randrange(-500_000, 500_000) / 100,
+        )
+
+
+def _load(connection, rows, batch, new_id, seed):
+    rng = random.Random(seed)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(
+            f"CREATE TABLE {TABLE} (id uuid PRIMARY KEY, date date NOT NULL, "
+            "label varchar(255) NOT NULL, amount numeric(12, 2) NOT NULL)"
+        )
+        cursor.execute("CHECKPOINT")
+        cursor.execute("SELECT pg_current_wal_lsn()")
+        wal_start = cursor.fetchone()[0]
+
+        started = time.perf_counter()
+        remaining = rows
+        generated = _rows(rng, rows, new_id)
+        while remaining:
+            size = min(batch, remaining)
+            with cursor.copy(
+                f"COPY {TABLE} (id, date, label, amount) FROM STDIN"
+            ) as copy:
+                for _ in range(size):
+                    copy.write_row(next(generated))
+            connection.commit()
+            remaining -= size
+        elapsed = time.perf_counter() - started
+
+        cursor.execute(
+            "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s), "
+            "pg_relation_size(%s), pg_relation_size(%s)",
+            [wal_start, f"{TABLE}_pkey", TABLE],
+        )
+        wal, index_size, table_size = cursor.fetchone()
+        cursor.execute(f"DROP TABLE {TABLE}")
+    connection.commit()
+    return elapsed, int(wal), index_size, table_size
+
+
+def run(database_url, rows, batch, seed):
+    mb = 1024 * 1024
+    print(
+        f"{'rows':>10} {'keys':>6} {'rows/s':>9} {'pkey MB':>8} "
+        f"{'table MB':>9} {'WAL MB':>8}"
+    )
+    with psycopg.connect(database_url) as connection:
+        for count in rows:
+            for name, new_id in GENERATORS.items():
+                elapsed, wal, index_size, table_size = _load(
+                    connection, count, batch, new_id, seed
+                )
+                print(
+                    f"{count:>10} {name:>6} {count / elapsed:>9.0f} "
+                    f"{index_size / mb:>8.1f} {table_size / mb:>9.1f} "
+                    f"{wal / mb:>8.1f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help="Base PostgreSQL de test (défaut : $BENCH_DATABASE_URL).",
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url ou BENCH_DATABASE_URL requis")
+    run(args.database_url, args.rows, args.batch, args.seed)
+
+
+if __name__ == "__main__":
+    main()
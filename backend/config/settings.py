@@ -11,11 +11,13 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
-import dj_database_url
 from dotenv import load_dotenv
 
+from apps.common.pooling import database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -55,6 +57,7 @@ INSTALLED_APPS = [
     "drf_spectacular",
     "corsheaders",
     # Local apps
+    "apps.common",
     "apps.users",
     "apps.companies",
     "apps.invoices",
@@ -63,6 +66,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En tête : mesurent aussi les autres middlewares (métriques d'abord,
+    # qui lisent le décompte SQL de la requête)
+    "apps.common.metrics.MetricsMiddleware",
+    "apps.common.query_count.QueryCountMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -70,6 +77,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.common.tenancy.TenantMiddleware",
+    "apps.common.replicas.ReplicaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -97,11 +106,61 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    "default": dj_database_url.config(
-        default=os.getenv("DATABASE_URL"), conn_max_age=600, ssl_require=True
-    )
-}
+# Pool de connexions par alias (apps.common.pooling, variables DB_POOL_*)
+DATABASES = {"default": database(os.getenv("DATABASE_URL"), "default")}
+
+# Réplicas en lecture (apps.common.replicas), séparées par des virgules
+DATABASE_REPLICAS = []
+for index, url in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), start=1
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = database(url, alias)
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+# Shards (apps.common.sharding) : "shard_1=postgres://...,shard_2=postgres://..."
+DATABASE_SHARDS = []
+for entry in filter(None, os.getenv("DATABASE_SHARD_URLS", "").split(",")):
+    alias, url = entry.split("=", 1)
+    DATABASES[alias] = database(url, alias)
+    DATABASE_SHARDS.append(alias)
+
+DATABASE_ROUTERS = [
+    "apps.common.sharding.ShardRouter",
+    "apps.common.replicas.ReplicaRouter",
+]
+# Durée maximale pendant laquelle les lectures d'un utilisateur restent sur
+# le primaire après une écriture (secondes)
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "30"))
+# Retard de rejeu au-delà duquel une réplica est écartée (secondes)
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "10"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+
+# Cache partagé par les workers et les instances : versions des caches par
+# entreprise (apps.common.cache). Sans REDIS_URL, cache local au processus :
+# une invalidation n'atteint alors les autres workers qu'à l'expiration de
+# leurs entrées
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+# Instrumentation SQL par requête (apps.common.query_count) : en-têtes
+# X-DB-*, log par requête, exception en cas de N+1 (tests)
+QUERY_COUNT_HEADERS = os.getenv("QUERY_COUNT_HEADERS", str(DEBUG)) == "True"
+QUERY_COUNT_LOG = os.getenv("QUERY_COUNT_LOG", "True") == "True"
+QUERY_COUNT_RAISE = os.getenv("QUERY_COUNT_RAISE", "False") == "True"
+# Répétitions d'une même SELECT à partir desquelles un N+1 est signalé
+QUERY_COUNT_N_PLUS_ONE = int(os.getenv("QUERY_COUNT_N_PLUS_ONE", "5"))
+
+# Jeton Bearer exigé sur /metrics (apps.common.metrics) ; vide : /metrics
+# refusé, sauf en DEBUG
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
 # DATABASES = {
 #     'default': {
@@ -157,6 +216,18 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
 
+# Audit : écriture asynchrone par lots (apps.audit.writer)
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "True") == "True"
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_SPILL_DIR = os.getenv(
+    "AUDIT_SPILL_DIR", os.path.join(tempfile.gettempdir(), "audit-spill")
+)
+# Mois conservés en base avant archivage colonnaire (apps.audit.retention)
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", str(BASE_DIR / "audit-archive"))
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -185,6 +256,7 @@ SPECTACULAR_SETTINGS = {
         {"name": "Invoices", "description": "Facturation"},
         {"name": "Customers", "description": "Gestion des clients"},
         {"name": "Treasury", "description": "Trésorerie et rapprochements"},
+        {"name": "Audit", "description": "Journal d'audit scellé"},
     ],
     "EXTENSIONS": [
         "apps.authentication.schema",
@@ -208,6 +280,7 @@ CORS_ALLOW_HEADERS = [
     "origin",
     "user-agent",
     "x-csrftoken",
+    "x-company-id",
     "x-requested-with",
 ]
 
@@ -20,6 +20,8 @@ from django.urls import include, path
 from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView,
                                    SpectacularSwaggerView)
 
+from apps.common.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     # API v1
@@ -28,6 +30,7 @@ urlpatterns = [
     path("api/v1/companies/", include("apps.companies.urls")),
     path("api/v1/invoices/", include("apps.invoices.urls")),
     path("api/v1/treasury/", include("apps.treasury.urls")),
+    path("api/v1/audit/", include("apps.audit.urls")),
     # Documentation API
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -36,4 +39,6 @@ urlpatterns = [
         name="swagger-ui",
     ),
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+    # Métriques Prometheus
+    path("metrics", metrics_view, name="metrics"),
 ]
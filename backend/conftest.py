@@ -0,0 +1,41 @@
+"""
+Configuration pytest commune.
+
+Django est initialisé comme sous `manage.py` (`config.settings` par défaut),
+que pytest soit lancé depuis backend/ ou depuis la racine du dépôt : ce
+fichier place backend/ dans `sys.path`.
+
+Les tests marqués `django_db` tournent sur la base de test créée par
+pytest-django à partir de DATABASE_URL ; sans pytest-django ou sans base
+configurée, ils sont sautés.
+"""
+
+import importlib.util
+import os
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+PYTEST_DJANGO = importlib.util.find_spec("pytest_django") is not None
+
+
+def pytest_configure(config):
+    if not PYTEST_DJANGO:
+        config.addinivalue_line(
+            "markers", "django_db: test sur base (requiert pytest-django)"
+        )
+    django.setup()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    if item.get_closest_marker("django_db") is None:
+        return
+    from django.conf import settings
+
+    if not PYTEST_DJANGO:
+        pytest.skip("pytest-django requis")
+    if not settings.DATABASES.get("default", {}).get("ENGINE"):
+        pytest.skip("DATABASE_URL non défini")
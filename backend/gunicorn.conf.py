@@ -0,0 +1,34 @@
+"""
+Configuration gunicorn, chargée automatiquement depuis ce dossier.
+
+Métriques Prometheus en mode multiprocessus (apps/common/metrics.py) :
+chaque worker écrit dans `PROMETHEUS_MULTIPROC_DIR`, vidé au démarrage du
+maître ; les fichiers d'un worker arrêté sont marqués morts pour que ses
+jauges disparaissent de l'agrégat.
+"""
+
+import os
+import shutil
+import tempfile
+
+# Un dossier par maître : deux serveurs sur la même machine ne partagent rien
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), f"prometheus-multiproc-{os.getpid()}"),
+)
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
@@ -0,0 +1,76 @@
+import uuid
+
+import numpy as np
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common.tenancy import TenantContext
+from apps.treasury import anomalies
+from apps.treasury.views import transaction_create
+from apps.users.models import User
+
+
+def test_merged_moments_match_full_history():
+    rng = np.random.default_rng(7)
+    codes = rng.integers(0, 4, 200)
+    values = rng.normal(-5000, 300, 200)
+
+    whole = anomalies.batch_moments(codes, values, 4)
+    first = anomalies.batch_moments(codes[:120], values[:120], 4)
+    second = anomalies.batch_moments(codes[120:], values[120:], 4)
+    merged = anomalies.merge_moments(*first, *second)
+
+    assert merged[0].tolist() == whole[0].tolist()
+    assert merged[1] == pytest.approx(whole[1])
+    assert merged[2] == pytest.approx(whole[2])
+
+
+def test_score_batch_flags_outliers_and_duplicates():
+    # Libellé 0 : loyer stable (-800 €) ; libellé 1 : sans historique
+    prior = (np.array([12, 0]), np.array([-80000.0, 0.0]), np.array([0.0, 0.0]))
+    codes = np.array([0, 0, 1, 1, 1])
+    amounts = np.array([-80500.0, -200000.0, -1299.0, -1299.0, 1299.0])
+    # Doublons : (libellé, montant, date) ; le code 0 existe déjà en base
+    duplicate_codes = np.array([0, 1, 2, 2, 3])
+    preexisting = np.array([True, False, False, False])
+
+    flags, scores = anomalies.score_batch(
+        codes, amounts, prior, duplicate_codes, preexisting
+    )
+
+    assert [anomalies.flag_names(f) for f in flags.tolist()] == [
+        ["duplicate"],
+        ["amount_outlier"],
+        [],
+        ["duplicate"],
+        [],
+    ]
+    assert scores[0] < 1 < anomalies.Z_THRESHOLD < scores[1]
+    assert scores[2:].tolist() == [0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"amount": "NaN"},
+        {"amount": "-Infinity"},
+        {"amount": "abc"},
+        {"amount": "10000000000"},
+        {"amount": "-1e12"},
+        {"amount": "12", "category": "x" * 65},
+        {"amount": "12", "label": "x" * 256},
+    ],
+)
+def test_invalid_transactions_are_rejected(fields):
+    entreprise_id = uuid.uuid4()
+    user = User(username="alpha-user", entreprise_id=entreprise_id)
+    request = APIRequestFactory().post(
+        "/api/v1/treasury/bank-transactions/create",
+        {"label": "PRLV SEPA EDF", **fields},
+        format="json",
+    )
+    force_authenticate(request, user=user)
+    request.tenant = TenantContext(entreprise_id, user.pk)
+    response = transaction_create(request)
+    assert response.status_code == 400
+    assert "invalide" in response.data["error"]
@@ -0,0 +1,74 @@
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from apps.audit.archive import ArchiveReader, write_archive
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+ACTIONS = ["invoice.validated", "bank_transaction.created", "auth.login"]
+
+
+def make_rows(count, offset=0):
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "created_at": START + timedelta(minutes=i + offset, microseconds=i),
+            "actor_id": None if i % 4 == 0 else f"actor-{i % 3}",
+            "action": ACTIONS[i % 3],
+            "entity_type": "invoice",
+            "entity_id": str(i + offset),
+            "metadata": {
+                "amount": str(i),
+                "status": "PAID" if i % 5 == 0 else "ISSUED",
+            },
+            "batch_sequence": 1,
+            "batch_index": i,
+            "entry_hash": f"{i:064x}",
+        }
+        for i in range(count)
+    ]
+
+
+def test_round_trip_preserves_rows(tmp_path):
+    rows = make_rows(200)
+    path = tmp_path / "2026-01.auditcol"
+    write_archive(path, reversed(rows))
+
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 200
+        assert archive.rows() == rows
+    assert path.stat().st_size < len(json.dumps(rows, default=str)) / 3
+
+
+def test_search_filters_columns_period_and_metadata(tmp_path):
+    rows = make_rows(300)
+    path = tmp_path / "2026-01.auditcol"
+    write_archive(path, rows)
+
+    with ArchiveReader(path) as archive:
+        found = archive.search(
+            since=START + timedelta(minutes=100),
+            until=START + timedelta(minutes=200),
+            action="auth.login",
+            metadata_contains={"status": "PAID"},
+        )
+        assert found == [
+            row
+            for row in rows[100:200]
+            if row["action"] == "auth.login" and row["metadata"]["status"] == "PAID"
+        ]
+        assert archive.search(action="unknown") == []
+        assert archive.search(entity_id="42") == [rows[42]]
+        assert archive.search(batch_index=7) == [rows[7]]
+        assert len(archive.search(limit=5)) == 5
+
+
+def test_rewrite_merges_and_deduplicates(tmp_path):
+    rows = make_rows(50)
+    path = tmp_path / "2026-01.auditcol"
+    write_archive(path, rows[:30])
+    write_archive(path, rows[20:] + make_rows(10, offset=1000))
+
+    with ArchiveReader(path) as archive:
+        assert len(archive) == 60
+        assert archive.rows()[:50] == rows
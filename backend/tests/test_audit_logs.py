@@ -0,0 +1,114 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.audit.models import AuditLog
+from apps.audit.views import audit_log_list
+from apps.common.pagination import encode_cursor
+from apps.common.tenancy import TenantContext
+from apps.companies.models import Entreprise
+from apps.users.models import User
+
+START = datetime(2026, 3, 2, 9, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def alpha_user():
+    alpha = Entreprise.objects.create(name="Alpha", siret="30000000000001")
+    beta = Entreprise.objects.create(name="Beta", siret="30000000000002")
+    user = User.objects.create(username="alpha-user", entreprise=alpha)
+    for day, (action, status) in enumerate(
+        [
+            ("invoice.created", "DRAFT"),
+            ("invoice.validated", "ISSUED"),
+            ("invoice.paid", "PAID"),
+            ("invoice.created", "DRAFT"),
+            ("invoice.paid", "PAID"),
+        ]
+    ):
+        AuditLog.objects.create(
+            entreprise=alpha,
+            actor=user if day % 2 else None,
+            action=action,
+            entity_type="invoice",
+            entity_id=f"FAC-{day}",
+            metadata={"status": status},
+            created_at=START + timedelta(days=day),
+        )
+    AuditLog.objects.create(entreprise=beta, action="invoice.paid", created_at=START)
+    return user
+
+
+def _list(user, **params):
+    request = APIRequestFactory().get("/api/v1/audit/logs", params)
+    force_authenticate(request, user=user)
+    request.tenant = TenantContext(user.entreprise_id, user.pk)
+    return audit_log_list(request)
+
+
+def _entity_ids(response):
+    assert response.status_code == 200, response.data
+    return [entry["entity_id"] for entry in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_lists_tenant_entries_newest_first(alpha_user):
+    response = _list(alpha_user)
+    assert _entity_ids(response) == ["FAC-4", "FAC-3", "FAC-2", "FAC-1", "FAC-0"]
+    assert {entry["entreprise_id"] for entry in response.data["results"]} == {
+        str(alpha_user.entreprise_id)
+    }
+    assert response.data["next_cursor"] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        ({"action": "invoice.paid"}, ["FAC-4", "FAC-2"]),
+        ({"entity_type": "invoice", "entity_id": "FAC-1"}, ["FAC-1"]),
+        ({"metadata": '{"status": "DRAFT"}'}, ["FAC-3", "FAC-0"]),
+        ({"since": "2026-03-03", "until": "2026-03-04"}, ["FAC-2", "FAC-1"]),
+    ],
+)
+def test_filters(alpha_user, params, expected):
+    assert _entity_ids(_list(alpha_user, **params)) == expected
+
+
+@pytest.mark.django_db
+def test_actor_filter(alpha_user):
+    response = _list(alpha_user, actor=str(alpha_user.pk))
+    assert _entity_ids(response) == ["FAC-3", "FAC-1"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"actor": "abc"},
+        {"entity_id": "FAC-1"},
+        {"since": "hier"},
+        {"metadata": "[1]"},
+        {"limit": "dix"},
+        {"cursor": "zz"},
+        {"cursor": encode_cursor(START, "abc")},
+    ],
+)
+def test_invalid_parameters_are_rejected(alpha_user, params):
+    response = _list(alpha_user, **params)
+    assert response.status_code == 400
+    assert "error" in response.data
+
+
+@pytest.mark.django_db
+def test_cursor_pages_cover_every_entry_once(alpha_user):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = _list(alpha_user, **params)
+        pages.append(_entity_ids(response))
+        cursor = response.data["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [["FAC-4", "FAC-3"], ["FAC-2", "FAC-1"], ["FAC-0"]]
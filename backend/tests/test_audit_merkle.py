@@ -0,0 +1,63 @@
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from apps.audit import merkle
+
+
+def leaves(count):
+    return [merkle.leaf_hash(str(i).encode()) for i in range(count)]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13, 100])
+def test_every_leaf_proves_inclusion_in_log_n_steps(count):
+    hashes = leaves(count)
+    root = merkle.merkle_root(hashes)
+    for index, leaf in enumerate(hashes):
+        proof = merkle.inclusion_proof(hashes, index)
+        assert merkle.verify_proof(leaf, proof, root)
+        assert len(proof) <= max(1, (count - 1).bit_length())
+
+
+def test_tampered_leaf_or_proof_fails():
+    hashes = leaves(7)
+    root = merkle.merkle_root(hashes)
+    proof = merkle.inclusion_proof(hashes, 3)
+    assert not merkle.verify_proof(merkle.leaf_hash(b"x"), proof, root)
+
+    side, _ = proof[0]
+    forged = [(side, merkle.leaf_hash(b"x")), *proof[1:]]
+    assert not merkle.verify_proof(hashes[3], forged, root)
+
+
+def test_odd_leaf_is_not_duplicated():
+    hashes = leaves(3)
+    assert merkle.merkle_root(hashes) != merkle.merkle_root(hashes + hashes[-1:])
+
+
+def test_entry_bytes_are_canonical():
+    created_at = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+    entry = {
+        "id": "a",
+        "entreprise_id": None,
+        "actor_id": None,
+        "action": "invoice.validated",
+        "entity_type": "invoice",
+        "entity_id": "1",
+        "metadata": {"b": 1, "a": 2},
+        "created_at": created_at,
+    }
+    same = dict(
+        entry,
+        metadata={"a": 2, "b": 1},
+        created_at=created_at.astimezone(timezone(timedelta(hours=2))),
+    )
+    assert merkle.entry_bytes(entry) == merkle.entry_bytes(same)
+    assert merkle.entry_bytes(entry) != merkle.entry_bytes(dict(entry, entity_id="2"))
+
+
+def test_chain_hash_depends_on_previous_link():
+    first = merkle.chain_hash(merkle.EMPTY_HASH, "ab", 1, 10)
+    assert merkle.chain_hash(first, "cd", 2, 5) != merkle.chain_hash(
+        merkle.EMPTY_HASH, "cd", 2, 5
+    )
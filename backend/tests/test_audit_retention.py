@@ -0,0 +1,129 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.db import connections
+from django.db.models import ProtectedError
+
+from apps.audit import retention, sealing
+from apps.audit.models import AuditBatch, AuditLog
+from apps.common import partitioning
+from apps.companies.models import Entreprise
+
+MONTH = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def tenants():
+    alpha = Entreprise.objects.create(name="Alpha", siret="20000000000001")
+    beta = Entreprise.objects.create(name="Beta", siret="20000000000002")
+    # Entrées des deux entreprises entremêlées : les lots scellés les mélangent
+    for minute in range(6):
+        AuditLog.objects.create(
+            entreprise=(alpha, beta)[minute % 2],
+            action="invoice.created",
+            metadata={"minute": minute},
+            created_at=MONTH + timedelta(days=3, minutes=minute),
+        )
+    sealing.seal_audit_log(window=timedelta(minutes=4))
+    return alpha, beta
+
+
+def _problems():
+    return [
+        problem
+        for batch_id in AuditBatch.objects.values_list("id", flat=True)
+        for problem in sealing.verify_batch(batch_id)[2]
+    ] + sealing.check_chain(sealing.batches_in_period())
+
+
+@pytest.mark.django_db
+def test_shared_batches_are_deleted_once_every_tenant_is_archived(tenants, tmp_path):
+    alpha, beta = tenants
+    assert AuditBatch.objects.count() == 2
+
+    result = retention.archive_month(alpha.pk, MONTH, root=tmp_path)
+    assert (result.archived, result.deleted) == (3, 0)
+    # Lots intacts tant que Beta n'est pas archivée
+    assert AuditLog.objects.count() == 6
+    assert _problems() == []
+    entry = AuditLog.objects.filter(entreprise=alpha).first()
+    assert sealing.entry_proof(entry).valid
+
+    result = retention.archive_month(beta.pk, MONTH, root=tmp_path)
+    assert (result.archived, result.deleted) == (3, 6)
+    assert not AuditLog.objects.exists()
+    assert not AuditBatch.objects.filter(archived_at__isnull=True).exists()
+    assert _problems() == []
+
+    # Réarchivage d'Alpha sans doublon
+    assert len(retention.search_archives(alpha.pk, root=tmp_path)) == 3
+    archived = retention.search_archives(
+        beta.pk, root=tmp_path, action="invoice.created"
+    )
+    assert len(archived) == 3
+
+
+@pytest.mark.django_db
+def test_deleting_a_tenant_keeps_the_seal_valid(tenants, tmp_path):
+    alpha, beta = tenants
+    # Entrées scellées : l'entreprise ne peut pas être supprimée
+    with pytest.raises(ProtectedError):
+        alpha.delete()
+    assert _problems() == []
+
+    retention.archive_month(alpha.pk, MONTH, root=tmp_path)
+    retention.archive_month(beta.pk, MONTH, root=tmp_path)
+    # Historique archivé : suppression possible, chaîne intacte
+    alpha.delete()
+    assert _problems() == []
+
+
+@pytest.mark.django_db
+def test_archive_audit_log_keeps_recent_and_unsealed_entries(tenants, tmp_path):
+    alpha, _ = tenants
+    recent = AuditLog.objects.create(entreprise=alpha, action="invoice.paid")
+    unsealed = AuditLog.objects.create(
+        entreprise=alpha, action="invoice.paid", created_at=MONTH + timedelta(days=9)
+    )
+
+    results = retention.archive_audit_log(
+        retention_months=1, root=tmp_path, dry_run=True
+    )
+    assert sorted(result.archived for result in results) == [3, 3]
+    assert AuditLog.objects.count() == 8
+
+    results = retention.archive_audit_log(retention_months=1, root=tmp_path)
+    assert sum(result.deleted for result in results) == 6
+    assert set(AuditLog.objects.values_list("id", flat=True)) == {
+        recent.pk,
+        unsealed.pk,
+    }
+    assert _problems() == []
+
+
+@pytest.fixture
+def month_partition(tenants):
+    connection = connections["default"]
+    if not partitioning.partition_key(AuditLog, connection):
+        pytest.skip("journal d'audit non partitionné (PostgreSQL requis)")
+    spec = partitioning.PARTITIONED_TABLES[AuditLog._meta.db_table]
+    partitioning.create_partition(connection, spec, MONTH.date())
+    return connection, spec
+
+
+@pytest.mark.django_db
+def test_partition_is_dropped_only_with_exactly_the_archived_rows(
+    month_partition, tmp_path
+):
+    connection, spec = month_partition
+    month = MONTH.date()
+    # Entrée arrivée (et scellée) après l'archivage : partition conservée
+    assert retention.drop_archived_partitions({month: 5}) == []
+    assert month in partitioning.partitions(connection, spec)
+    assert AuditLog.objects.count() == 6
+
+    results = retention.archive_audit_log(retention_months=1, root=tmp_path)
+    assert [(result.archived, result.deleted) for result in results] == [(3, 3)] * 2
+    assert month not in partitioning.partitions(connection, spec)
+    assert not AuditLog.objects.exists()
+    assert not AuditBatch.objects.filter(archived_at__isnull=True).exists()
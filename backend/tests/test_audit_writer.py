@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+import threading
+
+from apps.audit.writer import AuditWriter
+
+
+def make_writer(sink, **options):
+    options.setdefault("flush_interval", 0.05)
+    return AuditWriter(sink, **options)
+
+
+def test_events_are_written_in_batches():
+    batches = []
+    writer = make_writer(batches.append, batch_size=10)
+    for i in range(25):
+        writer.enqueue({"action": "test", "n": i})
+    assert writer.flush(timeout=2)
+
+    assert [event["n"] for batch in batches for event in batch] == list(range(25))
+    assert max(len(batch) for batch in batches) <= 10
+    writer.close()
+
+
+def test_full_queue_spills_to_disk_then_replays(tmp_path):
+    release = threading.Event()
+    written = []
+
+    def slow_sink(events):
+        release.wait(2)
+        written.extend(events)
+
+    writer = make_writer(
+        slow_sink,
+        queue_size=2,
+        batch_size=1,
+        put_timeout=0.01,
+        spill_dir=tmp_path,
+        retry_interval=0,
+    )
+    for i in range(10):
+        writer.enqueue({"n": i})
+    assert writer.stats["spilled"] > 0
+    assert list(tmp_path.glob("audit-*.jsonl"))
+
+    release.set()
+    writer.flush(timeout=2)
+    writer.close(timeout=2)
+    assert sorted(event["n"] for event in written) == list(range(10))
+    assert not list(tmp_path.iterdir())
+
+
+def test_failing_sink_spills_batch(tmp_path):
+    def broken_sink(events):
+        raise RuntimeError("base indisponible")
+
+    writer = make_writer(broken_sink, spill_dir=tmp_path, retry_interval=60)
+    writer.enqueue({"action": "test", "amount": 1})
+    writer.close(timeout=2)
+
+    (path,) = tmp_path.glob("audit-*.jsonl")
+    assert json.loads(path.read_text()) == {"action": "test", "amount": 1}
+    assert writer.stats["written"] == 0
+
+
+def test_close_flushes_pending_events():
+    written = []
+    writer = make_writer(written.extend, flush_interval=60)
+    writer.enqueue({"n": 1})
+    writer.close(timeout=2)
+    assert written == [{"n": 1}]
+
+
+def test_interrupted_replay_is_taken_over(tmp_path):
+    # Processus terminé au milieu du rejeu d'un déversement
+    dead_pid = int(
+        subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    )
+    orphan = tmp_path / f"audit-1.{dead_pid}.0123abcd.replay"
+    orphan.write_text(json.dumps({"n": 1}) + "\n" + json.dumps({"n": 2}) + "\n")
+
+    written = []
+    writer = make_writer(written.extend, spill_dir=tmp_path, retry_interval=0)
+    writer.enqueue({"n": 3})
+    writer.flush(timeout=2)
+    writer.close(timeout=2)
+    assert sorted(event["n"] for event in written) == [1, 2, 3]
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,54 @@
+import argparse
+
+import pytest
+
+from benchmarks import endpoints
+
+
+def _results(p95_ms=10.0, rps=100.0, queries=2, errors=0):
+    return {
+        "endpoints": {
+            "invoices": {
+                "queries": queries,
+                "rss_mb": 90.0,
+                "levels": {
+                    "8": {"p95_ms": p95_ms, "rps": rps, "errors": errors},
+                },
+            }
+        }
+    }
+
+
+def test_percentile_interpolates():
+    assert endpoints.percentile([5.0], 0.99) == 5.0
+    assert endpoints.percentile([4, 1, 3, 2, 5], 0.5) == 3
+    assert endpoints.percentile(range(1, 101), 0.95) == pytest.approx(95.05)
+
+
+def test_parse_threshold():
+    assert endpoints.parse_threshold("p95_ms=20%") == ("p95_ms", 0.2)
+    assert endpoints.parse_threshold("rps=0.1") == ("rps", 0.1)
+    with pytest.raises(argparse.ArgumentTypeError):
+        endpoints.parse_threshold("latency=10%")
+
+
+def test_compare_reports_degradations_beyond_thresholds():
+    baseline = _results()
+    assert endpoints.compare(_results(), baseline) == []
+    # +20 % sous le seuil de 25 %, +1 ms sous le bruit de mesure
+    assert endpoints.compare(_results(p95_ms=12.0), baseline) == []
+    assert endpoints.compare(_results(p95_ms=11.0), baseline, {"p95_ms": 0}) == []
+    regressions = endpoints.compare(
+        _results(p95_ms=20.0, rps=70.0, queries=3, errors=1), baseline
+    )
+    assert regressions == [
+        "invoices queries : 2 -> 3 (+50%), seuil 0%",
+        "invoices c=8 p95_ms : 10.0 -> 20.0 (+100%), seuil 25%",
+        "invoices c=8 rps : 100.0 -> 70.0 (-30%), seuil 20%",
+        "invoices c=8 errors : 0 -> 1, seuil 0%",
+    ]
+
+
+def test_routes_must_be_benchmarked_or_skipped():
+    routes = {"users:me": "", "admin:index": "", "audit:export": ""}
+    assert endpoints.uncovered_routes(routes) == ["audit:export"]
@@ -0,0 +1,35 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from apps.treasury import cashflow
+
+TODAY = date(2026, 6, 1).toordinal()
+
+
+def test_mean_delays_falls_back_to_overall_mean():
+    delays = cashflow.mean_delays(np.array([0, 0, 1]), np.array([10.0, 20.0, 40.0]), 3)
+    assert delays.tolist() == pytest.approx([15.0, 40.0, 70 / 3])
+
+
+def test_project_places_overdue_and_recurring_flows():
+    # Débit mensuel payé aujourd'hui, crédit hebdomadaire payé il y a 3 jours
+    flows = cashflow.RecurringFlows(
+        periods=np.array([30.0, 7.0]),
+        amounts=np.array([-100.0, 10.0]),
+        last=np.array([TODAY, TODAY - 3]),
+    )
+    projection = cashflow.project(
+        balance=1000,
+        expected_ordinals=np.array([TODAY - 10, TODAY + 5]),
+        expected_amounts=np.array([50.0, 70.0]),
+        flows=flows,
+        start=TODAY,
+        horizon=61,
+    )
+
+    assert projection.inflows[0] == 50 and projection.inflows[5] == 70
+    assert np.flatnonzero(projection.outflows).tolist() == [30, 60]
+    assert projection.inflows[4] == 10 and projection.inflows[11] == 10
+    assert projection.balance[-1] == 1000 + 50 + 70 - 200 + 9 * 10
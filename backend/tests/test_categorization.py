@@ -0,0 +1,133 @@
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common.tenancy import TenantContext
+from apps.companies.models import Entreprise
+from apps.treasury import categorization
+from apps.treasury.categories import category_rules
+from apps.treasury.models import CategoryRule
+from apps.treasury.views import category_rule_create
+from apps.users.models import User
+
+
+def test_normalize_label_strips_accents_and_separators():
+    assert categorization.normalize_label("Prlv SEPA  Électricité/EDF-123") == (
+        " PRLV SEPA ELECTRICITE EDF 123 "
+    )
+
+
+def test_label_key_drops_references():
+    assert (
+        categorization.label_key("PRLV SEPA Loyer 05/2026 REF 88412")
+        == "PRLV SEPA LOYER REF"
+    )
+
+
+def test_automaton_reports_overlapping_patterns():
+    automaton = categorization.AhoCorasick(
+        [(" SEPA ", 3), (" PRLV SEPA ", 1), (" EDF ", 2)]
+    )
+    assert automaton.matches(" PRLV SEPA EDF ") == {1, 2, 3}
+    assert automaton.matches(" VIR SEPA ") == {3}
+    assert automaton.matches(" REDFORD ") == set()
+
+
+def test_required_literal():
+    assert categorization.required_literal(r"VIR\s+SALAIRE\s+\d{2}/\d{4}") == "SALAIRE"
+    assert categorization.required_literal(r"loyer(s)? bureau") == "BUREAU"
+    assert categorization.required_literal(r"ABCD?E") == "ABC"
+    assert categorization.required_literal(r"FRAIS|COMMISSION") is None
+    assert categorization.required_literal(r"\d+ [A-Z]{2}") is None
+    # Échappements à suite : jamais lus comme des littéraux
+    for pattern in (r"\x41BCD", r"\u0041BCD", r"\N{LATIN CAPITAL LETTER A}BCD"):
+        assert categorization.required_literal(pattern) is None
+    assert categorization.required_literal(r"(A)\1BCD") is None
+
+
+def test_rules_priority_spans_keywords_and_regexes():
+    rules = categorization.CompiledRules(
+        [
+            categorization.Rule("Salaires", "REGEX", r"VIR\s+SALAIRE\s+\d{2}/\d{4}"),
+            categorization.Rule("Énergie", "KEYWORD", "edf"),
+            categorization.Rule("Banque", "REGEX", r"FRAIS|COMMISSION"),
+            categorization.Rule("Prélèvements", "KEYWORD", "prlv sepa"),
+        ]
+    )
+    assert rules.categorize("PRLV SEPA EDF FACTURE 42") == "Énergie"
+    assert rules.categorize("PRLV SEPA ORANGE") == "Prélèvements"
+    assert rules.categorize("Commission intervention") == "Banque"
+    assert rules.categorize("VIR SALAIRE 03/2026 EDF") == "Salaires"
+    assert rules.categorize("CB CARREFOUR") == ""
+
+
+def test_validate_regex():
+    assert categorization.validate_regex(r"LOYER\s+\d+") is None
+    assert categorization.validate_regex("(?P<x>A)") is not None
+    assert categorization.validate_regex("([A-Z]") is not None
+
+
+def test_untriggered_regexes_may_overlap():
+    rules = categorization.CompiledRules(
+        [
+            categorization.Rule("A", "REGEX", r"X\d"),
+            categorization.Rule("B", "REGEX", r"\d\dX"),
+        ]
+    )
+    assert rules.categorize("12X3") == "A"
+    assert rules.categorize("12X") == "B"
+    assert (
+        categorization.CompiledRules(
+            [categorization.Rule("A", "REGEX", r"\x41BCD")]
+        ).categorize("ABCD")
+        == "A"
+    )
+
+
+@pytest.mark.django_db
+def test_rule_changes_invalidate_the_cache_on_commit(
+    django_capture_on_commit_callbacks,
+):
+    entreprise = Entreprise.objects.create(name="Alpha", siret="70000000000001")
+    assert category_rules.get(entreprise.pk).categorize("PRLV SEPA EDF") == ""
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        CategoryRule.objects.create(
+            entreprise=entreprise, category="Énergie", pattern="edf"
+        )
+        # Avant le commit, l'entrée en cache reste valide
+        assert category_rules.get(entreprise.pk).categorize("PRLV SEPA EDF") == ""
+    assert len(callbacks) == 1
+    assert category_rules.get(entreprise.pk).categorize("PRLV SEPA EDF") == "Énergie"
+
+
+@pytest.mark.django_db
+def test_rule_creation_validates_lengths_and_types():
+    entreprise = Entreprise.objects.create(name="Beta", siret="70000000000002")
+    user = User.objects.create(username="beta-user", entreprise=entreprise)
+
+    def create(**data):
+        request = APIRequestFactory().post(
+            "/api/v1/treasury/category-rules/create",
+            {"category": "Énergie", "pattern": "edf"} | data,
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        request.tenant = TenantContext(entreprise.pk, user.pk)
+        return category_rule_create(request)
+
+    for data in (
+        {"category": "x" * 65},
+        {"pattern": "x" * 256},
+        {"category": ["Énergie"]},
+        {"is_active": "false"},
+        {"is_active": 0},
+        {"priority": 2**31},
+    ):
+        response = create(**data)
+        assert response.status_code == 400, data
+        assert "error" in response.data
+    assert not CategoryRule.objects.exists()
+
+    response = create(is_active=False)
+    assert response.status_code == 201
+    assert response.data["is_active"] is False
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from apps.common import dataset
+from apps.treasury.categorization import label_key
+
+TODAY = date(2026, 10, 19)
+
+
+def _tenant(seed, rank=0, factor=1.0, scale=0.2):
+    entreprises, users = dataset.reference_rows(4, seed, 1, today=TODAY)
+    return dataset.tenant_rows(
+        rank,
+        entreprises[rank]["id"],
+        users[0]["id"],
+        factor,
+        seed,
+        scale,
+        dataset.DEFAULT_MONTHS,
+        TODAY,
+    )
+
+
+def test_tenant_factors_are_zipf_with_mean_one():
+    factors = dataset.tenant_factors(10)
+    assert sum(factors) == pytest.approx(10)
+    assert factors == sorted(factors, reverse=True)
+    assert dataset.tenant_factors(3, skew=0) == [1, 1, 1]
+
+
+def test_rows_are_deterministic_for_a_seed():
+    assert dataset.reference_rows(4, 7, 1, today=TODAY) == dataset.reference_rows(
+        4, 7, 1, today=TODAY
+    )
+    assert _tenant(7) == _tenant(7)
+    assert _tenant(7)["invoices"][0]["id"] != _tenant(8)["invoices"][0]["id"]
+
+
+def test_rows_are_consistent():
+    rows = _tenant(3)
+    for invoice in rows["invoices"]:
+        lines = [line for line in rows["lines"] if line["invoice_id"] == invoice["id"]]
+        assert sum(line["total_ttc"] for line in lines) == invoice["total_ttc"]
+        assert invoice["issue_date"] <= TODAY
+    paid = {row["id"] for row in rows["invoices"] if row["status"] == "PAID"}
+    assert {row["invoice_id"] for row in rows["reconciliations"]} == paid
+    # Clés de libellé mémorisées par client ou marchand
+    for transaction in rows["transactions"]:
+        assert transaction["label_key"] == label_key(transaction["label"])
+        assert transaction["date"] <= TODAY
@@ -0,0 +1,73 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common.tenancy import TenantContext
+from apps.companies.models import Entreprise
+from apps.treasury.grouping import find_invoice_groups
+from apps.treasury.matching import InvoiceCandidate
+from apps.treasury.models import BankTransaction
+from apps.treasury.views import reconciliation_groups
+from apps.users.models import User
+
+
+def _invoices(*amounts):
+    return [
+        InvoiceCandidate(
+            id=i, number=f"FAC-{i:05d}", amount_cents=cents, issue_date=date(2026, 1, 1)
+        )
+        for i, cents in enumerate(amounts)
+    ]
+
+
+def test_finds_exact_combination():
+    invoices = _invoices(1000, 2500, 4000, 700, 3300)
+    result = find_invoice_groups(6500, invoices)
+
+    best = result.groups[0]
+    assert best.difference_cents == 0
+    assert sorted(c.amount_cents for c in best.invoices) in (
+        [2500, 4000],
+        [700, 2500, 3300],
+    )
+    assert all(g.total_cents == 6500 for g in result.groups)
+
+
+def test_tolerance_and_max_size():
+    invoices = _invoices(1000, 1000, 1000, 1001)
+    assert not find_invoice_groups(4001, invoices, max_size=3).groups
+
+    result = find_invoice_groups(3002, invoices, tolerance_cents=1, max_size=3)
+    assert result.groups[0].difference_cents in (-1, 1)
+
+
+def test_time_budget_is_enforced():
+    invoices = _invoices(*range(100, 100 + 40 * 7, 7))
+    result = find_invoice_groups(5000, invoices, max_size=8, time_budget=0)
+    assert result.timed_out
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "tolerance", ["abc", "NaN", "sNaN", "Infinity", "-Infinity", "1e999999999", "1e10"]
+)
+def test_groups_endpoint_rejects_non_finite_tolerance(tolerance):
+    entreprise = Entreprise.objects.create(name="Alpha", siret="80000000000001")
+    user = User.objects.create(username="alpha-user", entreprise=entreprise)
+    transaction = BankTransaction.objects.create(
+        entreprise=entreprise,
+        date=date(2026, 3, 2),
+        label="VIR CLIENT",
+        amount=Decimal("100.00"),
+    )
+    request = APIRequestFactory().get(
+        "/api/v1/reconciliations/groups",
+        {"bank_transaction_id": str(transaction.pk), "tolerance": tolerance},
+    )
+    force_authenticate(request, user=user)
+    request.tenant = TenantContext(entreprise.pk, user.pk)
+    response = reconciliation_groups(request)
+    assert response.status_code == 400
+    assert response.data["error"].startswith("tolerance invalide")
@@ -0,0 +1,30 @@
+import time
+
+from apps.common import ids
+
+
+def test_uuid7_layout():
+    before = time.time_ns() // 1_000_000
+    value = ids.uuid7()
+    after = time.time_ns() // 1_000_000
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+    assert before <= ids.uuid7_time(value) <= after + 1
+
+
+def test_uuid7_is_strictly_increasing():
+    values = [ids.uuid7() for _ in range(20_000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    # Même ordre sous forme de texte (tri des clés en base)
+    assert [str(v) for v in values] == sorted(str(v) for v in values)
+
+
+def test_counter_overflow_moves_to_next_millisecond(monkeypatch):
+    # Dernier identifiant émis « dans le futur » (horloge reculée depuis)
+    last_ms = time.time_ns() // 1_000_000 + 60_000
+    monkeypatch.setattr(ids, "_last_ms", last_ms)
+    monkeypatch.setattr(ids, "_counter", ids.COUNTER_MAX)
+    value = ids.uuid7()
+    assert ids.uuid7_time(value) == last_ms + 1
+    assert (value.int >> 64) & 0xFFF == 0
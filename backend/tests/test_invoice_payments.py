@@ -0,0 +1,248 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common.tenancy import TenantContext
+from apps.companies.models import Entreprise
+from apps.invoices.models import Customer, Invoice
+from apps.invoices.views import invoice_cancel, invoice_validate
+from apps.treasury import reconciliation
+from apps.treasury.models import BankTransaction, Reconciliation
+from apps.treasury.views import reconciliation_create
+from apps.users.models import User
+
+
+def _invoice(status, paid):
+    return Invoice(
+        status=status, total_ttc=Decimal("120.00"), amount_paid=Decimal(paid)
+    )
+
+
+def test_only_issued_and_paid_invoices_are_due():
+    for status in (Invoice.Status.DRAFT, Invoice.Status.CANCELED):
+        invoice = _invoice(status, "20")
+        invoice.refresh_payment_state()
+        assert (invoice.amount_due, invoice.status) == (0, status)
+
+    invoice = _invoice(Invoice.Status.ISSUED, "120")
+    invoice.refresh_payment_state()
+    assert (invoice.amount_due, invoice.status) == (0, Invoice.Status.PAID)
+    invoice.amount_paid = Decimal(100)
+    invoice.refresh_payment_state()
+    assert (invoice.amount_due, invoice.status) == (
+        Decimal("20.00"),
+        Invoice.Status.ISSUED,
+    )
+
+
+def _call(view, invoice, user):
+    request = APIRequestFactory().post(f"/api/v1/invoices/{invoice.pk}/action")
+    force_authenticate(request, user=user)
+    request.tenant = TenantContext(user.entreprise_id, user.pk)
+    return view(request, invoice_id=invoice.pk)
+
+
+@pytest.mark.django_db
+def test_status_changes_keep_payments_applied_meanwhile():
+    entreprise = Entreprise.objects.create(name="Alpha", siret="10000000000001")
+    user = User.objects.create(username="alpha-user", entreprise=entreprise)
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    invoice = Invoice.objects.create(
+        entreprise=entreprise,
+        customer=customer,
+        number="FAC-1",
+        total_ttc=Decimal("120.00"),
+    )
+    assert invoice.amount_due == 0
+
+    # Paiement imputé par `apply_payments` après le chargement de `invoice`
+    Invoice.objects.filter(pk=invoice.pk).update(amount_paid=Decimal("50.00"))
+    assert _call(invoice_validate, invoice, user).status_code == 200
+    invoice.refresh_from_db()
+    assert invoice.status == Invoice.Status.ISSUED
+    assert (invoice.amount_paid, invoice.amount_due) == (
+        Decimal("50.00"),
+        Decimal("70.00"),
+    )
+
+    assert _call(invoice_cancel, invoice, user).status_code == 200
+    invoice.refresh_from_db()
+    assert invoice.status == Invoice.Status.CANCELED
+    assert (invoice.amount_paid, invoice.amount_due) == (Decimal("50.00"), 0)
+
+
+@pytest.mark.django_db
+def test_apply_payments_records_status_transitions(monkeypatch):
+    entreprise = Entreprise.objects.create(name="Beta", siret="10000000000002")
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    invoices = [
+        Invoice.objects.create(
+            entreprise=entreprise,
+            customer=customer,
+            number=f"FAC-{index}",
+            status=Invoice.Status.ISSUED,
+            total_ttc=Decimal("120.00"),
+        )
+        for index in range(2)
+    ]
+    actions = []
+    monkeypatch.setattr(
+        "apps.audit.signals.record",
+        lambda action, instance, **kwargs: actions.append((action, instance.pk)),
+    )
+
+    # Une facture soldée, l'autre seulement réduite : seule la première change
+    reconciliation.apply_payments({invoices[0].pk: "120.00", invoices[1].pk: "20.00"})
+    assert actions == [("invoice.paid", invoices[0].pk)]
+
+    # Rapprochement supprimé : la facture redevient due
+    actions.clear()
+    reconciliation.apply_payments({invoices[0].pk: "-120.00"})
+    assert actions == [("invoice.reopened", invoices[0].pk)]
+
+
+@pytest.mark.django_db
+def test_stale_automatic_matches_are_discarded_under_lock():
+    entreprise = Entreprise.objects.create(name="Gamma", siret="10000000000003")
+    user = User.objects.create(username="gamma-user", entreprise=entreprise)
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    issued, canceled = (
+        Invoice.objects.create(
+            entreprise=entreprise,
+            customer=customer,
+            number=f"FAC-{status}",
+            status=status,
+            total_ttc=Decimal("120.00"),
+        )
+        for status in (Invoice.Status.ISSUED, Invoice.Status.CANCELED)
+    )
+    transactions = [
+        BankTransaction.objects.create(
+            entreprise=entreprise,
+            date=date(2026, 3, 2),
+            label=f"VIR {index}",
+            amount=Decimal("100.00"),
+        )
+        for index in range(4)
+    ]
+    # Rapprochement manuel arrivé après le calcul des correspondances
+    reconciliation.create_reconciliation(
+        entreprise_id=entreprise.pk,
+        invoice=issued,
+        bank_transaction=transactions[0],
+        matched_amount=Decimal("10.00"),
+        matched_by=user,
+    )
+
+    def match(transaction, invoice, amount):
+        return Reconciliation(
+            entreprise_id=entreprise.pk,
+            invoice_id=invoice.pk,
+            bank_transaction_id=transaction.pk,
+            matched_amount=Decimal(amount),
+            matched_by=user,
+        )
+
+    matches = [
+        match(transactions[0], issued, "50.00"),
+        match(transactions[1], issued, "100.00"),
+        # Reste à payer épuisé par la correspondance précédente
+        match(transactions[2], issued, "20.00"),
+        match(transactions[3], canceled, "50.00"),
+    ]
+    kept = reconciliation.discard_stale_matches(matches, batch_size=2)
+    assert kept == [matches[1]]
+
+
+@pytest.mark.django_db
+def test_manual_reconciliation_is_checked_against_the_locked_invoice():
+    entreprise = Entreprise.objects.create(name="Delta", siret="10000000000004")
+    user = User.objects.create(username="delta-user", entreprise=entreprise)
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    issued, draft = (
+        Invoice.objects.create(
+            entreprise=entreprise,
+            customer=customer,
+            number=f"FAC-{status}",
+            status=status,
+            total_ttc=Decimal("120.00"),
+        )
+        for status in (Invoice.Status.ISSUED, Invoice.Status.DRAFT)
+    )
+    transaction = BankTransaction.objects.create(
+        entreprise=entreprise,
+        date=date(2026, 3, 2),
+        label="VIR CLIENT",
+        amount=Decimal("150.00"),
+    )
+
+    def create(invoice, amount):
+        request = APIRequestFactory().post(
+            "/api/v1/reconciliations",
+            {
+                "invoice_id": str(invoice.pk),
+                "bank_transaction_id": str(transaction.pk),
+                "matched_amount": amount,
+            },
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        request.tenant = TenantContext(entreprise.pk, user.pk)
+        return reconciliation_create(request)
+
+    for amount in ("abc", "NaN", "sNaN", "-Infinity", "1e999999999", "-10", "0"):
+        assert create(issued, amount).status_code == 400, amount
+    assert create(draft, "10.00").status_code == 400
+    assert create(issued, "120.01").status_code == 400
+    assert not Reconciliation.objects.exists()
+
+    response = create(issued, "100.00")
+    assert response.status_code == 201
+    issued.refresh_from_db()
+    assert issued.amount_due == Decimal("20.00")
+    # Le reste à payer relu sous verrou tient compte du premier rapprochement
+    assert create(issued, "30.00").status_code == 400
+
+
+@pytest.mark.django_db
+def test_verify_invoice_balances_fixes_drift_under_lock():
+    entreprise = Entreprise.objects.create(name="Epsilon", siret="10000000000005")
+    user = User.objects.create(username="epsilon-user", entreprise=entreprise)
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    invoice = Invoice.objects.create(
+        entreprise=entreprise,
+        customer=customer,
+        number="FAC-1",
+        status=Invoice.Status.ISSUED,
+        total_ttc=Decimal("120.00"),
+    )
+    reconciliation.create_reconciliation(
+        entreprise_id=entreprise.pk,
+        invoice=invoice,
+        bank_transaction=BankTransaction.objects.create(
+            entreprise=entreprise,
+            date=date(2026, 3, 2),
+            label="VIR CLIENT",
+            amount=Decimal("50.00"),
+        ),
+        matched_amount=Decimal("50.00"),
+        matched_by=user,
+    )
+    Invoice.objects.filter(pk=invoice.pk).update(
+        amount_paid=Decimal("0.00"), amount_due=Decimal("120.00")
+    )
+
+    out = StringIO()
+    call_command("verify_invoice_balances", "--fix", stdout=out)
+    assert out.getvalue().count("FAC-1") == 1
+    invoice.refresh_from_db()
+    assert (invoice.amount_paid, invoice.amount_due) == (
+        Decimal("50.00"),
+        Decimal("70.00"),
+    )
+    call_command("verify_invoice_balances", stdout=out)
+    assert "0 facture(s) en écart" in out.getvalue()
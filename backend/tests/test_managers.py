@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+from django.test import override_settings
+
+from apps.common import sharding
+from apps.common.managers import tenant_scope
+from apps.companies.models import Entreprise
+from apps.invoices.models import Customer, Invoice, InvoiceLine
+
+
+@pytest.fixture
+def invoices():
+    created = []
+    for index, name in enumerate(["Alpha", "Beta"]):
+        entreprise = Entreprise.objects.create(name=name, siret=f"5000000000000{index}")
+        customer = Customer.objects.create(entreprise=entreprise, name="Client")
+        invoice = Invoice.objects.create(
+            entreprise=entreprise, customer=customer, number=f"FAC-{name}"
+        )
+        InvoiceLine.objects.create(
+            entreprise=entreprise,
+            invoice=invoice,
+            label="Conseil",
+            unit_price=Decimal("100.00"),
+        )
+        created.append(invoice)
+    return created
+
+
+@pytest.mark.django_db
+def test_scope_filters_every_query(invoices):
+    alpha, beta = invoices
+    assert Invoice.objects.count() == 2
+    with tenant_scope(alpha.entreprise_id):
+        assert list(Invoice.objects.all()) == [alpha]
+        assert not Invoice.objects.filter(pk=beta.pk).exists()
+        with pytest.raises(Invoice.DoesNotExist):
+            Invoice.objects.get(pk=beta.pk)
+        assert Invoice.objects.unscoped().count() == 2
+        # Scopes imbriqués : le plus interne l'emporte, puis restauration
+        with tenant_scope(beta.entreprise_id):
+            assert list(Invoice.objects.all()) == [beta]
+        assert list(Invoice.objects.all()) == [alpha]
+    assert Invoice.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_related_managers_are_scoped(invoices):
+    alpha, _ = invoices
+    with tenant_scope(alpha.entreprise_id):
+        assert [line.label for line in alpha.lines.all()] == ["Conseil"]
+        assert alpha.customer.invoices.count() == 1
+    # Relation suivie dans le scope d'une autre entreprise : rien ne fuit
+    with tenant_scope(invoices[1].entreprise_id):
+        assert not alpha.lines.exists()
+
+
+@pytest.mark.django_db
+def test_scoped_queries_carry_the_router_hint(invoices, monkeypatch):
+    alpha, beta = invoices
+    monkeypatch.setattr(
+        sharding.shard_map, "get", lambda key: {str(beta.entreprise_id): "shard_1"}
+    )
+    with override_settings(DATABASE_SHARDS=("shard_1",)):
+        with tenant_scope(beta.entreprise_id):
+            queryset = Invoice.objects.all()
+            assert queryset._hints["tenant"] == beta.entreprise_id
+            assert queryset.db == "shard_1"
+        with tenant_scope(alpha.entreprise_id):
+            assert Invoice.objects.all().db == "default"
+        assert "tenant" not in Invoice.objects.all()._hints
+        assert Invoice.objects.for_tenant(beta.entreprise_id).db == "shard_1"
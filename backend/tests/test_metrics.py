@@ -0,0 +1,66 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from prometheus_client import REGISTRY
+
+from apps.common import metrics
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def _view(request):
+    return HttpResponse(status=201)
+
+
+def test_middleware_labels_by_route_name():
+    middleware = metrics.MetricsMiddleware(_view)
+    labels = {"route": "users:me", "method": "GET", "status": "201"}
+    before = _sample("http_requests_total", **labels)
+    unmatched = _sample("http_requests_total", **{**labels, "route": "<unmatched>"})
+
+    request = RequestFactory().get("/api/v1/me")
+    request.resolver_match = resolve("/api/v1/me")
+    middleware(request)
+    middleware(RequestFactory().get("/nulle-part/42"))
+
+    assert _sample("http_requests_total", **labels) == before + 1
+    assert (
+        _sample("http_requests_total", **{**labels, "route": "<unmatched>"})
+        == unmatched + 1
+    )
+
+
+def test_cache_counters():
+    hit, _ = metrics.cache_counters("tests")
+    before = _sample("tenant_cache_requests_total", cache="tests", result="hit")
+    hit.inc()
+    assert (
+        _sample("tenant_cache_requests_total", cache="tests", result="hit")
+        == before + 1
+    )
+
+
+@override_settings(METRICS_TOKEN="secret")
+def test_metrics_view_requires_token():
+    factory = RequestFactory()
+    assert metrics.metrics_view(factory.get("/metrics")).status_code == 403
+    for header in ("Bearer secre", "Bearer secret2", "secret"):
+        request = factory.get("/metrics", HTTP_AUTHORIZATION=header)
+        assert metrics.metrics_view(request).status_code == 403
+
+    response = metrics.metrics_view(
+        factory.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+    )
+    assert response.status_code == 200
+    assert b"http_requests_total" in response.content
+
+
+@override_settings(METRICS_TOKEN="")
+def test_metrics_view_without_token_is_closed_outside_debug():
+    request = RequestFactory().get("/metrics")
+    with override_settings(DEBUG=False):
+        assert metrics.metrics_view(request).status_code == 403
+    with override_settings(DEBUG=True):
+        assert metrics.metrics_view(request).status_code == 200
@@ -0,0 +1,81 @@
+import pytest
+from django.db import OperationalError
+
+from apps.common import online_schema
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LockNotAvailable(Exception):
+    sqlstate = "55P03"
+
+
+def test_progress_is_throttled_and_estimates_remaining_time():
+    clock, lines = FakeClock(), []
+    progress = online_schema.Progress(
+        "banktx (note)",
+        total=1000,
+        unit="lignes",
+        interval=10,
+        write=lines.append,
+        clock=clock,
+    )
+    clock.now = 2
+    progress.update(100)
+    clock.now = 5
+    progress.update(250)
+    clock.now = 20
+    progress.update(400)
+    assert lines == [
+        "banktx (note) : 100/1000 (10 %), 50 lignes/s, reste ~18s, 2s",
+        "banktx (note) : 400/1000 (40 %), 20 lignes/s, reste ~30s, 20s",
+    ]
+    clock.now = 200
+    progress.finish()
+    assert lines[-1] == "banktx (note) : 400/1000 (40 %), 2 lignes/s, 3m20s - terminé"
+
+
+def test_progress_finish_is_silent_for_short_operations():
+    lines = []
+    online_schema.Progress("index x", write=lines.append).finish()
+    assert lines == []
+
+
+def test_partition_index_name():
+    name = online_schema.partition_index_name(
+        "banktx_note_idx",
+        "treasury_banktransaction",
+        "treasury_banktransaction_p202610",
+    )
+    assert name == "banktx_note_idx_p202610"
+    long_name = online_schema.partition_index_name(
+        "x" * 63, "audit_auditlog", "audit_auditlog_default"
+    )
+    assert len(long_name) == 63
+    assert long_name.endswith("_default")
+
+
+def test_retries_only_on_lock_timeout():
+    calls, pauses = [], []
+
+    def run():
+        calls.append(1)
+        if len(calls) < 3:
+            raise OperationalError("lock timeout") from LockNotAvailable()
+        return "ok"
+
+    assert online_schema._with_retries(run, delay=1, sleep=pauses.append) == "ok"
+    assert pauses == [1, 2]
+
+    def broken():
+        raise OperationalError("autre erreur")
+
+    with pytest.raises(OperationalError):
+        online_schema._with_retries(broken, sleep=pauses.append)
+    assert pauses == [1, 2]
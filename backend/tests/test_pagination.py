@@ -0,0 +1,30 @@
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from apps.common import pagination
+
+
+def test_cursor_round_trip():
+    moment = datetime(2026, 10, 19, 12, 30, 1, 250, tzinfo=UTC)
+    pk = uuid.UUID("f1c9a0e4-0000-4000-8000-000000000001")
+    cursor = pagination.encode_cursor(moment, pk)
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor) == (moment, pk)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "zz",
+        "bm90IGpzb24",
+        "WyJ4IiwgIjEiXQ",
+        # Date valide, clé primaire qui n'est pas un UUID
+        "WyIyMDI2LTAxLTAxVDAwOjAwOjAwKzAwOjAwIiwgImFiYyJd",
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(pagination.InvalidCursor):
+        pagination.decode_cursor(cursor)
@@ -0,0 +1,22 @@
+from datetime import date, datetime, timedelta, timezone
+
+from apps.common import partitioning
+
+
+def test_month_arithmetic():
+    assert partitioning.add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert partitioning.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    # Datetime ramenée en UTC : 1er novembre 00:30 à Paris = octobre en UTC
+    paris = timezone(timedelta(hours=1))
+    moment = datetime(2026, 11, 1, 0, 30, tzinfo=paris)
+    assert partitioning.month_start(moment) == date(2026, 10, 1)
+
+
+def test_partition_names_and_bounds():
+    transactions = partitioning.PARTITIONED_TABLES["treasury_banktransaction"]
+    audit = partitioning.PARTITIONED_TABLES["audit_auditlog"]
+    month = date(2026, 10, 1)
+    assert transactions.partition(month) == "treasury_banktransaction_p202610"
+    assert transactions.bound(month) == "2026-10-01"
+    assert audit.bound(month) == "2026-10-01 00:00:00+00"
+    assert audit.default_partition == "audit_auditlog_default"
@@ -0,0 +1,82 @@
+import os
+import threading
+
+import pytest
+
+from apps.common import pooling
+
+# Base PostgreSQL locale jetable, p. ex. postgres://postgres@localhost/postgres
+DATABASE_URL = os.getenv("POOL_TEST_DATABASE_URL")
+
+
+def test_alias_settings_override_global_ones():
+    environ = {"DB_POOL_MAX_SIZE": "6", "DB_POOL_REPLICA_1_MAX_SIZE": "12"}
+    assert pooling.pool_options("default", environ)["max_size"] == 6
+    assert pooling.pool_options("replica_1", environ)["max_size"] == 12
+    assert pooling.pool_options("replica_1", environ)["timeout"] == 10.0
+    with pytest.raises(ValueError):
+        pooling.pool_options("default", {"DB_POOL_MIN_SIZE": "8"})
+
+
+def test_postgres_urls_get_a_pool_without_persistent_connections():
+    if not pooling.pooling_available():
+        pytest.skip("psycopg_pool non installé")
+    config = pooling.database("postgres://u:p@db/app", "default", {})
+    assert config["CONN_MAX_AGE"] == 0 and config["CONN_HEALTH_CHECKS"]
+    assert config["OPTIONS"]["pool"]["name"] == "default"
+
+    persistent = pooling.database("postgres://u:p@db/app", "default", {"DB_POOL": "0"})
+    assert persistent["CONN_MAX_AGE"] == pooling.PERSISTENT_MAX_AGE
+    assert "pool" not in persistent["OPTIONS"]
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="POOL_TEST_DATABASE_URL non définie")
+def test_pool_under_concurrent_load():
+    psycopg_pool = pytest.importorskip("psycopg_pool")
+    environ = {"DB_POOL_MIN_SIZE": "2", "DB_POOL_MAX_SIZE": "4"}
+    pool = psycopg_pool.ConnectionPool(
+        DATABASE_URL,
+        open=True,
+        check=psycopg_pool.ConnectionPool.check_connection,
+        **pooling.pool_options("default", environ),
+    )
+    errors = []
+
+    def work():
+        try:
+            for _ in range(5):
+                with pool.connection() as connection:
+                    connection.execute("SELECT pg_sleep(0.01)")
+        except Exception as err:  # noqa: BLE001
+            errors.append(err)
+
+    try:
+        pool.wait()
+        # Connexion coupée côté serveur : remplacée au prochain emprunt
+        with pool.connection() as connection:
+            pid = connection.info.backend_pid
+        with (
+            psycopg_pool.ConnectionPool(DATABASE_URL, min_size=1) as admin,
+            admin.connection() as connection,
+        ):
+            connection.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE pid = %s",
+                [pid],
+            )
+
+        threads = [threading.Thread(target=work) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.get_stats()
+        assert errors == []
+        assert stats["requests_num"] == 1 + 16 * 5
+        assert stats["pool_max"] == 4 and stats["pool_size"] <= 4
+        # 16 threads pour 4 connexions : des emprunts ont attendu
+        assert stats["requests_waiting"] == 0 and stats["requests_queued"] > 0
+        assert stats["connections_lost"] >= 1
+    finally:
+        pool.close()
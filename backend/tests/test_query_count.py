@@ -0,0 +1,63 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from apps.common import query_count
+
+LOOKUP = 'SELECT "users_role"."code" FROM "users_role" WHERE "users_role"."id" = %s'
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    assert query_count.fingerprint(
+        "SELECT * FROM t WHERE a = 'x''y' AND b = 42  AND c IN (%s, %s, %s)"
+    ) == query_count.fingerprint(
+        "SELECT * FROM t WHERE a = 'z' AND b = 7 AND c IN (%s)"
+    )
+    # Chiffres des identifiants (partitions) conservés
+    assert "t_p202610" in query_count.fingerprint('SELECT * FROM "t_p202610"')
+
+
+def _lookups(stats, count):
+    for _ in range(count):
+        stats.record(LOOKUP, 0.001)
+
+
+def test_repeated_select_is_flagged_with_its_origin():
+    stats = query_count.QueryStats(threshold=3)
+    stats.record("SAVEPOINT s1", 0.001)
+    _lookups(stats, 2)
+    for _ in range(3):
+        stats.record('INSERT INTO "t" VALUES (%s)', 0.001)
+    assert stats.n_plus_one == []
+
+    _lookups(stats, 2)
+    assert stats.count == 7
+    assert stats.as_dict()["duplicates"] == 5
+    [group] = stats.n_plus_one
+    assert group.count == 4
+    assert group.origin.startswith("tests/test_query_count.py:")
+    assert group.origin.endswith("in _lookups")
+
+
+def _view(request):
+    _lookups(request.query_stats, 5)
+    return HttpResponse()
+
+
+@override_settings(
+    QUERY_COUNT_HEADERS=True,
+    QUERY_COUNT_LOG=False,
+    QUERY_COUNT_RAISE=False,
+    QUERY_COUNT_N_PLUS_ONE=5,
+)
+def test_middleware_headers_and_raise():
+    middleware = query_count.QueryCountMiddleware(_view)
+    response = middleware(RequestFactory().get("/api/v1/me"))
+    assert response["X-DB-Queries"] == "5"
+    assert response["X-DB-N-Plus-One"] == "1"
+
+    with (
+        override_settings(QUERY_COUNT_RAISE=True),
+        pytest.raises(query_count.NPlusOneError, match="5 x SELECT"),
+    ):
+        middleware(RequestFactory().get("/api/v1/me"))
@@ -0,0 +1,249 @@
+"""
+Non-régression des plans de requêtes, endpoint par endpoint.
+
+    PLAN_TESTS=1 DATABASE_URL=postgres://... pytest tests/test_query_plans.py
+
+Charge dans la base de test de pytest-django un jeu de données synthétique
+(`PLAN_TEST_SCALE`, 1 par défaut : environ 400 000 lignes), annulé en fin
+de module, puis appelle chaque endpoint de lecture deux fois : la seconde,
+caches chauds, est capturée. Chaque requête est rejouée avec
+EXPLAIN (ANALYZE, BUFFERS) et confrontée au budget de l'endpoint
+(`ENDPOINTS`) : index perdu, estimation de lignes, nombre de requêtes.
+"""
+
+import os
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import jwt
+import pytest
+from django.db import connection, transaction
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.common import query_plans
+from apps.companies.models import Entreprise
+from apps.invoices.models import Customer, Invoice, InvoiceLine
+from apps.treasury.models import BankTransaction, CategoryRule, Reconciliation
+from apps.users.models import Role, User
+
+ENABLED = os.getenv("PLAN_TESTS") == "1"
+SCALE = float(os.getenv("PLAN_TEST_SCALE", "1"))
+JWT_SECRET = "query-plan-tests"
+
+TENANTS = 30
+# Volumes par entreprise à l'échelle 1
+CUSTOMERS, INVOICES, LINES_PER_INVOICE = 200, 2_000, 3
+TRANSACTIONS, RECONCILIATIONS, CATEGORY_RULES = 5_000, 500, 20
+# Historique jusqu'à aujourd'hui : les fenêtres récentes de latest_rows servent
+DAYS = 900
+START = date.today() - timedelta(days=DAYS)
+
+REFERENCE_TABLES = frozenset({"users_role", "companies_entreprise"})
+Budget = query_plans.QueryBudget
+
+# Endpoint -> budget ; `{invoice}` et `{company}` désignent des lignes seedées
+ENDPOINTS = {
+    "/api/v1/me": Budget(queries=1, seq_scans=REFERENCE_TABLES),
+    "/api/v1/companies/": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/companies/{company}": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/invoices/": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/invoices/?status=ISSUED": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/invoices/{invoice}": Budget(queries=3, seq_scans=REFERENCE_TABLES),
+    "/api/v1/invoices/customers": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/treasury/dashboard": Budget(queries=4, seq_scans=REFERENCE_TABLES),
+    "/api/v1/treasury/bank-transactions": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    # Filtres peu sélectifs sur les mois récents : latest_rows élargit sa
+    # fenêtre jusqu'à la table entière (une requête par fenêtre)
+    "/api/v1/treasury/bank-transactions?from_date=2025-03-01&to_date=2025-03-31": (
+        Budget(queries=4, seq_scans=REFERENCE_TABLES)
+    ),
+    "/api/v1/treasury/bank-transactions?flagged=1": Budget(
+        queries=4, seq_scans=REFERENCE_TABLES
+    ),
+    "/api/v1/treasury/category-rules": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+    "/api/v1/treasury/reconciliations": Budget(queries=2, seq_scans=REFERENCE_TABLES),
+}
+
+
+def test_seq_scan_of_large_table_is_reported():
+    plan = {
+        "Node Type": "Limit",
+        "Plan Rows": 20,
+        "Plans": [
+            {
+                "Node Type": "Seq Scan",
+                "Relation Name": "treasury_banktransaction_p202603",
+                "Plan Rows": 40_000,
+                "Actual Rows": 20,
+                "Rows Removed by Filter": 39_000,
+                "Actual Loops": 1,
+            },
+        ],
+    }
+    problems = query_plans.plan_problems(plan, Budget(queries=1))
+    # Estimation sous LIMIT non comptée, parcours séquentiel signalé
+    assert problems == ["Seq Scan sur treasury_banktransaction (39020 lignes lues)"]
+    allowed = Budget(queries=1, seq_scans=frozenset({"treasury_banktransaction"}))
+    assert query_plans.plan_problems(plan, allowed) == []
+
+
+def test_row_estimate_budget_applies_below_blocking_nodes():
+    plan = {
+        "Node Type": "Limit",
+        "Plan Rows": 20,
+        "Plans": [
+            {
+                "Node Type": "Sort",
+                "Plan Rows": 80_000,
+                "Plans": [
+                    {
+                        "Node Type": "Index Scan",
+                        "Relation Name": "invoices_invoice",
+                        "Plan Rows": 80_000,
+                        "Actual Rows": 80_000,
+                        "Actual Loops": 1,
+                    },
+                ],
+            },
+        ],
+    }
+    assert query_plans.plan_problems(plan, Budget(queries=1, rows=10_000)) == [
+        "Sort : 80000 lignes estimées (budget 10000)",
+        "Index Scan sur invoices_invoice : 80000 lignes estimées (budget 10000)",
+    ]
+
+
+def test_transaction_control_is_not_counted():
+    queries = [
+        query_plans.CapturedQuery("default", sql, None, 0.0)
+        for sql in ('SAVEPOINT "s1"', "SELECT 1", 'RELEASE SAVEPOINT "s1"')
+    ]
+    assert [query.counted for query in queries] == [False, True, False]
+
+
+def _seed():
+    rng = random.Random(0)
+    role, _ = Role.objects.get_or_create(
+        code=Role.GERANT_PME, defaults={"label": "Gérant PME"}
+    )
+
+    def count(base):
+        return max(int(base * SCALE), 1)
+
+    entreprises = Entreprise.objects.bulk_create(
+        Entreprise(name=f"Entreprise {i:03d}", siret=f"{i:014d}")
+        for i in range(TENANTS)
+    )
+    user = User.objects.create(
+        username="plan-tests", entreprise=entreprises[0], role=role
+    )
+    for entreprise in entreprises:
+        customers = Customer.objects.bulk_create(
+            Customer(entreprise=entreprise, name=f"Client {i}")
+            for i in range(count(CUSTOMERS))
+        )
+        invoices = []
+        for i in range(count(INVOICES)):
+            issue_date = START + timedelta(days=rng.randrange(DAYS))
+            total = Decimal(rng.randrange(10_000, 500_000)) / 100
+            invoices.append(
+                Invoice(
+                    entreprise=entreprise,
+                    customer=rng.choice(customers),
+                    number=f"FAC-{i:06d}",
+                    status=rng.choice(["DRAFT", "ISSUED", "ISSUED", "PAID"]),
+                    issue_date=issue_date,
+                    due_date=issue_date + timedelta(days=30),
+                    total_ht=total,
+                    total_ttc=total * Decimal("1.2"),
+                    amount_due=total * Decimal("1.2"),
+                )
+            )
+        Invoice.objects.bulk_create(invoices, batch_size=5_000)
+        InvoiceLine.objects.bulk_create(
+            (
+                InvoiceLine(
+                    entreprise=entreprise,
+                    invoice=invoice,
+                    label=f"Prestation {j}",
+                    unit_price=invoice.total_ht / LINES_PER_INVOICE,
+                )
+                for invoice in invoices
+                for j in range(LINES_PER_INVOICE)
+            ),
+            batch_size=5_000,
+        )
+        transactions = BankTransaction.objects.bulk_create(
+            (
+                BankTransaction(
+                    entreprise=entreprise,
+                    date=START + timedelta(days=rng.randrange(DAYS)),
+                    label=f"VIR SEPA CLIENT {rng.randrange(500)}",
+                    amount=Decimal(rng.randrange(-300_000, 600_000)) / 100,
+                    anomaly_flags=1 if rng.random() < 0.01 else 0,
+                )
+                for _ in range(count(TRANSACTIONS))
+            ),
+            batch_size=5_000,
+        )
+        Reconciliation.objects.bulk_create(
+            (
+                Reconciliation(
+                    entreprise=entreprise,
+                    invoice=invoice,
+                    bank_transaction=transaction,
+                    matched_amount=invoice.total_ttc,
+                    matched_by=user,
+                )
+                for invoice, transaction in zip(
+                    invoices[: count(RECONCILIATIONS)],
+                    transactions[: count(RECONCILIATIONS)],
+                    strict=False,
+                )
+            ),
+            batch_size=5_000,
+        )
+        CategoryRule.objects.bulk_create(
+            CategoryRule(
+                entreprise=entreprise, category="Ventes", pattern=f"CLIENT {i}"
+            )
+            for i in range(CATEGORY_RULES)
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return user, Invoice.objects.filter(entreprise=user.entreprise).first()
+
+
+@pytest.fixture(scope="module")
+def api(django_db_setup, django_db_blocker):
+    """Client authentifié sur le jeu de données, chargé une fois par module."""
+    with (
+        django_db_blocker.unblock(),
+        override_settings(AUDIT_ASYNC=False, SUPABASE_JWT_SECRET=JWT_SECRET),
+        transaction.atomic(),
+    ):
+        user, invoice = _seed()
+        token = jwt.encode(
+            {"sub": user.username, "aud": "authenticated"}, JWT_SECRET, "HS256"
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        yield client, {"invoice": invoice.pk, "company": user.entreprise_id}
+        transaction.set_rollback(True)
+
+
+@pytest.mark.skipif(not ENABLED, reason="PLAN_TESTS non défini")
+@pytest.mark.django_db
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_endpoint_query_plans(api, endpoint):
+    client, ids = api
+    path = endpoint.format(**ids)
+    assert client.get(path).status_code == 200
+    with query_plans.capture_queries() as captured:
+        response = client.get(path)
+    assert response.status_code == 200
+    problems = query_plans.check_queries(captured, ENDPOINTS[endpoint])
+    assert not problems, "\n".join([path, *problems])
@@ -0,0 +1,84 @@
+from datetime import date
+from decimal import Decimal
+
+from apps.treasury import matching
+
+
+def _invoice(pk, number, amount, due, issue=date(2026, 1, 1)):
+    return matching.InvoiceCandidate(
+        id=pk,
+        number=number,
+        amount_cents=matching.to_cents(amount),
+        issue_date=issue,
+        due_date=due,
+    )
+
+
+def test_to_cents_rounds_half_up():
+    assert matching.to_cents(Decimal("12.345")) == 1235
+    assert matching.to_cents("100") == 10000
+
+
+def test_reference_keys():
+    assert matching.reference_keys("VIR SEPA FAC-00012 ACME") == {"FAC00012", "12"}
+
+
+def test_match_by_reference_wins_over_amount():
+    index = matching.InvoiceIndex.build(
+        [
+            _invoice(1, "FAC-00001", "120.00", date(2026, 2, 1)),
+            _invoice(2, "FAC-00002", "120.00", date(2026, 2, 1)),
+        ]
+    )
+    assert index.match(12000, date(2026, 2, 3), "VIR ACME FAC00002").id == 2
+
+
+def test_ambiguous_amount_is_left_for_manual_matching():
+    index = matching.InvoiceIndex.build(
+        [
+            _invoice(1, "FAC-00001", "120.00", date(2026, 2, 1)),
+            _invoice(2, "FAC-00002", "120.00", date(2026, 2, 10)),
+        ]
+    )
+    assert index.match(12000, date(2026, 2, 3), "VIREMENT ACME") is None
+
+
+def test_consumed_invoice_is_not_matched_twice():
+    index = matching.InvoiceIndex.build(
+        [_invoice(1, "FAC-00001", "50.00", date(2026, 2, 1))]
+    )
+    candidate = index.match(5000, date(2026, 2, 1), "VIR")
+    index.consume(candidate)
+    assert index.match(5000, date(2026, 2, 2), "VIR") is None
+
+
+def test_due_date_window():
+    index = matching.InvoiceIndex.build(
+        [_invoice(1, "FAC-00001", "50.00", date(2026, 2, 1))], late_days=10
+    )
+    assert index.match(5000, date(2026, 3, 1), "VIR") is None
+    assert index.match(5000, date(2026, 2, 5), "VIR").id == 1
+
+
+def test_suggest_ranks_referenced_customer_first():
+    candidates = [
+        _invoice(1, "FAC-00001", "120.00", date(2026, 2, 1)),
+        _invoice(2, "FAC-00002", "118.00", date(2026, 2, 1)),
+        _invoice(3, "FAC-00003", "900.00", date(2026, 2, 1)),
+    ]
+    candidates[1].customer_name = "GLOBEX SARL"
+    index = matching.InvoiceIndex.build(candidates)
+
+    suggestions = index.suggest(12000, date(2026, 2, 3), "VIR GLOBEX FAC-00002", k=2)
+
+    assert [s.candidate.id for s in suggestions] == [2, 1]
+    assert suggestions[0].details["reference"] == 1.0
+
+
+def test_suggest_limits_amount_candidates():
+    index = matching.InvoiceIndex.build(
+        _invoice(i, f"FAC-{i:05d}", 100 + i, date(2026, 2, 1)) for i in range(50)
+    )
+    suggestions = index.suggest(12500, date(2026, 2, 1), "VIR", k=3, max_candidates=5)
+    assert suggestions[0].candidate.id == 25
+    assert {s.candidate.id for s in suggestions} == {24, 25, 26}
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from apps.companies.models import Entreprise
+from apps.treasury import recurrence
+from apps.treasury.forecast import load_forecast_inputs
+from apps.treasury.models import RecurringSeries
+
+START = date(2026, 1, 5).toordinal()
+
+
+def test_amount_bands_group_close_amounts_by_sign():
+    bands = recurrence.amount_bands([-80000, -81000, -120000, 80000, 0])
+    assert bands[0] == bands[1]
+    assert bands[2] != bands[0]
+    assert bands[3] == -bands[0]
+    assert bands[4] == 0
+
+
+def test_classify_weekly_monthly_quarterly_and_noise():
+    month_starts = [date(2026, m, 5).toordinal() for m in range(1, 7)]
+    groups = {
+        0: [START + 7 * i for i in range(8)],  # Hebdomadaire
+        1: month_starts,  # Mensuel (28 à 31 jours)
+        2: [START + 91 * i for i in range(4)],  # Trimestriel
+        3: [START, START + 3, START + 40, START + 41],  # Irrégulier
+        4: [START, START + 30],  # Trop peu d'occurrences
+    }
+    codes = [code for code, dates in groups.items() for _ in dates]
+    ordinals = [ordinal for dates in groups.values() for ordinal in dates]
+
+    stats = recurrence.inter_arrival_stats(codes, ordinals, [-1000] * len(codes))
+    kinds = recurrence.classify(stats)
+
+    names = [recurrence.PERIODICITIES[k][0] if k >= 0 else None for k in kinds]
+    assert names == ["WEEKLY", "MONTHLY", "QUARTERLY", None, None]
+    assert stats.first[1] == month_starts[0] and stats.last[1] == month_starts[-1]
+    assert stats.counts.tolist() == [8, 6, 4, 4, 2]
+
+
+def test_inter_arrival_stats_empty():
+    stats = recurrence.inter_arrival_stats([], [], [])
+    assert len(recurrence.classify(stats)) == 0
+
+
+@pytest.mark.django_db
+def test_forecast_projects_recurring_outflows_only():
+    entreprise = Entreprise.objects.create(name="Alpha", siret="10000000000001")
+    last = date.today() - timedelta(days=10)
+    for label, amount in (("LOYER", "-1500.00"), ("VIR CLIENT", "800.00")):
+        RecurringSeries.objects.create(
+            entreprise=entreprise,
+            label_key=label,
+            amount_band=1,
+            kind=RecurringSeries.Kind.MONTHLY,
+            period_days=30.4,
+            occurrences=6,
+            first_date=last - timedelta(days=152),
+            last_date=last,
+            next_expected_date=last + timedelta(days=30),
+            expected_amount=Decimal(amount),
+        )
+
+    inputs = load_forecast_inputs(entreprise.pk)
+    # Encaissements clients : déjà projetés depuis les factures ouvertes
+    assert [item.label_key for item in inputs.recurring_series] == ["LOYER"]
+    assert inputs.recurring.amounts.tolist() == [-150000.0]
@@ -0,0 +1,110 @@
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.common import replicas
+
+# Primaire et réplica en streaming, p. ex. deux conteneurs postgres:15 locaux
+PRIMARY_URL = os.getenv("REPLICA_TEST_PRIMARY_URL")
+REPLICA_URL = os.getenv("REPLICA_TEST_REPLICA_URL")
+
+
+def test_lsn_ordering():
+    assert replicas.parse_lsn("0/16B3748") < replicas.parse_lsn("0/16B3750")
+    assert replicas.parse_lsn("1/0") > replicas.parse_lsn("0/FFFFFFFF")
+    assert replicas.parse_lsn(None) is None
+
+
+def status(alias, lsn=None, lag=0.0, healthy=True):
+    return replicas.ReplicaStatus(alias, healthy, lsn=lsn, lag=lag)
+
+
+def test_reads_wait_for_a_replica_that_replayed_the_last_write():
+    statuses = [status("replica_1", lsn=100), status("replica_2", lsn=250)]
+    assert replicas.choose_replica(statuses, 200, max_lag=10) == "replica_2"
+    assert replicas.choose_replica(statuses, 300, max_lag=10) is None
+    # Position inconnue (hors PostgreSQL) : lectures sur le primaire
+    assert (
+        replicas.choose_replica([status("replica_1")], replicas.UNKNOWN_POSITION, 10)
+        is None
+    )
+
+
+def test_unhealthy_and_lagging_replicas_are_skipped():
+    statuses = [
+        status("replica_1", lsn=500, healthy=False),
+        status("replica_2", lsn=500, lag=60),
+        status("replica_3", lsn=500),
+    ]
+    picks = {replicas.choose_replica(statuses, None, max_lag=10) for _ in range(5)}
+    assert picks == {"replica_3"}
+
+
+def test_reads_are_spread_across_replicas():
+    statuses = [status("replica_1"), status("replica_2")]
+    picks = {replicas.choose_replica(statuses, None, max_lag=10) for _ in range(4)}
+    assert picks == {"replica_1", "replica_2"}
+
+
+@pytest.mark.django_db
+def test_last_write_travels_in_a_signed_cookie():
+    user = SimpleNamespace(pk=uuid.uuid4(), is_authenticated=True)
+    request = RequestFactory().post("/api/v1/invoices")
+    request.user = user
+    response = HttpResponse()
+    replicas.remember_write(request, response)
+    cookie = response.cookies[replicas.PIN_COOKIE]
+    assert cookie["max-age"] == settings.REPLICA_PIN_SECONDS
+    assert cookie["httponly"]
+
+    # Requête suivante, servie par n'importe quel worker
+    follow = RequestFactory().get("/api/v1/invoices")
+    follow.COOKIES[replicas.PIN_COOKIE] = cookie.value
+    position = replicas.last_write(follow, user.pk)
+    assert isinstance(position, int)
+    # Cookie d'un autre utilisateur ou altéré : ignoré
+    assert replicas.last_write(follow, uuid.uuid4()) is None
+    forged = cookie.value.replace(f":{position}:", f":{position + 1}:", 1)
+    assert forged != cookie.value
+    follow.COOKIES[replicas.PIN_COOKIE] = forged
+    assert replicas.last_write(follow, user.pk) is None
+
+
+@pytest.mark.skipif(
+    not (PRIMARY_URL and REPLICA_URL),
+    reason="REPLICA_TEST_PRIMARY_URL / REPLICA_TEST_REPLICA_URL non définies",
+)
+def test_replica_catches_up_with_primary_write():
+    psycopg2 = pytest.importorskip("psycopg2")
+    primary = psycopg2.connect(PRIMARY_URL)
+    replica = psycopg2.connect(REPLICA_URL)
+    primary.autocommit = replica.autocommit = True
+    try:
+        with primary.cursor() as cursor:
+            cursor.execute("CREATE TABLE IF NOT EXISTS replica_probe (at timestamptz)")
+            cursor.execute("INSERT INTO replica_probe VALUES (now())")
+            position = replicas.primary_position(cursor)
+            # Le primaire n'est pas en réplication
+            assert not replicas.read_status("primary", cursor).healthy
+
+        deadline = time.monotonic() + 10
+        while True:
+            with replica.cursor() as cursor:
+                current = replicas.read_status("replica_1", cursor)
+            assert current.healthy
+            if current.has_replayed(position) or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        assert current.has_replayed(position)
+        assert replicas.choose_replica([current], position, max_lag=10) == "replica_1"
+    finally:
+        with primary.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS replica_probe")
+        primary.close()
+        replica.close()
@@ -0,0 +1,153 @@
+"""
+Tests du routage par shard et du déplacement d'entreprise.
+
+Les tests sur deux bases demandent un shard configuré, p. ex. :
+
+    DATABASE_SHARD_URLS=shard_1=postgres://postgres@localhost/fm_shard \
+        pytest tests/test_sharding.py
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common import sharding
+from apps.common.managers import tenant_scope
+from apps.common.tenancy import TenantContext, tenant_required
+from apps.companies.models import Entreprise
+from apps.invoices.models import Customer, Invoice, InvoiceLine
+from apps.users.models import User
+
+SHARD = settings.DATABASE_SHARDS[0] if settings.DATABASE_SHARDS else None
+needs_shard = pytest.mark.skipif(SHARD is None, reason="DATABASE_SHARD_URLS non défini")
+# Les entreprises créées sont recopiées sur chaque shard
+DATABASES = ["default", *settings.DATABASE_SHARDS]
+
+
+@api_view(["GET", "POST"])
+@tenant_required
+def tenant_view(request):
+    return Response({})
+
+
+def _call(method, user):
+    request = getattr(APIRequestFactory(), method)("/api/v1/tenant")
+    force_authenticate(request, user=user)
+    request.tenant = TenantContext(user.entreprise_id, user.pk)
+    return tenant_view(request)
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_frozen_tenant_rejects_writes_on_every_worker():
+    entreprise = Entreprise.objects.create(name="Alpha", siret="60000000000001")
+    user = User.objects.create(username="alpha-user", entreprise=entreprise)
+    # Gel lu en base : vu aussi par les workers qui ne l'ont pas posé
+    sharding.freeze_tenant(entreprise.pk, timeout=60)
+    assert Entreprise.objects.get(pk=entreprise.pk).frozen_until is not None
+
+    with override_settings(DATABASE_SHARDS=["shard_x"]):
+        assert _call("post", user).status_code == 503
+        assert _call("get", user).status_code == 200
+        sharding.unfreeze_tenant(entreprise.pk)
+        assert _call("post", user).status_code == 200
+        # Gel expiré
+        sharding.freeze_tenant(entreprise.pk, timeout=-1)
+        assert _call("post", user).status_code == 200
+
+    # Sans shard, aucun gel n'est lu
+    sharding.freeze_tenant(entreprise.pk, timeout=60)
+    with override_settings(DATABASE_SHARDS=[]):
+        assert _call("post", user).status_code == 200
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_cutover_requires_a_live_freeze():
+    entreprise = Entreprise.objects.create(name="Alpha", siret="60000000000002")
+    assert not sharding.cutover_tenant(entreprise.pk, "shard_x", hold=30)
+
+    sharding.freeze_tenant(entreprise.pk, timeout=60)
+    assert sharding.cutover_tenant(entreprise.pk, "shard_x", hold=30)
+    entreprise.refresh_from_db()
+    assert entreprise.shard == "shard_x"
+    # Gel prolongé le temps que chaque worker recharge la carte
+    with override_settings(DATABASE_SHARDS=["shard_x"]):
+        assert sharding.is_frozen(entreprise.pk)
+
+
+def _tenant_data(name, siret):
+    entreprise = Entreprise.objects.create(name=name, siret=siret)
+    customer = Customer.objects.create(entreprise=entreprise, name="Client")
+    invoice = Invoice.objects.create(
+        entreprise=entreprise, customer=customer, number=f"FAC-{name}"
+    )
+    InvoiceLine.objects.create(
+        entreprise=entreprise,
+        invoice=invoice,
+        label="Conseil",
+        unit_price=Decimal("100.00"),
+    )
+    return entreprise, invoice
+
+
+@needs_shard
+@pytest.mark.django_db(databases=DATABASES)
+def test_sync_verify_and_purge():
+    entreprise, invoice = _tenant_data("Alpha", "60000000000003")
+    sharding.sync_reference_rows(SHARD)
+
+    results = sharding.sync_tenant(entreprise.pk, "default", SHARD)
+    written = {result.label: result.written for result in results}
+    assert written["invoices.Invoice"] == written["invoices.InvoiceLine"] == 1
+    assert sharding.verify_tenant(entreprise.pk, "default", SHARD).problems == []
+
+    # Écriture sur la source après la copie : détectée, puis rattrapée
+    Invoice.objects.filter(pk=invoice.pk).update(number="FAC-2")
+    problems = sharding.verify_tenant(entreprise.pk, "default", SHARD).problems
+    assert problems == [
+        f"invoices.Invoice : 1 ligne(s) sur default, 1 sur {SHARD} (contenu différent)"
+    ]
+    sharding.sync_tenant(entreprise.pk, "default", SHARD)
+    assert sharding.verify_tenant(entreprise.pk, "default", SHARD).problems == []
+
+    deleted = sharding.purge_tenant(entreprise.pk, "default")
+    assert deleted["invoices.Invoice"] == 1
+    assert not Invoice.objects.using("default").filter(pk=invoice.pk).exists()
+    assert Invoice.objects.using(SHARD).get(pk=invoice.pk).number == "FAC-2"
+
+
+@needs_shard
+@pytest.mark.django_db(databases=DATABASES)
+def test_move_tenant_routes_the_tenant_to_its_new_shard(monkeypatch):
+    moved, invoice = _tenant_data("Alpha", "60000000000004")
+    stayed, _ = _tenant_data("Beta", "60000000000005")
+    monkeypatch.setattr(sharding, "SHARD_MAP_TTL", 0)
+
+    call_command(
+        "move_tenant",
+        str(moved.pk),
+        SHARD,
+        "--grace=0",
+        "--purge-source",
+        stdout=StringIO(),
+    )
+    moved.refresh_from_db()
+    assert (moved.shard, moved.frozen_until) == (SHARD, None)
+    assert sharding.shard_for(moved.pk) == SHARD
+    assert sharding.shard_for(stayed.pk) == "default"
+
+    with tenant_scope(moved.pk):
+        assert Invoice.objects.all().db == SHARD
+        assert list(Invoice.objects.all()) == [invoice]
+        customer = Customer.objects.create(entreprise=moved, name="Nouveau")
+    assert Customer.objects.using(SHARD).filter(pk=customer.pk).exists()
+    with tenant_scope(stayed.pk):
+        assert Invoice.objects.all().db == "default"
+    # Source purgée
+    assert not Invoice.objects.using("default").filter(entreprise=moved).exists()
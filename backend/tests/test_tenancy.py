@@ -0,0 +1,101 @@
+import pytest
+from django.http import HttpResponse
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.common import tenancy
+from apps.common.managers import scoped_tenant
+from apps.companies.models import Entreprise
+from apps.users.models import Role, User
+
+
+@api_view(["GET"])
+@tenancy.tenant_required
+def tenant_view(request):
+    return Response(
+        {
+            "entreprise_id": scoped_tenant(),
+            "switched": request.tenant.switched,
+        }
+    )
+
+
+def _get(user, company_id=None):
+    headers = {tenancy.TENANT_HEADER: str(company_id)} if company_id else {}
+    request = APIRequestFactory().get("/api/v1/tenant", headers=headers)
+    force_authenticate(request, user=user)
+    return tenancy.TenantMiddleware(tenant_view)(request)
+
+
+@pytest.fixture
+def companies():
+    return [
+        Entreprise.objects.create(name=name, siret=f"4000000000000{index}")
+        for index, name in enumerate(["Alpha", "Beta"])
+    ]
+
+
+def _user(username, entreprise, role):
+    return User.objects.create(
+        username=username,
+        entreprise=entreprise,
+        role=Role.objects.get_or_create(code=role, defaults={"label": role})[0],
+    )
+
+
+@pytest.mark.django_db
+def test_falls_back_to_the_user_entreprise(companies):
+    alpha, _ = companies
+    user = _user("gerant", alpha, Role.GERANT_PME)
+    for company_id in (None, alpha.pk):
+        response = _get(user, company_id)
+        assert response.status_code == 200
+        assert response.data == {"entreprise_id": alpha.pk, "switched": False}
+
+
+@pytest.mark.django_db
+def test_admin_cabinet_switches_to_any_active_entreprise(companies):
+    alpha, beta = companies
+    admin = _user("cabinet", alpha, Role.ADMIN_CABINET)
+    response = _get(admin, beta.pk)
+    assert response.status_code == 200
+    assert response.data == {"entreprise_id": beta.pk, "switched": True}
+
+    beta.is_active = False
+    beta.save()
+    assert _get(admin, beta.pk).status_code == 403
+
+
+@pytest.mark.django_db
+def test_non_members_are_denied(companies):
+    alpha, beta = companies
+    for role in (Role.GERANT_PME, Role.COMPTABLE_PME, Role.COLLABORATEUR):
+        response = _get(_user(role.lower(), alpha, role), beta.pk)
+        assert response.status_code == 403
+        assert response.data == {"error": "Accès refusé à cette entreprise"}
+
+
+@pytest.mark.django_db
+def test_malformed_header_or_missing_entreprise(companies):
+    alpha, _ = companies
+    response = _get(_user("gerant", alpha, Role.GERANT_PME), "not-a-uuid")
+    assert response.status_code == 400
+    assert response.data == {"error": f"{tenancy.TENANT_HEADER} invalide"}
+
+    response = _get(_user("orphelin", None, Role.COLLABORATEUR))
+    assert response.status_code == 400
+    assert response.data == {"error": "Entreprise non définie"}
+
+
+def test_current_request_is_exposed_while_handled():
+    seen = []
+
+    def view(request):
+        seen.append(tenancy.current_request())
+        return HttpResponse()
+
+    request = APIRequestFactory().get("/api/v1/tenant")
+    tenancy.TenantMiddleware(view)(request)
+    assert seen == [request]
+    assert tenancy.current_request() is None